@@ -1,6 +1,9 @@
 import requests
 from typing import Callable, Dict, Any
 from .settings import settings
+from ..utils.deadline import stage, time_left
+
+BACKEND_TIMEOUT_SECONDS = 10
 
 
 EXTERNAL_ENDPOINTS: Dict[str, str] = {
@@ -11,19 +14,22 @@ EXTERNAL_ENDPOINTS: Dict[str, str] = {
 
 def call_generate_meal_plan(household_id: str) -> Dict[str, Any]:
     """Call the external meal plan generation endpoint."""
-    resp = requests.get(f"{settings.bm_backend_api_base}/api/v1/athena/weekly-meal-plan/{household_id}", timeout=10)
+    with stage("backend"):
+        resp = requests.get(f"{settings.bm_backend_api_base}/api/v1/athena/weekly-meal-plan/{household_id}", timeout=time_left(BACKEND_TIMEOUT_SECONDS))
     resp.raise_for_status()
     return resp.json()
 
 def call_score_meal(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Call the external meal scoring endpoint."""
-    resp = requests.post(EXTERNAL_ENDPOINTS["SCORE_MEAL"], json=payload, timeout=10)
+    with stage("backend"):
+        resp = requests.post(EXTERNAL_ENDPOINTS["SCORE_MEAL"], json=payload, timeout=time_left(BACKEND_TIMEOUT_SECONDS))
     resp.raise_for_status()
     return resp.json()
 
 def call_place_order(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Call the external order placement endpoint."""
-    resp = requests.post(EXTERNAL_ENDPOINTS["PLACE_ORDER"], json=payload, timeout=10)
+    with stage("backend"):
+        resp = requests.post(EXTERNAL_ENDPOINTS["PLACE_ORDER"], json=payload, timeout=time_left(BACKEND_TIMEOUT_SECONDS))
     resp.raise_for_status()
     return resp.json()
 
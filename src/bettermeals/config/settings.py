@@ -1,6 +1,6 @@
 from pydantic import AnyHttpUrl
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     groq_api_key: Optional[str] = None
@@ -10,6 +10,143 @@ class Settings(BaseSettings):
     bm_backend_api_base: AnyHttpUrl = "http://staging-bm.eba-n3mspgd3.ap-south-1.elasticbeanstalk.com/"
     env: str = "dev"
 
+    # LLM response cache (temperature-0 calls only). Agents opt in by name, "*" enables all.
+    llm_cache_agents: List[str] = []
+    llm_cache_ttl_seconds: int = 6 * 3600
+    llm_cache_max_entries: int = 2048
+    llm_cache_sqlite_path: Optional[str] = None  # on-disk tier disabled when unset
+
+    # HTTP tool retries: retries capped at this fraction of requests; breakers per endpoint
+    http_retry_budget_ratio: float = 0.1
+    http_breaker_failure_threshold: int = 5
+    http_breaker_reset_seconds: float = 30.0
+
+    # Checkout idempotency ledger (in-memory only when unset)
+    idempotency_ledger_path: Optional[str] = None
+
+    # In-memory phone directory mirrored from Firestore listeners (routing lookups)
+    phone_directory_enabled: bool = True
+
+    # Completion listeners (onboarding form / weekly plan) and proactive WhatsApp messages
+    completion_events_enabled: bool = True
+    outbound_message_url: Optional[str] = None  # messages are only logged when unset
+
+    # Week-start meal plan pregeneration (AIMD concurrency against the backend)
+    meal_plan_batch_initial_concurrency: int = 4
+    meal_plan_batch_max_concurrency: int = 16
+    meal_plan_batch_max_attempts: int = 3
+
+    # Outbound broadcasts (token bucket sized to the WhatsApp messaging tier)
+    broadcast_rate_per_second: float = 20.0
+    broadcast_burst: int = 20
+    broadcast_concurrency: int = 8
+    broadcast_page_size: int = 200
+
+    # Nightly cook briefings (answers "today's menu" questions without the agent)
+    cook_briefings_enabled: bool = True
+    cook_briefing_concurrency: int = 8
+
+    # Semantic cache of cook assistant answers (local hashed n-gram vectors)
+    cook_semantic_cache_enabled: bool = True
+    cook_semantic_cache_threshold: float = 0.85
+    cook_semantic_cache_ttl_seconds: int = 7 * 24 * 3600
+    cook_semantic_cache_scoped_ttl_seconds: int = 12 * 3600
+    cook_semantic_cache_max_entries: int = 5000
+
+    # Invalidate cached per-day agent tool contexts on cook/user/household changes
+    tool_context_listeners_enabled: bool = True
+
+    # Provider prompt caching of static system prompts / tool schemas (Anthropic, Bedrock)
+    prompt_cache_enabled: bool = True
+
+    # Request deadline set by the WhatsApp webhook; downstream timeouts are capped by what is left
+    webhook_budget_seconds: float = 28.0
+    firestore_timeout_seconds: float = 10.0
+    llm_timeout_seconds: float = 30.0
+
+    # AgentCore invocations: at most this long per message (less if the request deadline
+    # has less left), and a rolling latency/error SLO per implementation (Runtime <-> MCP failover)
+    agent_webhook_budget_seconds: float = 25.0
+    agent_failover_enabled: bool = True
+    agent_min_attempt_seconds: float = 3.0
+    agent_slo_window_seconds: float = 120.0
+    agent_slo_min_samples: int = 5
+    agent_slo_error_rate: float = 0.5
+    agent_slo_latency_seconds: float = 15.0
+    agent_breaker_reset_seconds: float = 60.0
+
+    # Fair scheduling of agent invocations: concurrency caps and queue-time shedding
+    agent_max_concurrency: int = 32
+    agent_model_concurrency: int = 16
+    agent_actor_concurrency: int = 1
+    agent_actor_max_queued: int = 3
+    agent_max_queue_seconds: float = 8.0
+
+    # Webhook admission control: adaptive (AIMD on latency) global limit, fixed per-route caps
+    admission_enabled: bool = True
+    admission_initial_concurrency: int = 32
+    admission_min_concurrency: int = 4
+    admission_max_concurrency: int = 128
+    admission_latency_target_seconds: float = 10.0
+    # Paths that are slow by design get their own target (supervisor graph runs take 12-20s)
+    admission_latency_targets: Dict[str, float] = {
+        "/webhooks/whatsapp/graph": 25.0,
+    }
+    admission_route_limits: Dict[str, int] = {
+        "cook_assistant": 32,
+        "onboarding": 16,
+        "weekly_plan": 16,
+        "user_agent": 32,
+        "graph": 8,
+    }
+
+    # Sticky multi-process front: consistent hashing of phone numbers onto app workers
+    sticky_workers: int = 4
+    sticky_base_port: int = 8100
+    sticky_ring_replicas: int = 128
+    # Whether this process runs the side-effecting background work (completion listeners,
+    # proactive messages). The sticky front sets it for worker-0 only.
+    background_leader: bool = True
+
+    # Two-tier cache: "host:port" of utils/kv_server.py, "local" for an in-process
+    # stand-in; process-local only when unset
+    shared_cache_url: Optional[str] = None
+    shared_cache_local_ttl_seconds: float = 30.0
+    shared_cache_max_local_entries: int = 10_000
+    shared_cache_timeout_seconds: float = 0.2
+    shared_cache_secret: Optional[str] = None  # HMAC key for shared entries; set it for any non-"local" tier
+
+    # Graph checkpoints: message contents larger than the threshold are stored as
+    # content-addressed blobs ("local" directory or "firebase" storage) and referenced
+    # from the checkpoint; blobs unreferenced for the TTL are collected by the leader
+    graph_blob_offload_enabled: bool = True
+    graph_blob_backend: str = "local"
+    graph_blob_dir: str = ".graph_blobs"
+    graph_blob_threshold_bytes: int = 16_384
+    graph_blob_cache_entries: int = 256
+    graph_blob_ttl_seconds: float = 7 * 24 * 3600
+    graph_blob_gc_interval_seconds: float = 3600
+
+    # Supervisor fan-out: parallel handoffs to independent workers; trivial joins skip the LLM
+    supervisor_parallel_handoffs: bool = True
+    supervisor_join_skip_enabled: bool = True
+
+    # Hedged LLM router: per-agent provider preferences ("*" for any agent), hedge to the
+    # next provider after the agent's threshold, hedges capped at a fraction of calls
+    llm_provider_preferences: Dict[str, List[str]] = {"supervisor": ["groq", "anthropic"]}
+    llm_hedge_after_seconds: Dict[str, float] = {"supervisor": 0.5}
+    llm_hedge_default_after_seconds: float = 2.0
+    llm_hedge_max_ratio: float = 0.1
+    llm_router_window_seconds: float = 60.0
+    llm_router_min_samples: int = 5
+    llm_router_error_rate: float = 0.5
+    llm_router_cooldown_seconds: float = 30.0
+    # USD per million input / output tokens, for the llm.cost_usd metric
+    llm_provider_costs: Dict[str, Dict[str, float]] = {
+        "groq": {"input": 0.10, "output": 0.50},
+        "anthropic": {"input": 3.00, "output": 15.00},
+    }
+
     class Config:
         env_file = ".env"
 
@@ -1,14 +1,23 @@
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
 from google.cloud.firestore_v1.base_query import FieldFilter
 from google.cloud import firestore
 from .firebase_init import initialize_firebase
+from .phone_directory import PhoneDirectory, PhoneEntry, ROLE_COOK, ROLE_USER, normalize_phone_number
+from ..config.settings import settings
+from ..utils.deadline import time_left
+from ..utils.shared_cache import TwoTierCache
+import copy
 import logging
 import json
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Household documents (None for unknown ids) and "plan is ready" markers, shared across workers
+_households = TwoTierCache("household", ttl=300.0, negative_ttl=60.0)
+_generated_plans = TwoTierCache("meal_plan_generated", ttl=7 * 24 * 3600.0, negative_ttl=60.0)
+
 
 class Database:
     """Database layer for managing health-related data in Firestore"""
@@ -18,6 +27,7 @@ class Database:
         try:
             logger.info("Initializing database connection")
             self.db = initialize_firebase()
+            self.phone_directory = PhoneDirectory(self._normalize_phone_number)
             logger.info("Database connection initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database connection: {str(e)}")
@@ -31,25 +41,19 @@ class Database:
         - +919639293454 -> 919639293454 (removes + prefix)
         - 919639293454 -> 919639293454 (already correct)
         """
-        if not phone_number:
-            return phone_number
-        
-        # Remove + prefix if present
-        normalized = phone_number.lstrip('+')
-        
-        # Remove any non-digit characters (spaces, dashes, etc.)
-        normalized = ''.join(filter(str.isdigit, normalized))
-        
-        # Ensure it starts with 91
-        if not normalized.startswith('91'):
-            normalized = f"91{normalized}"
-        
-        # Validate: should be exactly 12 digits (91 + 10 digits)
-        if len(normalized) != 12 or not normalized.isdigit():
-            logger.warning(f"Invalid phone number format after normalization: {phone_number} -> {normalized} (expected 12 digits)")
-            # Still return normalized value, but log warning
-        
-        return normalized
+        return normalize_phone_number(phone_number)
+
+    @staticmethod
+    def _timeout() -> float:
+        """Firestore call timeout, capped by the current request deadline (if any)"""
+        return time_left(settings.firestore_timeout_seconds)
+
+    def start_phone_directory(self):
+        """Start mirroring cook/user phone numbers in memory (lookups fall back to queries until loaded)"""
+        try:
+            self.phone_directory.start(self.db)
+        except Exception as e:
+            logger.error(f"Failed to start phone directory, phone lookups will query Firestore: {str(e)}")
 
     #######################################
     ######## HOUSEHOLD ##########
@@ -59,6 +63,8 @@ class Database:
         """Find user by WhatsApp phone number
         
         Normalizes phone number to format: 919639293454 (no + prefix, with 91 country code)
+        Returns the compact record {"id", "householdId"} (see PhoneEntry.to_record), not the
+        full user document, whether answered by the phone directory or by a query.
         """
         try:
             if not phone_number:
@@ -67,32 +73,62 @@ class Database:
             # Normalize phone number to expected format
             normalized_phone = self._normalize_phone_number(phone_number)
             logger.debug(f"Normalized phone number: {phone_number} -> {normalized_phone}")
+
+            known, entry = self.phone_directory.lookup(ROLE_USER, normalized_phone)
+            if known:
+                return entry.to_record() if entry else None
             
             logger.debug(f"Searching for user with phone number: {normalized_phone}")
             users_ref = self.db.collection("user")
             q = users_ref.where("phone_number", "==", normalized_phone).limit(1)
-            docs = list(q.stream())
+            docs = list(q.stream(timeout=self._timeout()))
             
             if not docs:
                 logger.debug(f"No user found with phone number: {normalized_phone}")
                 return None
                 
             doc = docs[0]
-            data = doc.to_dict()
-            data["id"] = doc.id
             logger.debug(f"Found user: {doc.id} for phone number: {normalized_phone}")
-            return data
+            return PhoneEntry.from_document(ROLE_USER, doc.id, doc.to_dict() or {}).to_record()
             
         except Exception as e:
             logger.error(f"Error finding user by phone {phone_number}: {str(e)}")
             raise
 
+    def get_household_phone_numbers(self, household_id: str) -> List[str]:
+        """Normalized phone numbers of the users linked to a household"""
+        try:
+            if self.phone_directory.is_ready(ROLE_USER):
+                return self.phone_directory.phones_for_household(household_id, ROLE_USER)
+
+            users_ref = self.db.collection("user")
+            q = users_ref.where("householdId", "==", household_id)
+            phones = []
+            for doc in q.stream(timeout=self._timeout()):
+                phone_number = doc.to_dict().get("phone_number")
+                if phone_number:
+                    phones.append(self._normalize_phone_number(phone_number))
+            return phones
+
+        except Exception as e:
+            logger.error(f"Error getting phone numbers for household {household_id}: {str(e)}")
+            return []
+
     def get_household_data(self, household_id: str):
-        """Get household data by ID"""
+        """Get household data by ID (cached; None for unknown ids is cached briefly too)"""
+        household = _households.get_or_load(household_id, lambda: self._fetch_household_data(household_id))
+        # Callers may modify the result; keep the cached copy intact
+        return copy.deepcopy(household)
+
+    def invalidate_household_cache(self, household_id: str) -> None:
+        """Drop the cached household document after a write or a change notification"""
+        _households.delete(household_id)
+
+    def _fetch_household_data(self, household_id: str):
         try:
             logger.debug(f"Retrieving household data for ID: {household_id}")
             household_ref = self.db.collection("household")
-            doc = household_ref.document(household_id).get()
+            doc = household_ref.document(household_id).get(timeout=self._timeout())
             
             if not doc.exists:
                 logger.debug(f"No household found with ID: {household_id}")
@@ -118,7 +154,7 @@ class Database:
             message_data["phone_number"] = normalized_phone
             message_data["timestamp"] = datetime.now()
             
-            messages_ref.add(message_data)
+            messages_ref.add(message_data, timeout=self._timeout())
             logger.debug(f"Successfully saved user agent message for phone: {normalized_phone}")
             return True
         except Exception as e:
@@ -133,7 +169,8 @@ class Database:
             
             household_ref = self.db.collection("household")
             doc = household_ref.document(household_id)
-            doc.update(data)
+            doc.update(data, timeout=self._timeout())
+            self.invalidate_household_cache(household_id)
             
             logger.debug(f"Successfully updated household data for ID: {household_id}")
             
@@ -160,7 +197,7 @@ class Database:
             message_data["timestamp"] = datetime.now()
             
             # Add the message
-            messages_ref.add(message_data)
+            messages_ref.add(message_data, timeout=self._timeout())
             
             logger.debug(f"Successfully saved onboarding message for phone: {normalized_phone}")
             return True
@@ -179,7 +216,7 @@ class Database:
             messages_ref = self.db.collection("onboarding_messages")
             # Use only where clause to avoid index requirement, then sort in Python
             q = messages_ref.where("phone_number", "==", normalized_phone)
-            docs = list(q.stream())
+            docs = list(q.stream(timeout=self._timeout()))
             
             messages = []
             for doc in docs:
@@ -216,7 +253,8 @@ class Database:
             # Update household with final onboarding data
             household_ref = self.db.collection("household")
             doc = household_ref.document(household_id)
-            doc.update({"onboarding": onboarding_data})
+            doc.update({"onboarding": onboarding_data}, timeout=self._timeout())
+            self.invalidate_household_cache(household_id)
             
             logger.info(f"Successfully saved final onboarding data to household {household_id}")
             return True
@@ -240,7 +278,7 @@ class Database:
             message_data["phone_number"] = normalized_phone
             message_data["timestamp"] = datetime.now()
 
-            messages_ref.add(message_data)
+            messages_ref.add(message_data, timeout=self._timeout())
             logger.debug(f"Successfully saved workflow message for phone: {normalized_phone}")
             return True
         except Exception as e:
@@ -255,7 +293,7 @@ class Database:
             logger.debug(f"Getting workflow messages for phone: {normalized_phone}")
             messages_ref = self.db.collection(collection_name)
             q = messages_ref.where("phone_number", "==", normalized_phone)
-            docs = list(q.stream())
+            docs = list(q.stream(timeout=self._timeout()))
             messages = []
             for doc in docs:
                 data = doc.to_dict()
@@ -272,13 +310,58 @@ class Database:
         try:
             logger.debug(f"Saving final workflow data for phone: {phone_number}")
             workflow_ref = self.db.collection(collection_name)
-            workflow_ref.add(workflow_data)
+            workflow_ref.add(workflow_data, timeout=self._timeout())
             logger.debug(f"Successfully saved final workflow data for phone: {phone_number}")
             return True
         except Exception as e:
             logger.error(f"Error saving final workflow data for phone {phone_number}: {str(e)}")
             return False
 
+    #######################################
+    ############# FLOW STATE ##############
+    #######################################
+
+    def _flow_state_doc(self, collection_name: str, phone_number: str):
+        """Snapshot document for a flow: one per (transaction collection, phone number)"""
+        normalized_phone = self._normalize_phone_number(phone_number)
+        return self.db.collection("flow_state").document(f"{collection_name}_{normalized_phone}")
+
+    def get_flow_snapshot(self, collection_name: str, phone_number: str) -> Optional[Dict[str, Any]]:
+        """Get the current step/data snapshot of a step flow, None if the user has none yet"""
+        try:
+            doc = self._flow_state_doc(collection_name, phone_number).get(timeout=self._timeout())
+            if not doc.exists:
+                return None
+            return doc.to_dict()
+        except Exception as e:
+            logger.error(f"Error getting flow snapshot for phone {phone_number}: {str(e)}")
+            raise
+
+    def commit_flow_transition(self, collection_name: str, phone_number: str, snapshot: Dict[str, Any], messages: List[Dict[str, Any]]) -> bool:
+        """Write the transition's messages and the new flow snapshot in a single batch"""
+        try:
+            normalized_phone = self._normalize_phone_number(phone_number)
+            now = datetime.now()
+            batch = self.db.batch()
+
+            messages_ref = self.db.collection(collection_name)
+            for offset, message_data in enumerate(messages):
+                message_data["phone_number"] = normalized_phone
+                # Keep audit messages ordered within the batch
+                message_data["timestamp"] = now + timedelta(microseconds=offset)
+                batch.set(messages_ref.document(), message_data)
+
+            snapshot["phone_number"] = normalized_phone
+            snapshot["updated_at"] = now
+            batch.set(self._flow_state_doc(collection_name, phone_number), snapshot)
+
+            batch.commit(timeout=self._timeout())
+            logger.debug(f"Committed flow transition for phone: {normalized_phone} in {collection_name}")
+            return True
+        except Exception as e:
+            logger.error(f"Error committing flow transition for phone {phone_number}: {str(e)}")
+            return False
+
     #######################################
     ########### WEEKLY PLAN REF ###########
     #######################################
@@ -294,7 +377,8 @@ class Database:
             logger.debug(f"Updating weekly plan status for household: {household_id}, week: {year_week}")
             household_ref = self.db.collection("household")
             doc = household_ref.document(household_id)
-            doc.update({"weekly_plan": weekly_plan_status})
+            doc.update({"weekly_plan": weekly_plan_status}, timeout=self._timeout())
+            self.invalidate_household_cache(household_id)
             logger.debug(f"Successfully saved weekly plan status for household: {household_id}, week: {year_week}")
             return True
         except Exception as e:
@@ -309,7 +393,7 @@ class Database:
             household_ref = self.db.collection("weekly_meal_plan")
             
             # Check if document exists without fetching data
-            doc = household_ref.document(hid_year_week).get()
+            doc = household_ref.document(hid_year_week).get(timeout=self._timeout())
             
             if doc.exists:
                 logger.info(f"Weekly plan exists for household: {household_id}, week: {year_week}")
@@ -322,12 +406,152 @@ class Database:
             logger.error(f"Error checking if weekly plan is completed for household {household_id}: {str(e)}")
             return False
 
+    #######################################
+    ####### MEAL PLAN PREGENERATION #######
+    #######################################
+
+    def list_onboarded_household_ids(self) -> List[str]:
+        """Ids of households that have completed onboarding"""
+        try:
+            household_ref = self.db.collection("household")
+            q = household_ref.where(filter=FieldFilter("onboarding.status", "==", "completed")).select(["onboarding.status"])
+            return [doc.id for doc in q.stream(timeout=self._timeout())]
+        except Exception as e:
+            logger.error(f"Error listing onboarded households: {str(e)}")
+            raise
+
+    def is_meal_plan_generated(self, household_id: str, year_week: str) -> bool:
+        """Check the generation marker written by the batch job or the request path"""
+        try:
+            # True while the marker is "ready"; None (not ready) is re-checked after a minute
+            return bool(_generated_plans.get_or_load(f"{household_id}-{year_week}", lambda: self._meal_plan_ready(household_id, year_week)))
+        except Exception as e:
+            logger.error(f"Error checking meal plan generation for household {household_id}: {str(e)}")
+            return False
+
+    def _meal_plan_ready(self, household_id: str, year_week: str) -> Optional[bool]:
+        doc = self.db.collection("meal_plan_generation").document(f"{household_id}-{year_week}").get(timeout=self._timeout())
+        return True if doc.exists and doc.to_dict().get("status") == "ready" else None
+
+    def get_generated_household_ids(self, year_week: str) -> List[str]:
+        """Households whose meal plan for the week is already generated"""
+        try:
+            generation_ref = self.db.collection("meal_plan_generation")
+            q = (generation_ref
+                 .where(filter=FieldFilter("week", "==", year_week))
+                 .where(filter=FieldFilter("status", "==", "ready")))
+            return [doc.to_dict().get("household_id") for doc in q.stream(timeout=self._timeout())]
+        except Exception as e:
+            logger.error(f"Error getting generated households for week {year_week}: {str(e)}")
+            raise
+
+    def record_meal_plan_generation(self, household_id: str, year_week: str, status: str, source: str, error: Optional[str] = None) -> bool:
+        """Write the generation marker for a household's weekly plan"""
+        try:
+            self.db.collection("meal_plan_generation").document(f"{household_id}-{year_week}").set({
+                "household_id": household_id,
+                "week": year_week,
+                "status": status,
+                "source": source,
+                "error": error,
+                "updated_at": datetime.now(),
+            }, timeout=self._timeout())
+            _generated_plans.set(f"{household_id}-{year_week}", True if status == "ready" else None)
+            return True
+        except Exception as e:
+            logger.error(f"Error recording meal plan generation for household {household_id}: {str(e)}")
+            return False
+
+    def save_meal_plan_batch_progress(self, year_week: str, progress: Dict[str, Any]) -> bool:
+        """Checkpoint counters/status of the week's pregeneration batch"""
+        try:
+            progress["updated_at"] = datetime.now()
+            self.db.collection("meal_plan_batches").document(year_week).set(progress, merge=True, timeout=self._timeout())
+            return True
+        except Exception as e:
+            logger.error(f"Error saving meal plan batch progress for week {year_week}: {str(e)}")
+            return False
+
+    #######################################
+    ###### WEEKLY PLAN BROADCASTS #########
+    #######################################
+
+    def list_onboarded_households_page(self, page_size: int, start_after: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """One page of (household_id, weekly_plan) for onboarded households, ordered by id"""
+        try:
+            household_ref = self.db.collection("household")
+            q = (household_ref
+                 .where(filter=FieldFilter("onboarding.status", "==", "completed"))
+                 .select(["weekly_plan"])
+                 .order_by("__name__")
+                 .limit(page_size))
+            if start_after:
+                q = q.start_after({"__name__": household_ref.document(start_after)})
+            return [(doc.id, (doc.to_dict() or {}).get("weekly_plan") or {}) for doc in q.stream(timeout=self._timeout())]
+        except Exception as e:
+            logger.error(f"Error listing onboarded households after {start_after}: {str(e)}")
+            raise
+
+    def get_approved_household_ids(self, household_ids: List[str], year_week: str) -> List[str]:
+        """Households (of the given ids) that have a weekly_meal_plan for the week, in one batched read"""
+        try:
+            plan_ref = self.db.collection("weekly_meal_plan")
+            refs = [plan_ref.document(f"{household_id}-{year_week}") for household_id in household_ids]
+            suffix = f"-{year_week}"
+            return [doc.id[:-len(suffix)] for doc in self.db.get_all(refs, field_paths=[], timeout=self._timeout()) if doc.exists]
+        except Exception as e:
+            logger.error(f"Error checking approved weekly plans for week {year_week}: {str(e)}")
+            raise
+
+    def get_broadcast_delivered_phones(self, broadcast_id: str) -> List[str]:
+        """Phone numbers a broadcast has already been delivered to"""
+        try:
+            deliveries_ref = self.db.collection("broadcast_deliveries")
+            q = (deliveries_ref
+                 .where(filter=FieldFilter("broadcast_id", "==", broadcast_id))
+                 .where(filter=FieldFilter("status", "==", "sent"))
+                 .select(["phone_number"]))
+            return [doc.to_dict().get("phone_number") for doc in q.stream(timeout=self._timeout())]
+        except Exception as e:
+            logger.error(f"Error getting deliveries for broadcast {broadcast_id}: {str(e)}")
+            raise
+
+    def record_broadcast_delivery(self, broadcast_id: str, phone_number: str, household_id: str, status: str, error: Optional[str] = None) -> bool:
+        """Write the delivery state of a broadcast message to one phone number"""
+        try:
+            normalized_phone = self._normalize_phone_number(phone_number)
+            self.db.collection("broadcast_deliveries").document(f"{broadcast_id}_{normalized_phone}").set({
+                "broadcast_id": broadcast_id,
+                "phone_number": normalized_phone,
+                "household_id": household_id,
+                "status": status,
+                "error": error,
+                "updated_at": datetime.now(),
+            }, timeout=self._timeout())
+            return True
+        except Exception as e:
+            logger.error(f"Error recording broadcast delivery for phone {phone_number}: {str(e)}")
+            return False
+
+    def save_broadcast_progress(self, broadcast_id: str, progress: Dict[str, Any]) -> bool:
+        """Checkpoint counters/status of a broadcast"""
+        try:
+            progress["updated_at"] = datetime.now()
+            self.db.collection("broadcasts").document(broadcast_id).set(progress, merge=True, timeout=self._timeout())
+            return True
+        except Exception as e:
+            logger.error(f"Error saving progress for broadcast {broadcast_id}: {str(e)}")
+            return False
+
     #######################################
     ########## COOK ASSISTANT #############
     #######################################
 
     def find_cook_by_phone(self, phone_number: str) -> Optional[Dict[str, Any]]:
         """Find cook by WhatsApp phone number
+
+        Returns the compact record {"id", "household_id"} (see PhoneEntry.to_record), not the
+        full cook document, whether answered by the phone directory or by a query.
         """
         try:
             if not phone_number:
@@ -336,23 +560,25 @@ class Database:
             # Normalize phone number to expected format
             normalized_phone = self._normalize_phone_number(phone_number)
             logger.debug(f"Normalized phone number: {phone_number} -> {normalized_phone}")
+
+            known, entry = self.phone_directory.lookup(ROLE_COOK, normalized_phone)
+            if known:
+                return entry.to_record() if entry else None
             
             logger.debug(f"Searching for cook with phone number: {normalized_phone}")
             cook_ref = self.db.collection("cooks")
             
             # Search with normalized phone number
             q = cook_ref.where("whatsapp_number", "==", normalized_phone).limit(1)
-            docs = list(q.stream())
+            docs = list(q.stream(timeout=self._timeout()))
             
             if not docs:
                 logger.debug(f"No cook found with phone number: {normalized_phone}")
                 return None
                 
             doc = docs[0]
-            data = doc.to_dict()
-            data["id"] = doc.id
             logger.info(f"Found cook: {doc.id} for phone number: {normalized_phone}")
-            return data
+            return PhoneEntry.from_document(ROLE_COOK, doc.id, doc.to_dict() or {}).to_record()
             
         except Exception as e:
             logger.error(f"Error finding cook by phone {phone_number}: {str(e)}")
@@ -369,7 +595,7 @@ class Database:
             message_data["phone_number"] = normalized_phone
             message_data["timestamp"] = datetime.now()
             
-            messages_ref.add(message_data)
+            messages_ref.add(message_data, timeout=self._timeout())
             logger.debug(f"Successfully saved cook assistant message for phone: {normalized_phone}")
             return True
         except Exception as e:
@@ -384,7 +610,7 @@ class Database:
             logger.debug(f"Getting cook assistant messages for phone: {normalized_phone}")
             messages_ref = self.db.collection("cook_assistant_messages")
             q = messages_ref.where("phone_number", "==", normalized_phone)
-            docs = list(q.stream())
+            docs = list(q.stream(timeout=self._timeout()))
             
             messages = []
             for doc in docs:
@@ -405,6 +631,49 @@ class Database:
             return []
 
 
+    def list_cooks(self) -> List[Dict[str, Any]]:
+        """All cooks with their household and WhatsApp number"""
+        try:
+            cook_ref = self.db.collection("cooks").select(["household_id", "whatsapp_number"])
+            cooks = []
+            for doc in cook_ref.stream(timeout=self._timeout()):
+                data = doc.to_dict() or {}
+                data["id"] = doc.id
+                cooks.append(data)
+            return cooks
+        except Exception as e:
+            logger.error(f"Error listing cooks: {str(e)}")
+            raise
+
+    def get_weekly_meal_plan(self, household_id: str, year_week: str) -> Optional[Dict[str, Any]]:
+        """Get a household's meal plan for a week"""
+        try:
+            doc = self.db.collection("weekly_meal_plan").document(f"{household_id}-{year_week}").get(timeout=self._timeout())
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"Error getting weekly meal plan for household {household_id}, week {year_week}: {str(e)}")
+            raise
+
+    def save_cook_briefing(self, cook_id: str, date_str: str, briefing: Dict[str, Any]) -> bool:
+        """Store a cook's precomputed daily briefing"""
+        try:
+            briefing["generated_at"] = datetime.now()
+            self.db.collection("cook_briefings").document(f"{cook_id}-{date_str}").set(briefing, timeout=self._timeout())
+            return True
+        except Exception as e:
+            logger.error(f"Error saving briefing for cook {cook_id}, date {date_str}: {str(e)}")
+            return False
+
+    def get_cook_briefing(self, cook_id: str, date_str: str) -> Optional[Dict[str, Any]]:
+        """Get a cook's precomputed daily briefing"""
+        try:
+            doc = self.db.collection("cook_briefings").document(f"{cook_id}-{date_str}").get(timeout=self._timeout())
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"Error getting briefing for cook {cook_id}, date {date_str}: {str(e)}")
+            return None
+
+
 # -------------------- Singleton Instance -------------------- #
 _db_instance = None
 _db_lock = None
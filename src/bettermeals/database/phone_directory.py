@@ -0,0 +1,185 @@
+"""
+Phone Directory
+
+Process-local map of normalized phone number -> who the number belongs to (cook or
+user, document id, household id), mirrored from Firestore with `on_snapshot`
+listeners on the `cooks` and `user` collections.
+
+The first snapshot a listener delivers is the bulk load. Until it has arrived the
+directory reports the role as unknown, and `Database.find_*_by_phone` falls back to a
+direct query. After that, routing lookups are dictionary hits.
+
+Only the document id and household id are kept, so `Database.find_*_by_phone` returns
+the compact `PhoneEntry.to_record()` shape on both paths: `{"id", "household_id"}`
+for cooks and `{"id", "householdId"}` for users (household field omitted when unset).
+Read anything else from the cook/user document itself.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ROLE_COOK = "cook"
+ROLE_USER = "user"
+
+# role -> (collection, phone field, household field)
+_ROLE_SOURCES = {
+    ROLE_COOK: ("cooks", "whatsapp_number", "household_id"),
+    ROLE_USER: ("user", "phone_number", "householdId"),
+}
+
+
+def normalize_phone_number(phone_number: str) -> str:
+    """Normalize phone number to format: 919639293454 (no + prefix, with 91 country code)"""
+    if not phone_number:
+        return phone_number
+    
+    # Remove + prefix if present
+    normalized = phone_number.lstrip('+')
+    
+    # Remove any non-digit characters (spaces, dashes, etc.)
+    normalized = ''.join(filter(str.isdigit, normalized))
+    
+    # Ensure it starts with 91
+    if not normalized.startswith('91'):
+        normalized = f"91{normalized}"
+    
+    # Validate: should be exactly 12 digits (91 + 10 digits)
+    if len(normalized) != 12 or not normalized.isdigit():
+        logger.warning(f"Invalid phone number format after normalization: {phone_number} -> {normalized} (expected 12 digits)")
+        # Still return normalized value, but log warning
+    
+    return normalized
+
+
+@dataclass(frozen=True)
+class PhoneEntry:
+    """Compact directory entry"""
+    role: str
+    doc_id: str
+    household_id: Optional[str] = None
+
+    @classmethod
+    def from_document(cls, role: str, doc_id: str, data: Dict[str, Any]) -> "PhoneEntry":
+        return cls(role=role, doc_id=doc_id, household_id=data.get(_ROLE_SOURCES[role][2]))
+
+    def to_record(self) -> Dict[str, Any]:
+        """Record shape returned by Database.find_*_by_phone (household field name per collection)"""
+        record: Dict[str, Any] = {"id": self.doc_id}
+        if self.household_id:
+            record[_ROLE_SOURCES[self.role][2]] = self.household_id
+        return record
+
+
+class PhoneDirectory:
+    """In-memory phone -> (role, id, household) index kept current by Firestore listeners"""
+
+    def __init__(self, normalize: Callable[[str], str]):
+        self._normalize = normalize
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, PhoneEntry]] = {role: {} for role in _ROLE_SOURCES}
+        self._phone_by_doc: Dict[str, Dict[str, str]] = {role: {} for role in _ROLE_SOURCES}
+        self._household_phones: Dict[str, Set[Tuple[str, str]]] = {}
+        self._ready: Dict[str, threading.Event] = {role: threading.Event() for role in _ROLE_SOURCES}
+        self._watches: List[Any] = []
+        self._subscribers: List[Callable[[str, str], None]] = []
+
+    def subscribe(self, callback: Callable[[str, str], None]) -> None:
+        """Call `callback(role, doc_id)` for each cook/user document changed after the initial load."""
+        self._subscribers.append(callback)
+
+    def start(self, client) -> None:
+        """Attach the listeners; the first snapshot of each warms that role up."""
+        if self._watches:
+            return
+        for role, (collection, _, _) in _ROLE_SOURCES.items():
+            self._watches.append(client.collection(collection).on_snapshot(partial(self._on_snapshot, role)))
+            logger.info(f"Phone directory listening on '{collection}'")
+
+    def stop(self) -> None:
+        for watch in self._watches:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                logger.warning(f"Error stopping phone directory listener: {str(e)}")
+        self._watches = []
+        for event in self._ready.values():
+            event.clear()
+
+    def is_ready(self, role: str) -> bool:
+        return self._ready[role].is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return all(event.wait(timeout) for event in self._ready.values())
+
+    def lookup(self, role: str, phone_number: str) -> Tuple[bool, Optional[PhoneEntry]]:
+        """
+        Returns (known, entry). `known` is False while the role is still warming up,
+        in which case the caller should query Firestore directly.
+        """
+        if not self.is_ready(role):
+            metrics.incr("phone_directory.fallback", role=role)
+            return False, None
+        entry = self._entries[role].get(self._normalize(phone_number))
+        metrics.incr("phone_directory.hit" if entry else "phone_directory.miss", role=role)
+        return True, entry
+
+    def phones_for_household(self, household_id: str, role: Optional[str] = None) -> List[str]:
+        """Normalized phone numbers linked to a household (optionally only one role)."""
+        with self._lock:
+            members = self._household_phones.get(household_id, set())
+            return sorted(phone for member_role, phone in members if role is None or member_role == role)
+
+    def _on_snapshot(self, role: str, docs, changes, read_time) -> None:
+        try:
+            with self._lock:
+                for change in changes:
+                    if change.type.name == "REMOVED":
+                        self._remove(role, change.document.id)
+                    else:
+                        self._upsert(role, change.document.id, change.document.to_dict() or {})
+                size = len(self._entries[role])
+            metrics.gauge("phone_directory.entries", size, role=role)
+            if not self._ready[role].is_set():
+                self._ready[role].set()
+                logger.info(f"Phone directory loaded {size} {role} numbers")
+                return
+            for change in changes:
+                for callback in self._subscribers:
+                    callback(role, change.document.id)
+        except Exception as e:
+            logger.error(f"Error applying {role} phone directory changes: {str(e)}")
+
+    def _upsert(self, role: str, doc_id: str, data: Dict[str, Any]) -> None:
+        _, phone_field, _ = _ROLE_SOURCES[role]
+        self._remove(role, doc_id)
+        raw_phone = data.get(phone_field)
+        if not raw_phone:
+            return
+        phone = self._normalize(str(raw_phone))
+        entry = PhoneEntry.from_document(role, doc_id, data)
+        self._entries[role][phone] = entry
+        self._phone_by_doc[role][doc_id] = phone
+        if entry.household_id:
+            self._household_phones.setdefault(entry.household_id, set()).add((role, phone))
+
+    def _remove(self, role: str, doc_id: str) -> None:
+        phone = self._phone_by_doc[role].pop(doc_id, None)
+        if phone is None:
+            return
+        entry = self._entries[role].get(phone)
+        if entry is None or entry.doc_id != doc_id:
+            return
+        del self._entries[role][phone]
+        if entry.household_id:
+            members = self._household_phones.get(entry.household_id)
+            if members is not None:
+                members.discard((role, phone))
+                if not members:
+                    del self._household_phones[entry.household_id]
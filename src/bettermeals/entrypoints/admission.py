@@ -0,0 +1,136 @@
+"""
+Admission Control
+
+Load shedding in front of the webhooks, so a spike is turned away quickly instead of
+slowing every request down until timeouts cascade:
+
+- `AdmissionMiddleware` (ASGI): an adaptive concurrency limit over all webhook
+  requests (`AIMDLimiter`). A request that finishes within its path's latency target
+  (`admission_latency_targets`, else `admission_latency_target_seconds`) raises the
+  limit by roughly one per window; a slow or failed one cuts it by half, at most once
+  per window (requests admitted before the last cut don't cut again). Requests beyond the limit get an immediate 429
+  with a "we'll get back to you" reply and Retry-After.
+- `admission.route(name)`: fixed per-route caps (cook_assistant, onboarding,
+  weekly_plan, user_agent, graph from `admission_route_limits`), checked once the webhook
+  knows where a message goes. Over the cap raises AdmissionRejected, answered with
+  the same 429.
+
+Shed requests are counted in `admission.shed` (by route and reason).
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from ..config.settings import settings
+from ..telemetry.metrics import metrics
+from ..utils.rate_control import AIMDLimiter, OVERLOAD, SUCCESS
+
+logger = logging.getLogger(__name__)
+
+BUSY_REPLY = "We're getting a lot of messages right now. We'll get back to you shortly."
+RETRY_AFTER_SECONDS = "5"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a route is at its concurrency cap"""
+
+    def __init__(self, route: str):
+        super().__init__(f"Route {route} is at capacity")
+        self.route = route
+
+
+def busy_response() -> JSONResponse:
+    return JSONResponse({"reply": BUSY_REPLY}, status_code=429, headers={"Retry-After": RETRY_AFTER_SECONDS})
+
+
+class AdmissionController:
+    """Adaptive global limit plus fixed per-route caps"""
+
+    def __init__(self):
+        self.limiter = AIMDLimiter(
+            "admission",
+            initial=settings.admission_initial_concurrency,
+            minimum=settings.admission_min_concurrency,
+            maximum=settings.admission_max_concurrency,
+        )
+        self._route_in_flight: Dict[str, int] = {}
+
+    def try_admit(self) -> bool:
+        if self.limiter.try_acquire():
+            metrics.gauge("admission.in_flight", self.limiter.in_flight)
+            return True
+        self._record_shed("all", "concurrency_limit")
+        return False
+
+    async def complete(self, path: str, started: float, failed: bool) -> None:
+        """Feed the request's latency and outcome back into the adaptive limit."""
+        latency = time.monotonic() - started
+        target = settings.admission_latency_targets.get(path, settings.admission_latency_target_seconds)
+        slow = latency > target
+        await self.limiter.release(OVERLOAD if failed or slow else SUCCESS, started=started)
+        metrics.observe("admission.latency_seconds", latency)
+        metrics.gauge("admission.in_flight", self.limiter.in_flight)
+
+    @contextmanager
+    def route(self, name: str) -> Iterator[None]:
+        """Hold one of the route's slots for the block; AdmissionRejected when full."""
+        if not settings.admission_enabled:
+            yield
+            return
+        cap = settings.admission_route_limits.get(name)
+        in_flight = self._route_in_flight.get(name, 0)
+        if cap is not None and in_flight >= cap:
+            self._record_shed(name, "route_limit")
+            raise AdmissionRejected(name)
+        self._route_in_flight[name] = in_flight + 1
+        try:
+            yield
+        finally:
+            self._route_in_flight[name] -= 1
+
+    @staticmethod
+    def _record_shed(route: str, reason: str) -> None:
+        metrics.incr("admission.shed", route=route, reason=reason)
+        logger.warning(f"Shedding webhook request ({route}: {reason})")
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the adaptive limit to paths under `prefix`"""
+
+    def __init__(self, app, prefix: str = "/webhooks"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.admission_enabled or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        if not admission.try_admit():
+            await busy_response()(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            await admission.complete(scope["path"], started, failed=status["code"] >= 500)
+
+
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    return busy_response()
+
+
+# Create a singleton instance
+admission = AdmissionController()
@@ -1,7 +1,13 @@
 import logging, logging.config, yaml, os
 from fastapi import FastAPI
+from .admission import AdmissionMiddleware, AdmissionRejected, admission_rejected_handler
 from .routes.whatsapp import router as whatsapp_router
 from ..graph.service import graph_service
+from ..config.settings import settings
+from ..database.database import get_db
+from ..graph.blob_store import start_blob_collector
+from ..graph.completion_events import completion_events
+from ..graph.tool_context import tool_context_cache
 
 # Basic logging config
 cfg_path = os.path.join(os.path.dirname(__file__), "..", "config", "logging.yaml")
@@ -15,7 +21,40 @@ logger.info("Building LangGraph workflow...")
 graph_service.build_graph()
 logger.info("LangGraph workflow built successfully")
 
+# Mirror cook/user phone numbers in memory so routing lookups skip Firestore queries
+# (read-only, so every worker keeps its own mirror)
+if settings.phone_directory_enabled:
+    get_db().start_phone_directory()
+
+# React to onboarding form / weekly plan completion as it is written. This sends proactive
+# messages and advances flows, so only the leader process runs it (worker-0 behind the front).
+if settings.completion_events_enabled and settings.background_leader:
+    completion_events.start(get_db().db)
+elif settings.completion_events_enabled:
+    logger.info("Completion events left to the leader process")
+
+# Delete checkpoint blobs nobody referenced for graph_blob_ttl_seconds (shared storage, so leader only)
+if settings.graph_blob_offload_enabled and settings.background_leader:
+    start_blob_collector()
+
+# Drop cached agent tool contexts (and cached household documents) when cook/user/household documents change
+# (per-process invalidation only, so every worker listens)
+if settings.tool_context_listeners_enabled:
+    tool_context_cache.subscribe(get_db().invalidate_household_cache)
+    tool_context_cache.start(get_db().db, get_db().phone_directory)
+
 app = FastAPI(title="BetterMeals Agents")
 app.include_router(whatsapp_router, prefix="/webhooks")
 
+# Shed load with fast 429s (adaptive global limit, fixed per-route caps) instead of queueing
+app.add_middleware(AdmissionMiddleware, prefix="/webhooks")
+app.add_exception_handler(AdmissionRejected, admission_rejected_handler)
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe (used by the sticky front before routing to this worker)"""
+    return {"status": "ok"}
+
+
 logger.info("FastAPI application initialised")
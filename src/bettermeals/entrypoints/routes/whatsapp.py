@@ -1,6 +1,11 @@
 from fastapi import APIRouter, Depends
+from ...config.settings import settings
+from ...utils.deadline import request_deadline, stage
 from ...utils.webhook_processor import WebhookProcessor
+from ..admission import admission
 from ...graph.service import graph_service
+from ...graph.approvals import try_fast_resume
+from ...graph.streaming import OutboundRelay, stream_graph
 from ...graph.onboarding import onboarding_service
 from ...graph.weekly_plan import weekly_plan_service
 from ...graph.cook_assistant import cook_assistant_service
@@ -17,20 +22,54 @@ def get_graph():
 @router.post("/whatsapp")
 async def whatsapp_webhook(req: dict, graph=Depends(get_graph)):
     """Handle incoming WhatsApp webhook requests."""
+    # Every DB, HTTP, token and agent call below derives its timeout from this budget
+    with request_deadline(settings.webhook_budget_seconds, "whatsapp"):
+        return await _handle_message(req)
+
+
+@router.post("/whatsapp/graph")
+async def whatsapp_graph_webhook(req: dict, graph=Depends(get_graph)):
+    """Run the supervisor graph for a message, sending progress to WhatsApp while it runs."""
+    with request_deadline(settings.webhook_budget_seconds, "whatsapp_graph"):
+        text, household_id, sender_role = WebhookProcessor.extract_payload_data(req)
+        state_in, config = WebhookProcessor.build_graph_input(text, household_id, sender_role)
+        relay = OutboundRelay(req["phone_number"]) if req.get("phone_number") else None
+        with admission.route("graph"), stage("graph"):
+            try:
+                # Yes/no/choice replies to a pending approval resume at the worker directly
+                response = await try_fast_resume(graph, text, config, on_event=relay)
+                if response is None:
+                    response = await stream_graph(graph, state_in, config, on_event=relay)
+            except Exception:
+                if relay is not None:
+                    await relay.finish({})
+                raise
+            # Paragraphs already delivered through the outbound sender are left out of the reply
+            return await relay.finish(response) if relay is not None else response
+
+
+async def _handle_message(req: dict):
     phone_number = req.get("phone_number")
-    is_cook = cook_assistant_service.is_cook(phone_number)
+    with stage("routing"):
+        is_cook = cook_assistant_service.is_cook(phone_number)
     if is_cook:
-        return await cook_assistant_service.process_cook_message(req)
-    household_data = onboarding_service.get_household_data(phone_number)
+        with admission.route("cook_assistant"), stage("cook_assistant"):
+            return await cook_assistant_service.process_cook_message(req)
+    with stage("routing"):
+        household_data = onboarding_service.get_household_data(phone_number)
     is_onboarded = household_data is not None and household_data.get("onboarding", {}).get("status") == "completed"
     
     ### Onboard new users (new phone numbers)
     if not is_onboarded:
-        return onboarding_service.process_onboarding_message(req)
+        with admission.route("onboarding"), stage("onboarding"):
+            return onboarding_service.process_onboarding_message(req)
 
     ### First thing each week is to approve the weekly plan
-    weekly_plan_locked = weekly_plan_service.is_weekly_plan_locked(req, household_data)
+    with stage("routing"):
+        weekly_plan_locked = weekly_plan_service.is_weekly_plan_locked(req, household_data)
     if not weekly_plan_locked:
-        return weekly_plan_service.process_weekly_plan_message(req, household_data)
+        with admission.route("weekly_plan"), stage("weekly_plan"):
+            return weekly_plan_service.process_weekly_plan_message(req, household_data)
     
-    return await user_agent_service.process_messages(req)
+    with admission.route("user_agent"), stage("user_agent"):
+        return await user_agent_service.process_messages(req)
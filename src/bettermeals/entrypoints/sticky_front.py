@@ -0,0 +1,288 @@
+"""
+Sticky Multi-Process Front
+
+Runs N app workers (one uvicorn process each, on consecutive local ports) behind a
+small front process that sends every message from a phone number to the same worker,
+so per-process caches (phone directory, tool contexts, agent clients, tokens,
+in-memory graph checkpoints) keep hitting as the deployment scales out.
+
+- Routing: consistent hashing of the normalized phone number onto a ring with
+  `sticky_ring_replicas` virtual nodes per worker. Adding or removing a worker only
+  moves the keys of that worker's arcs (about 1/N of households).
+- Health: a worker that exits, refuses connections or fails `HEALTH_FAILURES_TO_REMOVE`
+  consecutive `/healthz` checks is taken off the ring (and restarted if it exited),
+  then put back once `/healthz` answers. A request that fails in a worker after it
+  was sent (timeout, dropped connection) is answered with 503 and Retry-After rather
+  than retried elsewhere, since the worker may already have acted on it.
+- Leader: worker-0 is started with BACKGROUND_LEADER=true and the others with false,
+  so side-effecting background work (completion events) runs once, not once per worker.
+  Read-only mirrors (phone directory, tool-context invalidation) stay per worker.
+- Locality: the front remembers the last worker per phone number and counts
+  `sticky.locality` hits (same worker as last time) and misses (moved by a
+  rebalance), plus the running hit rate as the `sticky.locality_hit_rate` gauge.
+
+Usage:
+    python -m src.bettermeals.entrypoints.sticky_front [--workers 4] [--port 8000]
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import click
+import httpx
+from fastapi import FastAPI, Request, Response
+
+from ..config.settings import settings
+from ..database.phone_directory import normalize_phone_number
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+APP_MODULE = "src.bettermeals.entrypoints.fastapi_app:app"
+HEALTH_PATH = "/healthz"
+HEALTH_INTERVAL_SECONDS = 2.0
+HEALTH_FAILURES_TO_REMOVE = 2
+RETRY_AFTER_SECONDS = "5"
+MAX_REMEMBERED_KEYS = 100_000
+# Hop-by-hop headers are not forwarded
+_SKIP_HEADERS = frozenset({"host", "content-length", "connection", "transfer-encoding", "keep-alive"})
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, replicas: int):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners.values()))
+
+    def add(self, node: str) -> None:
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+                self._owners[point] = node
+
+    def remove(self, node: str) -> None:
+        points = [point for point, owner in self._owners.items() if owner == node]
+        for point in points:
+            del self._owners[point]
+        self._points = [point for point in self._points if point in self._owners]
+
+    def node_for(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+class Worker:
+    """One app process on a local port"""
+
+    def __init__(self, index: int, port: int):
+        self.name = f"worker-{index}"
+        self.leader = index == 0
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.process: Optional[subprocess.Popen] = None
+        self.failed_checks = 0
+
+    def start(self) -> None:
+        command = [sys.executable, "-m", "uvicorn", APP_MODULE, "--host", "127.0.0.1", "--port", str(self.port)]
+        # Side-effecting listeners (completion events) run in the leader only, so N workers
+        # don't send N proactive messages for one completion
+        env = {**os.environ, "BACKGROUND_LEADER": "true" if self.leader else "false"}
+        self.process = subprocess.Popen(command, env=env)
+        logger.info(f"Started {self.name} on port {self.port} (pid {self.process.pid})")
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self) -> None:
+        if self.alive():
+            self.process.terminate()
+
+
+class StickyFront:
+    """Routes webhook requests to workers by phone number and keeps the ring healthy"""
+
+    def __init__(self, workers: List[Worker]):
+        self.workers = {worker.name: worker for worker in workers}
+        self.ring = HashRing(settings.sticky_ring_replicas)
+        self.client = httpx.AsyncClient(timeout=settings.webhook_budget_seconds + 2.0)
+        self._last_worker: "OrderedDict[str, str]" = OrderedDict()
+        self._hits = 0
+        self._lookups = 0
+
+    def route(self, phone_number: Optional[str]) -> Optional[Worker]:
+        if not phone_number:
+            nodes = self.ring.nodes
+            return self.workers[nodes[0]] if nodes else None
+        key = normalize_phone_number(phone_number)
+        name = self.ring.node_for(key)
+        if name is None:
+            return None
+        self._record_locality(key, name)
+        return self.workers[name]
+
+    def _record_locality(self, key: str, name: str) -> None:
+        previous = self._last_worker.pop(key, None)
+        self._last_worker[key] = name
+        if len(self._last_worker) > MAX_REMEMBERED_KEYS:
+            self._last_worker.popitem(last=False)
+        if previous is None:
+            metrics.incr("sticky.locality", outcome="new")
+            return
+        self._lookups += 1
+        if previous == name:
+            self._hits += 1
+            metrics.incr("sticky.locality", outcome="hit")
+        else:
+            metrics.incr("sticky.locality", outcome="miss")
+        metrics.gauge("sticky.locality_hit_rate", self._hits / self._lookups)
+
+    def take_off_ring(self, worker: Worker, reason: str) -> None:
+        if worker.name in self.ring.nodes:
+            self.ring.remove(worker.name)
+            metrics.incr("sticky.worker_removed", worker=worker.name)
+            logger.warning(f"{worker.name} removed from ring: {reason}")
+
+    async def forward(self, request: Request, worker: Worker, body: bytes) -> Response:
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in _SKIP_HEADERS}
+        upstream = await self.client.request(
+            request.method,
+            f"{worker.url}{request.url.path}",
+            params=request.query_params,
+            content=body,
+            headers=headers,
+        )
+        metrics.incr("sticky.forwarded", worker=worker.name)
+        return Response(
+            content=upstream.content,
+            status_code=upstream.status_code,
+            headers={k: v for k, v in upstream.headers.items() if k.lower() not in _SKIP_HEADERS},
+        )
+
+    async def supervise(self) -> None:
+        """Keep checking the workers until cancelled."""
+        while True:
+            await self.check_workers()
+            await asyncio.sleep(HEALTH_INTERVAL_SECONDS)
+
+    async def check_workers(self) -> None:
+        """Restart dead workers, take unhealthy ones off the ring, (re)join healthy ones."""
+        for worker in self.workers.values():
+            if not worker.alive():
+                self.take_off_ring(worker, "process exited")
+                worker.failed_checks = 0
+                worker.start()
+                continue
+            on_ring = worker.name in self.ring.nodes
+            if await self._healthy(worker):
+                worker.failed_checks = 0
+                if not on_ring:
+                    self.ring.add(worker.name)
+                    logger.info(f"{worker.name} joined the ring ({len(self.ring.nodes)} workers)")
+                continue
+            worker.failed_checks += 1
+            if on_ring and worker.failed_checks >= HEALTH_FAILURES_TO_REMOVE:
+                self.take_off_ring(worker, f"{worker.failed_checks} failed health checks")
+        metrics.gauge("sticky.workers", len(self.ring.nodes))
+
+    async def _healthy(self, worker: Worker) -> bool:
+        try:
+            response = await self.client.get(f"{worker.url}{HEALTH_PATH}", timeout=1.0)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def stop(self) -> None:
+        for worker in self.workers.values():
+            worker.stop()
+
+
+def _phone_number(body: bytes) -> Optional[str]:
+    try:
+        return (json.loads(body or b"{}") or {}).get("phone_number")
+    except (ValueError, AttributeError):
+        return None
+
+
+def _unavailable() -> Response:
+    return Response(status_code=503, headers={"Retry-After": RETRY_AFTER_SECONDS})
+
+
+def create_front(front: StickyFront) -> FastAPI:
+    app = FastAPI(title="BetterMeals Sticky Front")
+
+    @app.on_event("startup")
+    async def _start_supervisor():
+        app.state.supervisor = asyncio.create_task(front.supervise())
+
+    @app.on_event("shutdown")
+    async def _stop_workers():
+        app.state.supervisor.cancel()
+        front.stop()
+        await front.client.aclose()
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+    async def proxy(path: str, request: Request) -> Response:
+        body = await request.body()
+        phone_number = _phone_number(body)
+        # One retry on another worker if the chosen one is gone (connection refused)
+        for _ in range(2):
+            worker = front.route(phone_number)
+            if worker is None:
+                return _unavailable()
+            try:
+                return await front.forward(request, worker, body)
+            except httpx.ConnectError as e:
+                front.take_off_ring(worker, str(e))
+            except httpx.HTTPError as e:
+                # Sent but not answered (hung or crashing worker): health checks decide its ring membership
+                metrics.incr("sticky.upstream_error", worker=worker.name, error=type(e).__name__)
+                logger.warning(f"{worker.name} failed to answer {request.url.path}: {type(e).__name__}")
+                return _unavailable()
+        return _unavailable()
+
+    return app
+
+
+@click.command()
+@click.option("--workers", default=None, type=int, help="Number of app worker processes")
+@click.option("--host", default="0.0.0.0", help="Front host")
+@click.option("--port", default=8000, type=int, help="Front port")
+def main(workers: Optional[int], host: str, port: int):
+    """Run N app workers behind a phone-number-sticky front."""
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    count = workers or settings.sticky_workers
+    pool = [Worker(i, settings.sticky_base_port + i) for i in range(count)]
+    for worker in pool:
+        worker.start()
+    front = StickyFront(pool)
+    try:
+        uvicorn.run(create_front(front), host=host, port=port)
+    finally:
+        front.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+AgentCore Client Core
+
+Shared Bedrock AgentCore clients (MCP and Runtime) for every agent tree. Each agent
+(cook assistant, user agent) describes itself with an `AgentProfile`; clients, token
+managers, SSM parameters and HTTP connections are shared per process.
+"""
+
+from .interface import AgentClient
+from .profile import AgentProfile
+from .mcp.client import MCPAgentClient
+from .runtime.client import RuntimeAgentClient
+from .factory import create_agent_client, get_agent_client, get_implementation, invoke_agent
+from .health import AgentUnavailableError, FailoverAgentClient
+from .scheduler import AgentBusyError, agent_scheduler
+
+__all__ = [
+    "AgentBusyError",
+    "AgentClient",
+    "AgentProfile",
+    "AgentUnavailableError",
+    "FailoverAgentClient",
+    "MCPAgentClient",
+    "RuntimeAgentClient",
+    "agent_scheduler",
+    "create_agent_client",
+    "get_agent_client",
+    "get_implementation",
+    "invoke_agent",
+]
@@ -0,0 +1,77 @@
+"""
+Shared AWS Access
+
+One boto3 SSM client and one process-wide parameter cache for every agent, so
+gateway URLs, Cognito settings and memory ids are fetched once per process instead
+of once per agent tree (or per call). Plain String parameters are also kept in the
+shared cache tier, so a fleet of workers fetches them from SSM about once per hour;
+SecureString values never leave the process.
+"""
+
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import boto3
+
+from ...utils.shared_cache import MISSING, TwoTierCache
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_ssm_client = None
+_parameters: Dict[Tuple[str, bool], str] = {}
+_region: Optional[str] = None
+_shared_parameters = TwoTierCache("ssm", ttl=3600.0)
+
+
+def _ssm():
+    global _ssm_client
+    with _lock:
+        if _ssm_client is None:
+            _ssm_client = boto3.client("ssm")
+        return _ssm_client
+
+
+def get_ssm_parameter(name: str, with_decryption: bool = True) -> str:
+    """SSM parameter value; secrets cached for the life of the process, the rest shared for an hour"""
+    key = (name, with_decryption)
+    with _lock:
+        if key in _parameters:
+            return _parameters[key]
+    value = _shared_parameters.get(f"{name}|{with_decryption}")
+    if value is not MISSING:
+        return value
+    response = _ssm().get_parameter(Name=name, WithDecryption=with_decryption)
+    value = response["Parameter"]["Value"]
+    if response["Parameter"].get("Type") == "SecureString":
+        with _lock:
+            _parameters[key] = value
+    else:
+        _shared_parameters.set(f"{name}|{with_decryption}", value)
+    logger.debug(f"Fetched SSM parameter {name}")
+    return value
+
+
+def put_ssm_parameter(
+    name: str, value: str, parameter_type: str = "String", with_encryption: bool = False
+) -> None:
+    put_params = {
+        "Name": name,
+        "Value": value,
+        "Type": "SecureString" if with_encryption else parameter_type,
+        "Overwrite": True,
+    }
+    _ssm().put_parameter(**put_params)
+    with _lock:
+        for key in [key for key in _parameters if key[0] == name]:
+            del _parameters[key]
+    for with_decryption in (True, False):
+        _shared_parameters.delete(f"{name}|{with_decryption}")
+
+
+def get_aws_region() -> str:
+    global _region
+    if _region is None:
+        _region = boto3.session.Session().region_name
+    return _region
@@ -0,0 +1,167 @@
+"""
+Bedrock Client Configuration and Factory
+
+Handles selection between MCP and Runtime implementations for an agent profile.
+Clients are created once per (agent, implementation, agent_name) and reused, so
+token caches, MCP/Bedrock clients and HTTP connections survive across messages.
+Unless an implementation is forced, calls go through a FailoverAgentClient that
+moves to the other implementation while the configured one breaches its SLO.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import logging
+from ...config.settings import settings
+from ...utils.deadline import stage
+from .aws import get_ssm_parameter
+from .health import IMPLEMENTATIONS, FailoverAgentClient
+from .interface import AgentClient
+from .mcp.client import MCPAgentClient
+from .profile import AgentProfile
+from .runtime.client import RuntimeAgentClient
+from .scheduler import agent_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Default implementation
+DEFAULT_IMPLEMENTATION = "runtime"
+
+_clients: Dict[Tuple[str, Optional[str], Optional[str]], AgentClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_implementation(profile: AgentProfile) -> str:
+    """
+    Get the agent's implementation type from environment or SSM.
+    
+    Returns:
+        "mcp" or "runtime"
+    """
+    # Check environment variable first
+    impl = os.getenv(profile.implementation_env, "").lower()
+    
+    if impl in ("mcp", "runtime"):
+        logger.info(f"Using {profile.name} implementation from environment: {impl}")
+        return impl
+    
+    # Fallback to SSM parameter
+    try:
+        impl = get_ssm_parameter(profile.ssm("implementation")).lower()
+        if impl in ("mcp", "runtime"):
+            logger.info(f"Using {profile.name} implementation from SSM: {impl}")
+            return impl
+    except Exception as e:
+        logger.debug(f"Could not read implementation from SSM: {e}")
+    
+    logger.info(f"Using default {profile.name} implementation: {DEFAULT_IMPLEMENTATION}")
+    return DEFAULT_IMPLEMENTATION
+
+
+def create_agent_client(
+    profile: AgentProfile,
+    implementation: Optional[str] = None,
+    agent_name: Optional[str] = None
+) -> AgentClient:
+    """
+    Factory function to create a new agent client.
+    
+    Args:
+        profile: Agent profile to create the client for
+        implementation: "mcp" or "runtime". If None, reads from config/env/SSM.
+        agent_name: Optional agent name for Runtime config file lookup.
+    
+    Returns:
+        AgentClient instance (MCPAgentClient or RuntimeAgentClient)
+    
+    Raises:
+        ValueError: If implementation is invalid
+    """
+    impl = implementation or get_implementation(profile)
+    
+    if impl == "runtime":
+        logger.info(f"Creating RuntimeAgentClient for {profile.name}")
+        return RuntimeAgentClient(profile, agent_name=agent_name)
+    elif impl == "mcp":
+        logger.info(f"Creating MCPAgentClient for {profile.name}")
+        return MCPAgentClient(profile)
+    else:
+        raise ValueError(
+            f"Unknown implementation: {impl}. Must be 'mcp' or 'runtime'"
+        )
+
+
+def get_agent_client(
+    profile: AgentProfile,
+    implementation: Optional[str] = None,
+    agent_name: Optional[str] = None
+) -> AgentClient:
+    """
+    Shared agent client for the profile, created on first use.
+    
+    Without an explicit implementation the client fails over between Runtime and
+    MCP (when `agent_failover_enabled`); an explicit implementation is used as is.
+    """
+    key = (profile.name, implementation, agent_name)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if implementation or not settings.agent_failover_enabled:
+                client = create_agent_client(profile, implementation, agent_name)
+            else:
+                client = _create_failover_client(profile, agent_name)
+            _clients[key] = client
+        return client
+
+
+def _create_failover_client(profile: AgentProfile, agent_name: Optional[str]) -> AgentClient:
+    preferred = get_implementation(profile)
+    clients = {preferred: create_agent_client(profile, preferred, agent_name)}
+    for impl in IMPLEMENTATIONS:
+        if impl in clients:
+            continue
+        try:
+            clients[impl] = create_agent_client(profile, impl, agent_name)
+        except Exception as e:
+            # The fallback is optional: an agent may only be deployed one way
+            logger.warning(f"No {impl} fallback for {profile.name}: {str(e)}")
+    return FailoverAgentClient(profile, clients, preferred)
+
+
+async def invoke_agent(
+    profile: AgentProfile,
+    prompt: str,
+    actor_id: str,
+    session_id: str,
+    context: Optional[dict] = None,
+    implementation: Optional[str] = None,
+    agent_name: Optional[str] = None,
+    timeout: Optional[float] = None
+) -> str:
+    """
+    Unified invoke function that uses the shared client for the profile.
+    
+    The call first takes a slot from the fair scheduler (per-actor, per-model and
+    global caps); AgentBusyError is raised when it is shed instead.
+    
+    Args:
+        profile: Agent profile to invoke
+        prompt: The user's message/query
+        actor_id: Unique identifier for the user (phone_number)
+        session_id: Session identifier for conversation grouping
+        context: Optional dictionary of context values for tool calls
+        implementation: Optional override ("mcp" or "runtime")
+        agent_name: Optional agent name for Runtime config file lookup
+        timeout: Seconds left on the caller's deadline (webhook budget)
+    
+    Returns:
+        Agent response as a string
+    """
+    client = get_agent_client(profile, implementation=implementation, agent_name=agent_name)
+    queued_at = time.monotonic()
+    with stage("agent"):
+        async with agent_scheduler.slot(actor_id, profile.model_id, timeout):
+            if timeout is not None:
+                timeout -= time.monotonic() - queued_at
+            return await client.invoke(prompt, actor_id, session_id, context, timeout=timeout)
@@ -0,0 +1,211 @@
+"""
+Implementation Health and Failover
+
+Rolling latency / error SLO per (agent, implementation) with a breaker, and an agent
+client that fails over between the Runtime and MCP implementations:
+
+- Every invocation records its latency and outcome in a sliding window
+  (`agent_slo_window_seconds`).
+- With at least `agent_slo_min_samples` calls in the window, the breaker opens when
+  the error rate reaches `agent_slo_error_rate` or the p95 latency exceeds
+  `agent_slo_latency_seconds`.
+- While open, calls go to the other implementation. After
+  `agent_breaker_reset_seconds` one probe call is let through (half-open); success
+  closes the breaker, failure re-opens it.
+- Each attempt gets the time left on the caller's deadline, not a fixed timeout;
+  failover only happens if at least `agent_min_attempt_seconds` remain. Running out
+  of the caller's time is only held against an implementation when the attempt had
+  at least that long; a cancelled or starved probe just frees the probe slot.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ...config.settings import settings
+from ...telemetry.metrics import metrics
+from ...utils.deadline import DeadlineExceeded
+from .interface import AgentClient
+from .profile import AgentProfile
+
+logger = logging.getLogger(__name__)
+
+IMPLEMENTATIONS = ("runtime", "mcp")
+
+
+class AgentUnavailableError(Exception):
+    """Raised when no implementation of an agent can take the call"""
+
+    def __init__(self, agent: str, reason: str):
+        super().__init__(f"{agent} unavailable: {reason}")
+        self.agent = agent
+
+
+class ImplementationHealth:
+    """Sliding-window SLO tracker and breaker for one agent implementation"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, agent: str, implementation: str):
+        self.agent = agent
+        self.implementation = implementation
+        self._samples: Deque[Tuple[float, float, bool]] = deque()  # (at, latency, ok)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def try_acquire(self) -> bool:
+        """Whether a call may go to this implementation now (claims the probe when half-open)."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= settings.agent_breaker_reset_seconds:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                metrics.incr("agent.breaker_probe", agent=self.agent, implementation=self.implementation)
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Free the probe slot after a probe that ended without a verdict (cancelled, starved)."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        labels = {"agent": self.agent, "implementation": self.implementation}
+        metrics.observe("agent.latency_seconds", latency, **labels)
+        if not ok:
+            metrics.incr("agent.errors", **labels)
+        with self._lock:
+            self._samples.append((now, latency, ok))
+            self._trim(now)
+            if self._state == self.HALF_OPEN:
+                if ok:
+                    logger.info(f"{self.agent}/{self.implementation} recovered; breaker closed")
+                    self._state = self.CLOSED
+                    self._samples.clear()  # judge the recovered backend on fresh samples
+                else:
+                    self._open(now, "probe failed")
+                self._probe_in_flight = False
+                return
+            if self._state == self.CLOSED:
+                breach = self._slo_breach()
+                if breach:
+                    self._open(now, breach)
+
+    def _trim(self, now: float) -> None:
+        horizon = now - settings.agent_slo_window_seconds
+        while self._samples and self._samples[0][0] < horizon:
+            self._samples.popleft()
+
+    def _slo_breach(self) -> Optional[str]:
+        count = len(self._samples)
+        if count < settings.agent_slo_min_samples:
+            return None
+        errors = sum(1 for _, _, ok in self._samples if not ok)
+        if errors / count >= settings.agent_slo_error_rate:
+            return f"error rate {errors}/{count}"
+        latencies = sorted(latency for _, latency, _ in self._samples)
+        p95 = latencies[min(count - 1, int(0.95 * count))]
+        if p95 > settings.agent_slo_latency_seconds:
+            return f"p95 latency {p95:.1f}s"
+        return None
+
+    def _open(self, now: float, reason: str) -> None:
+        if self._state != self.OPEN:
+            logger.warning(f"Breaker opened for {self.agent}/{self.implementation}: {reason}")
+            metrics.incr("agent.breaker_opened", agent=self.agent, implementation=self.implementation)
+        self._state = self.OPEN
+        self._opened_at = now
+
+
+_health: Dict[Tuple[str, str], ImplementationHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_health(agent: str, implementation: str) -> ImplementationHealth:
+    key = (agent, implementation)
+    with _health_lock:
+        if key not in _health:
+            _health[key] = ImplementationHealth(agent, implementation)
+        return _health[key]
+
+
+class FailoverAgentClient:
+    """
+    AgentClient that prefers the configured implementation and fails over to the
+    other one while the preferred implementation breaches its SLO.
+    """
+
+    def __init__(self, profile: AgentProfile, clients: Dict[str, AgentClient], preferred: str):
+        self.profile = profile
+        self._clients = clients
+        self._preferred = preferred
+
+    def _order(self) -> List[str]:
+        return [self._preferred] + [impl for impl in IMPLEMENTATIONS if impl != self._preferred and impl in self._clients]
+
+    async def invoke(
+        self,
+        prompt: str,
+        actor_id: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        deadline = time.monotonic() + (timeout if timeout is not None else settings.agent_webhook_budget_seconds)
+        last_error: Optional[Exception] = None
+        for attempt, impl in enumerate(self._order()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (remaining < settings.agent_min_attempt_seconds and attempt > 0):
+                break
+            health = get_health(self.profile.name, impl)
+            if not health.try_acquire():
+                continue
+            is_probe = health.state == ImplementationHealth.HALF_OPEN
+            if attempt > 0:
+                metrics.incr("agent.failover", agent=self.profile.name, implementation=impl)
+            started = time.monotonic()
+            ok: Optional[bool] = None  # None: the attempt says nothing about the implementation
+            try:
+                response = await asyncio.wait_for(
+                    self._clients[impl].invoke(prompt, actor_id, session_id, context, timeout=remaining),
+                    timeout=remaining,
+                )
+                ok = True
+            except asyncio.TimeoutError as e:
+                # The caller's deadline ran out; only a failure if the attempt had a fair budget
+                ok = False if remaining >= settings.agent_min_attempt_seconds else None
+                last_error = e
+            except Exception as e:
+                ok = False
+                last_error = e
+            finally:
+                # Also runs when the caller is cancelled (e.g. the webhook disconnected)
+                if ok is not None:
+                    health.record(time.monotonic() - started, ok=ok)
+                elif is_probe:
+                    health.release_probe()
+            if ok:
+                return response
+            logger.warning(f"{self.profile.display_name} via {impl} failed after {time.monotonic() - started:.1f}s: {type(last_error).__name__}: {last_error}")
+
+        if last_error is not None:
+            raise last_error
+        if deadline - time.monotonic() <= 0:
+            raise DeadlineExceeded(self.profile.name, "agent")
+        raise AgentUnavailableError(self.profile.name, "all implementations are failing their SLO")
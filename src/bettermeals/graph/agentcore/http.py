@@ -0,0 +1,22 @@
+"""
+Shared HTTP Pool
+
+One httpx.AsyncClient for AgentCore Runtime invocations and Cognito token requests,
+so connections (and TLS sessions) are reused across calls and agents.
+"""
+
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=100.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
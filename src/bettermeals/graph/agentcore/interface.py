@@ -1,7 +1,7 @@
 """
 Agent Client Interface
 
-This module defines the abstract interface for cook assistant agent clients.
+This module defines the abstract interface for AgentCore agent clients.
 All implementations (MCP, Runtime, etc.) must implement this protocol.
 """
 
@@ -9,17 +9,18 @@ from typing import Protocol, Optional, Dict, Any
 
 
 class AgentClient(Protocol):
-    """Protocol defining the interface for cook assistant agent clients"""
+    """Protocol defining the interface for AgentCore agent clients"""
     
     async def invoke(
         self,
         prompt: str,
         actor_id: str,
         session_id: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
     ) -> str:
         """
-        Invoke the Cook Assistant agent with AgentCore memory integration.
+        Invoke the agent with AgentCore memory integration.
         
         Args:
             prompt: The user's message/query
@@ -28,6 +29,7 @@ class AgentClient(Protocol):
             context: Optional dictionary of context values to make available for tool calls.
                      Keys should match tool parameter names (e.g., {"cook_id": "123", "household_id": "456"}).
                      This makes the function extensible - add new keys as new tools/parameters are added.
+            timeout: Seconds left on the caller's deadline (None: the implementation's own limit)
             
         Returns:
             Agent response as a string
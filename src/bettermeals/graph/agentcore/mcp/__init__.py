@@ -4,18 +4,17 @@ MCP Client Implementation
 MCP-based agent client implementation with all supporting modules.
 """
 
-from .client import MCPAgentClient, invoke_cook_assistant
-from .token_manager import TokenManager
+from .client import MCPAgentClient
+from .token_manager import TokenManager, get_gateway_token_manager
 from .config_manager import ConfigManager
 from .mcp_client_factory import MCPClientFactory
 from .agent_factory import AgentFactory
 
 __all__ = [
     "MCPAgentClient",
-    "invoke_cook_assistant",
     "TokenManager",
+    "get_gateway_token_manager",
     "ConfigManager",
     "MCPClientFactory",
     "AgentFactory",
 ]
-
@@ -1,18 +1,21 @@
 """
 MCP Agent Client
 
-Main client implementation for invoking the User Agent agent via MCP.
+Main client implementation for invoking an AgentCore agent via MCP.
 Composes TokenManager, ConfigManager, MCPClientFactory, and AgentFactory.
 """
 
 from typing import Optional, Dict, Any
+import asyncio
 import logging
 from ..interface import AgentClient
-from .token_manager import TokenManager
+from .token_manager import TokenManager, get_gateway_token_manager
 from .config_manager import ConfigManager
 from .mcp_client_factory import MCPClientFactory
 from .agent_factory import AgentFactory
 from ..prompt_enhancer import enhance_prompt_with_context
+from ..profile import AgentProfile
+from ....telemetry.llm_usage import record_strands_usage
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,7 @@ class MCPAgentClient:
     
     def __init__(
         self,
+        profile: AgentProfile,
         token_manager: Optional[TokenManager] = None,
         config_manager: Optional[ConfigManager] = None,
         mcp_client_factory: Optional[MCPClientFactory] = None,
@@ -35,13 +39,15 @@ class MCPAgentClient:
         Initialize MCP agent client with dependencies.
         
         Args:
-            token_manager: TokenManager instance (created if None)
+            profile: Agent profile (SSM prefix, system prompt, model, memory)
+            token_manager: TokenManager instance (shared per Cognito provider if None)
             config_manager: ConfigManager instance (created if None)
             mcp_client_factory: MCPClientFactory instance (created if None)
             agent_factory: AgentFactory instance (created if None)
         """
-        self.token_manager = token_manager or TokenManager()
-        self.config_manager = config_manager or ConfigManager()
+        self.profile = profile
+        self.token_manager = token_manager or get_gateway_token_manager(profile)
+        self.config_manager = config_manager or ConfigManager(profile)
         self.mcp_client_factory = mcp_client_factory or MCPClientFactory()
         self.agent_factory = agent_factory or AgentFactory(self.config_manager)
     
@@ -50,18 +56,20 @@ class MCPAgentClient:
         prompt: str,
         actor_id: str,
         session_id: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
     ) -> str:
         """
-        Invoke the User Agent agent with AgentCore memory integration.
+        Invoke the agent with AgentCore memory integration.
         
         Args:
             prompt: The user's message/query
             actor_id: Unique identifier for the user (phone_number)
             session_id: Session identifier for conversation grouping
             context: Optional dictionary of context values to make available for tool calls.
-                     Keys should match tool parameter names (e.g., {"user_id": "123", "household_id": "456"}).
+                     Keys should match tool parameter names (e.g., {"cook_id": "123", "household_id": "456"}).
                      This makes the function extensible - add new keys as new tools/parameters are added.
+            timeout: Seconds left on the caller's deadline (None: the implementation's own limit)
             
         Returns:
             Agent response as a string
@@ -82,45 +90,29 @@ class MCPAgentClient:
             # Enhance prompt with available context for tool calls
             enhanced_prompt = enhance_prompt_with_context(prompt, context or {})
             
-            # Invoke agent with memory
-            # The MCP client context manager must stay open for the entire agent execution
-            # including async tool calls. The agent() call should block until all operations complete.
-            with client:
-                agent = self.agent_factory.create_agent(client, actor_id, session_id)
-                
-                # AgentCore handles conversation context automatically through session_manager
-                # Call agent synchronously - it should handle async operations internally
-                # and block until completion before returning
-                response = agent(enhanced_prompt)
-                
-                # Convert response to string
-                return str(response)
+            # The agent call blocks until all tool calls complete; run it on a worker
+            # thread so the event loop keeps serving and the caller's deadline applies
+            # (a timed-out run finishes in the background, its result is discarded)
+            return await asyncio.wait_for(
+                asyncio.to_thread(self._run_agent, client, enhanced_prompt, actor_id, session_id),
+                timeout=timeout,
+            )
                 
         except Exception as e:
             # Log and re-raise for caller to handle
-            logger.error(f"Error invoking user agent: {str(e)}", exc_info=True)
+            logger.error(f"Error invoking {self.profile.display_name}: {str(e)}", exc_info=True)
             raise
 
-
-# Create a singleton instance for backward compatibility
-_default_client: Optional[MCPAgentClient] = None
-
-
-async def invoke_user_agent(
-    prompt: str,
-    actor_id: str,
-    session_id: str,
-    context: Optional[Dict[str, Any]] = None
-) -> str:
-    """
-    Invoke the User Agent agent (backward compatibility function).
-    
-    This function maintains the original API while delegating to MCPAgentClient.
-    Consider using MCPAgentClient directly for better testability.
-    """
-    global _default_client
-    if _default_client is None:
-        _default_client = MCPAgentClient()
-    
-    return await _default_client.invoke(prompt, actor_id, session_id, context)
-
+    def _run_agent(self, client, enhanced_prompt: str, actor_id: str, session_id: str) -> str:
+        # Invoke agent with memory
+        # The MCP client context manager must stay open for the entire agent execution
+        # including async tool calls. The agent() call should block until all operations complete.
+        with client:
+            agent = self.agent_factory.create_agent(client, actor_id, session_id)
+            
+            # AgentCore handles conversation context automatically through session_manager
+            response = agent(enhanced_prompt)
+            record_strands_usage(self.profile.name, response)
+            
+            # Convert response to string
+            return str(response)
@@ -6,8 +6,8 @@ Handles SSM parameter retrieval and caching for gateway URL, memory ID, and regi
 
 from typing import Optional
 import logging
-from ...utils import get_ssm_parameter, get_aws_region
-from ...memory_config import get_memory_resource_id
+from ..aws import get_ssm_parameter, get_aws_region
+from ..profile import AgentProfile
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +15,9 @@ logger = logging.getLogger(__name__)
 class ConfigManager:
     """Manages configuration values with lazy initialization and caching"""
     
-    def __init__(self):
+    def __init__(self, profile: AgentProfile):
         """Initialize config manager with None values (lazy loading)"""
+        self.profile = profile
         self._gateway_url: Optional[str] = None
         self._memory_id: Optional[str] = None
         self._region: Optional[str] = None
@@ -24,13 +25,13 @@ class ConfigManager:
     def get_gateway_url(self) -> str:
         """Get gateway URL from SSM (cached)"""
         if self._gateway_url is None:
-            self._gateway_url = get_ssm_parameter("/app/useragent/agentcore/gateway_url")
+            self._gateway_url = get_ssm_parameter(self.profile.ssm("agentcore/gateway_url"))
         return self._gateway_url
     
     def get_memory_id(self) -> str:
         """Get memory resource ID (cached)"""
         if self._memory_id is None:
-            self._memory_id = get_memory_resource_id()
+            self._memory_id = self.profile.memory_id()
         return self._memory_id
     
     def get_region(self) -> str:
@@ -38,4 +39,3 @@ class ConfigManager:
         if self._region is None:
             self._region = get_aws_region()
         return self._region
-
@@ -0,0 +1,68 @@
+"""
+Token Manager for MCP Client
+
+Handles AWS gateway access token lifecycle with thread-safe caching.
+One manager (and token) per Cognito provider, shared by every agent using it.
+"""
+
+import os
+import asyncio
+import threading
+from typing import Dict, Optional
+import logging
+from bedrock_agentcore.identity.auth import requires_access_token
+from ..aws import get_ssm_parameter
+from ..profile import AgentProfile
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """Manages AWS gateway access token with thread-safe caching"""
+    
+    def __init__(self, provider_name: str):
+        """Initialize token manager for a Cognito credential provider"""
+        self.provider_name = provider_name
+        self._access_token: Optional[str] = None
+        self._token_lock = asyncio.Lock()
+        # Decorated per instance: the provider comes from the agent's SSM prefix
+        self._get_access_token_manually = requires_access_token(
+            provider_name=provider_name,
+            scopes=[],
+            auth_flow="M2M",
+        )(self._receive_access_token)
+    
+    async def _receive_access_token(self, *, access_token: str):
+        """Get access token - called by decorator"""
+        logger.info(f"Received access token, length: {len(access_token) if access_token else 0}")
+        self._access_token = access_token
+        return access_token
+    
+    async def get_access_token(self) -> str:
+        """Get AWS gateway access token (thread-safe)"""
+        async with self._token_lock:
+            if self._access_token is None:
+                logger.info("Token is None, fetching new token...")
+                await self._get_access_token_manually(access_token="")
+                logger.info(f"Token fetched, length: {len(self._access_token) if self._access_token else 0}")
+            else:
+                logger.debug("Using cached token")
+            return self._access_token
+
+
+_managers: Dict[str, TokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_gateway_token_manager(profile: AgentProfile) -> TokenManager:
+    """Shared token manager for the agent's Cognito provider"""
+    # Point AgentCore identity at the agent's .agentcore.json (first agent wins, as before)
+    config_file = profile.config_dir / ".agentcore.json"
+    if "AGENTCORE_CONFIG_PATH" not in os.environ and config_file.exists():
+        os.environ["AGENTCORE_CONFIG_PATH"] = str(config_file)
+
+    provider_name = get_ssm_parameter(profile.ssm("agentcore/cognito_provider"))
+    with _managers_lock:
+        if provider_name not in _managers:
+            _managers[provider_name] = TokenManager(provider_name)
+        return _managers[provider_name]
@@ -0,0 +1,28 @@
+"""
+Agent Profile
+
+Everything that differs between the Bedrock AgentCore agents (cook assistant, user
+agent). The clients, token caches and SSM cache in this package are shared.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Tuple
+
+
+@dataclass(frozen=True)
+class AgentProfile:
+    """Per-agent configuration for the shared AgentCore client core"""
+    name: str                          # e.g. "cook_assistant" (metrics, logs, config file lookup)
+    display_name: str                  # e.g. "Cook Assistant"
+    ssm_prefix: str                    # e.g. "/app/cookassistant"
+    implementation_env: str            # env var selecting "mcp" or "runtime"
+    model_id: str                      # Bedrock model for the MCP implementation
+    system_prompt: str
+    memory_id: Callable[[], str]       # AgentCore memory resource id resolver
+    config_dir: Path                   # holds .agentcore.json / .env for this agent
+    env_arn_keys: Tuple[str, ...] = field(default=("AGENT_ARN", "BEDROCK_AGENT_ARN", "RUNTIME_AGENT_ARN"))
+
+    def ssm(self, path: str) -> str:
+        """Full SSM parameter name, e.g. ssm("agentcore/gateway_url")"""
+        return f"{self.ssm_prefix}/{path}"
@@ -5,12 +5,12 @@ Runtime-based agent client implementation using Bedrock Runtime API.
 """
 
 from .client import RuntimeAgentClient
-from .token_manager import RuntimeTokenManager
+from .token_manager import RuntimeTokenManager, get_runtime_token_manager
 from .config_manager import RuntimeConfigManager
 
 __all__ = [
     "RuntimeAgentClient",
     "RuntimeTokenManager",
+    "get_runtime_token_manager",
     "RuntimeConfigManager",
 ]
-
@@ -1,20 +1,26 @@
 """
 Runtime Agent Client
 
-Main client implementation for invoking the Cook Assistant agent via Bedrock Runtime API.
-Uses M2M authentication and direct API calls (no MCP protocol).
+Main client implementation for invoking an AgentCore agent via Bedrock Runtime API.
+Uses M2M authentication and direct API calls (no MCP protocol). Token managers and
+the HTTP connection pool are shared across clients and agents.
 """
 
 from typing import Optional, Dict, Any
 import logging
 import httpx
+from ....utils.deadline import time_left
+from ..http import get_http_client
 from ..interface import AgentClient
+from ..profile import AgentProfile
 from ..prompt_enhancer import enhance_prompt_with_context
-from .token_manager import RuntimeTokenManager
+from .token_manager import RuntimeTokenManager, get_runtime_token_manager
 from .config_manager import RuntimeConfigManager
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TIMEOUT_SECONDS = 100.0
+
 
 class RuntimeAgentClient:
     """
@@ -25,6 +31,7 @@ class RuntimeAgentClient:
     
     def __init__(
         self,
+        profile: AgentProfile,
         token_manager: Optional[RuntimeTokenManager] = None,
         config_manager: Optional[RuntimeConfigManager] = None,
         agent_name: Optional[str] = None
@@ -33,22 +40,25 @@ class RuntimeAgentClient:
         Initialize Runtime agent client with dependencies.
         
         Args:
-            token_manager: RuntimeTokenManager instance (created if None)
+            profile: Agent profile (SSM prefix, config directory, display name)
+            token_manager: RuntimeTokenManager instance (shared per Cognito client if None)
             config_manager: RuntimeConfigManager instance (created if None)
             agent_name: Optional agent name for config file lookup
         """
-        self.token_manager = token_manager or RuntimeTokenManager()
-        self.config_manager = config_manager or RuntimeConfigManager(agent_name=agent_name)
+        self.profile = profile
+        self.token_manager = token_manager or get_runtime_token_manager(profile)
+        self.config_manager = config_manager or RuntimeConfigManager(profile, agent_name=agent_name)
     
     async def invoke(
         self,
         prompt: str,
         actor_id: str,
         session_id: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
     ) -> str:
         """
-        Invoke the Cook Assistant agent with AgentCore memory integration.
+        Invoke the agent with AgentCore memory integration.
         
         Args:
             prompt: The user's message/query
@@ -57,6 +67,7 @@ class RuntimeAgentClient:
             context: Optional dictionary of context values to make available for tool calls.
                      Keys should match tool parameter names (e.g., {"cook_id": "123", "household_id": "456"}).
                      This makes the function extensible - add new keys as new tools/parameters are added.
+            timeout: Seconds left on the caller's deadline (None: the implementation's own limit)
             
         Returns:
             Agent response as a string
@@ -90,41 +101,40 @@ class RuntimeAgentClient:
             
             logger.info(f"Invoking Bedrock Runtime agent at {endpoint_url}")
             
-            # Invoke agent endpoint with streaming
-            async with httpx.AsyncClient(timeout=100.0) as client:
-                response = await client.post(
-                    endpoint_url,
-                    params={"qualifier": endpoint_name},
-                    headers=headers,
-                    json=payload,
-                    timeout=100.0
-                )
-                
-                # Check response status
-                if response.status_code != 200:
-                    error_text = response.text
-                    logger.error(f"Bedrock Runtime API error: {response.status_code} - {error_text}")
-                    response.raise_for_status()
-                
-                # Handle streaming response
-                # The response is Server-Sent Events (SSE) format with "data: " prefix
-                response_text = ""
-                async for line in response.aiter_lines():
-                    if line:
-                        decoded_line = line.decode("utf-8") if isinstance(line, bytes) else line
-                        if decoded_line.startswith("data: "):
-                            # Extract content after "data: " prefix
-                            content = decoded_line[6:].strip()
-                            # Remove quotes if present
-                            content = content.strip('"')
-                            response_text += content
-                        elif decoded_line.strip():
-                            # Handle any other non-empty lines
-                            response_text += decoded_line.strip()
-                
-                logger.info(f"Received response from Bedrock Runtime (length: {len(response_text)})")
-                return response_text
-                
+            # Invoke agent endpoint on the shared connection pool
+            response = await get_http_client().post(
+                endpoint_url,
+                params={"qualifier": endpoint_name},
+                headers=headers,
+                json=payload,
+                timeout=time_left(timeout or DEFAULT_TIMEOUT_SECONDS)
+            )
+            
+            # Check response status
+            if response.status_code != 200:
+                error_text = response.text
+                logger.error(f"Bedrock Runtime API error: {response.status_code} - {error_text}")
+                response.raise_for_status()
+            
+            # Handle streaming response
+            # The response is Server-Sent Events (SSE) format with "data: " prefix
+            response_text = ""
+            async for line in response.aiter_lines():
+                if line:
+                    decoded_line = line.decode("utf-8") if isinstance(line, bytes) else line
+                    if decoded_line.startswith("data: "):
+                        # Extract content after "data: " prefix
+                        content = decoded_line[6:].strip()
+                        # Remove quotes if present
+                        content = content.strip('"')
+                        response_text += content
+                    elif decoded_line.strip():
+                        # Handle any other non-empty lines
+                        response_text += decoded_line.strip()
+            
+            logger.info(f"Received response from Bedrock Runtime (length: {len(response_text)})")
+            return response_text
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error invoking Bedrock Runtime: {e.response.status_code} - {e.response.text}", exc_info=True)
             raise Exception(f"Bedrock Runtime API error: {e.response.status_code}") from e
@@ -133,6 +143,6 @@ class RuntimeAgentClient:
             raise Exception(f"Failed to invoke Bedrock Runtime: {str(e)}") from e
         except Exception as e:
             # Log and re-raise for caller to handle
-            logger.error(f"Error invoking cook assistant via Runtime: {str(e)}", exc_info=True)
+            logger.error(f"Error invoking {self.profile.display_name} via Runtime: {str(e)}", exc_info=True)
             raise
 
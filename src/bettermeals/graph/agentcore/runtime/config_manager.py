@@ -10,7 +10,9 @@ import urllib.parse
 from pathlib import Path
 from typing import Optional
 import logging
-from ...utils import get_ssm_parameter, put_ssm_parameter, get_aws_region, read_config
+from ..aws import get_ssm_parameter, put_ssm_parameter, get_aws_region
+from ..profile import AgentProfile
+from ..utils import read_config
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +20,16 @@ logger = logging.getLogger(__name__)
 class RuntimeConfigManager:
     """Manages runtime configuration with lazy initialization and caching"""
     
-    def __init__(self, agent_name: Optional[str] = None):
+    def __init__(self, profile: AgentProfile, agent_name: Optional[str] = None):
         """
         Initialize runtime config manager.
         
         Args:
+            profile: Agent profile (SSM prefix, .env location)
             agent_name: Optional agent name to look up in config file.
                        If None, will use SSM parameter or default.
         """
+        self.profile = profile
         self._agent_arn: Optional[str] = None
         self._endpoint_name: Optional[str] = None
         self._region: Optional[str] = None
@@ -51,7 +55,7 @@ class RuntimeConfigManager:
             if self._agent_name:
                 try:
                     # Look for config file in project root
-                    config_path = Path(__file__).parent.parent.parent.parent.parent.parent / ".bedrock_agentcore.yaml"
+                    config_path = Path(__file__).parents[4] / ".bedrock_agentcore.yaml"
                     if config_path.exists():
                         runtime_config = read_config(str(config_path))
                         if self._agent_name in runtime_config.get("agents", {}):
@@ -64,19 +68,19 @@ class RuntimeConfigManager:
             # Fallback to SSM parameter
             if not self._agent_arn:
                 try:
-                    self._agent_arn = get_ssm_parameter("/app/useragent/runtime/agent_arn")
+                    self._agent_arn = get_ssm_parameter(self.profile.ssm("runtime/agent_arn"))
                     logger.info(f"Found agent ARN from SSM parameter")
                 except Exception as e:
                     # Try to sync from .env as last resort
                     try:
                         logger.info("SSM parameter not found, attempting to sync from .env...")
-                        self._agent_arn = RuntimeConfigManager.sync_agent_arn_from_env()
+                        self._agent_arn = self.sync_agent_arn_from_env()
                         logger.info("Successfully synced agent_arn from .env to SSM")
                     except Exception as sync_error:
                         raise ValueError(
                             f"Could not find agent ARN. "
                             f"Either provide agent_name for config file lookup, set SSM parameter "
-                            f"/app/useragent/runtime/agent_arn, or ensure .env contains agent_arn. "
+                            f"{self.profile.ssm('runtime/agent_arn')}, or ensure .env contains agent_arn. "
                             f"SSM error: {e}, Sync error: {sync_error}"
                         )
         
@@ -108,7 +112,7 @@ class RuntimeConfigManager:
         """
         if self._endpoint_name is None:
             try:
-                self._endpoint_name = get_ssm_parameter("/app/useragent/runtime/endpoint_name")
+                self._endpoint_name = get_ssm_parameter(self.profile.ssm("runtime/endpoint_name"))
             except Exception:
                 self._endpoint_name = "DEFAULT"
         
@@ -120,13 +124,12 @@ class RuntimeConfigManager:
             self._region = get_aws_region()
         return self._region
     
-    @classmethod
-    def sync_agent_arn_from_env(cls, env_file_path: Optional[str] = None) -> str:
+    def sync_agent_arn_from_env(self, env_file_path: Optional[str] = None) -> str:
         """
         Sync agent ARN from .env file to SSM Parameter Store.
         
         Args:
-            env_file_path: Path to .env file. If None, looks for .env in project root.
+            env_file_path: Path to .env file. If None, looks for .env in the agent's directory.
         
         Returns:
             Agent ARN string that was stored in SSM
@@ -136,10 +139,7 @@ class RuntimeConfigManager:
             ValueError: If agent_arn not found in .env file
         """
         if env_file_path is None:
-            # Look for .env in user_agent directory (3 levels up from this file)
-            # From bedrock/runtime/config_manager.py -> bedrock -> user_agent
-            useragent_root = Path(__file__).parent.parent.parent
-            env_file_path = useragent_root / ".env"
+            env_file_path = self.profile.config_dir / ".env"
         
         if not os.path.exists(env_file_path):
             raise FileNotFoundError(f".env file not found at {env_file_path}")
@@ -163,7 +163,7 @@ class RuntimeConfigManager:
         agent_arn = None
         for key, value in env_vars.items():
             key_upper = key.upper()
-            if key_upper in ['AGENT_ARN', 'USER_AGENT_AGENT_ARN', 'BEDROCK_AGENT_ARN', 'RUNTIME_AGENT_ARN']:
+            if key_upper in self.profile.env_arn_keys:
                 agent_arn = value
                 logger.info(f"Found agent_arn in .env as {key}")
                 break
@@ -171,12 +171,12 @@ class RuntimeConfigManager:
         if not agent_arn:
             raise ValueError(
                 f"agent_arn not found in .env file. "
-                f"Expected one of: AGENT_ARN, USER_AGENT_AGENT_ARN, BEDROCK_AGENT_ARN, RUNTIME_AGENT_ARN. "
+                f"Expected one of: {', '.join(self.profile.env_arn_keys)}. "
                 f"Available keys: {list(env_vars.keys())}"
             )
         
         # Store in SSM
-        ssm_param_name = "/app/useragent/runtime/agent_arn"
+        ssm_param_name = self.profile.ssm("runtime/agent_arn")
         put_ssm_parameter(ssm_param_name, agent_arn)
         logger.info(f"Synced agent_arn from .env to SSM: {ssm_param_name}")
         
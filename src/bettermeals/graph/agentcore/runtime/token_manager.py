@@ -0,0 +1,127 @@
+"""
+Token Manager for Runtime Client
+
+Handles M2M (Machine-to-Machine) access token lifecycle with thread-safe caching.
+Uses Cognito client credentials flow for authentication. Managers are shared per
+Cognito client (token URL, client id, scope), so agents on the same client share a token.
+"""
+
+import asyncio
+import base64
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import logging
+from ....utils.deadline import stage, time_left
+from ..aws import get_ssm_parameter
+from ..http import get_http_client
+from ..profile import AgentProfile
+
+logger = logging.getLogger(__name__)
+
+
+class RuntimeTokenManager:
+    """Manages M2M access token with thread-safe caching and automatic refresh"""
+    
+    def __init__(self, token_url: str, client_id: str, client_secret: str, scope: str = ""):
+        """Initialize runtime token manager for one Cognito client"""
+        self._token_url = token_url
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._scope = scope
+        self._access_token: Optional[str] = None
+        self._expires_at: float = 0
+        self._token_lock = asyncio.Lock()
+        self._ttl_seconds: int = 3600  # Default 1 hour, adjusted based on token expiry
+    
+    async def _get_m2m_token(self) -> str:
+        """
+        Get M2M access token using client credentials flow.
+        
+        Returns:
+            Access token string
+            
+        Raises:
+            Exception: If token request fails
+        """
+        # Base64 encode client_id:client_secret for Basic auth
+        credentials = base64.b64encode(f"{self._client_id}:{self._client_secret}".encode()).decode()
+        
+        data = {
+            "grant_type": "client_credentials",
+        }
+        
+        if self._scope:
+            data["scope"] = self._scope
+        
+        with stage("auth"):
+            response = await get_http_client().post(
+                self._token_url,
+                data=data,
+                headers={
+                    "Authorization": f"Basic {credentials}",
+                    "Content-Type": "application/x-www-form-urlencoded"
+                },
+                timeout=time_left(30.0)
+            )
+        
+        if response.status_code != 200:
+            error_text = response.text
+            raise Exception(f"Failed to get M2M token: {response.status_code} - {error_text}")
+        
+        token_data = response.json()
+        access_token = token_data["access_token"]
+        
+        # Adjust TTL based on token expiry if available
+        if "expires_in" in token_data:
+            # Refresh 1 minute before expiry
+            self._ttl_seconds = max(60, token_data["expires_in"] - 60)
+        
+        return access_token
+    
+    async def get_access_token(self, force_refresh: bool = False) -> str:
+        """
+        Get M2M access token (thread-safe, cached).
+        
+        Args:
+            force_refresh: If True, force refresh even if token is still valid
+            
+        Returns:
+            Access token string
+        """
+        async with self._token_lock:
+            current_time = time.time()
+            
+            if force_refresh or not self._access_token or current_time >= self._expires_at:
+                logger.info("Fetching new M2M token..." if not self._access_token else "Refreshing M2M token...")
+                self._access_token = await self._get_m2m_token()
+                self._expires_at = current_time + self._ttl_seconds
+                logger.info(f"Token acquired, expires in {self._ttl_seconds}s")
+            else:
+                logger.debug("Using cached M2M token")
+            
+            return self._access_token
+
+
+
+_managers: Dict[Tuple[str, str, str], RuntimeTokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_runtime_token_manager(profile: AgentProfile) -> RuntimeTokenManager:
+    """Shared token manager for the agent's Cognito client"""
+    client_id = get_ssm_parameter(profile.ssm("agentcore/machine_client_id"))
+    token_url = get_ssm_parameter(profile.ssm("agentcore/cognito_token_url"))
+    
+    # Get scope (optional, but recommended)
+    try:
+        scope = get_ssm_parameter(profile.ssm("agentcore/cognito_auth_scope"))
+    except Exception:
+        scope = ""  # Use default scope if not available
+    
+    key = (token_url, client_id, scope)
+    with _managers_lock:
+        if key not in _managers:
+            client_secret = get_ssm_parameter(profile.ssm("agentcore/cognito_secret"))
+            _managers[key] = RuntimeTokenManager(token_url, client_id, client_secret, scope)
+        return _managers[key]
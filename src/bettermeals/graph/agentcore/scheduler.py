@@ -0,0 +1,170 @@
+"""
+Fair Agent Scheduler
+
+Admission in front of every AgentCore invocation (cook assistant, user agent):
+
+- Concurrency caps: in flight overall (`agent_max_concurrency`), per Bedrock model
+  (`agent_model_concurrency`) and per actor / phone number
+  (`agent_actor_concurrency`).
+- Weighted fair queuing: a call that cannot start immediately is queued with a
+  virtual finish tag, max(virtual time, actor's last tag) + 1 / weight. Free slots
+  go to the lowest tag that fits the caps, so an actor with ten queued messages
+  gets one turn per round while other actors keep theirs.
+- Shedding: an actor with `agent_actor_max_queued` calls already waiting is
+  rejected at once, and a queued call is dropped after `agent_max_queue_seconds`
+  (or whatever is left of its deadline). Both raise AgentBusyError; the services
+  answer with a polite busy reply.
+
+All state lives on the event loop; no locks needed.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+from ...config.settings import settings
+from ...telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AgentBusyError(Exception):
+    """Raised when a call is shed instead of queued (or waited too long)"""
+
+    def __init__(self, actor_id: str, reason: str):
+        super().__init__(f"Agent busy for {actor_id}: {reason}")
+        self.actor_id = actor_id
+        self.reason = reason
+
+
+@dataclass
+class _Waiter:
+    tag: float
+    seq: int
+    actor_id: str
+    model: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class FairScheduler:
+    """Weighted fair queue with global, per-model and per-actor concurrency caps"""
+
+    def __init__(self):
+        self._running = 0
+        self._running_by_model: Dict[str, int] = {}
+        self._running_by_actor: Dict[str, int] = {}
+        self._queue: List[_Waiter] = []
+        self._virtual_time = 0.0
+        self._last_tag: Dict[str, float] = {}
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, actor_id: str, model: str, timeout: Optional[float] = None, weight: float = 1.0) -> AsyncIterator[None]:
+        """Hold an invocation slot for `actor_id` on `model` for the duration of the block."""
+        await self.acquire(actor_id, model, timeout, weight)
+        try:
+            yield
+        finally:
+            self.release(actor_id, model)
+
+    async def acquire(self, actor_id: str, model: str, timeout: Optional[float] = None, weight: float = 1.0) -> None:
+        if not self._queue and self._fits(actor_id, model):
+            self._start(actor_id, model)
+            metrics.observe("agent.queue_wait_seconds", 0.0, model=model)
+            return
+
+        queued = sum(1 for waiter in self._queue if waiter.actor_id == actor_id)
+        if queued >= settings.agent_actor_max_queued:
+            self._shed(actor_id, model, "actor_queue_full")
+
+        max_wait = settings.agent_max_queue_seconds
+        if timeout is not None:
+            # Leave the invocation itself enough of the caller's deadline
+            max_wait = min(max_wait, timeout - settings.agent_min_attempt_seconds)
+        if max_wait <= 0:
+            self._shed(actor_id, model, "deadline")
+
+        tag = max(self._virtual_time, self._last_tag.get(actor_id, 0.0)) + 1.0 / weight
+        self._last_tag[actor_id] = tag
+        waiter = _Waiter(tag, next(self._seq), actor_id, model, asyncio.get_running_loop().create_future())
+        self._queue.append(waiter)
+        metrics.gauge("agent.queue_depth", len(self._queue))
+        # The waiters ahead may all be blocked on other models or actors; don't idle a free slot
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max_wait)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self._remove(waiter)
+                self._shed(actor_id, model, "queue_timeout")
+            # Granted in the same tick as the timeout: keep the slot
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                self.release(actor_id, model)
+            else:
+                self._remove(waiter)
+            raise
+        metrics.observe("agent.queue_wait_seconds", time.monotonic() - waiter.enqueued_at, model=model)
+
+    def release(self, actor_id: str, model: str) -> None:
+        self._running -= 1
+        self._decrement(self._running_by_model, model)
+        self._decrement(self._running_by_actor, actor_id)
+        if actor_id not in self._running_by_actor and not any(w.actor_id == actor_id for w in self._queue):
+            self._last_tag.pop(actor_id, None)
+        self._dispatch()
+
+    def _fits(self, actor_id: str, model: str) -> bool:
+        return (
+            self._running < settings.agent_max_concurrency
+            and self._running_by_model.get(model, 0) < settings.agent_model_concurrency
+            and self._running_by_actor.get(actor_id, 0) < settings.agent_actor_concurrency
+        )
+
+    def _start(self, actor_id: str, model: str) -> None:
+        self._running += 1
+        self._running_by_model[model] = self._running_by_model.get(model, 0) + 1
+        self._running_by_actor[actor_id] = self._running_by_actor.get(actor_id, 0) + 1
+        metrics.gauge("agent.in_flight", self._running)
+
+    def _dispatch(self) -> None:
+        """Grant free slots in tag order, skipping waiters whose model/actor is at its cap."""
+        for waiter in sorted(self._queue, key=lambda w: (w.tag, w.seq)):
+            if self._running >= settings.agent_max_concurrency:
+                break
+            if waiter.future.done() or not self._fits(waiter.actor_id, waiter.model):
+                continue
+            self._remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.tag)
+            self._start(waiter.actor_id, waiter.model)
+            waiter.future.set_result(None)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        try:
+            self._queue.remove(waiter)
+        except ValueError:
+            pass
+        metrics.gauge("agent.queue_depth", len(self._queue))
+
+    def _shed(self, actor_id: str, model: str, reason: str) -> None:
+        metrics.incr("agent.shed", model=model, reason=reason)
+        logger.warning(f"Shedding agent call for {actor_id} on {model}: {reason}")
+        raise AgentBusyError(actor_id, reason)
+
+    @staticmethod
+    def _decrement(counts: Dict[str, int], key: str) -> None:
+        remaining = counts.get(key, 0) - 1
+        if remaining > 0:
+            counts[key] = remaining
+        else:
+            counts.pop(key, None)
+
+
+# Create a singleton instance
+agent_scheduler = FairScheduler()
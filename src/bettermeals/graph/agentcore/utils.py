@@ -0,0 +1,63 @@
+"""
+Shared helpers for the AgentCore client core.
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+import yaml
+
+
+def read_config(file_path: str) -> Dict[str, Any]:
+    """
+    Read configuration from a file path. Supports JSON, YAML, and YML formats.
+
+    Args:
+        file_path (str): Path to the configuration file
+
+    Returns:
+        Dict[str, Any]: Configuration data as a dictionary
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file format is not supported or invalid
+        yaml.YAMLError: If YAML parsing fails
+        json.JSONDecodeError: If JSON parsing fails
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Configuration file not found: {file_path}")
+
+    # Get file extension to determine format
+    _, ext = os.path.splitext(file_path.lower())
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            if ext == ".json":
+                return json.load(file)
+            elif ext in [".yaml", ".yml"]:
+                return yaml.safe_load(file)
+            else:
+                # Try to auto-detect format by attempting JSON first, then YAML
+                content = file.read()
+                file.seek(0)
+
+                # Try JSON first
+                try:
+                    return json.loads(content)
+                except json.JSONDecodeError:
+                    # Try YAML
+                    try:
+                        return yaml.safe_load(content)
+                    except yaml.YAMLError:
+                        raise ValueError(
+                            f"Unsupported configuration file format: {ext}. "
+                            f"Supported formats: .json, .yaml, .yml"
+                        )
+
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in configuration file {file_path}: {e}")
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML in configuration file {file_path}: {e}")
+    except Exception as e:
+        raise ValueError(f"Error reading configuration file {file_path}: {e}")
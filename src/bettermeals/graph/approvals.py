@@ -0,0 +1,154 @@
+"""
+Approval Fast Resume
+
+Approvals (approve_plan / approve_substitution / approve_checkout) are a large share of
+traffic, and the answer is nearly always "yes", "no" or one of the offered options.
+Rather than running the supervisor LLM to interpret it:
+
+- The supervisor records what it is waiting for with the `request_approval` tool
+  (`pending_action`, plus `pending_options` for choices) before asking the user.
+- On the next message, `try_fast_resume` parses the reply deterministically. A yes
+  or a choice resumes the graph directly at the worker that acts on the approval,
+  with the decision injected as the user's message (or as the resume value when the
+  graph is paused on an interrupt). A no closes the approval with a fixed reply and
+  runs no LLM at all.
+- Ambiguous replies return None, and the normal supervisor path handles them.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import InjectedToolCallId, tool
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from langgraph.types import Command
+from typing_extensions import Annotated
+
+from ..telemetry.metrics import metrics
+from .streaming import EventCallback, SUPERVISOR_NODE, pending_action_from, stream_graph
+
+logger = logging.getLogger(__name__)
+
+ApprovalAction = Literal["approve_plan", "approve_substitution", "approve_checkout"]
+
+# Worker that carries out each approval
+APPROVAL_WORKERS: Dict[str, str] = {
+    "approve_plan": "order",
+    "approve_substitution": "order",
+    "approve_checkout": "order",
+}
+DECLINED_REPLIES: Dict[str, str] = {
+    "approve_plan": "Okay, I won't build the cart. Tell me what you'd like to change in the plan.",
+    "approve_substitution": "Okay, I'll leave the cart as it is.",
+    "approve_checkout": "Okay, I haven't placed the order. Let me know when you're ready.",
+}
+
+_YES = {"yes", "y", "yeah", "yep", "yup", "ok", "okay", "sure", "approve", "approved", "confirm",
+        "confirmed", "go ahead", "proceed", "do it", "haan", "han", "ha", "ji", "theek hai", "👍", "✅"}
+_NO = {"no", "n", "nope", "nah", "cancel", "stop", "don't", "dont", "not now", "later", "nahi", "na", "👎", "❌"}
+
+
+class SupervisorState(AgentState, total=False):
+    """Supervisor graph state: messages plus the approval being waited for"""
+
+    pending_action: Optional[str]
+    pending_options: List[str]
+
+
+@tool("request_approval", description=(
+    "Record that you are about to ask the user for an approval. Call it right before asking, "
+    "with the action and, for substitutions, the options offered."
+))
+def request_approval(
+    action: ApprovalAction,
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    options: Optional[List[str]] = None,
+) -> Command:
+    return Command(update={
+        "pending_action": action,
+        "pending_options": options or [],
+        "messages": [ToolMessage("Recorded. Now ask the user and finish.", tool_call_id=tool_call_id)],
+    })
+
+
+@dataclass
+class Decision:
+    approved: bool
+    choice: Optional[str] = None
+
+    def as_message(self, action: str) -> str:
+        if self.choice:
+            return f"I choose {self.choice}. ({action})"
+        return f"Yes, approved. ({action})" if self.approved else f"No, declined. ({action})"
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[\s.!,]+", " ", text.strip().lower()).strip()
+
+
+def parse_decision(text: str, options: Optional[List[str]] = None) -> Optional[Decision]:
+    """Yes / no / one of `options` (by name or 1-based number); None if ambiguous or a question."""
+    reply = _normalize(text)
+    if not reply or "?" in reply:  # "what's methi?" asks about an option, it doesn't pick one
+        return None
+    if options:
+        normalized = [_normalize(option) for option in options]
+        if reply in normalized:
+            return Decision(approved=True, choice=options[normalized.index(reply)])
+        if reply.isdigit() and 1 <= int(reply) <= len(options):
+            return Decision(approved=True, choice=options[int(reply) - 1])
+        mentioned = [option for option, name in zip(options, normalized) if re.search(rf"\b{re.escape(name)}\b", reply)]
+        if len(mentioned) == 1 and not set(reply.split()) & _NO:  # "no methi" is not a choice
+            return Decision(approved=True, choice=mentioned[0])
+        return Decision(approved=False) if reply in _NO else None
+    if reply in _YES:
+        return Decision(approved=True)
+    if reply in _NO:
+        return Decision(approved=False)
+    return None
+
+
+def _pending(snapshot) -> Optional[str]:
+    values = snapshot.values or {}
+    if values.get("pending_action"):
+        return values["pending_action"]
+    interrupts = getattr(snapshot, "interrupts", None) or ()
+    return pending_action_from(interrupts) if interrupts else None
+
+
+async def try_fast_resume(graph, text: str, config: Dict[str, Any], on_event: Optional[EventCallback] = None) -> Optional[Dict[str, Any]]:
+    """Answer a reply to a pending approval without the supervisor LLM; None to take the normal path."""
+    snapshot = await graph.aget_state(config)
+    action = _pending(snapshot)
+    if not action:
+        return None
+    options = (snapshot.values or {}).get("pending_options") or []
+    decision = parse_decision(text, options)
+    if decision is None:
+        metrics.incr("approvals.fast_resume", action=action, outcome="ambiguous")
+        return None
+    cleared = {"pending_action": None, "pending_options": []}
+
+    if getattr(snapshot, "interrupts", None):
+        # Paused inside a worker: hand the decision straight to the waiting interrupt
+        command = Command(resume={"approved": decision.approved, "choice": decision.choice, "pending_action": action})
+    elif not decision.approved:
+        reply = DECLINED_REPLIES.get(action, "Okay, I won't go ahead.")
+        await graph.aupdate_state(
+            config,
+            {"messages": [HumanMessage(text), AIMessage(reply, name=SUPERVISOR_NODE)], **cleared},
+            as_node=SUPERVISOR_NODE,
+        )
+        metrics.incr("approvals.fast_resume", action=action, outcome="declined")
+        return {"reply": reply}
+    else:
+        worker = APPROVAL_WORKERS.get(action)
+        if worker is None:
+            return None
+        command = Command(goto=worker, update={"messages": [HumanMessage(decision.as_message(action))], **cleared})
+
+    metrics.incr("approvals.fast_resume", action=action, outcome="resumed")
+    logger.info(f"Fast-resuming {action} for thread {config['configurable']['thread_id']}")
+    return await stream_graph(graph, command, config, on_event)
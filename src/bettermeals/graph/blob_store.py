@@ -0,0 +1,344 @@
+"""
+Graph Blob Store
+
+Keeps large tool results and messages out of LangGraph checkpoints. Checkpoints are
+written after every super-step, and a full weekly plan (7 days x meals) or a cart in a
+tool message would otherwise be re-serialized into each one.
+
+- Per-message offload: `OffloadingSerializer` (the checkpointer serde, see
+  `BlobCheckpointSaver`) replaces the content of each message over
+  `graph_blob_threshold_bytes` with a reference to a content-addressed blob. The
+  message list itself stays inline, so a checkpoint grows by one small reference per
+  large message, and a plan that appears in many checkpoints is stored once.
+- Storage: blobs live under their sha256 in Firebase Storage
+  (`graph_blob_backend="firebase"`) or in a local directory. Hydrated blobs are kept
+  in an LRU of `graph_blob_cache_entries`, so resuming a thread does not download them
+  again.
+- Expiry: re-referencing a blob refreshes its age at most once per half TTL.
+  `collect()` deletes blobs not referenced for `graph_blob_ttl_seconds`, and the
+  leader process runs it every `graph_blob_gc_interval_seconds`
+  (`start_blob_collector`). A message whose blob has expired is restored with a
+  short placeholder instead of failing the thread.
+- Off the event loop: `BlobCheckpointSaver` runs checkpoint reads and writes (and
+  with them all blob I/O) in a worker thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ..config.settings import settings
+from ..telemetry.metrics import metrics
+from ..utils.deadline import time_left
+
+logger = logging.getLogger(__name__)
+
+BLOB_REF_KEY = "__blob__"
+EXPIRED_CONTENT = "[This earlier result has expired and is no longer available.]"
+_KNOWN_DIGESTS = 4096
+
+
+class BlobNotFound(Exception):
+    """Raised when a referenced blob has been collected (or never written)"""
+
+    def __init__(self, digest: str):
+        super().__init__(f"Blob {digest} not found")
+        self.digest = digest
+
+
+class LocalBlobBackend:
+    """Blobs as files under `root/<2-char prefix>/<digest>`; age is the file's mtime"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def touch(self, digest: str) -> None:
+        os.utime(self._path(digest))
+
+    def write(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def read(self, digest: str) -> bytes:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFound(digest)
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def older_than(self, cutoff: float) -> Iterable[str]:
+        """Digests last written or touched before `cutoff` (epoch seconds)."""
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if entry.is_file() and len(entry.name) == 64 and entry.stat().st_mtime < cutoff:
+                    yield entry.name
+
+
+class FirebaseBlobBackend:
+    """Blobs as objects under `prefix` in the default Firebase Storage bucket; age is `updated`"""
+
+    def __init__(self, prefix: str = "graph_blobs/"):
+        self.prefix = prefix
+        self._bucket = None
+
+    def _get_bucket(self):
+        if self._bucket is None:
+            from ..database.firebase_init import get_storage_bucket
+            self._bucket = get_storage_bucket()
+        return self._bucket
+
+    def _blob(self, digest: str):
+        return self._get_bucket().blob(f"{self.prefix}{digest}")
+
+    @staticmethod
+    def _timeout() -> float:
+        return time_left(settings.firestore_timeout_seconds)
+
+    def exists(self, digest: str) -> bool:
+        return self._blob(digest).exists(timeout=self._timeout())
+
+    def touch(self, digest: str) -> None:
+        # A metadata patch moves `updated`, which is what collection looks at
+        blob = self._blob(digest)
+        blob.metadata = {"referenced_at": datetime.now(timezone.utc).isoformat()}
+        blob.patch(timeout=self._timeout())
+
+    def write(self, digest: str, data: bytes) -> None:
+        self._blob(digest).upload_from_string(data, content_type="application/octet-stream", timeout=self._timeout())
+
+    def read(self, digest: str) -> bytes:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self._blob(digest).download_as_bytes(timeout=self._timeout())
+        except NotFound:
+            raise BlobNotFound(digest)
+
+    def delete(self, digest: str) -> None:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self._blob(digest).delete(timeout=self._timeout())
+        except NotFound:
+            pass
+
+    def older_than(self, cutoff: float) -> Iterable[str]:
+        limit = datetime.fromtimestamp(cutoff, timezone.utc)
+        for blob in self._get_bucket().list_blobs(prefix=self.prefix):
+            if blob.updated is not None and blob.updated < limit:
+                yield blob.name[len(self.prefix):]
+
+
+class BlobStore:
+    """Content-addressed blob store with an LRU of hydrated payloads"""
+
+    def __init__(self, backend, cache_entries: int = 256, ttl_seconds: Optional[float] = None):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.graph_blob_ttl_seconds
+        self._cache_entries = cache_entries
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        # digest -> when this process last wrote or touched it
+        self._known: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            refreshed_at = self._known.get(digest)
+        if refreshed_at is None or now - refreshed_at > self.ttl_seconds / 2:
+            if self.backend.exists(digest):
+                self.backend.touch(digest)
+            else:
+                self.backend.write(digest, data)
+                metrics.incr("graph_blob.written")
+                metrics.observe("graph_blob.bytes", len(data))
+            with self._lock:
+                self._known[digest] = now
+                self._known.move_to_end(digest)
+                while len(self._known) > _KNOWN_DIGESTS:
+                    self._known.popitem(last=False)
+        self._remember(digest, data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Blob bytes; BlobNotFound once it has been collected."""
+        with self._lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+                metrics.incr("graph_blob.hydrated", source="cache")
+                return data
+        data = self.backend.read(digest)
+        metrics.incr("graph_blob.hydrated", source="backend")
+        self._remember(digest, data)
+        return data
+
+    def collect(self) -> int:
+        """Delete blobs nobody referenced for `ttl_seconds`; returns how many were deleted."""
+        deleted = 0
+        for digest in list(self.backend.older_than(time.time() - self.ttl_seconds)):
+            self.backend.delete(digest)
+            with self._lock:
+                self._cache.pop(digest, None)
+                self._known.pop(digest, None)
+            deleted += 1
+        metrics.incr("graph_blob.collected", deleted)
+        if deleted:
+            logger.info(f"Collected {deleted} expired graph blobs")
+        return deleted
+
+    def _remember(self, digest: str, data: bytes) -> None:
+        with self._lock:
+            self._cache[digest] = data
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self._cache_entries:
+                self._cache.popitem(last=False)
+
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store for the configured backend"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if settings.graph_blob_backend == "firebase":
+                backend = FirebaseBlobBackend()
+            else:
+                backend = LocalBlobBackend(settings.graph_blob_dir)
+            _store = BlobStore(backend, settings.graph_blob_cache_entries)
+        return _store
+
+
+def offload_message(message: BaseMessage, store: BlobStore, threshold: int) -> BaseMessage:
+    """`message`, or a copy whose content is a blob reference if the content is over the threshold."""
+    if BLOB_REF_KEY in message.additional_kwargs:
+        return message
+    data = json.dumps(message.content).encode()
+    if len(data) <= threshold:
+        return message
+    ref = {"digest": store.put(data), "size": len(data)}
+    metrics.incr("graph_blob.offloaded", type=message.type)
+    return message.model_copy(update={"content": "", "additional_kwargs": {**message.additional_kwargs, BLOB_REF_KEY: ref}})
+
+
+def hydrate_message(message: BaseMessage, store: BlobStore) -> BaseMessage:
+    """Inverse of `offload_message`; expired content becomes a short placeholder."""
+    ref = message.additional_kwargs.get(BLOB_REF_KEY)
+    if ref is None:
+        return message
+    try:
+        content = json.loads(store.get(ref["digest"]))
+    except BlobNotFound:
+        metrics.incr("graph_blob.expired")
+        content = EXPIRED_CONTENT
+    additional_kwargs = {key: value for key, value in message.additional_kwargs.items() if key != BLOB_REF_KEY}
+    return message.model_copy(update={"content": content, "additional_kwargs": additional_kwargs})
+
+
+class OffloadingSerializer(SerializerProtocol):
+    """Checkpoint serde that stores large message contents as blobs, one per message"""
+
+    def __init__(self, store: BlobStore, threshold: int, inner: Optional[SerializerProtocol] = None):
+        self.store = store
+        self.threshold = threshold
+        self.inner = inner or JsonPlusSerializer()
+
+    def _map_messages(self, obj: Any, fn) -> Any:
+        # Channel values and pending writes carry messages alone or as a list
+        if isinstance(obj, BaseMessage):
+            return fn(obj)
+        if isinstance(obj, (list, tuple)) and any(isinstance(item, BaseMessage) for item in obj):
+            return type(obj)(fn(item) if isinstance(item, BaseMessage) else item for item in obj)
+        return obj
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        obj = self._map_messages(obj, lambda message: offload_message(message, self.store, self.threshold))
+        type_, data = self.inner.dumps_typed(obj)
+        metrics.observe("graph_blob.inline_bytes", len(data))
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        obj = self.inner.loads_typed(data)
+        return self._map_messages(obj, lambda message: hydrate_message(message, self.store))
+
+
+class BlobCheckpointSaver(InMemorySaver):
+    """In-memory checkpointer whose async API serializes (and so reads/writes blobs) off the event loop"""
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+
+def blob_serializer() -> OffloadingSerializer:
+    return OffloadingSerializer(get_blob_store(), settings.graph_blob_threshold_bytes)
+
+
+_collector: Optional[threading.Thread] = None
+
+
+def start_blob_collector() -> None:
+    """Collect expired blobs every `graph_blob_gc_interval_seconds` in a daemon thread."""
+    global _collector
+    if _collector is not None:
+        return
+
+    def run() -> None:
+        while True:
+            try:
+                get_blob_store().collect()
+            except Exception as e:
+                logger.warning(f"Graph blob collection failed: {str(e)}")
+            time.sleep(settings.graph_blob_gc_interval_seconds)
+
+    _collector = threading.Thread(target=run, name="graph-blob-gc", daemon=True)
+    _collector.start()
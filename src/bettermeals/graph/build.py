@@ -1,6 +1,9 @@
 from pathlib import Path
 from langgraph_supervisor import create_supervisor
-from ..llms.groq import supervisor_llm
+from ..config.settings import settings
+from ..llms.router import routed_llm, routed_system_prompt
+from .approvals import SupervisorState, request_approval
+from .join import join_skipping
 from .workers import recommender, scorer, order_agent, onboarding, cook_update
 
 PROMPT = (Path(__file__).parent / "prompts" / "supervisor_prompt.txt").read_text()
@@ -8,8 +11,15 @@ PROMPT = (Path(__file__).parent / "prompts" / "supervisor_prompt.txt").read_text
 def build_graph(checkpointer=None, store=None):
     workflow = create_supervisor(
         [onboarding, recommender, scorer, order_agent, cook_update],
-        model=supervisor_llm(),
-        prompt=PROMPT,
+        # Groq first, hedged to Anthropic when routing is slow (llm_provider_preferences)
+        model=join_skipping(routed_llm("supervisor")),
+        # pending_action / pending_options let approval replies resume without the supervisor LLM
+        state_schema=SupervisorState,
+        tools=[request_approval],
+        # rendered per provider (Anthropic cache_control, byte-identical text for Groq)
+        prompt=routed_system_prompt("supervisor", PROMPT),
+        # independent workers (e.g. scoring and cart building for one plan) run as parallel branches
+        parallel_tool_calls=settings.supervisor_parallel_handoffs,
         # optional knobs:
         # output_mode="last_message",
         # handoff_tool_prefix="delegate_to",
@@ -0,0 +1,105 @@
+"""
+Completion Events
+
+Turns Firestore completion writes into flow transitions, instead of checking for
+them whenever the user sends a message:
+
+- a new `household` document means the user's onboarding form was submitted
+- a new `weekly_meal_plan/{household_id}-{YYYY-WW}` document for the current week
+  means that week's plan was approved on the dashboard
+
+The completion is recorded in the user's flow snapshot. If the user is waiting at the
+matching step, the flow advances and a proactive WhatsApp message is sent.
+
+Each listener's first snapshot (documents that already exist) is skipped. Anything
+that completed while the process was down is still caught by the handlers' direct
+check when the user next messages.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from ..database.database import get_db
+from ..telemetry.metrics import metrics
+from ..utils.outbound import send_whatsapp_message
+from .onboarding import onboarding_service
+from .weekly_plan import weekly_plan_service
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionEvents:
+    """Firestore listeners that record form / plan completion in the flows"""
+
+    def __init__(self):
+        self._watches: List[Any] = []
+        self._primed: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        # Keep flow reads/writes and outbound sends off the listener thread
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="completion-events")
+
+    def start(self, client) -> None:
+        if self._watches:
+            return
+        listeners = {
+            "household": self.on_household_created,
+            "weekly_meal_plan": self.on_weekly_plan_created,
+        }
+        for collection, handler in listeners.items():
+            self._watches.append(client.collection(collection).on_snapshot(partial(self._on_snapshot, collection, handler)))
+            logger.info(f"Completion events listening on '{collection}'")
+
+    def stop(self) -> None:
+        for watch in self._watches:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                logger.warning(f"Error stopping completion listener: {str(e)}")
+        self._watches = []
+        self._primed.clear()
+
+    def _on_snapshot(self, collection: str, handler: Callable[[str], None], docs, changes, read_time) -> None:
+        with self._lock:
+            if not self._primed.get(collection):
+                # Initial snapshot: existing documents, not new completions
+                self._primed[collection] = True
+                return
+        for change in changes:
+            if change.type.name == "ADDED":
+                self._executor.submit(self._run, handler, change.document.id)
+
+    def _run(self, handler: Callable[[str], None], doc_id: str) -> None:
+        try:
+            handler(doc_id)
+        except Exception as e:
+            logger.error(f"Error handling completion event for {doc_id}: {str(e)}")
+
+    def on_household_created(self, household_id: str) -> None:
+        """Onboarding form submitted: the household now exists."""
+        for phone_number in get_db().get_household_phone_numbers(household_id):
+            metrics.incr("completion_events.recorded", kind="onboarding_form")
+            self._notify(phone_number, onboarding_service.handle_form_submitted(phone_number), "onboarding_form")
+
+    def on_weekly_plan_created(self, doc_id: str) -> None:
+        """Weekly plan approved on the dashboard for the current week."""
+        suffix = f"-{datetime.now().strftime('%Y-%W')}"
+        if not doc_id.endswith(suffix):
+            return
+        household_id = doc_id[:-len(suffix)]
+        for phone_number in get_db().get_household_phone_numbers(household_id):
+            metrics.incr("completion_events.recorded", kind="weekly_plan")
+            self._notify(phone_number, weekly_plan_service.handle_plan_submitted(phone_number, household_id), "weekly_plan")
+
+    def _notify(self, phone_number: str, reply: Optional[str], kind: str) -> None:
+        if not reply:
+            return
+        metrics.incr("completion_events.advanced", kind=kind)
+        send_whatsapp_message(phone_number, reply)
+
+
+# Create a singleton instance
+completion_events = CompletionEvents()
@@ -2,20 +2,18 @@
 Bedrock Agent Client Module
 
 This module provides the interface and implementations for cook assistant agent clients.
-Supports both MCP-based and Runtime-based implementations.
+Supports both MCP-based and Runtime-based implementations via the shared AgentCore core.
 """
 
-from .interface import AgentClient
-from .mcp.client import MCPAgentClient
-from .runtime.client import RuntimeAgentClient
-from .factory import create_agent_client, invoke_cook_assistant, get_implementation
+from ...agentcore import AgentClient, MCPAgentClient, RuntimeAgentClient
+from .factory import COOK_ASSISTANT, create_agent_client, invoke_cook_assistant, get_implementation
 
 __all__ = [
     "AgentClient",
     "MCPAgentClient",
     "RuntimeAgentClient",
+    "COOK_ASSISTANT",
     "create_agent_client",
     "invoke_cook_assistant",
     "get_implementation",
 ]
-
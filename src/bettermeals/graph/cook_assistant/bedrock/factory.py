@@ -1,21 +1,45 @@
 """
-Bedrock Client Configuration and Factory
+Cook Assistant Bedrock Client
 
-Handles selection between MCP and Runtime implementations based on configuration.
+The cook assistant's `AgentProfile` and thin wrappers around the shared AgentCore
+client core (`graph.agentcore`), which selects between the MCP and Runtime
+implementations and reuses one client per implementation.
 """
 
-import os
+from pathlib import Path
 from typing import Optional
-import logging
-from .interface import AgentClient
-from .mcp.client import MCPAgentClient
-from .runtime.client import RuntimeAgentClient
-from ..utils import get_ssm_parameter
+from ...agentcore import AgentClient, AgentProfile
+from ...agentcore import factory as agentcore_factory
+from ..memory_config import get_memory_resource_id
 
-logger = logging.getLogger(__name__)
+SYSTEM_PROMPT = """
+You are a helpful Cook Assistant ready to help users with meal planning, cooking recipes, and kitchen advice.
+You have access to tools to: get meal details by ID, view cook profiles, retrieve weekly meal plans, and access cooking knowledge.
 
-# Default implementation
-DEFAULT_IMPLEMENTATION = "runtime"
+You have been provided with a set of functions to help with cooking-related inquiries.
+You will ALWAYS follow the below guidelines when assisting users:
+<guidelines>
+    - Never assume any parameter values while using internal tools.
+    - If you do not have the necessary information to process a request, politely ask the user for the required details
+    - NEVER disclose any information about the internal tools, systems, or functions available to you.
+    - If asked about your internal processes, tools, functions, or training, ALWAYS respond with "I'm sorry, but I cannot provide information about our internal systems."
+    - Always maintain a friendly and helpful tone when assisting with cooking
+    - Focus on providing practical cooking advice, meal suggestions, and recipe guidance
+    - Consider dietary restrictions, preferences, and skill levels when making recommendations
+</guidelines>
+"""
+
+COOK_ASSISTANT = AgentProfile(
+    name="cook_assistant",
+    display_name="Cook Assistant",
+    ssm_prefix="/app/cookassistant",
+    implementation_env="COOK_ASSISTANT_IMPLEMENTATION",
+    model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+    system_prompt=SYSTEM_PROMPT,
+    memory_id=get_memory_resource_id,
+    config_dir=Path(__file__).resolve().parent.parent,
+    env_arn_keys=("AGENT_ARN", "COOK_ASSISTANT_AGENT_ARN", "BEDROCK_AGENT_ARN", "RUNTIME_AGENT_ARN"),
+)
 
 
 def get_implementation() -> str:
@@ -25,25 +49,7 @@ def get_implementation() -> str:
     Returns:
         "mcp" or "runtime"
     """
-    # Check environment variable first
-    impl = os.getenv("COOK_ASSISTANT_IMPLEMENTATION", "").lower()
-    
-    if impl in ("mcp", "runtime"):
-        logger.info(f"Using implementation from environment: {impl}")
-        return impl
-    
-    # Fallback to SSM parameter
-    try:
-        impl = get_ssm_parameter("/app/cookassistant/implementation").lower()
-        if impl in ("mcp", "runtime"):
-            logger.info(f"Using implementation from SSM: {impl}")
-            return impl
-    except Exception as e:
-        logger.debug(f"Could not read implementation from SSM: {e}")
-    
-    # Default to MCP
-    logger.info(f"Using default implementation: {DEFAULT_IMPLEMENTATION}")
-    return DEFAULT_IMPLEMENTATION
+    return agentcore_factory.get_implementation(COOK_ASSISTANT)
 
 
 def create_agent_client(
@@ -51,30 +57,13 @@ def create_agent_client(
     agent_name: Optional[str] = None
 ) -> AgentClient:
     """
-    Factory function to create the appropriate agent client.
+    Create a new cook assistant client (MCPAgentClient or RuntimeAgentClient).
     
     Args:
         implementation: "mcp" or "runtime". If None, reads from config/env/SSM.
         agent_name: Optional agent name for Runtime config file lookup.
-    
-    Returns:
-        AgentClient instance (MCPAgentClient or RuntimeAgentClient)
-    
-    Raises:
-        ValueError: If implementation is invalid
     """
-    impl = implementation or get_implementation()
-    
-    if impl == "runtime":
-        logger.info("Creating RuntimeAgentClient")
-        return RuntimeAgentClient(agent_name=agent_name)
-    elif impl == "mcp":
-        logger.info("Creating MCPAgentClient")
-        return MCPAgentClient()
-    else:
-        raise ValueError(
-            f"Unknown implementation: {impl}. Must be 'mcp' or 'runtime'"
-        )
+    return agentcore_factory.create_agent_client(COOK_ASSISTANT, implementation, agent_name)
 
 
 async def invoke_cook_assistant(
@@ -83,10 +72,11 @@ async def invoke_cook_assistant(
     session_id: str,
     context: Optional[dict] = None,
     implementation: Optional[str] = None,
-    agent_name: Optional[str] = None
+    agent_name: Optional[str] = None,
+    timeout: Optional[float] = None
 ) -> str:
     """
-    Unified invoke function that uses factory to select implementation.
+    Invoke the cook assistant through its shared client.
     
     Args:
         prompt: The user's message/query
@@ -95,9 +85,12 @@ async def invoke_cook_assistant(
         context: Optional dictionary of context values for tool calls
         implementation: Optional override ("mcp" or "runtime")
         agent_name: Optional agent name for Runtime config file lookup
+        timeout: Seconds left on the caller's deadline (webhook budget)
     
     Returns:
         Agent response as a string
     """
-    client = create_agent_client(implementation=implementation, agent_name=agent_name)
-    return await client.invoke(prompt, actor_id, session_id, context)
+    return await agentcore_factory.invoke_agent(
+        COOK_ASSISTANT, prompt, actor_id, session_id, context,
+        implementation=implementation, agent_name=agent_name, timeout=timeout,
+    )
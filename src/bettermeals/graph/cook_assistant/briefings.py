@@ -0,0 +1,182 @@
+"""
+Daily Cook Briefings
+
+Nightly job (e.g. cron, 22:00) that computes each cook's brief for the next day from
+their household's `weekly_meal_plan/{household_id}-{YYYY-WW}` and stores it in
+`cook_briefings/{cook_id}-{YYYYMMDD}`.
+
+The cook path answers short "what am I cooking today/tomorrow?" questions from the
+stored brief without invoking the agent. Everything else still goes to Bedrock.
+
+Usage:
+    python -m src.bettermeals.graph.cook_assistant.briefings [--date 2025-10-14]
+"""
+
+import asyncio
+import logging
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import click
+
+from ...config.settings import settings
+from ...database.database import get_db
+from ...telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_MENU = r"(menu|cook|cooking|make|making|meals?|dishes|breakfast|lunch|dinner|plan)"
+_DAY = r"(today|tomorrow)s?"
+# A question about the dishes themselves: "what am I cooking today?", "what's for lunch
+# tomorrow?". Negations and questions about timing, recipes or shopping go to the agent.
+MENU_QUESTION = re.compile(
+    rf"^(?:(?:hi|hello|hey|ok|okay|so) )*(what|whats|which)\b"
+    rf"(?!.*\b(not|no|cant|dont|wont|shouldnt|without|time|recipe|ingredients?|buy)\b)"
+    rf".*\b{_MENU}\b"
+)
+# A bare request: "today's menu", "menu for tomorrow please"
+MENU_REQUEST = re.compile(rf"^({_DAY} (menu|meals?|plan)|(menu|meals?|plan) (for )?{_DAY})( please)?$")
+DAY_WORDS = re.compile(rf"\b{_DAY}\b")
+MAX_MENU_QUESTION_WORDS = 10  # longer questions are about something specific: leave them to the agent
+MEAL_ORDER = ["breakfast", "lunch", "snack", "dinner"]
+
+
+def _day_meals(plan: Dict[str, Any], day: date) -> Optional[List[Dict[str, Any]]]:
+    """Meals for one day of a weekly plan (day entries as a list or keyed by day name)"""
+    day_name = day.strftime("%A").lower()
+    days = plan.get("days") or plan.get("recommendations") or plan.get("meal_plan") or plan
+    if isinstance(days, list):
+        for entry in days:
+            if isinstance(entry, dict) and str(entry.get("day", "")).lower() == day_name:
+                return entry.get("meals") or []
+        return None
+    if isinstance(days, dict):
+        for key, entry in days.items():
+            if str(key).lower() == day_name:
+                return entry.get("meals", []) if isinstance(entry, dict) else entry
+    return None
+
+
+def render_briefing(day: date, meals: List[Dict[str, Any]]) -> str:
+    """WhatsApp text for a day's brief"""
+    if not meals:
+        return f"Nothing is planned for {day.strftime('%A')}."
+
+    def order(meal: Dict[str, Any]) -> int:
+        meal_type = str(meal.get("type", "")).lower()
+        return MEAL_ORDER.index(meal_type) if meal_type in MEAL_ORDER else len(MEAL_ORDER)
+
+    lines = [f"Menu for {day.strftime('%A, %d %b')}:"]
+    for meal in sorted(meals, key=order):
+        name = meal.get("name") or meal.get("dish_name") or meal.get("meal_name") or "Unnamed dish"
+        meal_type = meal.get("type")
+        lines.append(f"- {meal_type.capitalize()}: {name}" if meal_type else f"- {name}")
+    return "\n".join(lines)
+
+
+def build_briefing(cook: Dict[str, Any], day: date, plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    meals = _day_meals(plan, day)
+    if meals is None:
+        return None
+    return {
+        "cook_id": cook["id"],
+        "household_id": cook.get("household_id"),
+        "date": day.isoformat(),
+        "meals": meals,
+        "text": render_briefing(day, meals),
+    }
+
+
+def requested_day(text: str) -> Optional[date]:
+    """The day a short menu question asks about, or None if it is not one"""
+    normalized = re.sub(r"[^a-z0-9]+", " ", text.lower().replace("'", "").replace("’", "")).strip()
+    if len(normalized.split()) > MAX_MENU_QUESTION_WORDS:
+        return None
+    if not (MENU_QUESTION.search(normalized) or MENU_REQUEST.search(normalized)):
+        return None
+    match = DAY_WORDS.search(normalized)
+    if not match:
+        return None
+    today = date.today()
+    return today + timedelta(days=1) if match.group(1) == "tomorrow" else today
+
+
+def todays_meal_ids(cook_id: str, household_id: Optional[str]) -> List[str]:
+    """Ids of today's meals, from the stored brief or else the household's weekly plan"""
+    today = date.today()
+    db = get_db()
+    briefing = db.get_cook_briefing(cook_id, today.strftime("%Y%m%d"))
+    if briefing:
+        meals = briefing.get("meals") or []
+    elif household_id:
+        plan = db.get_weekly_meal_plan(household_id, today.strftime("%Y-%W"))
+        meals = (_day_meals(plan, today) or []) if plan else []
+    else:
+        meals = []
+    return [meal.get("meal_id") or meal.get("id") for meal in meals if meal.get("meal_id") or meal.get("id")]
+
+
+def briefing_reply(cook_id: str, text: str) -> Optional[str]:
+    """Answer a "today's menu"-style question from the stored brief, if there is one"""
+    day = requested_day(text)
+    if day is None:
+        return None
+    briefing = get_db().get_cook_briefing(cook_id, day.strftime("%Y%m%d"))
+    metrics.incr("cook_briefing.lookup", hit=str(briefing is not None).lower())
+    return briefing.get("text") if briefing else None
+
+
+class CookBriefingGenerator:
+    """Computes and stores every cook's brief for one day"""
+
+    def __init__(self, day: Optional[date] = None):
+        self.day = day or date.today() + timedelta(days=1)
+        self.semaphore = asyncio.Semaphore(settings.cook_briefing_concurrency)
+        self.counts: Dict[str, int] = {"generated": 0, "no_plan": 0, "failed": 0}
+
+    async def run(self) -> Dict[str, int]:
+        cooks = await asyncio.to_thread(get_db().list_cooks)
+        by_household: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for cook in cooks:
+            if cook.get("household_id"):
+                by_household[cook["household_id"]].append(cook)
+
+        logger.info(f"Generating briefings for {len(cooks)} cooks ({len(by_household)} households) for {self.day}")
+        await asyncio.gather(*(self._household(household_id, members) for household_id, members in by_household.items()))
+        logger.info(f"Cook briefings for {self.day} finished: {self.counts}")
+        return self.counts
+
+    async def _household(self, household_id: str, cooks: List[Dict[str, Any]]) -> None:
+        db = get_db()
+        async with self.semaphore:
+            try:
+                plan = await asyncio.to_thread(db.get_weekly_meal_plan, household_id, self.day.strftime("%Y-%W"))
+                for cook in cooks:
+                    briefing = build_briefing(cook, self.day, plan) if plan else None
+                    if briefing is None:
+                        self._count("no_plan")
+                        continue
+                    saved = await asyncio.to_thread(db.save_cook_briefing, cook["id"], self.day.strftime("%Y%m%d"), briefing)
+                    self._count("generated" if saved else "failed")
+            except Exception as e:
+                logger.error(f"Error generating briefings for household {household_id}: {str(e)}")
+                self._count("failed", len(cooks))
+
+    def _count(self, key: str, n: int = 1) -> None:
+        self.counts[key] += n
+        metrics.incr(f"cook_briefing.{key}", n)
+
+
+@click.command()
+@click.option("--date", "day", default=None, help="Day to brief (YYYY-MM-DD), defaults to tomorrow")
+def main(day: Optional[str]):
+    """Precompute cook briefings for a day."""
+    logging.basicConfig(level=logging.INFO)
+    target = datetime.strptime(day, "%Y-%m-%d").date() if day else None
+    asyncio.run(CookBriefingGenerator(target).run())
+
+
+if __name__ == "__main__":
+    main()
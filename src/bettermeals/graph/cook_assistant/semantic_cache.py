@@ -0,0 +1,239 @@
+"""
+Semantic Answer Cache
+
+Answers to repeated cook questions ("how long to soak rajma", "substitute for paneer")
+served without a Bedrock agent run.
+
+- Questions are normalized (case, punctuation, filler words) and vectorized locally:
+  word unigrams plus character trigrams, hashed into a fixed number of signed buckets
+  and L2-normalized. No external embedding service.
+- Nearest neighbour: candidates share at least one word with the question (inverted
+  index), then cosine similarity must reach `cook_semantic_cache_threshold`.
+- Negations and quantities are exact-match parts of the key: "can I not use ghee" never
+  matches "can I use ghee", nor "1 cup" "3 cups", however similar the vectors are.
+- Scope: answers come from an agent run with one household's tool context
+  (allergies, household size, menu), so by default they only match within the same
+  household/week (or household/meal, when asked with a meal_id). Only questions with a
+  household-independent intent (soaking, pressure-cooker whistles, storage, ...:
+  `GLOBAL_INTENT_WORDS`) that don't mention the cook's own plan are shared across cooks.
+- Follow-ups that only make sense with the conversation ("and for 4?", "what about
+  it") are never cached.
+- Entries expire after a TTL (shorter for scoped answers). The oldest entries are
+  evicted beyond `cook_semantic_cache_max_entries`.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ...config.settings import settings
+from ...telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 1024
+MIN_CONTENT_WORDS = 2
+
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "please", "pls", "plz", "kindly", "hi", "hello", "hey", "can", "could",
+    "you", "tell", "me", "i", "do", "does", "is", "are", "to", "of", "for", "in", "on", "should",
+    "would", "will", "bhaiya", "ji", "sir", "madam", "maam", "what", "how", "much", "many",
+})
+# Technique, timing and storage: intents whose answer does not depend on the household
+GLOBAL_INTENT_WORDS = frozenset({
+    "soak", "soaking", "soaked", "sprout", "sprouting", "ferment", "fermenting", "knead", "kneading",
+    "marinate", "marinating", "whistle", "whistles", "boil", "boiling", "simmer", "steam", "steaming",
+    "preheat", "store", "storing", "stored", "fridge", "refrigerate", "refrigerator", "freeze",
+    "freezer", "thaw", "defrost",
+})
+# Words that tie the answer to this cook's household, plan or day
+SCOPED_WORDS = frozenset({
+    "today", "todays", "tomorrow", "tonight", "week", "weekly", "plan", "menu", "my", "our",
+    "household", "family", "order", "delivery", "schedule", "breakfast", "lunch", "dinner",
+})
+# Words that refer back to the conversation: the question cannot stand alone
+ANAPHORA_WORDS = frozenset({"it", "that", "this", "these", "those", "them", "same", "also", "again", "instead"})
+FOLLOW_UP_PREFIXES = ("and ", "what about", "how about", "then ", "also ")
+# Words that flip or change the answer without moving the vector much; must match exactly
+NEGATION_WORDS = frozenset({
+    "not", "no", "never", "without", "dont", "doesnt", "didnt", "isnt", "arent", "wasnt",
+    "cant", "cannot", "couldnt", "shouldnt", "wouldnt", "wont", "mustnt", "nahi", "mat",
+})
+NUMBER_WORDS = frozenset({
+    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven",
+    "twelve", "half", "quarter", "double", "twice", "dozen",
+})
+_NUMBER = re.compile(r"^\d+(?:[./]\d+)?$")
+
+# Context keys that scope an answer, per scope kind
+SCOPE_KEYS = {
+    "household": ("household_id", "year_week"),
+    "meal": ("household_id", "meal_id"),
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s'./]|(?<!\d)[./]|[./](?!\d)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    text = _PUNCTUATION.sub(" ", text.lower().replace("’", "'"))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def exact_terms(words: List[str]) -> frozenset:
+    """Negations and quantities in a question; cached answers only match on the same set"""
+    return frozenset(word for word in words if word in NEGATION_WORDS or word in NUMBER_WORDS or _NUMBER.match(word))
+
+
+def _bucket(token: str) -> Tuple[int, float]:
+    digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+    value = int.from_bytes(digest, "big")
+    return value % DIMENSIONS, 1.0 if (value >> 63) & 1 else -1.0
+
+
+def vectorize(words: List[str]) -> Dict[int, float]:
+    """Sparse, L2-normalized hashed vector of word unigrams (weight 2) and char trigrams"""
+    vector: Dict[int, float] = {}
+    for word in words:
+        index, sign = _bucket(f"w:{word}")
+        vector[index] = vector.get(index, 0.0) + 2.0 * sign
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            index, sign = _bucket(f"c:{padded[i:i + 3]}")
+            vector[index] = vector.get(index, 0.0) + sign
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items()} if norm else {}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+@dataclass
+class _Entry:
+    scope: str
+    question: str
+    words: Set[str]
+    exact: frozenset
+    vector: Dict[int, float]
+    answer: str
+    expires_at: float = 0.0
+
+
+class SemanticAnswerCache:
+    """In-process nearest-neighbour cache of agent answers keyed by question meaning"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._index: Dict[Tuple[str, str], Set[int]] = {}  # (scope, word) -> entry ids
+        self._next_id = 0
+
+    def _prepare(self, text: str, context: Dict[str, Any]) -> Optional[Tuple[str, str, List[str], frozenset]]:
+        """(scope, normalized question, content words, exact terms), or None if not cacheable"""
+        question = normalize_question(text)
+        words = question.replace("'", "").split()
+        if question.startswith(FOLLOW_UP_PREFIXES) or ANAPHORA_WORDS.intersection(words):
+            return None
+        content = [word for word in words if word not in FILLER_WORDS]
+        if len(content) < MIN_CONTENT_WORDS:
+            return None
+        exact = exact_terms(words)
+
+        if context.get("meal_id"):
+            kind = "meal"
+        elif GLOBAL_INTENT_WORDS.intersection(content) and not SCOPED_WORDS.intersection(content):
+            return "global", question, content, exact
+        else:
+            kind = "household"
+        values = [context.get(key) for key in SCOPE_KEYS[kind]]
+        if not all(values):
+            return None  # context-dependent, but without the keys to scope it
+        return f"{kind}:" + ":".join(str(value) for value in values), question, content, exact
+
+    def lookup(self, text: str, context: Dict[str, Any]) -> Optional[str]:
+        if not settings.cook_semantic_cache_enabled:
+            return None
+        prepared = self._prepare(text, context)
+        if prepared is None:
+            metrics.incr("semantic_cache.uncacheable")
+            return None
+        scope, question, content, exact = prepared
+        vector = vectorize(content)
+        kind = scope.split(":", 1)[0]
+
+        best: Optional[_Entry] = None
+        best_score = 0.0
+        now = time.time()
+        with self._lock:
+            candidates: Set[int] = set()
+            for word in content:
+                candidates.update(self._index.get((scope, word), ()))
+            for entry_id in candidates:
+                entry = self._entries.get(entry_id)
+                if entry is None:
+                    continue
+                if entry.expires_at <= now:
+                    self._remove(entry_id)
+                    continue
+                if entry.exact != exact:
+                    continue
+                score = cosine(vector, entry.vector)
+                if score > best_score:
+                    best, best_score = entry, score
+
+        if best is not None and best_score >= settings.cook_semantic_cache_threshold:
+            metrics.incr("semantic_cache.hit", scope=kind)
+            metrics.observe("semantic_cache.similarity", best_score, scope=kind)
+            logger.info(f"Semantic cache hit ({best_score:.2f}): '{question}' ~ '{best.question}'")
+            return best.answer
+        metrics.incr("semantic_cache.miss", scope=kind)
+        return None
+
+    def store(self, text: str, context: Dict[str, Any], answer: str) -> None:
+        if not settings.cook_semantic_cache_enabled or not answer:
+            return
+        prepared = self._prepare(text, context)
+        if prepared is None:
+            return
+        scope, question, content, exact = prepared
+        ttl = settings.cook_semantic_cache_ttl_seconds if scope == "global" else settings.cook_semantic_cache_scoped_ttl_seconds
+        entry = _Entry(scope, question, set(content), exact, vectorize(content), answer, time.time() + ttl)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            for word in entry.words:
+                self._index.setdefault((scope, word), set()).add(entry_id)
+            while len(self._entries) > settings.cook_semantic_cache_max_entries:
+                self._remove(next(iter(self._entries)))
+            size = len(self._entries)
+        metrics.gauge("semantic_cache.entries", size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for word in entry.words:
+            ids = self._index.get((entry.scope, word))
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[(entry.scope, word)]
+
+
+# Create a singleton instance
+cook_answer_cache = SemanticAnswerCache()
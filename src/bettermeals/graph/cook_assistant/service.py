@@ -1,12 +1,21 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 import hashlib
 from datetime import datetime
+from ...config.settings import settings
 from ...database.database import get_db
+from ...database.phone_directory import ROLE_COOK
+from ...utils.deadline import time_left
+from ..agentcore import AgentBusyError
+from ..tool_context import tool_context_cache
 from .bedrock import invoke_cook_assistant
+from .briefings import briefing_reply, todays_meal_ids
+from .semantic_cache import cook_answer_cache
 
 logger = logging.getLogger(__name__)
 
+BUSY_REPLY = "I'm still working on your earlier messages. Please send this again in a minute."
+
 
 class CookAssistantService:
     """Service to manage cook assistant interactions"""
@@ -42,6 +51,13 @@ class CookAssistantService:
             
             # Save user message to Firebase for audit/compliance
             self._save_message(phone_number, "user", text)
+
+            # "What am I cooking today?" is answered from the nightly briefing, without the agent
+            briefing = self._briefing_reply(phone_number, text)
+            if briefing:
+                response = self._format_msg_for_whatsapp(briefing)
+                self._save_message(phone_number, "bot", response)
+                return {"reply": response}
             
             # Generate session ID (phone_number + date for daily grouping)
             # Ensures >= 33 characters for Bedrock Runtime API compatibility
@@ -51,15 +67,22 @@ class CookAssistantService:
             # This is generic and extensible - add new keys as new tools/parameters are added
             context = self._build_tool_context(phone_number, payload)
             
-            # Invoke bedrock agent with AgentCore memory and context
+            # Invoke bedrock agent with AgentCore memory and context (unless a similar question was answered)
             try:
-                response_text = await invoke_cook_assistant(
-                    prompt=text,
-                    actor_id=phone_number,
-                    session_id=session_id,
-                    context=context
-                )
+                response_text = cook_answer_cache.lookup(text, context)
+                if response_text is None:
+                    response_text = await invoke_cook_assistant(
+                        prompt=text,
+                        actor_id=phone_number,
+                        session_id=session_id,
+                        context=context,
+                        # Whatever is left of the webhook's request deadline, not a fixed 100s
+                        timeout=time_left(settings.agent_webhook_budget_seconds)
+                    )
+                    cook_answer_cache.store(text, context, response_text)
                 response = self._format_msg_for_whatsapp(response_text)
+            except AgentBusyError:
+                response = BUSY_REPLY
             except Exception as e:
                 logger.error(f"Error invoking bedrock agent: {str(e)}")
                 response = "I'm sorry, I encountered an error. Please try again."
@@ -73,13 +96,25 @@ class CookAssistantService:
             logger.error(f"Error processing cook message: {str(e)}")
             return {"reply": "I'm sorry, I encountered an error. Please try again."}
     
+    def _briefing_reply(self, phone_number: str, text: str) -> Optional[str]:
+        """Precomputed briefing for menu questions, None when the agent should answer"""
+        if not settings.cook_briefings_enabled:
+            return None
+        try:
+            cook_data = self.db.find_cook_by_phone(phone_number)
+            if not cook_data or not cook_data.get("id"):
+                return None
+            return briefing_reply(cook_data["id"], text)
+        except Exception as e:
+            logger.error(f"Error looking up cook briefing for {phone_number}: {str(e)}")
+            return None
+
     def _build_tool_context(self, phone_number: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Build a generic context dictionary with available values for tool calls.
         
-        This method extracts context values from the database and payload.
-        It's designed to be easily extensible - add new key-value pairs as needed
-        when new tools or parameters are introduced.
+        The database part is built once per cook per day and cached (see
+        graph/tool_context.py); payload values are applied on every message.
         
         Args:
             phone_number: Cook's phone number
@@ -88,28 +123,33 @@ class CookAssistantService:
         Returns:
             Dictionary of context key-value pairs (keys should match tool parameter names)
         """
+        return tool_context_cache.get(ROLE_COOK, phone_number, payload, self._load_tool_context)
+
+    def _load_tool_context(self, phone_number: str) -> Dict[str, Any]:
+        """Cacheable part of the tool context: ids, household, week and today's meals"""
         context = {}
-        context["phone_number"] = phone_number
         
         # Extract cook_id from database
         cook_data = self.db.find_cook_by_phone(phone_number)
         if cook_data:
             cook_id = cook_data.get("id")
             if cook_id:
+                context["id"] = cook_id
                 context["cook_id"] = cook_id
             
             # Extract household_id from cook data if available
             household_id = cook_data.get("household_id")
             if household_id:
                 context["household_id"] = household_id
-        
-        # Extract household_id from payload (takes precedence)
-        if payload.get("household_id"):
-            context["household_id"] = payload.get("household_id")
-        
-        # Extract meal_id from payload if present
-        if payload.get("meal_id"):
-            context["meal_id"] = payload.get("meal_id")
+
+            # Prefetch today's meal ids so meal tools need no lookup
+            if cook_id:
+                try:
+                    meal_ids = todays_meal_ids(cook_id, household_id)
+                    if meal_ids:
+                        context["meal_ids"] = meal_ids
+                except Exception as e:
+                    logger.warning(f"Could not prefetch today's meals for cook {cook_id}: {str(e)}")
         
         # Calculate year_week in format "YYYY-Www" (e.g., "2024-W01")
         now = datetime.now()
@@ -0,0 +1,347 @@
+"""
+Compiled Flow Engine
+
+Table-driven state machine shared by the WhatsApp step flows
+(onboarding, weekly plan, workflow_ref).
+
+Each flow declares a table of StepSpecs: the handler for the step, one precompiled
+keyword matcher, and the data key the user's reply is captured under. Per message
+the engine does a single snapshot read (current step + collected data), runs the
+handler, and persists the whole transition (user message, step update, bot reply,
+new snapshot) in one batched write.
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+
+from ..database.database import get_db
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatcher:
+    """
+    Keyword test compiled into a single regex.
+
+    mode="contains": any keyword appears anywhere in the lower-cased text
+    mode="exact":    the whole lower-cased, stripped text is one of the keywords
+    """
+
+    def __init__(self, keywords: Iterable[str], mode: str = "contains"):
+        if mode not in ("contains", "exact"):
+            raise ValueError(f"Unknown matcher mode: {mode}")
+        # Longest first so alternation prefers the most specific keyword
+        ordered = sorted({k.lower() for k in keywords}, key=len, reverse=True)
+        self.mode = mode
+        self._pattern = re.compile("|".join(re.escape(k) for k in ordered))
+
+    def __call__(self, text: str) -> bool:
+        if self.mode == "exact":
+            return self._pattern.fullmatch(text.lower().strip()) is not None
+        return self._pattern.search(text.lower()) is not None
+
+
+def contains_any(*keywords: str) -> KeywordMatcher:
+    return KeywordMatcher(keywords, mode="contains")
+
+
+def exactly_one_of(*keywords: str) -> KeywordMatcher:
+    return KeywordMatcher(keywords, mode="exact")
+
+
+@dataclass
+class FlowContext:
+    """Everything a step handler needs; no handler reads flow state from the database"""
+    text: str
+    phone_number: str
+    step: Enum
+    data: Dict[str, Any]
+    matched: bool
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class StepResult:
+    """Outcome of a step: the reply plus the transition to persist"""
+    reply: str
+    next_step: Optional[Enum] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    # Side effects outside the flow state (e.g. final household write), run after commit
+    after_commit: Optional[Callable[["FlowSnapshot"], None]] = None
+
+
+@dataclass(frozen=True)
+class StepSpec:
+    """Declarative description of one step"""
+    handler: Callable[[FlowContext], StepResult]
+    matcher: Optional[KeywordMatcher] = None
+    capture: Optional[str] = None  # store the user's reply at this step under data[capture]
+    # Reaction to an external event (e.g. form submitted) while the user is at this step
+    on_event: Optional[Callable[[FlowContext], Optional[StepResult]]] = None
+
+    def matches(self, text: str) -> bool:
+        return self.matcher(text) if self.matcher is not None else False
+
+
+@dataclass
+class FlowSnapshot:
+    """Persisted per-user flow state"""
+    step: Enum
+    data: Dict[str, Any]
+    scope: Optional[str] = None
+    flow_type: Optional[str] = None
+
+
+class FlowEngine(ABC):
+    """Base class for table-driven step flows"""
+
+    # Set by each flow family
+    step_enum: Type[Enum]
+    initial_step: Enum
+    transaction_collection: str
+    type_field: str = "flow_type"
+    fallback_reply: str = "Hi, how can I help you today?"
+    error_reply: str = "Sorry, We're facing some trouble. Please try again."
+
+    def __init__(self):
+        self.steps: Dict[Enum, StepSpec] = self._initialize_steps()
+
+    @abstractmethod
+    def _initialize_steps(self) -> Dict[Enum, StepSpec]:
+        """Return the step table for this flow"""
+        pass
+
+    @abstractmethod
+    def get_flow_type(self) -> str:
+        """Return the type of flow (e.g., 'generic', 'referral')"""
+        pass
+
+    def snapshot_scope(self) -> Optional[str]:
+        """Scope of the snapshot; a snapshot from another scope restarts the flow."""
+        return None
+
+    def process_message(self, text: str, phone_number: str, **extra) -> Dict[str, Any]:
+        """Run one transition for the user's message and return the reply."""
+        persist = True
+        try:
+            snapshot = self.load_snapshot(phone_number)
+        except Exception as e:
+            logger.error(f"Error loading {self.get_flow_type()} flow state for {phone_number}: {str(e)}")
+            # Answer from the first step, as the flows always have, but don't overwrite
+            # a stored snapshot we could not read
+            snapshot = FlowSnapshot(step=self.initial_step, data={}, scope=self.snapshot_scope())
+            persist = False
+
+        logger.info(f"Processing {self.get_flow_type()} {self.transaction_collection} for {phone_number} at step: {snapshot.step}")
+
+        data = dict(snapshot.data)
+        spec = self.steps.get(snapshot.step)
+        try:
+            if spec is None:
+                result = StepResult(reply=self.fallback_reply)
+            else:
+                if spec.capture:
+                    data[spec.capture] = text
+                context = FlowContext(
+                    text=text,
+                    phone_number=phone_number,
+                    step=snapshot.step,
+                    data=data,
+                    matched=spec.matches(text),
+                    extra=extra,
+                )
+                result = spec.handler(context)
+        except Exception as e:
+            logger.error(f"Error processing {self.get_flow_type()} flow message: {str(e)}")
+            result = StepResult(reply=self.error_reply)
+
+        data.update(result.data)
+        new_snapshot = FlowSnapshot(
+            step=result.next_step or snapshot.step,
+            data=data,
+            scope=snapshot.scope,
+        )
+        if not persist:
+            return {"reply": result.reply}
+        self._commit(phone_number, snapshot.step, new_snapshot, text, result.reply)
+
+        if result.after_commit is not None:
+            try:
+                result.after_commit(new_snapshot)
+            except Exception as e:
+                logger.error(f"Error in post-transition action for {phone_number}: {str(e)}")
+
+        return {"reply": result.reply}
+
+    def load_snapshot(self, phone_number: str) -> FlowSnapshot:
+        """Single read of the user's flow state (migrating legacy history once)."""
+        raw = get_db().get_flow_snapshot(self.transaction_collection, phone_number)
+        if raw is None:
+            return self._snapshot_from_history(phone_number, self.snapshot_scope())
+        return self._snapshot_from_raw(phone_number, raw)
+
+    def _snapshot_from_raw(self, phone_number: str, raw: Dict[str, Any]) -> FlowSnapshot:
+        scope = self.snapshot_scope()
+        if raw.get("scope") != scope:
+            return FlowSnapshot(step=self.initial_step, data={}, scope=scope, flow_type=raw.get("flow_type"))
+
+        try:
+            step = self.step_enum(raw.get("step", self.initial_step.value))
+        except ValueError:
+            logger.warning(f"Invalid {self.get_flow_type()} step '{raw.get('step')}' for {phone_number}")
+            step = self.initial_step
+        return FlowSnapshot(step=step, data=dict(raw.get("data") or {}), scope=scope, flow_type=raw.get("flow_type"))
+
+    def handle_event(self, phone_number: str, event_data: Dict[str, Any], raw: Optional[Dict[str, Any]] = None, **extra) -> Optional[str]:
+        """
+        Record an external event (e.g. form submitted) in the user's snapshot and let
+        the current step react to it. Returns the proactive message to send, if any.
+        Users without a snapshot are left alone; their handlers fall back to querying.
+        `raw` is the stored snapshot when the caller has already read it.
+        """
+        if raw is None:
+            raw = get_db().get_flow_snapshot(self.transaction_collection, phone_number)
+        if raw is None:
+            return None
+        snapshot = self._snapshot_from_raw(phone_number, raw)
+
+        data = dict(snapshot.data)
+        data.update(event_data)
+        spec = self.steps.get(snapshot.step)
+        result = None
+        if spec is not None and spec.on_event is not None:
+            context = FlowContext(
+                text="",
+                phone_number=phone_number,
+                step=snapshot.step,
+                data=data,
+                matched=False,
+                extra=extra,
+            )
+            result = spec.on_event(context)
+
+        records: List[Dict[str, Any]] = []
+        new_snapshot = FlowSnapshot(step=snapshot.step, data=data, scope=snapshot.scope)
+        if result is not None:
+            data.update(result.data)
+            new_snapshot.step = result.next_step or snapshot.step
+            records.extend(self._step_records(snapshot.step, new_snapshot.step))
+            records.append({
+                "role": "bot",
+                "content": result.reply,
+                self.type_field: self.get_flow_type(),
+                "current_step": new_snapshot.step.value,
+                "proactive": True,
+            })
+        self._write(phone_number, new_snapshot, records)
+        logger.info(f"Recorded {list(event_data)} for {phone_number} in {self.get_flow_type()} flow at step {new_snapshot.step.value}")
+
+        if result is None:
+            return None
+        if result.after_commit is not None:
+            try:
+                result.after_commit(new_snapshot)
+            except Exception as e:
+                logger.error(f"Error in post-transition action for {phone_number}: {str(e)}")
+        return result.reply
+
+    def _snapshot_from_history(self, phone_number: str, scope: Optional[str]) -> FlowSnapshot:
+        """
+        Rebuild state for users who started before snapshots existed by replaying
+        their message history. Runs once; the next commit writes the snapshot.
+        """
+        db = get_db()
+        messages = db.get_workflow_messages(phone_number, self.transaction_collection)  # newest first
+        if scope is not None:
+            messages = [m for m in messages if self._message_scope(m) == scope]
+        if not messages:
+            return FlowSnapshot(step=self.initial_step, data={}, scope=scope)
+
+        step = self.initial_step
+        for message in messages:
+            if message.get("step_update") and message.get("role") == "system":
+                try:
+                    step = self.step_enum(message.get("current_step"))
+                    break
+                except ValueError:
+                    continue
+
+        captures = {s.value: spec.capture for s, spec in self.steps.items() if spec.capture}
+        data: Dict[str, Any] = {}
+        for message in reversed(messages):
+            if message.get("role") == "user" and message.get("current_step") in captures:
+                data[captures[message["current_step"]]] = message.get("content", "")
+
+        logger.info(f"Migrated {self.get_flow_type()} flow state for {phone_number} from history at step {step.value}")
+        return FlowSnapshot(step=step, data=data, scope=scope)
+
+    def _message_scope(self, message: Dict[str, Any]) -> Optional[str]:
+        """Scope a legacy message belongs to (flows with a scope override this)."""
+        return None
+
+    def get_step(self, phone_number: str) -> Enum:
+        return self.load_snapshot(phone_number).step
+
+    def get_data(self, phone_number: str) -> Dict[str, Any]:
+        return self.load_snapshot(phone_number).data
+
+    def set_step(self, phone_number: str, step: Enum):
+        """Move a user to `step` outside of a message transition."""
+        snapshot = self.load_snapshot(phone_number)
+        previous_step = snapshot.step
+        snapshot.step = step
+        self._write(phone_number, snapshot, self._step_records(previous_step, step))
+
+    def set_data(self, phone_number: str, data: Dict[str, Any]):
+        """Merge `data` into the user's collected flow data."""
+        snapshot = self.load_snapshot(phone_number)
+        snapshot.data.update(data)
+        self._write(phone_number, snapshot, [])
+
+    def _step_records(self, previous_step: Enum, step: Enum) -> List[Dict[str, Any]]:
+        if step == previous_step:
+            return []
+        return [{
+            "role": "system",
+            "content": f"Step updated to: {step.value}",
+            self.type_field: self.get_flow_type(),
+            "current_step": step.value,
+            "step_update": True,
+        }]
+
+    def _commit(self, phone_number: str, previous_step: Enum, snapshot: FlowSnapshot, text: str, reply: str):
+        """Persist the transition: audit messages + new snapshot in one batched write."""
+        flow_type = self.get_flow_type()
+        records: List[Dict[str, Any]] = [{
+            "role": "user",
+            "content": text,
+            self.type_field: flow_type,
+            "current_step": previous_step.value,
+        }]
+        records.extend(self._step_records(previous_step, snapshot.step))
+        records.append({
+            "role": "bot",
+            "content": reply,
+            self.type_field: flow_type,
+            "current_step": snapshot.step.value,
+        })
+        self._write(phone_number, snapshot, records)
+
+    def _write(self, phone_number: str, snapshot: FlowSnapshot, records: List[Dict[str, Any]]):
+        flow_type = self.get_flow_type()
+        state = {
+            "flow_type": flow_type,
+            "step": snapshot.step.value,
+            "data": snapshot.data,
+            "scope": snapshot.scope,
+        }
+        try:
+            db = get_db()
+            if not db.commit_flow_transition(self.transaction_collection, phone_number, state, records):
+                logger.error(f"Failed to persist {flow_type} transition for {phone_number}")
+        except Exception as e:
+            logger.error(f"Error persisting {flow_type} transition for {phone_number}: {str(e)}")
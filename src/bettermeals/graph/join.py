@@ -0,0 +1,138 @@
+"""
+Supervisor Fan-Out Join
+
+With `parallel_tool_calls`, the supervisor can hand off to several independent workers
+in one step (e.g. meal_scorer and order for the same meal_plan_id). They run as
+parallel branches and all report back before the supervisor runs again, which is the
+join.
+
+Most joins need no decision: every branch finished with a plain answer, and the
+supervisor would only stitch them together. `JoinSkippingChatModel` wraps the
+supervisor model and answers such trivial joins itself, without an LLM call. It
+joins the branch answers in dispatch order. A join is not trivial, and goes to the
+model, when any branch is missing an answer, asks the user something, reports an
+error, or produced something the user has to approve (a new plan or a cart): the
+supervisor must then call request_approval and ask for approve_plan /
+approve_checkout.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from ..config.settings import settings
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_PREFIX = "transfer_to_"
+# Branch answers that need the supervisor to decide what happens next (whole words only,
+# so "terror" or "unapproved" don't count)
+_NEEDS_DECISION = re.compile(r"\?|\b(?:errors?|fail(?:ed|ure)?|unable|approv(?:e|al))\b", re.IGNORECASE)
+# Branches whose results wait for an approval: a new plan (approve_plan) or a cart (approve_checkout)
+_APPROVABLE_WORKERS = {"meal_recommender"}
+_APPROVABLE_TOOLS = {"bm_recommend_meals", "bm_build_cart", "bm_substitute"}
+_CART = re.compile(r"\bcart(?:_id)?\b", re.IGNORECASE)
+
+
+def _handoff_targets(message: BaseMessage) -> List[str]:
+    calls = getattr(message, "tool_calls", None) or []
+    if not calls or not all(call["name"].startswith(HANDOFF_PREFIX) for call in calls):
+        return []
+    return [call["name"][len(HANDOFF_PREFIX):] for call in calls]
+
+
+def _text(message: BaseMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(block.get("text", "") for block in message.content if isinstance(block, dict))
+
+
+def trivial_join_reply(messages: Sequence[BaseMessage]) -> Optional[str]:
+    """Combined branch answers if the last step was a fan-out that needs no decision."""
+    for index in range(len(messages) - 1, -1, -1):
+        targets = _handoff_targets(messages[index])
+        if targets:
+            break
+    else:
+        return None
+    if len(targets) < 2:
+        return None
+
+    answers: Dict[str, str] = {}
+    for message in messages[index + 1:]:
+        if isinstance(message, ToolMessage) and message.name in _APPROVABLE_TOOLS:
+            return None  # worker tool results are only here with output_mode="full_history"
+        if isinstance(message, AIMessage) and not message.tool_calls and message.name in targets:
+            answers[message.name] = _text(message)
+    if set(answers) != set(targets):
+        return None
+    if _APPROVABLE_WORKERS & set(targets) or ("order" in answers and _CART.search(answers["order"])):
+        return None
+    if any(not answer.strip() or _NEEDS_DECISION.search(answer) for answer in answers.values()):
+        return None
+    return "\n\n".join(answers[target].strip() for target in targets)
+
+
+class JoinSkippingChatModel(BaseChatModel):
+    """Supervisor model that answers trivial fan-out joins without calling `model`"""
+
+    model: BaseChatModel
+
+    @property
+    def _llm_type(self) -> str:
+        return f"join-skipping-{self.model._llm_type}"
+
+    def bind_tools(self, tools: Sequence[Any], *, parallel_tool_calls: Optional[bool] = None, **kwargs: Any):
+        if parallel_tool_calls is not None:
+            kwargs["parallel_tool_calls"] = parallel_tool_calls
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _skip(self, messages: List[BaseMessage]) -> Optional[ChatResult]:
+        if not settings.supervisor_join_skip_enabled:
+            return None
+        reply = trivial_join_reply(messages)
+        if reply is None:
+            return None
+        metrics.incr("supervisor.join_skipped")
+        logger.debug("Answering fan-out join without the supervisor model")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        skipped = self._skip(messages)
+        if skipped is not None:
+            return skipped
+        config = {"callbacks": run_manager.get_child()} if run_manager else None
+        message = self.model.bind(**kwargs).invoke(messages, config=config, stop=stop)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        skipped = self._skip(messages)
+        if skipped is not None:
+            return skipped
+        config = {"callbacks": run_manager.get_child()} if run_manager else None
+        message = await self.model.bind(**kwargs).ainvoke(messages, config=config, stop=stop)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def join_skipping(model: BaseChatModel) -> BaseChatModel:
+    # The wrapped model keeps its own cache and callbacks; the wrapper must not cache too
+    return JoinSkippingChatModel(model=model, cache=False)
@@ -6,7 +6,7 @@ This module provides structured onboarding flows for different types of users:
 - Referral users: Special onboarding flow with discounts
 
 The module is organized into separate files for better maintainability:
-- base.py: Base classes and enums
+- base.py: Base classes, enums and shared step matchers (flows run on graph/flow_engine.py)
 - generic.py: Generic user onboarding flow
 - referral.py: Referral user onboarding flow  
 - service.py: Main service that routes to appropriate onboarding flow
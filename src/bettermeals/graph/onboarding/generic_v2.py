@@ -1,7 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Optional
 import logging
 
-from .base import BaseOnboarding, OnboardingStep
+from .base import BaseOnboarding, OnboardingStep, FORM_DONE, TRIAL_ACCEPTED, CONFIRMED, PAYMENT_DONE
+from ..flow_engine import FlowContext, StepResult, StepSpec
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -9,127 +10,106 @@ logger = logging.getLogger(__name__)
 
 class GenericUserOnboardingV2(BaseOnboarding):
     """Onboarding flow for generic users"""
-    
+
     def get_onboarding_type(self) -> str:
         return "generic"
-    
-    def _initialize_steps(self) -> Dict[OnboardingStep, callable]:
+
+    def _initialize_steps(self) -> Dict[OnboardingStep, StepSpec]:
         return {
-            OnboardingStep.GREETING: self._handle_greeting,
-            OnboardingStep.NAME_COLLECTION: self._handle_name_collection,
-            OnboardingStep.FORM_COMPLETION: self._handle_form_completion,
-            OnboardingStep.TRIAL_OFFER: self._handle_trial_offer,
-            OnboardingStep.PAYMENT_CONFIRMATION: self._handle_payment_confirmation,
-            # OnboardingStep.GROUP_INVITATION: self._handle_group_invitation,
+            OnboardingStep.GREETING: StepSpec(self._handle_greeting),
+            OnboardingStep.NAME_COLLECTION: StepSpec(self._handle_name_collection, capture="name"),
+            OnboardingStep.FORM_COMPLETION: StepSpec(self._handle_form_completion, matcher=FORM_DONE, on_event=self._on_form_submitted),
+            OnboardingStep.TRIAL_OFFER: StepSpec(self._handle_trial_offer, matcher=TRIAL_ACCEPTED),
+            OnboardingStep.PAYMENT_CONFIRMATION: StepSpec(self._handle_payment_confirmation, matcher=CONFIRMED),
+            # OnboardingStep.GROUP_INVITATION: StepSpec(self._handle_group_invitation, matcher=PAYMENT_DONE),
         }
-    
-    def _handle_greeting(self, text: str, phone_number: str) -> Dict[str, Any]:
+
+    def _handle_greeting(self, ctx: FlowContext) -> StepResult:
         """Handle initial greeting step."""
-        self._set_onboarding_step(phone_number, OnboardingStep.NAME_COLLECTION)
-        return {
-            "reply": "Hey! I'm Zuko from Bettermeals. May I know your name?"
-        }
-    
-    def _handle_name_collection(self, text: str, phone_number: str) -> Dict[str, Any]:
+        return StepResult(
+            reply="Hey! I'm Zuko from Bettermeals. May I know your name?",
+            next_step=OnboardingStep.NAME_COLLECTION,
+        )
+
+    def _handle_name_collection(self, ctx: FlowContext) -> StepResult:
         """Handle name collection step."""
-        name = text.strip()
+        name = ctx.text.strip()
         if not name:
-            return {"reply": "Please tell me your name so I can help you better!"}
-        
-        # Store the name
-        user_data = self._get_user_data(phone_number)
-        user_data["name"] = name
-        self._set_user_data(phone_number, user_data)
-        
-        self._set_onboarding_step(phone_number, OnboardingStep.FORM_COMPLETION)
-        return {
-            "reply": f"Nice to meet you, {name}! Please complete this quick onboarding form to get started: https://bettermeals.in/onboarding \n\n Let me know once you've completed the form!"
-        }
-    
-    def _handle_form_completion(self, text: str, phone_number: str) -> Dict[str, Any]:
+            return StepResult(reply="Please tell me your name so I can help you better!")
+
+        return StepResult(
+            reply=f"Nice to meet you, {name}! Please complete this quick onboarding form to get started: https://bettermeals.in/onboarding \n\n Let me know once you've completed the form!",
+            next_step=OnboardingStep.FORM_COMPLETION,
+            data={"name": name},
+        )
+
+    def _handle_form_completion(self, ctx: FlowContext) -> StepResult:
         """Handle form completion step."""
-        completion_keywords = ["done", "completed", "finished"]
-        # Import locally to avoid circular import
-        from .service import onboarding_service
-        if any(keyword in text.lower() for keyword in completion_keywords) and onboarding_service.check_if_onboarding_form_submitted(phone_number)[0]:
-            self._set_onboarding_step(phone_number, OnboardingStep.TRIAL_OFFER)
-            user_data = self._get_user_data(phone_number)
-            user_name = user_data.get("name", "there")
-            return {
-                "reply": f"Perfect, {user_name}! Thanks for completing the form. Want to try BetterMeals for a month at just ₹149?"
-            }    
-        else:
-            return {
-                "reply": "Please complete the onboarding form first: https://bettermeals.in/onboarding \n\nLet me know once you're done!"
-            }
-    
-    def _handle_trial_offer(self, text: str, phone_number: str) -> Dict[str, Any]:
+        if ctx.matched and self._form_submitted(ctx):
+            return self._offer_trial(ctx)
+        return StepResult(
+            reply="Please complete the onboarding form first: https://bettermeals.in/onboarding \n\nLet me know once you're done!"
+        )
+
+    def _on_form_submitted(self, ctx: FlowContext) -> Optional[StepResult]:
+        """Form submitted while we wait for it: offer the trial right away."""
+        if ctx.data.get("form_submitted"):
+            return self._offer_trial(ctx)
+        return None
+
+    def _offer_trial(self, ctx: FlowContext) -> StepResult:
+        user_name = ctx.data.get("name", "there")
+        return StepResult(
+            reply=f"Perfect, {user_name}! Thanks for completing the form. Want to try BetterMeals for a month at just ₹149?",
+            next_step=OnboardingStep.TRIAL_OFFER,
+            data={"form_submitted": True},
+        )
+
+    def _handle_trial_offer(self, ctx: FlowContext) -> StepResult:
         """Handle trial offer acceptance."""
-        accepted = text.lower().strip() in ["sure", "yes", "y", "yeah", "yep", "ok", "okay"]
-        
-        if not accepted:
-            return {
-                "reply": "No worries! Take your time. Feel free to reach out when you're ready to try BetterMeals."
-            }
-        
-        self._set_onboarding_step(phone_number, OnboardingStep.PAYMENT_CONFIRMATION)
-        user_data = self._get_user_data(phone_number)
-        user_name = user_data.get("name", "there")
-        
-        return {
-            "reply": f"Awesome! Can you confirm your name for the payment link? Is it {user_name}?"
-        }
-    
-    def _handle_payment_confirmation(self, text: str, phone_number: str) -> Dict[str, Any]:
+        if not ctx.matched:
+            return StepResult(
+                reply="No worries! Take your time. Feel free to reach out when you're ready to try BetterMeals."
+            )
+
+        user_name = ctx.data.get("name", "there")
+        return StepResult(
+            reply=f"Awesome! Can you confirm your name for the payment link? Is it {user_name}?",
+            next_step=OnboardingStep.PAYMENT_CONFIRMATION,
+        )
+
+    def _handle_payment_confirmation(self, ctx: FlowContext) -> StepResult:
         """Handle payment confirmation."""
-        confirmed = text.lower().strip() in ["yes", "y", "yeah", "yep"]
-        
-        if not confirmed:
-            return {
-                "reply": "Please confirm your name once, before the payment process starts"
-            }
-        
-        self._set_onboarding_step(phone_number, OnboardingStep.COMPLETED)
-        # Save final onboarding data to household collection
-        self._save_final_onboarding_data(phone_number)
-        
-        user_data = self._get_user_data(phone_number)
-        user_name = user_data.get("name", "there")
-        
+        if not ctx.matched:
+            return StepResult(reply="Please confirm your name once, before the payment process starts")
+
+        user_name = ctx.data.get("name", "there")
+
         # Generate payment link (in production, integrate with payment gateway)
         upi_id = "9639293454@ybl"  # Mock id
-        
-        return {
-            "reply": f"You can pay for the ₹149 trial at this UPI ID: {upi_id}\n\nLet me know once you've paid, {user_name}! 😊"
-        }
-    
-    def _handle_group_invitation(self, text: str, phone_number: str) -> Dict[str, Any]:
+
+        return StepResult(
+            reply=f"You can pay for the ₹149 trial at this UPI ID: {upi_id}\n\nLet me know once you've paid, {user_name}! 😊",
+            next_step=OnboardingStep.COMPLETED,
+            # Save final onboarding data to household collection
+            after_commit=lambda snapshot: self._save_final_onboarding_data(ctx.phone_number, snapshot),
+        )
+
+    def _handle_group_invitation(self, ctx: FlowContext) -> StepResult:
         """Handle group invitation after payment."""
-        if "done" in text.lower() or "✅" in text or "paid" in text.lower():
-            self._set_onboarding_step(phone_number, OnboardingStep.COMPLETED)
+        if not ctx.matched:
+            return StepResult(
+                reply="Please let me know once you've completed the payment so I can send you the group invitation."
+            )
+
+        def finish(snapshot):
             # Save final onboarding data to household collection
-            self._save_final_onboarding_data(phone_number)
-            
+            self._save_final_onboarding_data(ctx.phone_number, snapshot)
             # In production, create user record and household in database
-            self._create_user_record(phone_number)
-            
-            return {
-                "reply": "You have received the invite for WhatsApp group. Please join the group and our team will lead you from there."
-            }
-        else:
-            return {
-                "reply": "Please let me know once you've completed the payment so I can send you the group invitation."
-            }
-    
-    def _create_user_record(self, phone_number: str):
-        """Create user record in database after successful onboarding."""
-        try:
-            user_data = self._get_user_data(phone_number)
-            logger.info(f"Creating user record for {phone_number} with data: {user_data}")
-            
-            # In production, implement actual database creation
-            # For now, just log the completion
-            logger.info(f"Generic onboarding completed for {phone_number}")
-            
-        except Exception as e:
-            logger.error(f"Error creating user record for {phone_number}: {str(e)}")
+            self._create_user_record(ctx.phone_number, snapshot)
+
+        return StepResult(
+            reply="You have received the invite for WhatsApp group. Please join the group and our team will lead you from there.",
+            next_step=OnboardingStep.COMPLETED,
+            after_commit=finish,
+        )
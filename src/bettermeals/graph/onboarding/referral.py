@@ -1,7 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Optional
 import logging
 
-from .base import BaseOnboarding, OnboardingStep
+from .base import BaseOnboarding, OnboardingStep, FORM_DONE, TRIAL_ACCEPTED, CONFIRMED, PAYMENT_DONE
+from ..flow_engine import FlowContext, StepResult, StepSpec
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -9,140 +10,110 @@ logger = logging.getLogger(__name__)
 
 class ReferralUserOnboarding(BaseOnboarding):
     """Onboarding flow for referral users"""
-    
+
     def get_onboarding_type(self) -> str:
         return "referral"
-    
-    def _initialize_steps(self) -> Dict[OnboardingStep, callable]:
+
+    def _initialize_steps(self) -> Dict[OnboardingStep, StepSpec]:
         return {
-            OnboardingStep.GREETING: self._handle_greeting,
-            OnboardingStep.NAME_COLLECTION: self._handle_name_collection,
-            OnboardingStep.NEEDS_ASSESSMENT: self._handle_treatment_plan,
-            OnboardingStep.FORM_COMPLETION: self._handle_form_completion,
-            OnboardingStep.TRIAL_OFFER: self._handle_trial_offer,
-            OnboardingStep.PAYMENT_CONFIRMATION: self._handle_payment_confirmation,
-            # OnboardingStep.GROUP_INVITATION: self._handle_group_invitation,
+            OnboardingStep.GREETING: StepSpec(self._handle_greeting),
+            OnboardingStep.NAME_COLLECTION: StepSpec(self._handle_name_collection, capture="name"),
+            OnboardingStep.NEEDS_ASSESSMENT: StepSpec(self._handle_treatment_plan, capture="treatment_plan"),
+            OnboardingStep.FORM_COMPLETION: StepSpec(self._handle_form_completion, matcher=FORM_DONE, on_event=self._on_form_submitted),
+            OnboardingStep.TRIAL_OFFER: StepSpec(self._handle_trial_offer, matcher=TRIAL_ACCEPTED),
+            OnboardingStep.PAYMENT_CONFIRMATION: StepSpec(self._handle_payment_confirmation, matcher=CONFIRMED),
+            # OnboardingStep.GROUP_INVITATION: StepSpec(self._handle_group_invitation, matcher=PAYMENT_DONE),
         }
-    
-    def _handle_greeting(self, text: str, phone_number: str) -> Dict[str, Any]:
+
+    def _handle_greeting(self, ctx: FlowContext) -> StepResult:
         """Handle initial greeting step for referral users."""
-        self._set_onboarding_step(phone_number, OnboardingStep.NAME_COLLECTION)
-        return {
-            "reply": "Hey! I'm Zuko from Bettermeals. I see you were referred by Super Health hospital! May I know your name?"
-        }
-    
-    def _handle_name_collection(self, text: str, phone_number: str) -> Dict[str, Any]:
+        return StepResult(
+            reply="Hey! I'm Zuko from Bettermeals. I see you were referred by Super Health hospital! May I know your name?",
+            next_step=OnboardingStep.NAME_COLLECTION,
+        )
+
+    def _handle_name_collection(self, ctx: FlowContext) -> StepResult:
         """Handle name collection step for referral users."""
-        name = text.strip()
+        name = ctx.text.strip()
         if not name:
-            return {"reply": "Please tell me your name so I can help you better!"}
-        
-        # Store the name
-        user_data = self._get_user_data(phone_number)
-        user_data["name"] = name
-        user_data["is_referral"] = True
-        self._set_user_data(phone_number, user_data)
-        
-        self._set_onboarding_step(phone_number, OnboardingStep.NEEDS_ASSESSMENT)
-        return {
-            "reply": f"Nice to meet you, {name}! Which treatment plan are you looking for?\n\n1. Diabetes Management\n2. Heart Health\n3. Weight Management\n4. General Wellness\n5. Post-Surgery Recovery\n6. Other specific condition"
-        }
-    
-    def _handle_treatment_plan(self, text: str, phone_number: str) -> Dict[str, Any]:
+            return StepResult(reply="Please tell me your name so I can help you better!")
+
+        return StepResult(
+            reply=f"Nice to meet you, {name}! Which treatment plan are you looking for?\n\n1. Diabetes Management\n2. Heart Health\n3. Weight Management\n4. General Wellness\n5. Post-Surgery Recovery\n6. Other specific condition",
+            next_step=OnboardingStep.NEEDS_ASSESSMENT,
+            data={"name": name, "is_referral": True},
+        )
+
+    def _handle_treatment_plan(self, ctx: FlowContext) -> StepResult:
         """Handle treatment plan selection for hospital referral users."""
-        # Store the treatment plan
-        user_data = self._get_user_data(phone_number)
-        user_data["treatment_plan"] = text
-        user_data["referral_source"] = "Super Health Hospital"
-        self._set_user_data(phone_number, user_data)
-        
-        self._set_onboarding_step(phone_number, OnboardingStep.FORM_COMPLETION)
-        
-        return {
-            "reply": f"Perfect! Please complete this quick onboarding form to get started: https://bettermeals.in/onboarding \n\n Let me know once you've completed the form!"
-        }
+        # Treatment plan is captured from the reply by the step table
+        return StepResult(
+            reply="Perfect! Please complete this quick onboarding form to get started: https://bettermeals.in/onboarding \n\n Let me know once you've completed the form!",
+            next_step=OnboardingStep.FORM_COMPLETION,
+            data={"referral_source": "Super Health Hospital"},
+        )
 
-    def _handle_form_completion(self, text: str, phone_number: str) -> Dict[str, Any]:
+    def _handle_form_completion(self, ctx: FlowContext) -> StepResult:
         """Handle form completion step."""
-        completion_keywords = ["done", "completed", "finished"]
-        # Import locally to avoid circular import
-        from .service import onboarding_service
-        if any(keyword in text.lower() for keyword in completion_keywords) and onboarding_service.check_if_onboarding_form_submitted(phone_number)[0]:
-            self._set_onboarding_step(phone_number, OnboardingStep.TRIAL_OFFER)
-            user_data = self._get_user_data(phone_number)
-            user_name = user_data.get("name", "there")
-            treatment_plan = user_data.get("treatment_plan", "illness")
-            return {
-                "reply": f"Perfect, {user_name}! Thanks for completing the form. BetterMeals will help you recover from {treatment_plan.lower()}. Since you were referred by Super Health hospital, you get the first month for just ₹299 instead of ₹499!"
-            }
-        else:
-            return {
-                "reply": "Please complete the onboarding form first: https://bettermeals.in/onboarding \n\nLet me know once you're done!"
-            }
-    
-    
-    def _handle_trial_offer(self, text: str, phone_number: str) -> Dict[str, Any]:
+        if ctx.matched and self._form_submitted(ctx):
+            return self._offer_trial(ctx)
+        return StepResult(
+            reply="Please complete the onboarding form first: https://bettermeals.in/onboarding \n\nLet me know once you're done!"
+        )
+
+    def _on_form_submitted(self, ctx: FlowContext) -> Optional[StepResult]:
+        """Form submitted while we wait for it: offer the trial right away."""
+        if ctx.data.get("form_submitted"):
+            return self._offer_trial(ctx)
+        return None
+
+    def _offer_trial(self, ctx: FlowContext) -> StepResult:
+        user_name = ctx.data.get("name", "there")
+        treatment_plan = ctx.data.get("treatment_plan", "illness")
+        return StepResult(
+            reply=f"Perfect, {user_name}! Thanks for completing the form. BetterMeals will help you recover from {treatment_plan.lower()}. Since you were referred by Super Health hospital, you get the first month for just ₹299 instead of ₹499!",
+            next_step=OnboardingStep.TRIAL_OFFER,
+            data={"form_submitted": True},
+        )
+
+    def _handle_trial_offer(self, ctx: FlowContext) -> StepResult:
         """Handle trial offer acceptance for referral users."""
-        accepted = text.lower().strip() in ["sure", "yes", "y", "yeah", "yep", "ok", "okay"]
-        
-        if not accepted:
-            return {
-                "reply": "No worries! Take your time. Feel free to reach out when you're ready to try BetterMeals with Super Health hospital's special pricing."
-            }
-        
-        self._set_onboarding_step(phone_number, OnboardingStep.PAYMENT_CONFIRMATION)
-        user_data = self._get_user_data(phone_number)
-        user_name = user_data.get("name", "there")
-        
-        return {
-            "reply": f"Awesome! Can you confirm your name for the payment link? Is it {user_name}?"
-        }
-    
-    def _handle_payment_confirmation(self, text: str, phone_number: str) -> Dict[str, Any]:
+        if not ctx.matched:
+            return StepResult(
+                reply="No worries! Take your time. Feel free to reach out when you're ready to try BetterMeals with Super Health hospital's special pricing."
+            )
+
+        user_name = ctx.data.get("name", "there")
+        return StepResult(
+            reply=f"Awesome! Can you confirm your name for the payment link? Is it {user_name}?",
+            next_step=OnboardingStep.PAYMENT_CONFIRMATION,
+        )
+
+    def _handle_payment_confirmation(self, ctx: FlowContext) -> StepResult:
         """Handle payment confirmation for referral users."""
-        confirmed = text.lower().strip() in ["yes", "y", "yeah", "yep"]
-        
-        if not confirmed:
-            return {
-                "reply": "Please confirm your name so I send you the payment details"
-            }
-        
-        self._set_onboarding_step(phone_number, OnboardingStep.COMPLETED)
-        user_data = self._get_user_data(phone_number)
-        user_name = user_data.get("name", "there")
-        
+        if not ctx.matched:
+            return StepResult(reply="Please confirm your name so I send you the payment details")
+
+        user_name = ctx.data.get("name", "there")
+
         # Generate payment link for referral users (special discount)
         upi_id = "9639293454@ybl"  # Mock id
-        
-        return {
-            "reply": f"Here's the UPI ID for the ₹299 trial (referral discount): {upi_id}\n\nLet me know once you've paid, {user_name}! 😊"
-        }
-    
-    def _handle_group_invitation(self, text: str, phone_number: str) -> Dict[str, Any]:
+
+        return StepResult(
+            reply=f"Here's the UPI ID for the ₹299 trial (referral discount): {upi_id}\n\nLet me know once you've paid, {user_name}! 😊",
+            next_step=OnboardingStep.COMPLETED,
+        )
+
+    def _handle_group_invitation(self, ctx: FlowContext) -> StepResult:
         """Handle group invitation after payment for referral users."""
-        if "done" in text.lower() or "✅" in text or "paid" in text.lower():
-            self._set_onboarding_step(phone_number, OnboardingStep.COMPLETED)
-            
+        if not ctx.matched:
+            return StepResult(
+                reply="Please let me know once you've completed the payment so I can send you the group invitation."
+            )
+
+        return StepResult(
+            reply="You have received the invite for WhatsApp group. Please join the group and our team will lead you from there. Thanks for joining through Super Health hospital referral!",
+            next_step=OnboardingStep.COMPLETED,
             # In production, create user record and household in database
-            self._create_user_record(phone_number)
-            
-            return {
-                "reply": "You have received the invite for WhatsApp group. Please join the group and our team will lead you from there. Thanks for joining through Super Health hospital referral!"
-            }
-        else:
-            return {
-                "reply": "Please let me know once you've completed the payment so I can send you the group invitation."
-            }
-    
-    def _create_user_record(self, phone_number: str):
-        """Create user record in database after successful referral onboarding."""
-        try:
-            user_data = self._get_user_data(phone_number)
-            logger.info(f"Creating referral user record for {phone_number} with data: {user_data}")
-            
-            # In production, implement actual database creation
-            # For now, just log the completion
-            logger.info(f"Super Health hospital referral onboarding completed for {phone_number}")
-            
-        except Exception as e:
-            logger.error(f"Error creating referral user record for {phone_number}: {str(e)}")
+            after_commit=lambda snapshot: self._create_user_record(ctx.phone_number, snapshot),
+        )
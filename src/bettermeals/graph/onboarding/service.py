@@ -1,6 +1,7 @@
 from typing import Dict, Any, Optional, Tuple
 import logging
 
+from .base import BaseOnboarding
 from .generic_v2 import GenericUserOnboardingV2
 from .referral import ReferralUserOnboarding
 from ...database.database import get_db
@@ -75,6 +76,14 @@ class OnboardingService:
             logger.error(f"Error getting household data for phone {phone_number}: {str(e)}")
             return None
 
+    def handle_form_submitted(self, phone_number: str) -> Optional[str]:
+        """Record that the onboarding form was submitted; returns a proactive message if the flow moved on."""
+        raw = get_db().get_flow_snapshot(BaseOnboarding.transaction_collection, phone_number)
+        if raw is None:
+            return None
+        flow = self.referral_onboarding if raw.get("flow_type") == "referral" else self.generic_onboarding
+        return flow.handle_event(phone_number, {"form_submitted": True}, raw=raw)
+
     def process_onboarding_message(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Process onboarding message and return appropriate response."""
         try:
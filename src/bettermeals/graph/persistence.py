@@ -1,6 +1,11 @@
 from langgraph.checkpoint.memory import InMemorySaver
+from ..config.settings import settings
+from .blob_store import BlobCheckpointSaver, blob_serializer
 # Swap to Redis/SQLite checkpointer later if desired
 
 def make_checkpointer():
     """Return a checkpointer for durable execution (dev: in-memory)."""
+    if settings.graph_blob_offload_enabled:
+        # Large message contents (plans, carts) are stored once as blobs; checkpoints keep references
+        return BlobCheckpointSaver(serde=blob_serializer())
     return InMemorySaver()
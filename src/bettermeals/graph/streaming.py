@@ -0,0 +1,172 @@
+"""
+Streaming Graph Execution
+
+Runs the supervisor graph with `astream_events` instead of a blocking `invoke`, so a
+12-20s workflow shows progress as it goes. Events passed to the `on_event` callback:
+
+    {"type": "progress", "worker": name, "label": text}   a worker started
+    {"type": "token", "text": chunk}                      part of the supervisor's answer
+    {"type": "discard"}                                   the tokens since the last
+                                                          discard were a preamble to
+                                                          a handoff, not the answer
+    {"type": "interrupt", "pending_action": action}       the graph paused for approval
+
+`OutboundRelay` is the WhatsApp consumer. It sends the first progress note and
+completed answer paragraphs through the outbound sender while the graph runs, and
+leaves only the unsent tail for the webhook reply.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from ..telemetry.metrics import metrics
+from ..utils.outbound import send_whatsapp_message
+from ..utils.webhook_processor import WebhookProcessor
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+SUPERVISOR_NODE = "supervisor"
+WORKER_LABELS = {
+    "onboarding": "Updating your household profile",
+    "meal_recommender": "Planning your meals",
+    "meal_scorer": "Checking how healthy the plan is",
+    "order": "Working on your grocery order",
+    "cook_update": "Processing the cook's update",
+}
+INTERRUPT_KEY = "__interrupt__"
+
+
+def _top_level_node(metadata: Dict[str, Any]) -> Optional[str]:
+    """Outermost graph node an event belongs to (workers and the supervisor are subgraphs)."""
+    namespace = metadata.get("langgraph_checkpoint_ns") or ""
+    if namespace:
+        return namespace.split("|", 1)[0].split(":", 1)[0]
+    return metadata.get("langgraph_node")
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+def pending_action_from(value: Any) -> Optional[str]:
+    """pending_action named by an interrupt value (or list of interrupts)"""
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    value = getattr(value, "value", value)  # Interrupt(value=...)
+    if isinstance(value, dict):
+        return value.get("pending_action")
+    return str(value) if value else None
+
+
+async def stream_graph(
+    graph, state_in: Dict[str, Any], config: Dict[str, Any], on_event: Optional[EventCallback] = None
+) -> Dict[str, Any]:
+    """Run the graph to completion or interrupt, reporting progress; returns the webhook response."""
+    started = time.monotonic()
+    first_event = True
+    workers_started = set()
+    pending_action: Optional[str] = None
+
+    async def emit(event: Dict[str, Any]) -> None:
+        nonlocal first_event
+        if first_event:
+            first_event = False
+            metrics.observe("graph_stream.first_event_seconds", time.monotonic() - started, type=event["type"])
+        if on_event is not None:
+            result = on_event(event)
+            if inspect.isawaitable(result):
+                await result
+
+    async for event in graph.astream_events(state_in, config, version="v2"):
+        kind = event["event"]
+        metadata = event.get("metadata") or {}
+        data = event.get("data") or {}
+
+        if kind == "on_chain_start" and event["name"] in WORKER_LABELS and metadata.get("langgraph_node") == event["name"]:
+            if event["name"] not in workers_started:
+                workers_started.add(event["name"])
+                await emit({"type": "progress", "worker": event["name"], "label": WORKER_LABELS[event["name"]]})
+
+        elif kind == "on_chat_model_stream" and _top_level_node(metadata) == SUPERVISOR_NODE:
+            chunk = data.get("chunk")
+            text = _chunk_text(chunk)
+            if text and not getattr(chunk, "tool_call_chunks", None):
+                await emit({"type": "token", "text": text})
+
+        elif kind == "on_chat_model_end" and _top_level_node(metadata) == SUPERVISOR_NODE:
+            if getattr(data.get("output"), "tool_calls", None):
+                await emit({"type": "discard"})
+
+        elif kind == "on_chain_stream" and isinstance(data.get("chunk"), dict):
+            chunk = data["chunk"]
+            action = pending_action_from(chunk[INTERRUPT_KEY]) if INTERRUPT_KEY in chunk else chunk.get("pending_action")
+            if action and action != pending_action:
+                pending_action = action
+                await emit({"type": "interrupt", "pending_action": action})
+
+    snapshot = await graph.aget_state(config)
+    final_state = dict(snapshot.values or {})
+    if pending_action and not final_state.get("pending_action"):
+        final_state["pending_action"] = pending_action
+    last_message = WebhookProcessor.extract_last_ai_message(final_state.get("messages", []))
+    metrics.observe("graph_stream.total_seconds", time.monotonic() - started)
+    return WebhookProcessor.build_response(last_message, final_state)
+
+
+class OutboundRelay:
+    """Forwards stream events to a phone number as WhatsApp messages, in order"""
+
+    def __init__(self, phone_number: str, min_paragraph_chars: int = 80):
+        self.phone_number = phone_number
+        self.min_paragraph_chars = min_paragraph_chars
+        self.sent_text = ""
+        self._buffer = ""
+        self._progress_sent = False
+        self._queue: "asyncio.Queue[Optional[Tuple[str, bool]]]" = asyncio.Queue()
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def __call__(self, event: Dict[str, Any]) -> None:
+        if event["type"] == "progress" and not self._progress_sent:
+            # One progress note is enough on WhatsApp; more would be noise
+            self._progress_sent = True
+            self._queue.put_nowait((f"{event['label']}...", False))
+        elif event["type"] == "token":
+            self._buffer += event["text"]
+            self._flush_paragraphs()
+        elif event["type"] == "discard":
+            self._buffer = ""
+
+    def _flush_paragraphs(self) -> None:
+        cut = self._buffer.rfind("\n\n")
+        if cut >= self.min_paragraph_chars:
+            self._queue.put_nowait((self._buffer[:cut].strip(), True))
+            self._buffer = self._buffer[cut + 2:]
+
+    async def _send_loop(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            text, is_answer = item
+            sent = await asyncio.to_thread(send_whatsapp_message, self.phone_number, text)
+            metrics.incr("graph_stream.relayed", outcome="sent" if sent else "failed")
+            if sent and is_answer:
+                self.sent_text += text + "\n\n"
+
+    async def finish(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Wait for queued messages; the reply keeps only what was not already sent (may be empty)."""
+        self._queue.put_nowait(None)
+        await self._sender
+        reply = (response.get("reply") or "").strip()
+        sent = self.sent_text.strip()
+        if sent and reply.startswith(sent):
+            response = {**response, "reply": reply[len(sent):].strip(), "streamed": True}
+        return response
@@ -0,0 +1,189 @@
+"""
+Tool Context Cache
+
+The cook and user agent services pass a tool context (ids, household, year_week, ...)
+with every Bedrock invocation. It is built once per (role, phone, day) and then
+served from memory:
+
+- the `find_*_by_phone` lookup and enrichment (e.g. today's meal ids) run on the
+  first message of the day only
+- an entry is dropped when its cook/user document changes (phone directory
+  subscription) or when its household's `household` / `weekly_meal_plan` documents
+  change (listeners attached with `start`)
+- payload values (household_id, meal_id) still override per message
+
+Entries from previous days are discarded on the first lookup of a new day.
+
+Contexts are built outside the lock. Every invalidation bumps a generation counter,
+and while builds are in flight the generation is remembered per invalidated document
+and household. A build whose document or household was invalidated after it started
+(or that straddles a day change) is returned but not stored, so it cannot overwrite
+the invalidation with stale data.
+"""
+
+import logging
+import threading
+from datetime import date
+from functools import partial
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_Key = Tuple[str, str]  # (role, phone_number)
+
+# collection -> household id for a changed document id
+_HOUSEHOLD_SOURCES: Dict[str, Callable[[str], str]] = {
+    "household": lambda doc_id: doc_id,
+    "weekly_meal_plan": lambda doc_id: doc_id.rsplit("-", 2)[0],  # {household_id}-{YYYY}-{WW}
+}
+
+
+class ToolContextCache:
+    """Per-(role, phone) daily tool contexts with document-change invalidation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day = date.today()
+        self._entries: Dict[_Key, Dict[str, Any]] = {}
+        self._by_doc: Dict[str, Set[_Key]] = {}
+        self._by_household: Dict[str, Set[_Key]] = {}
+        self._watches: List[Any] = []
+        self._primed: Dict[str, bool] = {}
+        self._household_subscribers: List[Callable[[str], None]] = []
+        # Invalidation generations, only tracked while a build is in flight
+        self._generation = 0
+        self._cleared_generation = 0
+        self._building = 0
+        self._doc_generations: Dict[str, int] = {}
+        self._household_generations: Dict[str, int] = {}
+
+    def get(self, role: str, phone_number: str, payload: Dict[str, Any], build: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Tool context for a message. `build(phone_number)` computes the cacheable part;
+        it should set "id" (the cook/user document id) and "household_id" when known.
+        """
+        key = (role, phone_number)
+        with self._lock:
+            today = date.today()
+            if today != self._day:
+                self._clear()
+                self._day = today
+            cached = self._entries.get(key)
+            if cached is None:
+                started = self._generation
+                self._building += 1
+
+        if cached is None:
+            metrics.incr("tool_context.miss", role=role)
+            try:
+                cached = build(phone_number)
+            except Exception:
+                with self._lock:
+                    self._finish_build()
+                raise
+            with self._lock:
+                if self._invalidated_since(role, cached, started):
+                    metrics.incr("tool_context.stale_build", role=role)
+                else:
+                    self._store(key, cached)
+                self._finish_build()
+        else:
+            metrics.incr("tool_context.hit", role=role)
+
+        context = {k: v for k, v in cached.items() if k != "id"}
+        context["phone_number"] = phone_number
+        # Values from the payload take precedence
+        for field in ("household_id", "meal_id"):
+            if payload.get(field):
+                context[field] = payload.get(field)
+        return context
+
+    def invalidate_doc(self, role: str, doc_id: str) -> None:
+        doc_key = f"{role}:{doc_id}"
+        with self._lock:
+            self._generation += 1
+            if self._building:
+                self._doc_generations[doc_key] = self._generation
+            self._drop(self._by_doc.pop(doc_key, set()))
+
+    def invalidate_household(self, household_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._building:
+                self._household_generations[household_id] = self._generation
+            self._drop(self._by_household.pop(household_id, set()))
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(household_id)` whenever a `household` document changes."""
+        self._household_subscribers.append(callback)
+
+    def start(self, client, phone_directory) -> None:
+        """Invalidate on cook/user changes (directory) and household/plan changes (listeners)."""
+        if self._watches:
+            return
+        phone_directory.subscribe(self.invalidate_doc)
+        for collection in _HOUSEHOLD_SOURCES:
+            self._watches.append(client.collection(collection).on_snapshot(partial(self._on_snapshot, collection)))
+            logger.info(f"Tool context cache listening on '{collection}'")
+
+    def stop(self) -> None:
+        for watch in self._watches:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                logger.warning(f"Error stopping tool context listener: {str(e)}")
+        self._watches = []
+        self._primed.clear()
+
+    def _on_snapshot(self, collection: str, docs, changes, read_time) -> None:
+        if not self._primed.get(collection):
+            # Initial snapshot: existing documents, nothing changed
+            self._primed[collection] = True
+            return
+        for change in changes:
+            household_id = _HOUSEHOLD_SOURCES[collection](change.document.id)
+            self.invalidate_household(household_id)
+            if collection == "household":
+                for callback in self._household_subscribers:
+                    callback(household_id)
+
+    def _invalidated_since(self, role: str, context: Dict[str, Any], started: int) -> bool:
+        """Whether the context's document or household was invalidated after generation `started`"""
+        if self._cleared_generation > started:
+            return True
+        if context.get("id") and self._doc_generations.get(f"{role}:{context['id']}", 0) > started:
+            return True
+        return bool(context.get("household_id")) and self._household_generations.get(context["household_id"], 0) > started
+
+    def _finish_build(self) -> None:
+        self._building -= 1
+        if not self._building:
+            self._doc_generations.clear()
+            self._household_generations.clear()
+
+    def _store(self, key: _Key, context: Dict[str, Any]) -> None:
+        self._entries[key] = context
+        role = key[0]
+        if context.get("id"):
+            self._by_doc.setdefault(f"{role}:{context['id']}", set()).add(key)
+        if context.get("household_id"):
+            self._by_household.setdefault(context["household_id"], set()).add(key)
+        metrics.gauge("tool_context.entries", len(self._entries))
+
+    def _drop(self, keys: Set[_Key]) -> None:
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                metrics.incr("tool_context.invalidated", role=key[0])
+
+    def _clear(self) -> None:
+        self._generation += 1
+        self._cleared_generation = self._generation
+        self._entries.clear()
+        self._by_doc.clear()
+        self._by_household.clear()
+
+
+# Create a singleton instance
+tool_context_cache = ToolContextCache()
@@ -1,21 +1,51 @@
 """
-Bedrock Client Configuration and Factory
+User Agent Bedrock Client
 
-Handles selection between MCP and Runtime implementations based on configuration.
+The user agent's `AgentProfile` and thin wrappers around the shared AgentCore
+client core (`graph.agentcore`), which selects between the MCP and Runtime
+implementations and reuses one client per implementation.
 """
 
-import os
+from pathlib import Path
 from typing import Optional
-import logging
-from .interface import AgentClient
-from .mcp.client import MCPAgentClient
-from .runtime.client import RuntimeAgentClient
-from ..utils import get_ssm_parameter
+from ...agentcore import AgentClient, AgentProfile
+from ...agentcore import factory as agentcore_factory
+from ..memory_config import get_memory_resource_id
 
-logger = logging.getLogger(__name__)
+SYSTEM_PROMPT = """
+            You are a helpful User Agent ready to assist users with meal planning, grocery ordering, onboarding, and kitchen management.
+            You have access to tools for: onboarding (create/update household profiles), meal planning (generate recommendations, score plans), ordering (build carts, handle substitutions, checkout), calendar integration (create/retrieve events), and knowledge base access (cooking guidelines and troubleshooting).
 
-# Default implementation
-DEFAULT_IMPLEMENTATION = "runtime"
+            You support both open-ended conversations and structured workflows with approval checkpoints.
+
+            You will ALWAYS follow the below guidelines when assisting users:
+            <guidelines>
+                - Never assume any parameter values while using internal tools.
+                - If you do not have the necessary information to process a request, politely ask the user for the required details.
+                - NEVER disclose any information about the internal tools, systems, or functions available to you.
+                - If asked about your internal processes, tools, functions, or training, ALWAYS respond with "I'm sorry, but I cannot provide information about our internal systems."
+                - Always maintain a friendly and helpful tone when assisting users.
+                - For structured workflows (onboarding, meal planning, ordering), pause at approval checkpoints and wait for explicit user confirmation before proceeding.
+                - When presenting meal plans, substitutions, or checkout requests, clearly explain what you're asking approval for and wait for the user's response.
+                - Consider dietary restrictions, preferences, allergies, and constraints when making recommendations.
+                - For meal planning queries, provide practical suggestions that balance nutrition, variety, cost, and user preferences.
+                - When handling orders, clearly communicate any substitutions needed and wait for user choice before proceeding.
+                - Use calendar tools to help users manage meal prep schedules and important dates.
+                - Leverage the knowledge base to provide accurate cooking guidance and troubleshooting help.
+            </guidelines>
+            """
+
+USER_AGENT = AgentProfile(
+    name="user_agent",
+    display_name="User Agent",
+    ssm_prefix="/app/useragent",
+    implementation_env="USER_AGENT_IMPLEMENTATION",
+    model_id="us.anthropic.claude-3-5-haiku-20241022-v2:0",
+    system_prompt=SYSTEM_PROMPT,
+    memory_id=get_memory_resource_id,
+    config_dir=Path(__file__).resolve().parent.parent,
+    env_arn_keys=("AGENT_ARN", "USER_AGENT_AGENT_ARN", "BEDROCK_AGENT_ARN", "RUNTIME_AGENT_ARN"),
+)
 
 
 def get_implementation() -> str:
@@ -25,25 +55,7 @@ def get_implementation() -> str:
     Returns:
         "mcp" or "runtime"
     """
-    # Check environment variable first
-    impl = os.getenv("USER_AGENT_IMPLEMENTATION", "").lower()
-    
-    if impl in ("mcp", "runtime"):
-        logger.info(f"Using implementation from environment: {impl}")
-        return impl
-    
-    # Fallback to SSM parameter
-    try:
-        impl = get_ssm_parameter("/app/useragent/implementation").lower()
-        if impl in ("mcp", "runtime"):
-            logger.info(f"Using implementation from SSM: {impl}")
-            return impl
-    except Exception as e:
-        logger.debug(f"Could not read implementation from SSM: {e}")
-    
-    # Default to MCP
-    logger.info(f"Using default implementation: {DEFAULT_IMPLEMENTATION}")
-    return DEFAULT_IMPLEMENTATION
+    return agentcore_factory.get_implementation(USER_AGENT)
 
 
 def create_agent_client(
@@ -51,30 +63,13 @@ def create_agent_client(
     agent_name: Optional[str] = None
 ) -> AgentClient:
     """
-    Factory function to create the appropriate agent client.
+    Create a new user agent client (MCPAgentClient or RuntimeAgentClient).
     
     Args:
         implementation: "mcp" or "runtime". If None, reads from config/env/SSM.
         agent_name: Optional agent name for Runtime config file lookup.
-    
-    Returns:
-        AgentClient instance (MCPAgentClient or RuntimeAgentClient)
-    
-    Raises:
-        ValueError: If implementation is invalid
     """
-    impl = implementation or get_implementation()
-    
-    if impl == "runtime":
-        logger.info("Creating RuntimeAgentClient")
-        return RuntimeAgentClient(agent_name=agent_name)
-    elif impl == "mcp":
-        logger.info("Creating MCPAgentClient")
-        return MCPAgentClient()
-    else:
-        raise ValueError(
-            f"Unknown implementation: {impl}. Must be 'mcp' or 'runtime'"
-        )
+    return agentcore_factory.create_agent_client(USER_AGENT, implementation, agent_name)
 
 
 async def invoke_user_agent(
@@ -83,10 +78,11 @@ async def invoke_user_agent(
     session_id: str,
     context: Optional[dict] = None,
     implementation: Optional[str] = None,
-    agent_name: Optional[str] = None
+    agent_name: Optional[str] = None,
+    timeout: Optional[float] = None
 ) -> str:
     """
-    Unified invoke function that uses factory to select implementation.
+    Invoke the user agent through its shared client.
     
     Args:
         prompt: The user's message/query
@@ -95,9 +91,12 @@ async def invoke_user_agent(
         context: Optional dictionary of context values for tool calls
         implementation: Optional override ("mcp" or "runtime")
         agent_name: Optional agent name for Runtime config file lookup
+        timeout: Seconds left on the caller's deadline (webhook budget)
     
     Returns:
         Agent response as a string
     """
-    client = create_agent_client(implementation=implementation, agent_name=agent_name)
-    return await client.invoke(prompt, actor_id, session_id, context)
+    return await agentcore_factory.invoke_agent(
+        USER_AGENT, prompt, actor_id, session_id, context,
+        implementation=implementation, agent_name=agent_name, timeout=timeout,
+    )
@@ -1,21 +0,0 @@
-"""
-MCP Client Implementation
-
-MCP-based agent client implementation with all supporting modules.
-"""
-
-from .client import MCPAgentClient, invoke_user_agent
-from .token_manager import TokenManager
-from .config_manager import ConfigManager
-from .mcp_client_factory import MCPClientFactory
-from .agent_factory import AgentFactory
-
-__all__ = [
-    "MCPAgentClient",
-    "invoke_user_agent",
-    "TokenManager",
-    "ConfigManager",
-    "MCPClientFactory",
-    "AgentFactory",
-]
-
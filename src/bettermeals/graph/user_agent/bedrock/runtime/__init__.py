@@ -1,16 +0,0 @@
-"""
-Runtime Client Implementation
-
-Runtime-based agent client implementation using Bedrock Runtime API.
-"""
-
-from .client import RuntimeAgentClient
-from .token_manager import RuntimeTokenManager
-from .config_manager import RuntimeConfigManager
-
-__all__ = [
-    "RuntimeAgentClient",
-    "RuntimeTokenManager",
-    "RuntimeConfigManager",
-]
-
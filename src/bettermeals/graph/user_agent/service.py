@@ -2,11 +2,18 @@ from typing import Dict, Any
 import logging
 import hashlib
 from datetime import datetime
+from ...config.settings import settings
 from ...database.database import get_db
+from ...database.phone_directory import ROLE_USER
+from ...utils.deadline import time_left
+from ..agentcore import AgentBusyError
+from ..tool_context import tool_context_cache
 from .bedrock import invoke_user_agent
 
 logger = logging.getLogger(__name__)
 
+BUSY_REPLY = "I'm still working on your earlier messages. Please send this again in a minute."
+
 
 class UserAgentService:
     """Service to manage user assistant interactions"""
@@ -42,8 +49,12 @@ class UserAgentService:
                     prompt=text,
                     actor_id=phone_number,
                     session_id=session_id,
-                    context=context
+                    context=context,
+                    # Whatever is left of the webhook's request deadline, not a fixed 100s
+                    timeout=time_left(settings.agent_webhook_budget_seconds)
                 )
+            except AgentBusyError:
+                response_text = BUSY_REPLY
             except Exception as e:
                 logger.error(f"Error invoking bedrock agent: {str(e)}")
                 response_text = "I'm sorry, I encountered an error. Please try again."
@@ -61,9 +72,8 @@ class UserAgentService:
         """
         Build a generic context dictionary with available values for tool calls.
         
-        This method extracts context values from the database and payload.
-        It's designed to be easily extensible - add new key-value pairs as needed
-        when new tools or parameters are introduced.
+        The database part is built once per user per day and cached (see
+        graph/tool_context.py); payload values are applied on every message.
         
         Args:
             phone_number: User's phone number
@@ -72,29 +82,25 @@ class UserAgentService:
         Returns:
             Dictionary of context key-value pairs (keys should match tool parameter names)
         """
+        return tool_context_cache.get(ROLE_USER, phone_number, payload, self._load_tool_context)
+
+    def _load_tool_context(self, phone_number: str) -> Dict[str, Any]:
+        """Cacheable part of the tool context: ids, household and week"""
         context = {}
-        context["phone_number"] = phone_number
         
         # Extract user_id from database
         user_data = self.db.find_user_by_phone(phone_number)
         if user_data:
             user_id = user_data.get("id")
             if user_id:
+                context["id"] = user_id
                 context["user_id"] = user_id
             
-            # Extract household_id from user data if available
-            household_id = user_data.get("household_id")
+            # Extract household_id from user data if available (user documents use "householdId")
+            household_id = user_data.get("householdId") or user_data.get("household_id")
             if household_id:
                 context["household_id"] = household_id
         
-        # Extract household_id from payload (takes precedence)
-        if payload.get("household_id"):
-            context["household_id"] = payload.get("household_id")
-        
-        # Extract meal_id from payload if present
-        if payload.get("meal_id"):
-            context["meal_id"] = payload.get("meal_id")
-        
         # Calculate year_week in format "YYYY-Www" (e.g., "2024-W01")
         now = datetime.now()
         week_num = now.strftime("%W")
@@ -0,0 +1,128 @@
+"""
+Weekly Meal Plan Pregeneration
+
+Batch job, run at the start of each week (e.g. cron, Monday 00:30), that generates the
+new week's meal plan for every onboarded household ahead of the users' first messages.
+
+- Calls to the planner go through an AIMD limiter: concurrency grows while the
+  backend keeps up and halves on 429/5xx/timeouts. Overloaded calls are retried
+  with backoff.
+- Each household's outcome is written to `meal_plan_generation/{household_id}-{week}`.
+  A rerun after a crash skips households already marked ready. The request path
+  only checks that marker instead of calling the planner.
+- Counters are checkpointed to `meal_plan_batches/{week}`.
+
+The planner endpoint always generates the current week's plan, so the job has no
+week option: run it during the week it generates for.
+
+Usage:
+    python -m src.bettermeals.graph.weekly_plan.batch
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Dict, Optional
+
+import click
+import requests
+
+from ...config.ext_endpoints import call_generate_meal_plan
+from ...config.settings import settings
+from ...database.database import get_db
+from ...telemetry.metrics import metrics
+from ...utils.rate_control import AIMDLimiter, ERROR, OVERLOAD, SUCCESS
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+CHECKPOINT_EVERY = 50
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+def _outcome_for(error: Exception) -> str:
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return OVERLOAD if error.response.status_code in OVERLOAD_STATUS_CODES else ERROR
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return OVERLOAD
+    return ERROR
+
+
+class MealPlanPregenerator:
+    """Generates a week's meal plans for all onboarded households"""
+
+    def __init__(self):
+        self.year_week = datetime.now().strftime("%Y-%W")
+        self.limiter = AIMDLimiter(
+            "meal_plan_batch",
+            initial=settings.meal_plan_batch_initial_concurrency,
+            maximum=settings.meal_plan_batch_max_concurrency,
+        )
+        self.max_attempts = settings.meal_plan_batch_max_attempts
+        self.counts: Dict[str, int] = {"generated": 0, "failed": 0, "skipped": 0}
+
+    async def run(self) -> Dict[str, int]:
+        db = get_db()
+        household_ids = await asyncio.to_thread(db.list_onboarded_household_ids)
+        done = set(await asyncio.to_thread(db.get_generated_household_ids, self.year_week))
+        pending = [household_id for household_id in household_ids if household_id not in done]
+        self.counts["skipped"] = len(household_ids) - len(pending)
+
+        logger.info(f"Pregenerating {len(pending)} meal plans for week {self.year_week} ({self.counts['skipped']} already done)")
+        await self._checkpoint("running", total=len(household_ids), started_at=datetime.now())
+
+        await asyncio.gather(*(self._generate(household_id) for household_id in pending))
+
+        await self._checkpoint("completed", completed_at=datetime.now())
+        logger.info(f"Meal plan pregeneration for week {self.year_week} finished: {self.counts}")
+        return self.counts
+
+    async def _generate(self, household_id: str) -> None:
+        error: Optional[Exception] = None
+        for attempt in range(1, self.max_attempts + 1):
+            await self.limiter.acquire()
+            outcome = SUCCESS
+            try:
+                await asyncio.to_thread(call_generate_meal_plan, household_id)
+            except Exception as e:
+                error = e
+                outcome = _outcome_for(e)
+            finally:
+                await self.limiter.release(outcome)
+
+            if outcome == SUCCESS:
+                await self._record(household_id, "ready")
+                return
+            if outcome == ERROR or attempt == self.max_attempts:
+                break
+            # Exponential backoff with full jitter
+            await asyncio.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))))
+
+        logger.error(f"Failed to pregenerate meal plan for household {household_id}: {str(error)}")
+        await self._record(household_id, "failed", error=str(error))
+
+    async def _record(self, household_id: str, status: str, error: Optional[str] = None) -> None:
+        db = get_db()
+        await asyncio.to_thread(db.record_meal_plan_generation, household_id, self.year_week, status, "batch", error)
+        key = "generated" if status == "ready" else "failed"
+        self.counts[key] += 1
+        metrics.incr(f"meal_plan_batch.{key}")
+        if (self.counts["generated"] + self.counts["failed"]) % CHECKPOINT_EVERY == 0:
+            await self._checkpoint("running")
+
+    async def _checkpoint(self, status: str, **fields) -> None:
+        progress = {"status": status, "concurrency": self.limiter.limit, **self.counts, **fields}
+        await asyncio.to_thread(get_db().save_meal_plan_batch_progress, self.year_week, progress)
+
+
+@click.command()
+def main():
+    """Pregenerate this week's meal plans for all onboarded households."""
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(MealPlanPregenerator().run())
+
+
+if __name__ == "__main__":
+    main()
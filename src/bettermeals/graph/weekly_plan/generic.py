@@ -1,12 +1,15 @@
-from typing import Dict, Any
+from typing import Dict, Optional
 import logging
 
 from .base import BaseWeeklyPlan, WeeklyPlanStep
+from ..flow_engine import FlowContext, StepResult, StepSpec, contains_any
 from ...database.database import get_db
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+PLAN_APPROVED = contains_any("done", "completed", "finished", "approved", "approve", "yes", "y", "yeah", "yep", "ok", "okay")
+
 
 class GenericWeeklyPlan(BaseWeeklyPlan):
     """Weekly plan flow for generic users"""
@@ -14,57 +17,53 @@ class GenericWeeklyPlan(BaseWeeklyPlan):
     def __init__(self):
         super().__init__()
         self.form_link = "https://bettermeals.in/app/dashboard/"
-    
+
     def get_form_link(self, household_id: str):
         return self.form_link + household_id
 
     def get_weekly_plan_type(self) -> str:
         return "generic"
-    
-    def _initialize_steps(self) -> Dict[WeeklyPlanStep, callable]:
+
+    def _initialize_steps(self) -> Dict[WeeklyPlanStep, StepSpec]:
         return {
-            WeeklyPlanStep.STARTED: self.start_plan_approval,
-            WeeklyPlanStep.PLAN_APPROVAL: self._handle_plan_approval,
+            WeeklyPlanStep.STARTED: StepSpec(self.start_plan_approval),
+            WeeklyPlanStep.PLAN_APPROVAL: StepSpec(self._handle_plan_approval, matcher=PLAN_APPROVED, capture="plan_approval", on_event=self._on_plan_submitted),
         }
-    
-    def start_plan_approval(self, text: str, phone_number: str, household_id: str) -> Dict[str, Any]:
-        """Start the plan approval process for a user."""
-        try:
-            self._set_weekly_plan_step(phone_number, WeeklyPlanStep.PLAN_APPROVAL)
-            approval_link = self.get_form_link(household_id)
 
-            response = {
-                "reply": f"Your weekly plan approval is pending for this week!\n\nPlease review and approve your meal plan at: {approval_link}\n\nOnce you've reviewed the plan, reply with 'approved' to confirm."
-            }
+    def start_plan_approval(self, ctx: FlowContext) -> StepResult:
+        """Start the plan approval process for a user."""
+        approval_link = self.get_form_link(ctx.extra["household_id"])
+        return StepResult(
+            reply=f"Your weekly plan approval is pending for this week!\n\nPlease review and approve your meal plan at: {approval_link}\n\nOnce you've reviewed the plan, reply with 'approved' to confirm.",
+            next_step=WeeklyPlanStep.PLAN_APPROVAL,
+        )
 
-            # Saving the initial message
-            self._save_message(phone_number, "bot", response["reply"])
-            
-            return response
-            
-        except Exception as e:
-            logger.error(f"Error starting plan approval for {household_id}: {str(e)}")
-            return {"reply": "Sorry, we're facing some issue reagarding your meal planning. Please try again."}
-    
-    def _handle_plan_approval(self, text: str, phone_number: str, household_id: str) -> Dict[str, Any]:
+    def _handle_plan_approval(self, ctx: FlowContext) -> StepResult:
         """Handle plan approval step."""
-        # Check if user has approved the plan
-        completion_keywords = ["done", "completed", "finished","approved", "approve", "yes", "y", "yeah", "yep", "ok", "okay"]
-        if any(keyword in text.lower() for keyword in completion_keywords) and self.check_if_workflow_form_submitted(household_id):
-            self._set_weekly_plan_step(phone_number, WeeklyPlanStep.COMPLETED)
-            self._save_final_weekly_plan_data(phone_number, household_id)
-            
-            return {
-                "reply": "Great! Thanks for confirming your preferences for the week."
-            }
-        else:
-            # Keep asking for approval
-            approval_link = self.get_form_link(household_id)
-            return {
-                "reply": f"Please review your weekly meal plan first at: {approval_link} to move ahead."
-            }
-    
+        household_id = ctx.extra["household_id"]
+        # Check if user has approved the plan (submission is normally recorded by the completion listener)
+        if ctx.matched and (ctx.data.get("plan_submitted") or self.check_if_workflow_form_submitted(household_id)):
+            return self._complete(ctx, household_id)
+
+        # Keep asking for approval
+        approval_link = self.get_form_link(household_id)
+        return StepResult(reply=f"Please review your weekly meal plan first at: {approval_link} to move ahead.")
+
+    def _on_plan_submitted(self, ctx: FlowContext) -> Optional[StepResult]:
+        """Plan approved on the dashboard while we wait for it: confirm right away."""
+        if ctx.data.get("plan_submitted"):
+            return self._complete(ctx, ctx.extra["household_id"])
+        return None
+
+    def _complete(self, ctx: FlowContext, household_id: str) -> StepResult:
+        return StepResult(
+            reply="Great! Thanks for confirming your preferences for the week.",
+            next_step=WeeklyPlanStep.COMPLETED,
+            data={"plan_submitted": True},
+            after_commit=lambda snapshot: self._save_final_weekly_plan_data(ctx.phone_number, household_id, snapshot),
+        )
+
     def check_if_workflow_form_submitted(self, household_id: str) -> bool:
         """Check if workflow form is submitted for a user."""
         db = get_db()
-        return db.check_if_weekly_plan_completed(household_id)
\ No newline at end of file
+        return db.check_if_weekly_plan_completed(household_id)
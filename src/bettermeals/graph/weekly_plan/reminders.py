@@ -0,0 +1,157 @@
+"""
+Weekly Plan Approval Reminders
+
+Broadcast that nudges every onboarded household whose plan for the week is not yet
+approved, instead of waiting for the user to message us first.
+
+- Households are streamed from Firestore in pages. Each page is checked against
+  `weekly_meal_plan/{household_id}-{week}` with one batched read.
+- Messages are rendered with the household's approval link and sent by a few workers
+  that share a token bucket sized to the WhatsApp messaging tier
+  (`broadcast_rate_per_second` / `broadcast_burst`).
+- A delivered reminder moves that phone's weekly plan flow to plan approval (for the
+  current week), so the "approved" reply it asks for is handled as an approval.
+- Each delivery is written to `broadcast_deliveries`. A rerun of the same broadcast
+  skips numbers that were already sent to. Counters are checkpointed to
+  `broadcasts/{broadcast_id}`.
+
+Usage:
+    python -m src.bettermeals.graph.weekly_plan.reminders [--week 2025-41]
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+import click
+
+from ...config.settings import settings
+from ...database.database import get_db
+from ...telemetry.metrics import metrics
+from ...utils.outbound import send_whatsapp_message
+from ...utils.rate_control import TokenBucket
+from .service import weekly_plan_service
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_EVERY = 100
+
+REMINDER_TEMPLATE = (
+    "Your meal plan for this week is ready!\n\n"
+    "Please review and approve it at: {approval_link}\n\n"
+    "Once you've reviewed the plan, reply with 'approved' to confirm."
+)
+
+
+class ApprovalReminderBroadcast:
+    """Sends the weekly plan approval reminder to households that have not approved yet"""
+
+    def __init__(self, year_week: Optional[str] = None):
+        self.year_week = year_week or datetime.now().strftime("%Y-%W")
+        self.broadcast_id = f"weekly_plan_reminder-{self.year_week}"
+        self.bucket = TokenBucket("broadcast", settings.broadcast_rate_per_second, settings.broadcast_burst)
+        self.counts: Dict[str, int] = {"sent": 0, "failed": 0, "skipped": 0, "approved": 0}
+
+    def render(self, household_id: str) -> str:
+        approval_link = weekly_plan_service.generic_weekly_plan.get_form_link(household_id)
+        return REMINDER_TEMPLATE.format(approval_link=approval_link)
+
+    async def run(self) -> Dict[str, int]:
+        db = get_db()
+        delivered = set(await asyncio.to_thread(db.get_broadcast_delivered_phones, self.broadcast_id))
+        logger.info(f"Broadcast {self.broadcast_id} starting ({len(delivered)} already delivered)")
+        await self._checkpoint("running", started_at=datetime.now())
+
+        # Bounded queue: paging pauses while the senders are rate limited
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.broadcast_page_size)
+        workers = [asyncio.create_task(self._sender(queue)) for _ in range(settings.broadcast_concurrency)]
+        try:
+            async for household_id, phone_number in self._recipients(delivered):
+                await queue.put((household_id, phone_number))
+                metrics.gauge("broadcast.queue_depth", queue.qsize(), broadcast="weekly_plan_reminder")
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        await self._checkpoint("completed", completed_at=datetime.now())
+        logger.info(f"Broadcast {self.broadcast_id} finished: {self.counts}")
+        return self.counts
+
+    async def _recipients(self, delivered: Set[str]) -> AsyncIterator[Tuple[str, str]]:
+        """Yield (household_id, phone_number) for unapproved households, page by page"""
+        db = get_db()
+        start_after = None
+        while True:
+            page = await asyncio.to_thread(db.list_onboarded_households_page, settings.broadcast_page_size, start_after)
+            if not page:
+                return
+            start_after = page[-1][0]
+
+            pending = [
+                household_id for household_id, weekly_plan in page
+                if not (weekly_plan.get("status") == "approved" and weekly_plan.get("week") == self.year_week)
+            ]
+            approved = set(await asyncio.to_thread(db.get_approved_household_ids, pending, self.year_week)) if pending else set()
+            self.counts["approved"] += len(page) - len(pending) + len(approved)
+
+            for household_id in pending:
+                if household_id in approved:
+                    continue
+                for phone_number in await asyncio.to_thread(db.get_household_phone_numbers, household_id):
+                    if phone_number in delivered:
+                        self.counts["skipped"] += 1
+                        continue
+                    yield household_id, phone_number
+
+            if len(page) < settings.broadcast_page_size:
+                return
+
+    async def _sender(self, queue: asyncio.Queue) -> None:
+        while True:
+            household_id, phone_number = await queue.get()
+            try:
+                await self.bucket.acquire()
+                sent = await asyncio.to_thread(send_whatsapp_message, phone_number, self.render(household_id))
+                await self._record(household_id, phone_number, "sent" if sent else "failed")
+                if sent:
+                    await self._await_approval(phone_number)
+            except Exception as e:
+                logger.error(f"Error sending reminder to {phone_number}: {str(e)}")
+                await self._record(household_id, phone_number, "failed", error=str(e))
+            finally:
+                queue.task_done()
+
+    async def _await_approval(self, phone_number: str) -> None:
+        """Put the phone's flow at plan approval, where the "approved" reply is expected"""
+        flow = weekly_plan_service.generic_weekly_plan
+        if self.year_week != flow.snapshot_scope():
+            return
+        try:
+            await asyncio.to_thread(flow.mark_plan_sent, phone_number)
+        except Exception as e:
+            logger.error(f"Error moving {phone_number} to plan approval: {str(e)}")
+
+    async def _record(self, household_id: str, phone_number: str, status: str, error: Optional[str] = None) -> None:
+        await asyncio.to_thread(get_db().record_broadcast_delivery, self.broadcast_id, phone_number, household_id, status, error)
+        self.counts[status] += 1
+        metrics.incr(f"broadcast.{status}", broadcast="weekly_plan_reminder")
+        if (self.counts["sent"] + self.counts["failed"]) % CHECKPOINT_EVERY == 0:
+            await self._checkpoint("running")
+
+    async def _checkpoint(self, status: str, **fields) -> None:
+        progress = {"status": status, "week": self.year_week, **self.counts, **fields}
+        await asyncio.to_thread(get_db().save_broadcast_progress, self.broadcast_id, progress)
+
+
+@click.command()
+@click.option("--week", default=None, help="Week to remind about (%Y-%W), defaults to the current week")
+def main(week: Optional[str]):
+    """Send weekly plan approval reminders to households that have not approved yet."""
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(ApprovalReminderBroadcast(week).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -55,11 +55,16 @@ class WeeklyPlanService:
             text = payload.get("text", "").strip()
             household_id = household_data.get("householdId")
 
-            logger.info(f"Trigger meal plan generation for household {household_id}")
-            meal_plan_response = call_generate_meal_plan(household_id)
-            if meal_plan_response is None:
-                raise Exception(f"Error generating meal plan for household {household_id}")
-            logger.info(f"Meal plan generated successfully for household {household_id}")
+            # Normally pregenerated by the week-start batch (batch.py); generate lazily otherwise
+            db = get_db()
+            year_week = self._get_current_week_number()
+            if not db.is_meal_plan_generated(household_id, year_week):
+                logger.info(f"Trigger meal plan generation for household {household_id}")
+                meal_plan_response = call_generate_meal_plan(household_id)
+                if meal_plan_response is None:
+                    raise Exception(f"Error generating meal plan for household {household_id}")
+                db.record_meal_plan_generation(household_id, year_week, "ready", "request")
+                logger.info(f"Meal plan generated successfully for household {household_id}")
             
             # Determine weekly plan type based on payload or other logic
             weekly_plan_type = self._determine_weekly_plan_type(payload)
@@ -74,6 +79,10 @@ class WeeklyPlanService:
             logger.error(f"Error processing weekly plan message: {str(e)}")
             return {"reply": "Sorry, I encountered an error. Please try again."}
 
+    def handle_plan_submitted(self, phone_number: str, household_id: str) -> Optional[str]:
+        """Record this week's plan approval; returns a proactive message if the flow moved on."""
+        return self.generic_weekly_plan.handle_event(phone_number, {"plan_submitted": True}, household_id=household_id)
+
     def _determine_weekly_plan_type(self, payload: Dict[str, Any]) -> str:
         """Determine the type of weekly plan based on payload or other logic."""
         # TODO: Add options. For now, always return generic.
@@ -5,7 +5,7 @@ from ..tools.orders import bm_build_cart, bm_substitute, bm_checkout, bm_order_s
 from ..tools.onboarding import bm_onboard_household, bm_onboard_resident
 
 recommender = create_react_agent(
-    model=worker_llm_fast(),
+    model=worker_llm_fast("meal_recommender"),
     tools=[bm_recommend_meals],
     name="meal_recommender",
     prompt="""You are a meal recommendation agent. When asked to plan meals:
@@ -38,28 +38,28 @@ Do not invent meals - always use the tool to get real recommendations.
 )
 
 scorer = create_react_agent(
-    model=worker_llm_fast(),
+    model=worker_llm_fast("meal_scorer"),
     tools=[bm_score_meal_plan],
     name="meal_scorer",
     prompt="Use the tool to get scores. Do not invent scores."
 )
 
 order_agent = create_react_agent(
-    model=worker_llm_fast(),
+    model=worker_llm_fast("order"),
     tools=[bm_build_cart, bm_substitute, bm_checkout, bm_order_status],
     name="order",
-    prompt="Build cart, handle substitutions with user approval, then checkout using an idempotency key."
+    prompt="Build cart, handle substitutions with user approval, then checkout with the household_id and cart_id. Checkout is idempotent per cart: never checkout a cart twice, and if the result says replayed, report the existing order."
 )
 
 onboarding = create_react_agent(
-    model=worker_llm_fast(),
+    model=worker_llm_fast("onboarding"),
     tools=[bm_onboard_household, bm_onboard_resident],
     name="onboarding",
     prompt="Convert free text to structured payloads and call the onboarding tools. Do not fabricate IDs."
 )
 
 cook_update = create_react_agent(
-    model=worker_llm_fast(),
+    model=worker_llm_fast("cook_update"),
     tools=[bm_substitute],
     name="cook_update",
     prompt="Map cook messages (missing items) to substitution tool calls. Keep replies concise."
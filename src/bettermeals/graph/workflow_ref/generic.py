@@ -1,79 +1,70 @@
-from typing import Dict, Any
+from typing import Dict
 import logging
 
 from .base import BaseWorkflow, WorkflowStep
+from ..flow_engine import FlowContext, FlowSnapshot, StepResult, StepSpec, contains_any
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+FORM_DONE = contains_any("done", "completed", "finished")
+
 
 class GenericChatWorkflow(BaseWorkflow):
     """Workflow flow for generic users"""
 
     def __init__(self):
+        super().__init__()
         self.form_link = "form_link"
-    
+
     def get_workflow_type(self) -> str:
         return "generic"
-    
-    def _initialize_steps(self) -> Dict[WorkflowStep, callable]:
+
+    def _initialize_steps(self) -> Dict[WorkflowStep, StepSpec]:
         return {
-            WorkflowStep.GREETING: self._handle_greeting,
-            WorkflowStep.NAME_COLLECTION: self._handle_name_collection,
-            WorkflowStep.FORM_COMPLETION: self._handle_form_completion,
-            WorkflowStep.PAYMENT_CONFIRMATION: self._handle_payment_confirmation,
+            WorkflowStep.GREETING: StepSpec(self._handle_greeting),
+            WorkflowStep.NAME_COLLECTION: StepSpec(self._handle_name_collection, capture="name"),
+            WorkflowStep.FORM_COMPLETION: StepSpec(self._handle_form_completion, matcher=FORM_DONE),
         }
-    
-    def _handle_greeting(self, text: str, phone_number: str) -> Dict[str, Any]:
+
+    def _handle_greeting(self, ctx: FlowContext) -> StepResult:
         """Handle initial greeting step."""
-        self._set_workflow_step(phone_number, WorkflowStep.NAME_COLLECTION)
-        return {
-            "reply": "Hey! I'm Zuko from Bettermeals. May I know your name?"
-        }
-    
-    def _handle_name_collection(self, text: str, phone_number: str) -> Dict[str, Any]:
+        return StepResult(
+            reply="Hey! I'm Zuko from Bettermeals. May I know your name?",
+            next_step=WorkflowStep.NAME_COLLECTION,
+        )
+
+    def _handle_name_collection(self, ctx: FlowContext) -> StepResult:
         """Handle name collection step."""
-        name = text.strip()
+        name = ctx.text.strip()
         if not name:
-            return {"reply": "Please tell me your name so I can help you better!"}
-        
-        # Store the name
-        user_data = self._get_user_data(phone_number)
-        user_data["name"] = name
-        self._set_user_data(phone_number, user_data)
-        
-        self._set_workflow_step(phone_number, WorkflowStep.FORM_COMPLETION)
-        return {
-            "reply": f"Nice to meet you, {name}! Please complete this quick workflow form to get started: {self.form_link} \n\n Let me know once you've completed the form!"
-        }
-    
-    def _handle_form_completion(self, text: str, phone_number: str) -> Dict[str, Any]:
+            return StepResult(reply="Please tell me your name so I can help you better!")
+
+        return StepResult(
+            reply=f"Nice to meet you, {name}! Please complete this quick workflow form to get started: {self.form_link} \n\n Let me know once you've completed the form!",
+            next_step=WorkflowStep.FORM_COMPLETION,
+            data={"name": name},
+        )
+
+    def _handle_form_completion(self, ctx: FlowContext) -> StepResult:
         """Handle form completion step."""
-        completion_keywords = ["done", "completed", "finished"]
         # Import locally to avoid circular import
         from .service import workflow_service
-        if any(keyword in text.lower() for keyword in completion_keywords) and workflow_service.check_if_workflow_form_submitted(phone_number)[0]:
-            self._set_workflow_step(phone_number, WorkflowStep.COMPLETED)
-            user_data = self._get_user_data(phone_number)
-            user_name = user_data.get("name", "there")
-            self._save_final_workflow_data(phone_number)
-            # self._create_user_record(phone_number)
-            return {
-                "reply": f"Perfect, {user_name}! Thanks for completing the form. Let me know if you need anything else."
-            }    
-        else:
-            return {
-                "reply": "Please complete the workflow form first: {self.form_link} \n\nLet me know once you're done!"
-            }
-    
-    def _create_user_record(self, phone_number: str):
+        submitted = ctx.matched and (workflow_service.check_if_workflow_form_submitted(ctx.phone_number) or (False, None))[0]
+        if submitted:
+            user_name = ctx.data.get("name", "there")
+            return StepResult(
+                reply=f"Perfect, {user_name}! Thanks for completing the form. Let me know if you need anything else.",
+                next_step=WorkflowStep.COMPLETED,
+                after_commit=lambda snapshot: self._save_final_workflow_data(ctx.phone_number, snapshot),
+            )
+        return StepResult(
+            reply=f"Please complete the workflow form first: {self.form_link} \n\nLet me know once you're done!"
+        )
+
+    def _create_user_record(self, phone_number: str, snapshot: FlowSnapshot):
         """Create user record in database after successful workflow."""
-        try:
-            user_data = self._get_user_data(phone_number)
-            logger.info(f"Creating user record for {phone_number} with data: {user_data}")
-            
-            # TODO: For now, just log the completion
-            logger.info(f"Generic workflow completed for {phone_number}")
-            
-        except Exception as e:
-            logger.error(f"Error creating user record for {phone_number}: {str(e)}")
+        logger.info(f"Creating user record for {phone_number} with data: {snapshot.data}")
+
+        # TODO: For now, just log the completion
+        logger.info(f"Generic workflow completed for {phone_number}")
@@ -0,0 +1,252 @@
+"""
+LLM Response Cache
+
+Exact-match cache for deterministic (temperature 0) chat model calls.
+Keys are built from the normalized message list, the model id and a hash of the
+llm_string (which carries bound tool schemas and call parameters), so a cached
+routing decision is only reused for the exact same conversation, tools and model.
+
+Two tiers: an in-process LRU in front of an optional on-disk SQLite table.
+Agents opt in by name via `settings.llm_cache_agents`.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+from ..config.settings import settings
+from ..telemetry.llm_usage import RESPONSE_CACHE_HIT
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Per-call fields that differ between otherwise identical histories
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+def _normalize_messages(prompt: str) -> Any:
+    """
+    Normalize a serialized message list for hashing.
+
+    Drops per-call metadata (message ids, usage, response metadata) and rewrites
+    provider-generated tool call ids to positional ids, so the same conversation
+    hashes identically no matter which run produced it.
+    """
+    try:
+        messages = json.loads(prompt)
+    except (TypeError, ValueError):
+        return prompt
+
+    call_ids: Dict[str, str] = {}
+
+    def _call_id(value: str) -> str:
+        if value not in call_ids:
+            call_ids[value] = f"call_{len(call_ids)}"
+        return call_ids[value]
+
+    def _normalize_tool_calls(tool_calls: Any) -> Any:
+        if not isinstance(tool_calls, list):
+            return tool_calls
+        normalized = []
+        for call in tool_calls:
+            if isinstance(call, dict) and isinstance(call.get("id"), str):
+                call = {**call, "id": _call_id(call["id"])}
+            normalized.append(call)
+        return normalized
+
+    def _walk(node: Any) -> Any:
+        if isinstance(node, list):
+            return [_walk(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        if node.get("lc") is not None and isinstance(node.get("kwargs"), dict):
+            kwargs = {k: v for k, v in node["kwargs"].items() if k not in _VOLATILE_MESSAGE_FIELDS}
+            if "tool_calls" in kwargs:
+                kwargs["tool_calls"] = _normalize_tool_calls(kwargs["tool_calls"])
+            additional = kwargs.get("additional_kwargs")
+            if isinstance(additional, dict) and "tool_calls" in additional:
+                kwargs["additional_kwargs"] = {**additional, "tool_calls": _normalize_tool_calls(additional["tool_calls"])}
+            if isinstance(kwargs.get("tool_call_id"), str):
+                kwargs["tool_call_id"] = _call_id(kwargs["tool_call_id"])
+            return {**node, "kwargs": {k: _walk(v) for k, v in kwargs.items()}}
+        return {k: _walk(v) for k, v in node.items()}
+
+    return _walk(messages)
+
+
+def cache_key(prompt: str, llm_string: str, model_id: str) -> str:
+    """Build the exact-match cache key for a chat model call."""
+    tools_and_params_hash = hashlib.sha256(llm_string.encode("utf-8")).hexdigest()
+    material = json.dumps(
+        {
+            "model": model_id,
+            "llm": tools_and_params_hash,
+            "messages": _normalize_messages(prompt),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    """Two-tier (LRU + SQLite) store of serialized generations with TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, sqlite_path: Optional[str] = None):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, Tuple[float, List[Any]]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            logger.info(f"LLM response cache on-disk tier at {sqlite_path}")
+
+    def get(self, key: str) -> Tuple[Optional[List[Any]], Optional[str]]:
+        """Return (generations, tier) or (None, None) on miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._lru.move_to_end(key)
+                    return value, "memory"
+                del self._lru[key]
+
+            if self._conn is None:
+                return None, None
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, None
+            raw, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None, None
+
+        try:
+            value = [loads(item) for item in json.loads(raw)]
+        except Exception as e:
+            logger.warning(f"Dropping undecodable LLM cache entry {key[:12]}: {e}")
+            return None, None
+        with self._lock:
+            self._put_memory(key, expires_at, value)
+        return value, "sqlite"
+
+    def put(self, key: str, value: Sequence[Any]) -> None:
+        expires_at = time.time() + self._ttl_seconds
+        value = list(value)
+        serialized = None
+        if self._conn is not None:
+            serialized = json.dumps([dumps(item) for item in value])
+        with self._lock:
+            self._put_memory(key, expires_at, value)
+            if serialized is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, serialized, expires_at),
+                )
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_response_cache")
+                self._conn.commit()
+
+    def _put_memory(self, key: str, expires_at: float, value: List[Any]) -> None:
+        self._lru[key] = (expires_at, value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._max_entries:
+            self._lru.popitem(last=False)
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain cache bound to one agent.
+
+    Each agent gets its own instance (for hit/miss attribution) over the shared store.
+    """
+
+    def __init__(self, agent: str, model_id: str, store: ResponseStore):
+        self.agent = agent
+        self.model_id = model_id
+        self._store = store
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string, self.model_id)
+        value, tier = self._store.get(key)
+        if value is None:
+            metrics.incr("llm_cache.miss", agent=self.agent, model=self.model_id)
+            return None
+        metrics.incr("llm_cache.hit", agent=self.agent, model=self.model_id, tier=tier)
+        logger.debug(f"LLM cache hit for {self.agent} ({tier})")
+        # Marked copies: the stored usage is the original call's, not this one's
+        return [
+            generation.model_copy(update={"generation_info": {**(generation.generation_info or {}), RESPONSE_CACHE_HIT: True}})
+            for generation in value
+        ]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string, self.model_id)
+        try:
+            self._store.put(key, return_val)
+        except Exception as e:
+            # Caching is best-effort; never fail the model call because of it
+            logger.warning(f"Failed to store LLM response for {self.agent}: {e}")
+
+    def clear(self, **kwargs: Any) -> None:
+        self._store.clear()
+
+
+# -------------------- Singleton Store -------------------- #
+_store_instance: Optional[ResponseStore] = None
+_store_lock = threading.Lock()
+
+
+def get_response_store() -> ResponseStore:
+    """Get singleton instance of the shared response store"""
+    global _store_instance
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                _store_instance = ResponseStore(
+                    max_entries=settings.llm_cache_max_entries,
+                    ttl_seconds=settings.llm_cache_ttl_seconds,
+                    sqlite_path=settings.llm_cache_sqlite_path,
+                )
+    return _store_instance
+
+
+def is_cache_enabled(agent: str) -> bool:
+    """Check whether an agent opted in to response caching"""
+    enabled = settings.llm_cache_agents
+    return "*" in enabled or agent in enabled
+
+
+def llm_cache_for(agent: str, model_id: str, temperature: float) -> Optional[LLMResponseCache]:
+    """
+    Return a cache for the agent's chat model, or None when caching does not apply.
+
+    Only temperature-0 calls are cached: anything sampled must not be replayed.
+    """
+    if temperature != 0 or not is_cache_enabled(agent):
+        return None
+    return LLMResponseCache(agent=agent, model_id=model_id, store=get_response_store())
@@ -1,18 +1,39 @@
 from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import SystemMessage
 from ..config.settings import settings
+from ..telemetry.llm_usage import PromptUsageCallback
+from .cache import llm_cache_for
+from .deadline import DeadlineBoundChat, DeadlineCallback
 
-def supervisor_llm():
+MODEL_ID = "claude-3-5-sonnet-20241022"
+
+class DeadlineChatAnthropic(DeadlineBoundChat, ChatAnthropic):
+    """ChatAnthropic whose calls time out with the request deadline"""
+
+def supervisor_llm(agent: str = "supervisor"):
     # strong router for instruction-following
-    return ChatAnthropic(
-        model="claude-3-5-sonnet-20241022", 
+    return DeadlineChatAnthropic(
+        model=MODEL_ID, 
         temperature=0, 
-        api_key=settings.claude_api_key
+        api_key=settings.claude_api_key,
+        cache=llm_cache_for(agent, MODEL_ID, temperature=0),
+        timeout=settings.llm_timeout_seconds,  # client default; each call gets the time left
+        callbacks=[PromptUsageCallback(agent), DeadlineCallback()],
     )
 
-def worker_llm_fast():
+def worker_llm_fast(agent: str = "worker"):
     # fast, capable worker for tool-calling
-    return ChatAnthropic(
-        model="claude-3-5-sonnet-20241022", 
+    return DeadlineChatAnthropic(
+        model=MODEL_ID, 
         temperature=0, 
-        api_key=settings.claude_api_key
+        api_key=settings.claude_api_key,
+        cache=llm_cache_for(agent, MODEL_ID, temperature=0),
+        timeout=settings.llm_timeout_seconds,  # client default; each call gets the time left
+        callbacks=[PromptUsageCallback(agent), DeadlineCallback()],
     )
+
+def system_prompt(text: str):
+    # Mark the static system prompt (and the tool schemas before it) as a cacheable prefix
+    if not settings.prompt_cache_enabled:
+        return text
+    return SystemMessage(content=[{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}])
@@ -0,0 +1,77 @@
+"""
+LLM Deadline Guard
+
+Chat model calls made while handling a request are bounded by the request deadline
+(utils/deadline.py):
+
+- `DeadlineCallback` raises DeadlineExceeded before the next model call starts once
+  the deadline is spent, so a graph run does not keep calling the model after the
+  webhook gave up.
+- `DeadlineBoundChat` gives each call whatever is left of the deadline (at most
+  `llm_timeout_seconds`) as its provider request timeout. Async calls are also
+  cancelled when that time runs out, and streams stop between chunks.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from ..config.settings import settings
+from ..utils.deadline import time_left
+
+
+class DeadlineCallback(BaseCallbackHandler):
+    """Refuses to start a chat model call after the request deadline"""
+
+    raise_error = True  # propagate DeadlineExceeded instead of logging it
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        time_left(float("inf"))
+
+
+def _bound(kwargs: Dict[str, Any]) -> float:
+    """Set the call's request timeout to the time left (raises DeadlineExceeded when spent)."""
+    timeout = time_left(kwargs.get("timeout") or settings.llm_timeout_seconds)
+    kwargs["timeout"] = timeout
+    return timeout
+
+
+class DeadlineBoundChat:
+    """Chat model mixin deriving each call's timeout from the request deadline"""
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        _bound(kwargs)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        timeout = _bound(kwargs)
+        try:
+            return await asyncio.wait_for(
+                super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            time_left(timeout)  # DeadlineExceeded when the request deadline was the limit
+            raise
+
+    def _stream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        _bound(kwargs)
+        for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            time_left(float("inf"))
+            yield chunk
+
+    async def _astream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        _bound(kwargs)
+        async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            time_left(float("inf"))
+            yield chunk
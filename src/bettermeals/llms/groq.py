@@ -1,10 +1,36 @@
 from langchain_groq import ChatGroq
 from ..config.settings import settings
+from ..telemetry.llm_usage import PromptUsageCallback
+from .cache import llm_cache_for
+from .deadline import DeadlineBoundChat, DeadlineCallback
 
-def supervisor_llm():
+MODEL_ID = "openai/gpt-oss-20b"
+
+class DeadlineChatGroq(DeadlineBoundChat, ChatGroq):
+    """ChatGroq whose calls time out with the request deadline"""
+
+def supervisor_llm(agent: str = "supervisor"):
     # strong router for instruction-following
-    return ChatGroq(model="openai/gpt-oss-20b", temperature=0, api_key=settings.groq_api_key)
+    return DeadlineChatGroq(
+        model=MODEL_ID,
+        temperature=0,
+        api_key=settings.groq_api_key,
+        cache=llm_cache_for(agent, MODEL_ID, temperature=0),
+        timeout=settings.llm_timeout_seconds,  # client default; each call gets the time left
+        callbacks=[PromptUsageCallback(agent), DeadlineCallback()],
+    )
 
-def worker_llm_fast():
+def worker_llm_fast(agent: str = "worker"):
     # fast, capable worker for tool-calling
-    return ChatGroq(model="openai/gpt-oss-20b", temperature=0, api_key=settings.groq_api_key)
+    return DeadlineChatGroq(
+        model=MODEL_ID,
+        temperature=0,
+        api_key=settings.groq_api_key,
+        cache=llm_cache_for(agent, MODEL_ID, temperature=0),
+        timeout=settings.llm_timeout_seconds,  # client default; each call gets the time left
+        callbacks=[PromptUsageCallback(agent), DeadlineCallback()],
+    )
+
+def system_prompt(text: str):
+    # Groq caches identical prompt prefixes automatically; keep the text byte-identical
+    return text
@@ -0,0 +1,391 @@
+"""
+Hedged LLM Router
+
+Chat model that spreads an agent's calls over an ordered list of providers
+(`llm_provider_preferences`, e.g. supervisor -> ["groq", "anthropic"]) so one provider's
+latency spike does not blow the agent's budget:
+
+- Hedging: the call goes to the first healthy provider. If no answer arrives within
+  the agent's threshold (`llm_hedge_after_seconds`), the same request also goes to the
+  next provider. The first valid response wins (text or tool calls, no error) and the
+  other request is cancelled. Hedges are capped at roughly `llm_hedge_max_ratio` of
+  calls (the same token-bucket budget as HTTP retries), so a provider-wide slowdown
+  cannot double the traffic.
+- Streaming: when the caller streams (astream_events in graph/streaming.py), the race
+  is on time to first chunk instead. The first provider to produce text or a tool
+  call chunk wins, and the others are cancelled. Its chunks are then forwarded as
+  this model's own stream, so they reach the parent run's callbacks. An error after
+  the first chunk cannot fail over and is raised.
+- Failover: an error from one provider moves on to the next one right away.
+- Health: each provider keeps a sliding window of latency and errors. A provider at
+  `llm_router_error_rate` or above is tried last until `llm_router_cooldown_seconds`
+  pass.
+- Metrics: `llm.router_calls` (by agent / winning provider / outcome),
+  `llm.hedge_rate`, `llm.cost_usd` (from token usage and `llm_provider_costs`).
+
+Providers are chat model factories registered by name, each with a system prompt
+formatter. "groq" and "anthropic" are built in, and `register_provider` adds others
+(e.g. local fake models in tests). A plain-text system prompt is re-rendered for each
+provider on every call, so the Anthropic leg gets its cache_control block while Groq
+gets the byte-identical text (see `routed_system_prompt`).
+Per-call callbacks are not forwarded to the provider calls, so a losing hedge never
+shows up in a stream. Each provider model keeps its own usage and deadline
+callbacks.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from ..config.settings import settings
+from ..telemetry.metrics import metrics
+from ..tools.retry import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+ModelFactory = Callable[[str], BaseChatModel]
+Availability = Callable[[], bool]
+PromptFormatter = Callable[[str], Union[str, SystemMessage]]
+
+_NO_CALLBACKS = {"callbacks": []}
+
+
+def _groq(agent: str) -> BaseChatModel:
+    from .groq import supervisor_llm
+    return supervisor_llm(agent)
+
+
+def _anthropic(agent: str) -> BaseChatModel:
+    from .claude import supervisor_llm
+    return supervisor_llm(agent)
+
+
+def _groq_prompt(text: str) -> Union[str, SystemMessage]:
+    from .groq import system_prompt
+    return system_prompt(text)
+
+
+def _anthropic_prompt(text: str) -> Union[str, SystemMessage]:
+    from .claude import system_prompt
+    return system_prompt(text)
+
+
+def _plain_prompt(text: str) -> str:
+    return text
+
+
+# name -> (factory, whether it is configured, system prompt formatter); unconfigured
+# providers are left out of routing
+_providers: Dict[str, Tuple[ModelFactory, Availability, PromptFormatter]] = {
+    "groq": (_groq, lambda: bool(settings.groq_api_key), _groq_prompt),
+    "anthropic": (_anthropic, lambda: bool(settings.claude_api_key), _anthropic_prompt),
+}
+
+
+def register_provider(
+    name: str, factory: ModelFactory, available: Availability = lambda: True, system_prompt: PromptFormatter = _plain_prompt
+) -> None:
+    """Make `factory(agent)` available as provider `name` in preference lists."""
+    _providers[name] = (factory, available, system_prompt)
+
+
+class ProviderHealth:
+    """Sliding window of latency and errors for one provider"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._samples: Deque[Tuple[float, float, bool]] = deque()  # (at, latency, ok)
+        self._unhealthy_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._samples.append((now, latency, ok))
+            while self._samples and self._samples[0][0] < now - settings.llm_router_window_seconds:
+                self._samples.popleft()
+            errors = sum(1 for _, _, sample_ok in self._samples if not sample_ok)
+            if len(self._samples) >= settings.llm_router_min_samples and errors / len(self._samples) >= settings.llm_router_error_rate:
+                if now >= self._unhealthy_until:
+                    logger.warning(f"LLM provider {self.provider} unhealthy ({errors}/{len(self._samples)} errors)")
+                    metrics.incr("llm.provider_unhealthy", provider=self.provider)
+                self._unhealthy_until = now + settings.llm_router_cooldown_seconds
+                self._samples.clear()
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self._unhealthy_until
+
+
+_health: Dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+hedge_budget = RetryBudget(ratio=settings.llm_hedge_max_ratio)
+
+
+def get_provider_health(provider: str) -> ProviderHealth:
+    with _health_lock:
+        if provider not in _health:
+            _health[provider] = ProviderHealth(provider)
+        return _health[provider]
+
+
+def _valid(message: Any) -> bool:
+    return isinstance(message, AIMessage) and bool(message.content or message.tool_calls)
+
+
+def _with_system_prompt(provider: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Messages with a plain-text system prompt rendered in the provider's format."""
+    if not messages or not isinstance(messages[0], SystemMessage) or not isinstance(messages[0].content, str):
+        return messages
+    rendered = _providers[provider][2](messages[0].content)
+    if isinstance(rendered, str):
+        return messages
+    return [rendered, *messages[1:]]
+
+
+def _has_output(chunk: AIMessageChunk) -> bool:
+    return bool(chunk.content or chunk.tool_call_chunks)
+
+
+def _record_cost(agent: str, provider: str, message: AIMessage) -> None:
+    usage = message.usage_metadata or {}
+    prices = settings.llm_provider_costs.get(provider)
+    if not usage or not prices:
+        return
+    cost = (usage.get("input_tokens", 0) * prices["input"] + usage.get("output_tokens", 0) * prices["output"]) / 1_000_000
+    metrics.incr("llm.cost_usd", cost, agent=agent, provider=provider)
+
+
+class HedgedChatModel(BaseChatModel):
+    """Chat model hedging each call across an agent's preferred providers"""
+
+    agent: str
+    providers: List[str]
+    models: List[BaseChatModel]
+    hedge_after: float
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged-router"
+
+    def bind_tools(self, tools: Sequence[Any], *, parallel_tool_calls: Optional[bool] = None, **kwargs: Any):
+        # Bound in OpenAI format here; each provider model converts to its own format per call
+        if parallel_tool_calls is not None:
+            kwargs["parallel_tool_calls"] = parallel_tool_calls
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _candidates(self) -> List[Tuple[str, BaseChatModel]]:
+        """Preference order, with unhealthy providers moved to the end"""
+        pairs = list(zip(self.providers, self.models))
+        return sorted(pairs, key=lambda pair: not get_provider_health(pair[0]).healthy())
+
+    @staticmethod
+    def _runnable(model: BaseChatModel, tools: Optional[List[Dict[str, Any]]], kwargs: Dict[str, Any]):
+        if tools:
+            return model.bind_tools(tools, **kwargs)
+        return model.bind(**kwargs) if kwargs else model
+
+    async def _call(self, provider: str, model: BaseChatModel, messages: List[BaseMessage], stop, tools, kwargs) -> AIMessage:
+        started = time.monotonic()
+        try:
+            message = await self._runnable(model, tools, kwargs).ainvoke(
+                _with_system_prompt(provider, messages), config=_NO_CALLBACKS, stop=stop
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            get_provider_health(provider).record(time.monotonic() - started, ok=False)
+            raise
+        ok = _valid(message)
+        get_provider_health(provider).record(time.monotonic() - started, ok=ok)
+        if not ok:
+            raise ValueError(f"Empty response from {provider}")
+        _record_cost(self.agent, provider, message)
+        return message
+
+    async def _open_stream(
+        self, provider: str, model: BaseChatModel, messages: List[BaseMessage], stop, tools, kwargs
+    ) -> Tuple[AsyncIterator[AIMessageChunk], List[AIMessageChunk], float]:
+        """Start streaming from `provider` and read up to its first chunk with text or a tool call."""
+        started = time.monotonic()
+        stream = self._runnable(model, tools, kwargs).astream(
+            _with_system_prompt(provider, messages), config=_NO_CALLBACKS, stop=stop
+        )
+        chunks: List[AIMessageChunk] = []
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                if _has_output(chunk):
+                    return stream, chunks, started
+        except asyncio.CancelledError:
+            await stream.aclose()
+            raise
+        except Exception:
+            get_provider_health(provider).record(time.monotonic() - started, ok=False)
+            raise
+        get_provider_health(provider).record(time.monotonic() - started, ok=False)
+        raise ValueError(f"Empty response from {provider}")
+
+    def _record_outcome(self, provider: str, outcome: str, hedged: bool) -> None:
+        metrics.incr("llm.router_calls", agent=self.agent, provider=provider, outcome=outcome)
+        metrics.observe("llm.hedge_rate", 1.0 if hedged else 0.0, agent=self.agent)
+
+    async def _race(self, attempt: Callable[[str, BaseChatModel], Awaitable[Any]]) -> Tuple[str, Any, str, bool]:
+        """
+        Run `attempt(provider, model)` on the preferred provider, hedging to the next one
+        when it is slow and failing over on errors.
+
+        Returns (provider, result, outcome, hedged) of the first attempt that succeeds;
+        the others are cancelled.
+        """
+        hedge_budget.record_request()
+        candidates = self._candidates()
+        pending: Dict[asyncio.Task, str] = {}
+        next_index = 0
+        hedged = False
+        last_error: Optional[Exception] = None
+
+        def start_next() -> bool:
+            nonlocal next_index
+            if next_index >= len(candidates):
+                return False
+            provider, model = candidates[next_index]
+            next_index += 1
+            pending[asyncio.create_task(attempt(provider, model))] = provider
+            return True
+
+        start_next()
+        try:
+            while pending:
+                can_hedge = next_index < len(candidates) and len(pending) == 1
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_after if can_hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Slow primary: hedge to the next provider if the budget allows, else keep waiting
+                    if hedge_budget.try_acquire():
+                        hedged = True
+                        metrics.incr("llm.hedge_started", agent=self.agent, provider=candidates[next_index][0])
+                        start_next()
+                    else:
+                        metrics.incr("llm.hedge_skipped", agent=self.agent, reason="budget")
+                        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        outcome = "primary" if provider == candidates[0][0] else ("hedge" if hedged else "failover")
+                        return provider, task.result(), outcome, hedged
+                    last_error = task.exception()
+                    logger.warning(f"LLM provider {provider} failed for {self.agent}: {str(last_error)}")
+                    if not pending:
+                        start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+                metrics.incr("llm.hedge_cancelled", agent=self.agent, provider=pending[task])
+        metrics.incr("llm.router_calls", agent=self.agent, provider="none", outcome="failed")
+        raise last_error or RuntimeError(f"No LLM provider answered for {self.agent}")
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        provider, message, outcome, hedged = await self._race(
+            lambda provider, model: self._call(provider, model, messages, stop, tools, kwargs)
+        )
+        self._record_outcome(provider, outcome, hedged)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # Hedged on time to first chunk; this model's run reports each chunk to the parent callbacks
+        provider, (stream, chunks, started), outcome, hedged = await self._race(
+            lambda provider, model: self._open_stream(provider, model, messages, stop, tools, kwargs)
+        )
+        self._record_outcome(provider, outcome, hedged)
+        message: Optional[AIMessageChunk] = None
+        try:
+            for chunk in chunks:
+                message = chunk if message is None else message + chunk
+                yield ChatGenerationChunk(message=chunk)
+            async for chunk in stream:
+                message = message + chunk
+                yield ChatGenerationChunk(message=chunk)
+        except Exception:
+            get_provider_health(provider).record(time.monotonic() - started, ok=False)
+            raise
+        finally:
+            await stream.aclose()
+        get_provider_health(provider).record(time.monotonic() - started, ok=True)
+        _record_cost(self.agent, provider, message)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Sync callers get sequential failover only; hedging needs the event loop
+        last_error: Optional[Exception] = None
+        for provider, model in self._candidates():
+            started = time.monotonic()
+            try:
+                message = self._runnable(model, tools, kwargs).invoke(
+                    _with_system_prompt(provider, messages), config=_NO_CALLBACKS, stop=stop
+                )
+            except Exception as e:
+                get_provider_health(provider).record(time.monotonic() - started, ok=False)
+                last_error = e
+                continue
+            ok = _valid(message)
+            get_provider_health(provider).record(time.monotonic() - started, ok=ok)
+            if ok:
+                _record_cost(self.agent, provider, message)
+                self._record_outcome(provider, "primary" if last_error is None else "failover", hedged=False)
+                return ChatResult(generations=[ChatGeneration(message=message)])
+        raise last_error or RuntimeError(f"No LLM provider answered for {self.agent}")
+
+
+def _routed_providers(agent: str) -> List[str]:
+    preferences = settings.llm_provider_preferences.get(agent) or settings.llm_provider_preferences.get("*") or ["groq"]
+    return [provider for provider in preferences if _providers[provider][1]()] or preferences[:1]
+
+
+def routed_system_prompt(agent: str, text: str) -> Union[str, SystemMessage]:
+    """System prompt for `agent`: in its provider's format when there is only one provider,
+    plain text when the router picks per call (it renders the text for each provider then)."""
+    providers = _routed_providers(agent)
+    if len(providers) == 1:
+        return _providers[providers[0]][2](text)
+    return text
+
+
+def routed_llm(agent: str = "supervisor") -> BaseChatModel:
+    """Chat model for `agent` following its provider preference list (plain model if only one)."""
+    providers = _routed_providers(agent)
+    models = [_providers[provider][0](agent) for provider in providers]
+    if len(models) == 1:
+        return models[0]
+    hedge_after = settings.llm_hedge_after_seconds.get(agent, settings.llm_hedge_default_after_seconds)
+    # Provider models cache and report usage themselves; the router must not cache on top
+    return HedgedChatModel(agent=agent, providers=providers, models=models, hedge_after=hedge_after, cache=False)
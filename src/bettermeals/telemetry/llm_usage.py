@@ -0,0 +1,76 @@
+"""
+LLM Prompt Usage
+
+Input / cache-read / cache-write token counters, so the effect of provider prompt
+caching shows up next to the other metrics:
+
+- `PromptUsageCallback`: LangChain callback for the supervisor and worker models
+  (Anthropic `cache_read`/`cache_creation`, Groq `cached_tokens`). Generations served
+  from our own response cache (`llms/cache.py`) still carry the usage of the call
+  that produced them; they are marked with `RESPONSE_CACHE_HIT` and skipped.
+- `record_strands_usage`: accumulated usage of a strands (Bedrock) agent result
+"""
+
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .metrics import metrics
+
+# generation_info flag set on generations served from the LLM response cache
+RESPONSE_CACHE_HIT = "response_cache_hit"
+
+
+def record_prompt_usage(agent: str, input_tokens: int, cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> None:
+    """Count prompt tokens for one model call; `input_tokens` includes cached tokens."""
+    metrics.incr("llm.input_tokens", input_tokens, agent=agent)
+    metrics.incr("llm.cache_read_tokens", cache_read_tokens, agent=agent)
+    metrics.incr("llm.cache_write_tokens", cache_write_tokens, agent=agent)
+    if input_tokens:
+        metrics.observe("llm.cache_read_ratio", cache_read_tokens / input_tokens, agent=agent)
+
+
+def _usage_from_message(message: Any) -> Optional[Dict[str, int]]:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        details = usage.get("input_token_details") or {}
+        cache_read = details.get("cache_read") or 0
+        if not cache_read:
+            # langchain-groq keeps the OpenAI-style field in the raw token usage
+            token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+            cache_read = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        return {
+            "input_tokens": usage.get("input_tokens") or 0,
+            "cache_read_tokens": cache_read,
+            "cache_write_tokens": details.get("cache_creation") or 0,
+        }
+    return None
+
+
+class PromptUsageCallback(BaseCallbackHandler):
+    """Records prompt/cache token usage of every chat model call for an agent"""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                if (generation.generation_info or {}).get(RESPONSE_CACHE_HIT):
+                    continue  # no provider call was made
+                usage = _usage_from_message(getattr(generation, "message", None))
+                if usage:
+                    record_prompt_usage(self.agent, **usage)
+
+
+def record_strands_usage(agent: str, result: Any) -> None:
+    """Record the accumulated usage of a strands AgentResult (all model calls of one turn)."""
+    usage = getattr(getattr(result, "metrics", None), "accumulated_usage", None) or {}
+    if usage:
+        record_prompt_usage(
+            agent,
+            input_tokens=usage.get("inputTokens", 0) + usage.get("cacheReadInputTokens", 0) + usage.get("cacheWriteInputTokens", 0),
+            cache_read_tokens=usage.get("cacheReadInputTokens", 0),
+            cache_write_tokens=usage.get("cacheWriteInputTokens", 0),
+        )
@@ -0,0 +1,121 @@
+"""
+Process-local Metrics
+
+Thread-safe counters, gauges and latency observations keyed by name + labels.
+Kept in memory so services can record cheaply; export later (Prometheus/LangSmith)
+by reading `snapshot()`.
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Tuple
+
+# Number of recent observations kept per series for percentile estimates
+_RESERVOIR_SIZE = 1024
+
+_SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _series_key(name: str, labels: Dict[str, Any]) -> _SeriesKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Metrics:
+    """In-memory metrics registry"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[_SeriesKey, float] = defaultdict(float)
+        self._gauges: Dict[_SeriesKey, float] = {}
+        self._observations: Dict[_SeriesKey, Dict[str, Any]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        """Increment a counter"""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] += value
+
+    def gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to its current value"""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record an observation (latency, size, ...)"""
+        key = _series_key(name, labels)
+        with self._lock:
+            series = self._observations.get(key)
+            if series is None:
+                series = {"count": 0, "sum": 0.0, "min": value, "max": value,
+                          "samples": deque(maxlen=_RESERVOIR_SIZE)}
+                self._observations[key] = series
+            series["count"] += 1
+            series["sum"] += value
+            series["min"] = min(series["min"], value)
+            series["max"] = max(series["max"], value)
+            samples: Deque[float] = series["samples"]
+            samples.append(value)
+
+    def counter_value(self, name: str, **labels) -> float:
+        """Read a single counter (0 if never incremented)"""
+        with self._lock:
+            return self._counters.get(_series_key(name, labels), 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a plain-dict view of every series"""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+            gauges = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._gauges.items()
+            ]
+            observations = []
+            for (name, labels), series in self._observations.items():
+                samples = list(series["samples"])
+                observations.append({
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": series["count"],
+                    "sum": series["sum"],
+                    "min": series["min"],
+                    "max": series["max"],
+                    "p50": _percentile(samples, 0.50),
+                    "p95": _percentile(samples, 0.95),
+                    "p99": _percentile(samples, 0.99),
+                })
+        return {"counters": counters, "gauges": gauges, "observations": observations}
+
+    def reset(self) -> None:
+        """Drop all recorded series"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+# Global registry instance
+metrics = Metrics()
+
+
+def incr(name: str, value: float = 1, **labels) -> None:
+    metrics.incr(name, value, **labels)
+
+
+def gauge(name: str, value: float, **labels) -> None:
+    metrics.gauge(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    metrics.observe(name, value, **labels)
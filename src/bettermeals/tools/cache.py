@@ -0,0 +1,246 @@
+"""
+Tool Result Cache
+
+Decorators that declare whether a BetterMeals tool is side-effect free.
+
+- `read_only(...)` caches results keyed on canonicalized arguments with a per-tool TTL,
+  tags each entry for invalidation and collapses concurrent identical calls.
+- `mutating(...)` marks a tool as never cacheable and invalidates related tags
+  after it succeeds (e.g. a checkout invalidates the cached status of its order).
+
+Apply them underneath `@tool` so LangChain still infers the schema from the
+original signature:
+
+    @tool("bm_order_status", description="...")
+    @read_only("bm_order_status", ttl_seconds=30, tags=...)
+    async def bm_order_status(order_id: str) -> dict: ...
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TagFn = Callable[[Dict[str, Any], Any], Iterable[str]]
+ScopeFn = Callable[[], Dict[str, Any]]
+
+# Tools registered as side-effecting; these can never be wrapped by read_only()
+MUTATING_TOOLS: Set[str] = set()
+READ_ONLY_TOOLS: Set[str] = set()
+
+
+def _canonical_args(func: Callable, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    """Bind call arguments to the signature (defaults applied) for stable keys."""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _is_cacheable_result(result: Any) -> bool:
+    """Only cache successful payloads; errors should be retried on the next call."""
+    return not (isinstance(result, dict) and result.get("success") is False)
+
+
+class ToolResultCache:
+    """TTL cache with tag-based invalidation and in-flight request coalescing"""
+
+    def __init__(self, max_entries: int = 4096):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Any, Tuple[str, ...]]] = {}
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value, tags = entry
+            if expires_at <= time.time():
+                self._drop(key)
+                return False, None
+            return True, value
+
+    def put(self, key: str, value: Any, ttl_seconds: float, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            self._drop(key)
+            if len(self._entries) >= self._max_entries:
+                self._evict_expired_or_oldest()
+            self._entries[key] = (time.time() + ttl_seconds, value, tags)
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying any of the tags; returns the number dropped."""
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    self._drop(key)
+                    dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+
+    async def get_or_call(self, key: str, call: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run `call` once per key at a time; concurrent callers await the same result.
+
+        Returns (result, coalesced) where coalesced is True for callers that
+        piggybacked on another caller's in-flight request.
+        """
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited isn't logged as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._inflight.pop(key, None)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _evict_expired_or_oldest(self) -> None:
+        now = time.time()
+        expired = [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._drop(key)
+        if len(self._entries) >= self._max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            self._drop(oldest)
+
+
+# Shared cache instance used by the tool decorators
+tool_cache = ToolResultCache()
+
+
+def read_only(
+    tool_name: str,
+    ttl_seconds: float,
+    tags: Optional[TagFn] = None,
+    scope: Optional[ScopeFn] = None,
+):
+    """
+    Mark an async tool function as side-effect free and cache its results.
+
+    Args:
+        tool_name: Tool name (must match the @tool name)
+        ttl_seconds: How long a result stays fresh
+        tags: Optional fn(args, result) -> tags used for invalidation by mutating tools
+        scope: Optional fn() -> extra key material (e.g. the current plan week)
+    """
+    if tool_name in MUTATING_TOOLS:
+        raise ValueError(f"Tool {tool_name} is registered as mutating and cannot be cached")
+    READ_ONLY_TOOLS.add(tool_name)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            call_args = _canonical_args(func, args, kwargs)
+            key_material = {"tool": tool_name, "args": call_args}
+            if scope is not None:
+                key_material["scope"] = scope()
+            key = _canonical_json(key_material)
+
+            hit, value = tool_cache.get(key)
+            if hit:
+                metrics.incr("tool_cache.hit", tool=tool_name)
+                return value
+
+            async def _call():
+                result = await func(*args, **kwargs)
+                if _is_cacheable_result(result):
+                    entry_tags = list(tags(call_args, result)) if tags else []
+                    tool_cache.put(key, result, ttl_seconds, entry_tags)
+                return result
+
+            result, coalesced = await tool_cache.get_or_call(key, _call)
+            metrics.incr("tool_cache.coalesced" if coalesced else "tool_cache.miss", tool=tool_name)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def mutating(tool_name: str, invalidates: Optional[TagFn] = None):
+    """
+    Mark an async tool function as side-effecting: never cached, and on success
+    drops cached results tagged by `invalidates(args, result)`.
+    """
+    if tool_name in READ_ONLY_TOOLS:
+        raise ValueError(f"Tool {tool_name} is already registered as read-only")
+    MUTATING_TOOLS.add(tool_name)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            if invalidates is not None and _is_cacheable_result(result):
+                call_args = _canonical_args(func, args, kwargs)
+                dropped = tool_cache.invalidate_tags(t for t in invalidates(call_args, result) if t)
+                if dropped:
+                    logger.debug(f"{tool_name} invalidated {dropped} cached tool results")
+                    metrics.incr("tool_cache.invalidated", dropped, tool=tool_name)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def tags_from(*templates: str) -> TagFn:
+    """
+    Build a tag function from "prefix:{field}" templates.
+
+    Fields are looked up in the call args first, then in a dict result; templates
+    whose field is missing are skipped.
+    """
+    def _tags(args: Dict[str, Any], result: Any) -> List[str]:
+        values = dict(result) if isinstance(result, dict) else {}
+        values.update({k: v for k, v in args.items() if v is not None})
+        rendered = []
+        for template in templates:
+            try:
+                rendered.append(template.format(**values))
+            except KeyError:
+                continue
+        return rendered
+
+    return _tags
@@ -1,16 +1,35 @@
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import Optional
+from ..utils.deadline import stage, time_left
+from .retry import call_with_retries
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.2, min=0.2, max=2))
-async def post_json(url: str, json: dict, headers: dict = None, timeout: float = 15):
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.post(url, json=json, headers=headers)
-        r.raise_for_status()
-        return r.json()
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+async def post_json(url: str, json: dict, headers: dict = None, timeout: float = 15, idempotency_key: Optional[str] = None):
+    """POST JSON. Retried on transient failures only when an idempotency key is attached
+    (or the request provably never reached the server)."""
+    headers = dict(headers or {})
+    if idempotency_key:
+        headers[IDEMPOTENCY_HEADER] = idempotency_key
+
+    async def _send() -> httpx.Response:
+        async with httpx.AsyncClient(timeout=time_left(timeout)) as client:
+            r = await client.post(url, json=json, headers=headers)
+            r.raise_for_status()
+            return r
+
+    with stage("http"):
+        r = await call_with_retries(url, _send, idempotent=idempotency_key is not None)
+    return r.json()
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.2, min=0.2, max=2))
 async def get_json(url: str, params: dict = None, headers: dict = None, timeout: float = 15):
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.get(url, params=params, headers=headers)
-        r.raise_for_status()
-        return r.json()
+    """GET JSON. Safe to retry on any transient failure."""
+    async def _send() -> httpx.Response:
+        async with httpx.AsyncClient(timeout=time_left(timeout)) as client:
+            r = await client.get(url, params=params, headers=headers)
+            r.raise_for_status()
+            return r
+
+    with stage("http"):
+        r = await call_with_retries(url, _send, idempotent=True)
+    return r.json()
@@ -0,0 +1,139 @@
+"""
+Checkout Idempotency Ledger
+
+Issues deterministic idempotency keys per (household, cart) and remembers the
+outcome of each checkout, so a resumed graph thread or a retried webhook gets the
+original order back instead of placing a second one.
+
+Records move through: in_flight -> completed. A failed attempt removes the record
+so the next attempt retries with the same key (the backend dedupes on it).
+Entries live in memory and, when `settings.idempotency_ledger_path` is set, in a
+local SQLite file so they survive restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..config.settings import settings
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT = "in_flight"
+COMPLETED = "completed"
+
+
+class IdempotencyLedger:
+    """Local record of checkout attempts keyed by household + cart"""
+
+    def __init__(self, namespace: str, sqlite_path: Optional[str] = None):
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_ledger ("
+                "key TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, updated_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def key_for(self, household_id: str, cart_id: str) -> str:
+        """Deterministic key: the same household cart always maps to the same key."""
+        digest = hashlib.sha256(f"{self._namespace}:{household_id}:{cart_id}".encode("utf-8")).hexdigest()
+        return f"{self._namespace}_{digest[:32]}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None or self._conn is None:
+                return record
+            row = self._conn.execute(
+                "SELECT status, result FROM idempotency_ledger WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            record = {"status": row[0], "result": json.loads(row[1]) if row[1] else None}
+            self._records[key] = record
+            return record
+
+    async def run_once(
+        self,
+        household_id: str,
+        cart_id: str,
+        call: Callable[[str], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """
+        Execute `call(idempotency_key)` at most once per household cart.
+
+        Completed results are replayed from the ledger; a concurrent duplicate waits
+        for the in-flight attempt. Unsuccessful results are not recorded.
+        """
+        key = self.key_for(household_id, cart_id)
+
+        record = self.get(key)
+        if record is not None and record["status"] == COMPLETED:
+            logger.info(f"Replaying recorded {self._namespace} for household {household_id}, cart {cart_id}")
+            metrics.incr("idempotency.replayed", namespace=self._namespace)
+            return {**record["result"], "replayed": True}
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            metrics.incr("idempotency.coalesced", namespace=self._namespace)
+            result = await asyncio.shield(pending)
+            return {**result, "replayed": True}
+
+        if record is not None and record["status"] == IN_FLIGHT:
+            # A previous process died mid-call; resend with the same key so the
+            # backend can dedupe rather than minting a new one
+            logger.warning(f"Resuming interrupted {self._namespace} {key} with the original key")
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._write(key, IN_FLIGHT, None)
+        try:
+            result = await call(key)
+        except BaseException as e:
+            self._delete(key)
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            if isinstance(result, dict) and result.get("success") is not False:
+                self._write(key, COMPLETED, result)
+                metrics.incr("idempotency.completed", namespace=self._namespace)
+            else:
+                self._delete(key)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def _write(self, key: str, status: str, result: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._records[key] = {"status": status, "result": result}
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO idempotency_ledger (key, status, result, updated_at) VALUES (?, ?, ?, ?)",
+                    (key, status, json.dumps(result, default=str) if result is not None else None, time.time()),
+                )
+                self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._records.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM idempotency_ledger WHERE key = ?", (key,))
+                self._conn.commit()
+
+
+# Ledger used by the checkout tool
+checkout_ledger = IdempotencyLedger("checkout", sqlite_path=settings.idempotency_ledger_path)
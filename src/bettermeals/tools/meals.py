@@ -1,10 +1,26 @@
 from langchain_core.tools import tool
 from ..config.settings import settings
 from .http_client import post_json
+from .cache import read_only, tags_from
 import uuid
 from datetime import datetime, timedelta
 
+RECOMMENDATIONS_TTL_SECONDS = 7 * 24 * 3600
+SCORES_TTL_SECONDS = 24 * 3600
+
+
+def _current_plan_week() -> dict:
+    """Recommendations are per household per plan week."""
+    return {"week": datetime.now().strftime("%Y-%W")}
+
+
 @tool("bm_recommend_meals", description="Call BetterMeals recommendations API.")
+@read_only(
+    "bm_recommend_meals",
+    ttl_seconds=RECOMMENDATIONS_TTL_SECONDS,
+    tags=tags_from("household:{household_id}"),
+    scope=_current_plan_week,
+)
 async def bm_recommend_meals(
     household_id: str, 
     constraints: dict = {}
@@ -90,6 +106,7 @@ async def bm_recommend_meals(
     }
 
 @tool("bm_score_meal_plan", description="Call BetterMeals meal scoring API.")
+@read_only("bm_score_meal_plan", ttl_seconds=SCORES_TTL_SECONDS)
 async def bm_score_meal_plan(meal_id: str, metrics: list[str]) -> dict:
     """Return nutrition scores for a given meal plan."""
     # TODO: Uncomment when API is working
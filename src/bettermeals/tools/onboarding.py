@@ -1,18 +1,21 @@
 from langchain_core.tools import tool
 from ..config.settings import settings
 from .http_client import post_json
+from .cache import mutating, tags_from
 import uuid
+from typing import Optional
 from datetime import datetime
 
 @tool("bm_onboard_household", description="Create or update a household profile.")
-async def bm_onboard_household(phone_hash: str, preferences: dict) -> dict:
-    """Create/update household; preferences include veg/non-veg, allergies, constraints."""
+@mutating("bm_onboard_household", invalidates=tags_from("household:{household_id}"))
+async def bm_onboard_household(phone_hash: str, preferences: dict, household_id: Optional[str] = None) -> dict:
+    """Create/update household (pass household_id to update); preferences include veg/non-veg, allergies, constraints."""
     # TODO: Uncomment when API is working
     # return await post_json(f"{settings.bm_api_base}/onboarding/household",
-    #                        {"phone_hash": phone_hash, "preferences": preferences})
+    #                        {"phone_hash": phone_hash, "preferences": preferences, "household_id": household_id})
     
     # Mock response for household onboarding
-    household_id = str(uuid.uuid4())
+    household_id = household_id or str(uuid.uuid4())
     return {
         "success": True,
         "household_id": household_id,
@@ -23,6 +26,7 @@ async def bm_onboard_household(phone_hash: str, preferences: dict) -> dict:
     }
 
 @tool("bm_onboard_resident", description="Create or update a resident profile.")
+@mutating("bm_onboard_resident", invalidates=tags_from("household:{household_id}"))
 async def bm_onboard_resident(household_id: str, resident: dict) -> dict:
     """Create/update resident under a household."""
     # TODO: Uncomment when API is working
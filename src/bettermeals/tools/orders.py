@@ -1,10 +1,15 @@
 from langchain_core.tools import tool
 from ..config.settings import settings
 from .http_client import post_json, get_json
+from .cache import read_only, mutating, tags_from
+from .idempotency import checkout_ledger
 import uuid
 from datetime import datetime, timedelta
 
+ORDER_STATUS_TTL_SECONDS = 30
+
 @tool("bm_build_cart", description="Build cart from meal plan.")
+@mutating("bm_build_cart")
 async def bm_build_cart(household_id: str, meal_plan_id: str) -> dict:
     """Create a grocery cart from a meal plan."""
     # TODO: Uncomment when API is working
@@ -29,11 +34,14 @@ async def bm_build_cart(household_id: str, meal_plan_id: str) -> dict:
     }
 
 @tool("bm_substitute", description="Propose or accept a substitution in cart.")
+@mutating("bm_substitute")
 async def bm_substitute(cart_id: str, original: str, chosen: str) -> dict:
     """Update cart with a substitution selection."""
     # TODO: Uncomment when API is working
+    # Same cart + selection is the same operation, so a derived key makes retries safe
     # return await post_json(f"{settings.bm_api_base}/orders/substitute",
-    #                        {"cart_id": cart_id, "original": original, "chosen": chosen})
+    #                        {"cart_id": cart_id, "original": original, "chosen": chosen},
+    #                        idempotency_key=f"substitute:{cart_id}:{original}:{chosen}")
     
     # Mock response for substitution
     return {
@@ -47,11 +55,21 @@ async def bm_substitute(cart_id: str, original: str, chosen: str) -> dict:
     }
 
 @tool("bm_checkout", description="Checkout cart (idempotent).")
-async def bm_checkout(cart_id: str, idempotency_key: str) -> dict:
-    """Place the grocery order using an idempotency key to avoid duplicate charges."""
+@mutating("bm_checkout", invalidates=tags_from("order:{order_id}"))
+async def bm_checkout(household_id: str, cart_id: str) -> dict:
+    """Place the grocery order once per household cart; repeated calls return the original order."""
+    return await checkout_ledger.run_once(
+        household_id,
+        cart_id,
+        lambda idempotency_key: _place_order(cart_id, idempotency_key),
+    )
+
+async def _place_order(cart_id: str, idempotency_key: str) -> dict:
+    """Call the checkout API with the ledger-issued idempotency key."""
     # TODO: Uncomment when API is working
     # return await post_json(f"{settings.bm_api_base}/orders/checkout",
-    #                        {"cart_id": cart_id, "idempotency_key": idempotency_key})
+    #                        {"cart_id": cart_id, "idempotency_key": idempotency_key},
+    #                        idempotency_key=idempotency_key)
     
     # Mock response for checkout
     order_id = str(uuid.uuid4())
@@ -68,6 +86,11 @@ async def bm_checkout(cart_id: str, idempotency_key: str) -> dict:
     }
 
 @tool("bm_order_status", description="Fetch order status by ID.")
+@read_only(
+    "bm_order_status",
+    ttl_seconds=ORDER_STATUS_TTL_SECONDS,
+    tags=tags_from("order:{order_id}"),
+)
 async def bm_order_status(order_id: str) -> dict:
     """Get order status (created/packed/delivered) and ETA."""
     # TODO: Uncomment when API is working
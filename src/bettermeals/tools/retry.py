@@ -0,0 +1,279 @@
+"""
+Retry Engine for HTTP Tools
+
+Decides whether a failed call may be retried and when:
+
+- Idempotent calls (GET, or POST carrying an idempotency key) retry on timeouts,
+  transport errors, 429 and 5xx.
+- Mutating calls without an idempotency key only retry when the request provably
+  never reached the server (connection refused / connect timeout) or was rejected
+  with 429, so a retry cannot duplicate a side effect.
+- Retry-After is honoured (capped); longer waits give up instead of sleeping.
+- Every retry draws from a shared RetryBudget so retries stay a bounded fraction of
+  traffic during backend brownouts.
+- A CircuitBreaker per endpoint fails fast while the backend is unhealthy.
+- No retry is scheduled when its backoff would outlast the request deadline.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config.settings import settings
+from ..telemetry.metrics import metrics
+from ..utils.deadline import remaining
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Statuses that mean the server rejected the request before acting on it
+REJECTED_STATUS_CODES = frozenset({429})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited because the endpoint is unhealthy"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}; retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Attempt count and exponential backoff (full jitter) settings"""
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+    max_retry_after: float = 10.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """
+    Token bucket shared by all callers: each request deposits `ratio` tokens,
+    each retry withdraws one. Caps retries at roughly `ratio` of traffic
+    (plus a small burst allowance of `min_tokens`).
+    """
+
+    def __init__(self, ratio: float, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, endpoint: str, failure_threshold: int, reset_timeout: float):
+        self.endpoint = endpoint
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError unless the call may proceed. Returns True when the call
+        is the half-open probe; its caller must then record an outcome or release it.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            elapsed = time.monotonic() - self._opened_at
+            if self._state == self.OPEN and elapsed >= self._reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            raise CircuitOpenError(self.endpoint, max(0.0, self._reset_timeout - elapsed))
+
+    def release_probe(self) -> None:
+        """Free the probe slot after a probe that ended without a verdict (cancelled, deadline)."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit closed for {self.endpoint}")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit opened for {self.endpoint} after {self._failures} failures")
+                    metrics.incr("http.circuit_opened", endpoint=self.endpoint)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+# Shared across every HTTP tool in the process
+retry_budget = RetryBudget(ratio=settings.http_retry_budget_ratio)
+default_policy = RetryPolicy()
+
+
+def endpoint_key(url: str) -> str:
+    """Breakers are per endpoint (host + path), independent of query string."""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    key = endpoint_key(url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                key,
+                failure_threshold=settings.http_breaker_failure_threshold,
+                reset_timeout=settings.http_breaker_reset_seconds,
+            )
+            _breakers[key] = breaker
+        return breaker
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date), None if absent/invalid."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _is_retryable(error: Exception, idempotent: bool) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if idempotent:
+            return status in RETRYABLE_STATUS_CODES
+        return status in REJECTED_STATUS_CODES
+    if idempotent:
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+    # Without an idempotency key only retry when the request never left the client
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def _counts_as_failure(error: Exception) -> bool:
+    """Only backend health problems trip the breaker, not client errors like 404/422."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+async def call_with_retries(
+    url: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    idempotent: bool,
+    policy: RetryPolicy = default_policy,
+) -> httpx.Response:
+    """
+    Run `send` under the endpoint's breaker, retrying per the policy and budget.
+
+    `send` must raise httpx.HTTPStatusError for non-2xx responses.
+    """
+    breaker = get_breaker(url)
+    endpoint = breaker.endpoint
+    retry_budget.record_request()
+
+    attempt = 1
+    while True:
+        is_probe = breaker.before_call()
+        try:
+            response = await send()
+        except Exception as e:
+            if _counts_as_failure(e):
+                breaker.record_failure()
+            elif isinstance(e, httpx.HTTPStatusError):
+                breaker.record_success()
+            elif is_probe:
+                # Says nothing about the backend (e.g. DeadlineExceeded); let the next call probe
+                breaker.release_probe()
+
+            if attempt >= policy.max_attempts or not _is_retryable(e, idempotent):
+                raise
+
+            delay = policy.backoff(attempt)
+            if isinstance(e, httpx.HTTPStatusError):
+                retry_after = parse_retry_after(e.response)
+                if retry_after is not None:
+                    if retry_after > policy.max_retry_after:
+                        logger.warning(f"Retry-After {retry_after:.1f}s from {endpoint} exceeds cap; giving up")
+                        raise
+                    delay = max(delay, retry_after)
+
+            left = remaining()
+            if left is not None and delay >= left:
+                logger.warning(f"Not retrying {endpoint}: {delay:.2f}s backoff outlasts the request deadline")
+                metrics.incr("http.retry_past_deadline", endpoint=endpoint)
+                raise
+
+            if not retry_budget.try_acquire():
+                logger.warning(f"Retry budget exhausted; not retrying {endpoint}")
+                metrics.incr("http.retry_budget_exhausted", endpoint=endpoint)
+                raise
+
+            metrics.incr("http.retry", endpoint=endpoint, idempotent=idempotent)
+            logger.info(f"Retrying {endpoint} in {delay:.2f}s (attempt {attempt + 1}/{policy.max_attempts}): {e}")
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # Cancelled mid-probe: without this the breaker would stay half-open for good
+            if is_probe:
+                breaker.release_probe()
+            raise
+
+        breaker.record_success()
+        return response
@@ -0,0 +1,112 @@
+"""
+Request Deadlines
+
+One deadline per inbound request, carried in a contextvar so every layer below the
+webhook sees it without threading it through call signatures (asyncio tasks and
+`asyncio.to_thread` workers inherit it):
+
+- `request_deadline(budget, name)`: set in the webhook; on exit records how much of
+  the budget was used and whether it was exceeded.
+- `time_left(default)`: timeout for the next DB / HTTP / token / agent call, i.e.
+  `default` capped at the remaining budget. Raises DeadlineExceeded once the budget
+  is spent, so no new work starts after the caller gave up. Without a deadline
+  (batch jobs, CLIs) it returns `default`.
+- `stage(name)`: attributes wall time to a stage (routing, agent, http, ...) for the
+  `deadline.stage_seconds` metric.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call would start after the request's budget ran out"""
+
+    def __init__(self, name: str, stage: Optional[str] = None):
+        super().__init__(f"Deadline for {name} exceeded" + (f" in {stage}" if stage else ""))
+        self.name = name
+        self.stage = stage
+
+
+class Deadline:
+    """Monotonic expiry time plus per-stage time accounting"""
+
+    def __init__(self, budget: float, name: str):
+        self.name = name
+        self.budget = budget
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget
+        self.stages: Dict[str, float] = {}
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+_stage: ContextVar[Optional[str]] = ContextVar("request_stage", default=None)
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left on the current deadline, None when there is none."""
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def time_left(default: float) -> float:
+    """Timeout for the next call: `default`, capped at the remaining budget."""
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    left = deadline.remaining()
+    if left <= 0:
+        stage_name = _stage.get()
+        metrics.incr("deadline.exhausted", request=deadline.name, stage=stage_name or "none")
+        raise DeadlineExceeded(deadline.name, stage_name)
+    return min(default, left)
+
+
+@contextmanager
+def request_deadline(budget: float, name: str = "request") -> Iterator[Deadline]:
+    """Run the block under a fresh deadline of `budget` seconds."""
+    deadline = Deadline(budget, name)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+        used = deadline.elapsed()
+        metrics.observe("deadline.used_seconds", used, request=name)
+        if used > budget:
+            metrics.incr("deadline.exceeded", request=name)
+            breakdown = ", ".join(f"{stage_name}={seconds:.1f}s" for stage_name, seconds in deadline.stages.items())
+            logger.warning(f"{name} took {used:.1f}s of a {budget:.1f}s budget ({breakdown})")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Attribute the block's wall time to stage `name` of the current request."""
+    deadline = _current.get()
+    token = _stage.set(name)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+        if deadline is not None:
+            spent = time.monotonic() - started
+            deadline.stages[name] = deadline.stages.get(name, 0.0) + spent
+            metrics.observe("deadline.stage_seconds", spent, request=deadline.name, stage=name)
@@ -0,0 +1,146 @@
+"""
+Shared KV Server
+
+Minimal pure-Python key-value server behind the shared cache tier
+(utils/shared_cache.py), for local runs, tests and small deployments. Values are
+opaque strings with a TTL; the server never decodes them.
+
+Protocol: one JSON object per line in each direction.
+
+    {"op": "get", "key": k}                          -> {"ok": true, "value": v | null}
+    {"op": "set", "key": k, "value": v, "ttl": s}    -> {"ok": true}
+    {"op": "add", "key": k, "value": v, "ttl": s}    -> {"ok": true, "added": bool}  (set if absent)
+    {"op": "delete", "key": k}                       -> {"ok": true}
+    {"op": "invalidate", "prefix": p}                -> {"ok": true, "deleted": n}
+    {"op": "ping"}                                   -> {"ok": true}
+
+There is no authentication: clients sign their entries (`shared_cache_secret`) and
+drop anything that does not verify. Bind it to a private interface only.
+
+Usage:
+    python -m src.bettermeals.utils.kv_server [--host 127.0.0.1] [--port 6390]
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import click
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 6390
+
+
+class KVStore:
+    """TTL'd string store with LRU eviction; also the in-process stand-in for the server"""
+
+    def __init__(self, max_entries: int = 100_000):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                return False
+            self._entries[key] = (time.time() + ttl, value)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one protocol request"""
+        op = request.get("op")
+        if op == "get":
+            return {"ok": True, "value": self.get(request["key"])}
+        if op == "set":
+            self.set(request["key"], request["value"], float(request["ttl"]))
+            return {"ok": True}
+        if op == "add":
+            return {"ok": True, "added": self.add(request["key"], request["value"], float(request["ttl"]))}
+        if op == "delete":
+            self.delete(request["key"])
+            return {"ok": True}
+        if op == "invalidate":
+            return {"ok": True, "deleted": self.invalidate(request["prefix"])}
+        if op == "ping":
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+
+class KVServer:
+    """asyncio TCP server for a KVStore"""
+
+    def __init__(self, store: Optional[KVStore] = None):
+        self.store = store or KVStore()
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self.store.handle(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self._serve_client, host, port)
+        logger.info(f"Shared KV server listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Interface to bind (keep it private)")
+@click.option("--port", default=DEFAULT_PORT, type=int, help="Port to listen on")
+@click.option("--max-entries", default=100_000, type=int, help="LRU capacity")
+def main(host: str, port: int, max_entries: int):
+    """Run the shared cache KV server."""
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(KVServer(KVStore(max_entries)).serve(host, port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import logging
+import requests
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def send_whatsapp_message(phone_number: str, text: str) -> bool:
+    """
+    Send a proactive (not in reply to a webhook) WhatsApp message.
+
+    Posts to `settings.outbound_message_url` when configured; otherwise the message
+    is only logged.
+    """
+    if not settings.outbound_message_url:
+        logger.info(f"Outbound message for {phone_number} (no outbound_message_url configured): {text}")
+        return False
+    try:
+        resp = requests.post(settings.outbound_message_url, json={"phone_number": phone_number, "text": text}, timeout=10)
+        resp.raise_for_status()
+        logger.info(f"Sent outbound message to {phone_number}")
+        return True
+    except Exception as e:
+        logger.error(f"Error sending outbound message to {phone_number}: {str(e)}")
+        return False
@@ -0,0 +1,104 @@
+"""
+Rate Control
+
+- `AIMDLimiter`: AIMD (additive increase, multiplicative decrease) concurrency limiter
+  for calls to a shared backend. Each success raises the limit by 1/limit (roughly +1
+  per window of successful calls). Each overload signal (429, 5xx, timeout) multiplies
+  it by `decrease_factor`, at most once per window: a call that started before the
+  last decrease (pass `started` to `release`) was admitted under the old limit and
+  does not cut it again. Callers wait in `acquire` while in-flight is at the limit,
+  or use `try_acquire` to be turned away instead (admission control).
+- `TokenBucket`: fixed send rate with bounded bursts, for provider limits that are
+  known up front (e.g. WhatsApp messaging tiers).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from ..telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = "success"
+OVERLOAD = "overload"
+ERROR = "error"  # failure that says nothing about backend load (e.g. 404)
+
+
+class AIMDLimiter:
+    """Concurrency limit that adapts to backend overload signals"""
+
+    def __init__(self, name: str, initial: int, minimum: int = 1, maximum: int = 32, decrease_factor: float = 0.5):
+        self.name = name
+        self._minimum = minimum
+        self._maximum = maximum
+        self._decrease_factor = decrease_factor
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._decreased_at = float("-inf")
+        self._cond = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot without waiting; False when in-flight is at the limit."""
+        if self._in_flight >= int(self._limit):
+            return False
+        self._in_flight += 1
+        return True
+
+    async def release(self, outcome: str, started: Optional[float] = None) -> None:
+        """Free the slot; `started` is the call's `time.monotonic()` when it was admitted."""
+        async with self._cond:
+            self._in_flight -= 1
+            if outcome == OVERLOAD:
+                # A call admitted before the last decrease belongs to the window that decrease answered
+                if started is None or started >= self._decreased_at:
+                    previous = self.limit
+                    self._limit = max(float(self._minimum), self._limit * self._decrease_factor)
+                    self._decreased_at = time.monotonic()
+                    if self.limit != previous:
+                        logger.warning(f"{self.name}: overloaded, concurrency {previous} -> {self.limit}")
+            elif outcome == SUCCESS:
+                self._limit = min(float(self._maximum), self._limit + 1.0 / self._limit)
+            metrics.gauge("rate_control.limit", self.limit, limiter=self.name)
+            self._cond.notify_all()
+
+
+class TokenBucket:
+    """Rate limit: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, name: str, rate: float, capacity: Optional[float] = None):
+        self.name = name
+        self.rate = rate
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                metrics.incr("rate_control.throttled", limiter=self.name)
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
@@ -0,0 +1,338 @@
+"""
+Two-Tier Shared Cache
+
+An in-process LRU in front of a key-value tier shared by every worker process and
+container (utils/kv_server.py, at `shared_cache_url`), so a token fetched or a plan
+marked in one worker is visible to all of them:
+
+- Reads go local -> shared -> loader. Local copies live at most
+  `shared_cache_local_ttl_seconds` when the shared tier is on, which bounds how long
+  another worker's invalidation can go unnoticed.
+- Stampede protection: one loader per key per process (striped locks) and, with the
+  shared tier, one per key across processes (a short lease taken with "add"; the
+  others poll the shared tier until the value shows up, the lease runs out or the
+  request deadline does). Callers on the event loop thread never poll; they load.
+- Negative caching: a loader result of None is cached for `negative_ttl`.
+- Namespaces: keys are stored as "{namespace}:{key}"; `invalidate_all` drops the
+  whole namespace in both tiers.
+- The shared tier is optional: without `shared_cache_url` (or while it is
+  unreachable) the cache works process-locally. "local" uses an in-process KVStore
+  (tests, single process).
+
+Values are stored as JSON (datetimes, e.g. Firestore timestamps, are tagged and
+restored). With `shared_cache_secret` set, entries are HMAC-signed and anything whose
+signature does not check out is treated as a miss, before it is decoded. Values that
+do not serialize stay in the local tier. Keep secrets (tokens, SecureStrings) out of
+the shared tier altogether: the KV server has no authentication.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config.settings import settings
+from ..telemetry.metrics import metrics
+from .deadline import time_left
+from .kv_server import KVStore
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+LEASE_SECONDS = 5.0
+LEASE_POLL_SECONDS = 0.05
+UNAVAILABLE_BACKOFF_SECONDS = 10.0
+_LOCK_STRIPES = 64
+
+
+class SharedKVClient:
+    """Blocking client for the KV server; errors degrade to cache misses."""
+
+    def __init__(self, address: str, timeout: float):
+        host, _, port = address.rpartition(":")
+        self._address = (host or "127.0.0.1", int(port))
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._down_until = 0.0
+
+    def _call(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                return None
+            try:
+                if self._sock is None:
+                    self._sock = socket.create_connection(self._address, timeout=self._timeout)
+                    self._reader = self._sock.makefile("rb")
+                self._sock.sendall(json.dumps(request).encode() + b"\n")
+                line = self._reader.readline()
+                if not line:
+                    raise ConnectionError("connection closed")
+                return json.loads(line)
+            except (OSError, ValueError) as e:
+                self._close()
+                self._down_until = time.monotonic() + UNAVAILABLE_BACKOFF_SECONDS
+                metrics.incr("shared_cache.unavailable")
+                logger.warning(f"Shared cache at {self._address[0]}:{self._address[1]} unavailable: {str(e)}")
+                return None
+
+    def _close(self) -> None:
+        try:
+            if self._sock is not None:
+                self._sock.close()
+        except OSError:
+            pass
+        self._sock = None
+        self._reader = None
+
+    def get(self, key: str) -> Optional[str]:
+        response = self._call({"op": "get", "key": key})
+        return response.get("value") if response else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._call({"op": "set", "key": key, "value": value, "ttl": ttl})
+
+    def add(self, key: str, value: str, ttl: float) -> Optional[bool]:
+        """True if set, False if the key exists, None if the tier is unavailable."""
+        response = self._call({"op": "add", "key": key, "value": value, "ttl": ttl})
+        return response.get("added") if response else None
+
+    def delete(self, key: str) -> None:
+        self._call({"op": "delete", "key": key})
+
+    def invalidate(self, prefix: str) -> None:
+        self._call({"op": "invalidate", "prefix": prefix})
+
+
+class LocalKVClient:
+    """SharedKVClient interface over an in-process KVStore (stand-in for the server)"""
+
+    def __init__(self, store: Optional[KVStore] = None):
+        self.store = store or KVStore()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.store.get(key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.store.set(key, value, ttl)
+
+    def add(self, key: str, value: str, ttl: float) -> Optional[bool]:
+        return self.store.add(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.store.delete(key)
+
+    def invalidate(self, prefix: str) -> None:
+        self.store.invalidate(prefix)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_shared_client():
+    """Process-wide client for `shared_cache_url`, None when the shared tier is off."""
+    global _client
+    if not settings.shared_cache_url:
+        return None
+    with _client_lock:
+        if _client is None:
+            if settings.shared_cache_url == "local":
+                _client = LocalKVClient()
+            else:
+                if not settings.shared_cache_secret:
+                    logger.warning("shared_cache_secret is unset: shared cache entries are not signed")
+                _client = SharedKVClient(settings.shared_cache_url, settings.shared_cache_timeout_seconds)
+        return _client
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$datetime" in obj:
+        return datetime.fromisoformat(obj["$datetime"])
+    return obj
+
+
+def _signature(payload: str) -> str:
+    return hmac.new(settings.shared_cache_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def _encode(value: Any) -> str:
+    """JSON payload, prefixed with "{hmac}." when `shared_cache_secret` is set (TypeError if unserializable)."""
+    payload = json.dumps([value], default=_json_default, separators=(",", ":"))
+    if settings.shared_cache_secret:
+        return f"{_signature(payload)}.{payload}"
+    return payload
+
+
+def _decode(raw: str) -> Any:
+    """Inverse of `_encode`; ValueError when the signature is missing or wrong."""
+    payload = raw
+    if settings.shared_cache_secret:
+        signature, _, payload = raw.partition(".")
+        if not hmac.compare_digest(signature, _signature(payload)):
+            raise ValueError("bad signature")
+    return json.loads(payload, object_hook=_json_object_hook)[0]
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class TwoTierCache:
+    """Namespaced local LRU + shared KV cache with stampede protection"""
+
+    def __init__(self, namespace: str, ttl: float, negative_ttl: float = 60.0, max_local_entries: Optional[int] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._max_local_entries = max_local_entries or settings.shared_cache_max_local_entries
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._local_lock = threading.Lock()
+        self._stripes: List[threading.Lock] = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """Cached value (None included, if negatively cached) or `default` on a miss."""
+        value = self._get_local(key)
+        if value is not MISSING:
+            metrics.incr("shared_cache.hit", namespace=self.namespace, tier="local")
+            return value
+        value = self._get_shared(key)
+        if value is not MISSING:
+            metrics.incr("shared_cache.hit", namespace=self.namespace, tier="shared")
+            return value
+        metrics.incr("shared_cache.miss", namespace=self.namespace)
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        self._set_local(key, value, ttl)
+        client = get_shared_client()
+        if client is None:
+            return
+        try:
+            raw = _encode(value)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Keeping {self._key(key)} local only: {str(e)}")
+            return
+        client.set(self._key(key), raw, ttl)
+
+    def delete(self, key: str) -> None:
+        with self._local_lock:
+            self._local.pop(key, None)
+        client = get_shared_client()
+        if client is not None:
+            client.delete(self._key(key))
+
+    def invalidate_all(self) -> None:
+        """Drop every key of this namespace, locally and in the shared tier."""
+        with self._local_lock:
+            self._local.clear()
+        client = get_shared_client()
+        if client is not None:
+            client.invalidate(f"{self.namespace}:")
+        metrics.incr("shared_cache.invalidated", namespace=self.namespace)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Cached value, or `loader()` computed once across threads/processes and cached."""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        with self._stripes[hash(key) % _LOCK_STRIPES]:
+            value = self._get_local(key)
+            if value is not MISSING:
+                return value
+            lease = self._acquire_lease(key)
+            if lease is False:
+                value = self._wait_for_leader(key)
+                if value is not MISSING:
+                    return value
+            try:
+                metrics.incr("shared_cache.load", namespace=self.namespace)
+                value = loader()
+                self.set(key, value, ttl)
+                return value
+            finally:
+                if lease:
+                    get_shared_client().delete(self._key(key) + ":lease")
+
+    def _acquire_lease(self, key: str) -> Optional[bool]:
+        client = get_shared_client()
+        if client is None:
+            return None
+        return client.add(self._key(key) + ":lease", "1", LEASE_SECONDS)
+
+    def _wait_for_leader(self, key: str) -> Any:
+        """Another process is loading `key`: poll the shared tier for its result.
+
+        Bounded by the lease and the request deadline. On the event loop thread the
+        caller loads itself instead of blocking the loop.
+        """
+        if _on_event_loop():
+            metrics.incr("shared_cache.stampede_skip", namespace=self.namespace)
+            return MISSING
+        metrics.incr("shared_cache.stampede_wait", namespace=self.namespace)
+        give_up_at = time.monotonic() + time_left(LEASE_SECONDS)
+        while time.monotonic() < give_up_at:
+            time.sleep(min(LEASE_POLL_SECONDS, max(0.0, give_up_at - time.monotonic())))
+            value = self._get_shared(key)
+            if value is not MISSING:
+                return value
+        return MISSING
+
+    def _get_local(self, key: str) -> Any:
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._local[key]
+                return MISSING
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Any, ttl: float) -> None:
+        if get_shared_client() is not None:
+            ttl = min(ttl, settings.shared_cache_local_ttl_seconds)
+        with self._local_lock:
+            self._local[key] = (time.time() + ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self._max_local_entries:
+                self._local.popitem(last=False)
+
+    def _get_shared(self, key: str) -> Any:
+        client = get_shared_client()
+        if client is None:
+            return MISSING
+        raw = client.get(self._key(key))
+        if raw is None:
+            return MISSING
+        try:
+            value = _decode(raw)
+        except (ValueError, TypeError, IndexError, KeyError) as e:
+            logger.warning(f"Dropping undecodable shared cache entry {self._key(key)}: {str(e)}")
+            return MISSING
+        self._set_local(key, value, self.ttl)
+        return value
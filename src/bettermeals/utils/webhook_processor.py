@@ -20,6 +20,9 @@ class WebhookProcessor:
             "messages": [{"role": "user", "content": text}],
             "household_id": household_id,
             "sender_role": sender_role,
+            # A new message answers (or moves past) any approval that was pending
+            "pending_action": None,
+            "pending_options": [],
         }
         return state_in, config
 
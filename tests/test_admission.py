@@ -0,0 +1,230 @@
+import asyncio
+import time
+
+import pytest
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.entrypoints import admission as admission_module
+from src.bettermeals.entrypoints.admission import AdmissionController, AdmissionMiddleware, AdmissionRejected
+from src.bettermeals.utils.rate_control import AIMDLimiter, ERROR, OVERLOAD, SUCCESS
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    monkeypatch.setattr(settings, "admission_initial_concurrency", 2)
+    monkeypatch.setattr(settings, "admission_min_concurrency", 1)
+    monkeypatch.setattr(settings, "admission_max_concurrency", 4)
+    monkeypatch.setattr(settings, "admission_latency_target_seconds", 1.0)
+    monkeypatch.setattr(settings, "admission_latency_targets", {"/webhooks/whatsapp/graph": 20.0})
+    monkeypatch.setattr(settings, "admission_route_limits", {"cook_assistant": 1})
+
+
+class TestAIMDLimiter:
+    """Test additive increase, multiplicative decrease and the limit bounds"""
+
+    def test_initial_limit_is_clamped(self):
+        assert AIMDLimiter("test", initial=100, minimum=1, maximum=8).limit == 8
+        assert AIMDLimiter("test", initial=0, minimum=2, maximum=8).limit == 2
+
+    def test_successes_raise_the_limit_by_about_one_per_window(self):
+        limiter = AIMDLimiter("test", initial=4, maximum=32)
+
+        async def scenario():
+            for _ in range(4):
+                assert limiter.try_acquire()
+                await limiter.release(SUCCESS)
+
+        asyncio.run(scenario())
+        assert limiter.limit == 4  # 4 + 1/4 + ... is just short of 5
+        asyncio.run(scenario())
+        assert limiter.limit == 5
+
+    def test_overload_halves_the_limit_down_to_the_minimum(self):
+        limiter = AIMDLimiter("test", initial=8, minimum=3)
+
+        async def overload():
+            limiter.try_acquire()
+            await limiter.release(OVERLOAD)
+
+        asyncio.run(overload())
+        assert limiter.limit == 4
+        asyncio.run(overload())
+        assert limiter.limit == 3
+
+    def test_overloads_from_one_window_decrease_once(self):
+        limiter = AIMDLimiter("test", initial=8, minimum=1)
+
+        async def scenario():
+            started = time.monotonic()
+            for _ in range(4):
+                assert limiter.try_acquire()
+            for _ in range(4):
+                await limiter.release(OVERLOAD, started=started)
+            # Admitted after the cut: a new window, so it may cut again
+            assert limiter.try_acquire()
+            await limiter.release(OVERLOAD, started=time.monotonic())
+
+        asyncio.run(scenario())
+        assert limiter.limit == 2
+
+    def test_limit_never_exceeds_the_maximum(self):
+        limiter = AIMDLimiter("test", initial=2, maximum=2)
+
+        async def scenario():
+            for _ in range(10):
+                limiter.try_acquire()
+                await limiter.release(SUCCESS)
+
+        asyncio.run(scenario())
+        assert limiter.limit == 2
+
+    def test_unrelated_error_leaves_the_limit_alone(self):
+        limiter = AIMDLimiter("test", initial=4)
+
+        async def scenario():
+            limiter.try_acquire()
+            await limiter.release(ERROR)
+
+        asyncio.run(scenario())
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    def test_try_acquire_refuses_at_the_limit(self):
+        limiter = AIMDLimiter("test", initial=1)
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+
+    def test_acquire_waits_for_a_release(self):
+        limiter = AIMDLimiter("test", initial=1)
+
+        async def scenario():
+            await limiter.acquire()
+            waiting = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            assert not waiting.done()
+            await limiter.release(SUCCESS)
+            await asyncio.wait_for(waiting, timeout=1)
+            assert limiter.in_flight == 1
+
+        asyncio.run(scenario())
+
+
+class TestAdmissionController:
+    """Test latency feedback into the global limit and the per-route caps"""
+
+    def test_slow_request_cuts_the_limit(self, limits):
+        controller = AdmissionController()
+
+        async def scenario():
+            assert controller.try_admit()
+            await controller.complete("/webhooks/whatsapp", time.monotonic() - 5.0, failed=False)
+
+        asyncio.run(scenario())
+        assert controller.limiter.limit == 1
+
+    def test_failed_request_cuts_the_limit(self, limits):
+        controller = AdmissionController()
+
+        async def scenario():
+            assert controller.try_admit()
+            await controller.complete("/webhooks/whatsapp", time.monotonic(), failed=True)
+
+        asyncio.run(scenario())
+        assert controller.limiter.limit == 1
+
+    def test_steady_graph_traffic_above_the_default_target_keeps_the_limit(self, limits, monkeypatch):
+        monkeypatch.setattr(settings, "admission_max_concurrency", 8)
+        controller = AdmissionController()
+
+        async def scenario():
+            # Graph runs take 12-20s, well over the 1s default target but within the path's own
+            for _ in range(20):
+                assert controller.try_admit()
+                assert controller.try_admit()
+                started = time.monotonic() - 15.0
+                await controller.complete("/webhooks/whatsapp/graph", started, failed=False)
+                await controller.complete("/webhooks/whatsapp/graph", started, failed=False)
+
+        asyncio.run(scenario())
+        assert controller.limiter.limit >= 2
+
+    def test_steady_slow_traffic_cuts_once_per_window(self, limits, monkeypatch):
+        monkeypatch.setattr(settings, "admission_initial_concurrency", 4)
+        monkeypatch.setattr(settings, "admission_max_concurrency", 8)
+        controller = AdmissionController()
+
+        async def scenario():
+            # A full window admitted together and all over target is one overload signal
+            started = time.monotonic() - 5.0
+            for _ in range(4):
+                assert controller.try_admit()
+            for _ in range(4):
+                await controller.complete("/webhooks/whatsapp", started, failed=False)
+
+        asyncio.run(scenario())
+        assert controller.limiter.limit == 2
+
+    def test_requests_beyond_the_limit_are_shed(self, limits):
+        controller = AdmissionController()
+        assert controller.try_admit()
+        assert controller.try_admit()
+        assert not controller.try_admit()
+
+    def test_route_cap(self, limits):
+        controller = AdmissionController()
+        with controller.route("cook_assistant"):
+            with pytest.raises(AdmissionRejected):
+                with controller.route("cook_assistant"):
+                    pass
+            with controller.route("onboarding"):  # no cap configured
+                pass
+        with controller.route("cook_assistant"):
+            pass
+
+    def test_route_cap_is_off_when_admission_is_disabled(self, limits, monkeypatch):
+        monkeypatch.setattr(settings, "admission_enabled", False)
+        controller = AdmissionController()
+        with controller.route("cook_assistant"):
+            with controller.route("cook_assistant"):
+                pass
+
+
+class TestAdmissionMiddleware:
+    """Test that the middleware sheds webhook requests and reports their outcome"""
+
+    @staticmethod
+    def _run(middleware, path="/webhooks/whatsapp"):
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(middleware({"type": "http", "path": path, "headers": []}, receive, send))
+        return sent[0]["status"]
+
+    @staticmethod
+    def _app(status):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        return app
+
+    def test_full_limit_answers_429(self, limits, monkeypatch):
+        controller = AdmissionController()
+        monkeypatch.setattr(admission_module, "admission", controller)
+        controller.try_admit()
+        controller.try_admit()
+        assert self._run(AdmissionMiddleware(self._app(200))) == 429
+        assert self._run(AdmissionMiddleware(self._app(200)), path="/health") == 200
+
+    def test_server_error_is_fed_back_as_overload(self, limits, monkeypatch):
+        controller = AdmissionController()
+        monkeypatch.setattr(admission_module, "admission", controller)
+        assert self._run(AdmissionMiddleware(self._app(503))) == 503
+        assert controller.limiter.limit == 1
+        assert controller.limiter.in_flight == 0
@@ -0,0 +1,137 @@
+import uuid
+from pathlib import Path
+
+import pytest
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.graph.agentcore import aws, factory
+from src.bettermeals.graph.agentcore.profile import AgentProfile
+from src.bettermeals.graph.agentcore.runtime import token_manager
+from src.bettermeals.utils import shared_cache
+from src.bettermeals.utils.shared_cache import LocalKVClient, TwoTierCache
+
+
+def _profile(ssm_prefix: str = "/app/test") -> AgentProfile:
+    return AgentProfile(
+        name=f"test_agent_{uuid.uuid4().hex[:8]}",
+        display_name="Test Agent",
+        ssm_prefix=ssm_prefix,
+        implementation_env="TEST_AGENT_IMPLEMENTATION",
+        model_id="test-model",
+        system_prompt="",
+        memory_id=lambda: "memory",
+        config_dir=Path("."),
+    )
+
+
+class FakeSSM:
+    """SSM client over a dict of name -> (value, type) that counts reads"""
+
+    def __init__(self, parameters):
+        self.parameters = parameters
+        self.reads = []
+
+    def get_parameter(self, Name, WithDecryption):
+        self.reads.append(Name)
+        value, kind = self.parameters[Name]
+        return {"Parameter": {"Name": Name, "Value": value, "Type": kind}}
+
+    def put_parameter(self, Name, Value, Type, Overwrite):
+        self.parameters[Name] = (Value, Type)
+
+
+@pytest.fixture
+def kv(monkeypatch):
+    client = LocalKVClient()
+    monkeypatch.setattr(settings, "shared_cache_url", "local")
+    monkeypatch.setattr(settings, "shared_cache_secret", "test-secret")
+    monkeypatch.setattr(shared_cache, "_client", client)
+    return client
+
+
+@pytest.fixture
+def ssm(monkeypatch, kv):
+    fake = FakeSSM({
+        "/app/test/agentcore/gateway_url": ("https://gateway", "String"),
+        "/app/test/agentcore/cognito_secret": ("s3cret", "SecureString"),
+    })
+    monkeypatch.setattr(aws, "_ssm_client", fake)
+    monkeypatch.setattr(aws, "_parameters", {})
+    monkeypatch.setattr(aws, "_shared_parameters", TwoTierCache("ssm", ttl=3600.0))
+    return fake
+
+
+def _new_process(monkeypatch):
+    """Another worker: empty process caches, same shared tier"""
+    monkeypatch.setattr(aws, "_parameters", {})
+    monkeypatch.setattr(aws, "_shared_parameters", TwoTierCache("ssm", ttl=3600.0))
+
+
+class TestSSMParameters:
+    """Test which SSM values are cached where"""
+
+    def test_secure_string_never_reaches_the_shared_tier(self, ssm, kv, monkeypatch):
+        assert aws.get_ssm_parameter("/app/test/agentcore/cognito_secret") == "s3cret"
+        assert aws.get_ssm_parameter("/app/test/agentcore/cognito_secret") == "s3cret"
+        assert ssm.reads == ["/app/test/agentcore/cognito_secret"]
+        assert kv.get("ssm:/app/test/agentcore/cognito_secret|True") is None
+
+        _new_process(monkeypatch)
+        aws.get_ssm_parameter("/app/test/agentcore/cognito_secret")
+        assert len(ssm.reads) == 2
+
+    def test_plain_string_is_shared_across_workers(self, ssm, kv, monkeypatch):
+        assert aws.get_ssm_parameter("/app/test/agentcore/gateway_url") == "https://gateway"
+        assert kv.get("ssm:/app/test/agentcore/gateway_url|True") is not None
+
+        _new_process(monkeypatch)
+        assert aws.get_ssm_parameter("/app/test/agentcore/gateway_url") == "https://gateway"
+        assert ssm.reads == ["/app/test/agentcore/gateway_url"]
+
+    def test_put_drops_the_cached_value(self, ssm):
+        aws.get_ssm_parameter("/app/test/agentcore/gateway_url")
+        aws.put_ssm_parameter("/app/test/agentcore/gateway_url", "https://gateway-2")
+        assert aws.get_ssm_parameter("/app/test/agentcore/gateway_url") == "https://gateway-2"
+
+        aws.get_ssm_parameter("/app/test/agentcore/cognito_secret")
+        aws.put_ssm_parameter("/app/test/agentcore/cognito_secret", "rotated", with_encryption=True)
+        assert aws.get_ssm_parameter("/app/test/agentcore/cognito_secret") == "rotated"
+
+
+class TestSharedClients:
+    """Test that token managers and agent clients are created once and reused"""
+
+    @pytest.fixture
+    def cognito(self, monkeypatch):
+        values = {
+            "/app/cook/agentcore/machine_client_id": "client-1",
+            "/app/user/agentcore/machine_client_id": "client-1",
+            "/app/other/agentcore/machine_client_id": "client-2",
+        }
+
+        def get_parameter(name, with_decryption=True):
+            if name.endswith("machine_client_id"):
+                return values[name]
+            return {"cognito_token_url": "https://auth/token", "cognito_auth_scope": "agents", "cognito_secret": "s"}[name.rsplit("/", 1)[1]]
+
+        monkeypatch.setattr(token_manager, "get_ssm_parameter", get_parameter)
+        monkeypatch.setattr(token_manager, "_managers", {})
+
+    def test_agents_on_one_cognito_client_share_a_token_manager(self, cognito):
+        cook = token_manager.get_runtime_token_manager(_profile("/app/cook"))
+        user = token_manager.get_runtime_token_manager(_profile("/app/user"))
+        other = token_manager.get_runtime_token_manager(_profile("/app/other"))
+        assert cook is user
+        assert other is not cook
+
+    def test_agent_client_is_created_once(self, monkeypatch):
+        created = []
+        monkeypatch.setattr(factory, "_clients", {})
+        monkeypatch.setattr(settings, "agent_failover_enabled", False)
+        monkeypatch.setattr(factory, "create_agent_client", lambda profile, impl, name: created.append(profile.name) or object())
+
+        profile = _profile()
+        client = factory.get_agent_client(profile)
+        assert factory.get_agent_client(profile) is client
+        assert factory.get_agent_client(profile, implementation="mcp") is not client
+        assert len(created) == 2
@@ -0,0 +1,166 @@
+import asyncio
+import uuid
+from pathlib import Path
+
+import pytest
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.graph.agentcore.health import (
+    AgentUnavailableError,
+    FailoverAgentClient,
+    ImplementationHealth,
+    get_health,
+)
+from src.bettermeals.graph.agentcore.profile import AgentProfile
+from src.bettermeals.utils.deadline import DeadlineExceeded
+
+
+def _profile() -> AgentProfile:
+    """Fresh agent name per test so health state does not leak between tests"""
+    return AgentProfile(
+        name=f"test_agent_{uuid.uuid4().hex[:8]}",
+        display_name="Test Agent",
+        ssm_prefix="/app/test",
+        implementation_env="TEST_AGENT_IMPLEMENTATION",
+        model_id="test-model",
+        system_prompt="",
+        memory_id=lambda: "memory",
+        config_dir=Path("."),
+    )
+
+
+class FakeAgent:
+    """Agent client that answers, fails or hangs"""
+
+    def __init__(self, reply="ok", error=None, delay=0.0):
+        self.reply = reply
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def invoke(self, prompt, actor_id, session_id, context=None, timeout=None):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.reply
+
+
+@pytest.fixture
+def slo(monkeypatch):
+    monkeypatch.setattr(settings, "agent_slo_min_samples", 3)
+    monkeypatch.setattr(settings, "agent_slo_error_rate", 0.5)
+    monkeypatch.setattr(settings, "agent_slo_latency_seconds", 1.0)
+    monkeypatch.setattr(settings, "agent_breaker_reset_seconds", 0.0)
+    monkeypatch.setattr(settings, "agent_min_attempt_seconds", 0.05)
+
+
+def _open(health: ImplementationHealth) -> None:
+    for _ in range(3):
+        health.record(0.1, ok=False)
+
+
+class TestImplementationHealth:
+    """Test the SLO breaker of one implementation"""
+
+    def test_error_rate_opens_after_min_samples(self, slo, monkeypatch):
+        monkeypatch.setattr(settings, "agent_breaker_reset_seconds", 60.0)
+        health = ImplementationHealth("agent", "runtime")
+        health.record(0.1, ok=False)
+        health.record(0.1, ok=False)
+        assert health.state == ImplementationHealth.CLOSED
+        health.record(0.1, ok=True)
+        assert health.state == ImplementationHealth.OPEN
+        assert not health.try_acquire()
+
+    def test_p95_latency_opens(self, slo):
+        health = ImplementationHealth("agent", "runtime")
+        for _ in range(3):
+            health.record(5.0, ok=True)
+        assert health.state == ImplementationHealth.OPEN
+
+    def test_half_open_allows_one_probe_and_success_closes(self, slo):
+        health = ImplementationHealth("agent", "runtime")
+        _open(health)
+        assert health.try_acquire()
+        assert health.state == ImplementationHealth.HALF_OPEN
+        assert not health.try_acquire()
+        health.record(0.1, ok=True)
+        assert health.state == ImplementationHealth.CLOSED
+
+    def test_released_probe_can_be_claimed_again(self, slo):
+        health = ImplementationHealth("agent", "runtime")
+        _open(health)
+        health.try_acquire()
+        health.release_probe()
+        assert health.try_acquire()
+
+
+class TestFailoverAgentClient:
+    """Test failover and probe bookkeeping across implementations"""
+
+    def test_fails_over_to_the_other_implementation(self, slo):
+        runtime, mcp = FakeAgent(error=RuntimeError("boom")), FakeAgent(reply="from mcp")
+        client = FailoverAgentClient(_profile(), {"runtime": runtime, "mcp": mcp}, preferred="runtime")
+        assert asyncio.run(client.invoke("hi", "actor", "session", timeout=5)) == "from mcp"
+        assert runtime.calls == 1
+
+    def test_open_implementation_is_skipped(self, slo, monkeypatch):
+        monkeypatch.setattr(settings, "agent_breaker_reset_seconds", 60.0)
+        profile = _profile()
+        _open(get_health(profile.name, "runtime"))
+        runtime, mcp = FakeAgent(), FakeAgent(reply="from mcp")
+        client = FailoverAgentClient(profile, {"runtime": runtime, "mcp": mcp}, preferred="runtime")
+        assert asyncio.run(client.invoke("hi", "actor", "session", timeout=5)) == "from mcp"
+        assert runtime.calls == 0
+
+    def test_cancelled_probe_releases_the_implementation(self, slo):
+        profile = _profile()
+        health = get_health(profile.name, "runtime")
+        _open(health)
+        client = FailoverAgentClient(profile, {"runtime": FakeAgent(delay=10)}, preferred="runtime")
+
+        async def cancel_mid_probe():
+            task = asyncio.create_task(client.invoke("hi", "actor", "session", timeout=5))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_mid_probe())
+        assert health.state == ImplementationHealth.HALF_OPEN
+        assert health.try_acquire()
+
+    def test_spent_deadline_is_not_blamed_on_the_implementation(self, slo):
+        profile = _profile()
+        runtime = FakeAgent()
+        client = FailoverAgentClient(profile, {"runtime": runtime}, preferred="runtime")
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(client.invoke("hi", "actor", "session", timeout=0))
+        assert runtime.calls == 0
+        assert len(get_health(profile.name, "runtime")._samples) == 0
+
+    def test_timeout_within_a_starved_budget_is_not_a_failure(self, slo, monkeypatch):
+        monkeypatch.setattr(settings, "agent_min_attempt_seconds", 1.0)
+        profile = _profile()
+        client = FailoverAgentClient(profile, {"runtime": FakeAgent(delay=1)}, preferred="runtime")
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(client.invoke("hi", "actor", "session", timeout=0.02))
+        assert len(get_health(profile.name, "runtime")._samples) == 0
+
+    def test_timeout_within_a_fair_budget_counts(self, slo):
+        profile = _profile()
+        client = FailoverAgentClient(profile, {"runtime": FakeAgent(delay=1)}, preferred="runtime")
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(client.invoke("hi", "actor", "session", timeout=0.1))
+        samples = get_health(profile.name, "runtime")._samples
+        assert [ok for _, _, ok in samples] == [False]
+
+    def test_no_available_implementation(self, slo, monkeypatch):
+        monkeypatch.setattr(settings, "agent_breaker_reset_seconds", 60.0)
+        profile = _profile()
+        _open(get_health(profile.name, "runtime"))
+        client = FailoverAgentClient(profile, {"runtime": FakeAgent()}, preferred="runtime")
+        with pytest.raises(AgentUnavailableError):
+            asyncio.run(client.invoke("hi", "actor", "session", timeout=5))
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.graph.agentcore.scheduler import AgentBusyError, FairScheduler
+
+
+@pytest.fixture
+def caps(monkeypatch):
+    monkeypatch.setattr(settings, "agent_max_concurrency", 1)
+    monkeypatch.setattr(settings, "agent_model_concurrency", 1)
+    monkeypatch.setattr(settings, "agent_actor_concurrency", 1)
+    monkeypatch.setattr(settings, "agent_actor_max_queued", 5)
+    monkeypatch.setattr(settings, "agent_max_queue_seconds", 5.0)
+    monkeypatch.setattr(settings, "agent_min_attempt_seconds", 1.0)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestFairScheduler:
+    """Test caps, fair ordering and shedding of agent invocations"""
+
+    def test_call_under_caps_starts_immediately(self, caps):
+        async def scenario():
+            scheduler = FairScheduler()
+            async with scheduler.slot("a", "model"):
+                assert scheduler._running == 1
+            assert scheduler._running == 0
+
+        asyncio.run(scenario())
+
+    def test_actors_take_turns(self, caps):
+        """Ten queued messages from one actor do not starve another actor"""
+        order = []
+
+        async def call(scheduler, actor):
+            async with scheduler.slot(actor, "model"):
+                order.append(actor)
+                await asyncio.sleep(0)
+
+        async def scenario():
+            scheduler = FairScheduler()
+            await scheduler.acquire("x", "model")
+            tasks = [asyncio.create_task(call(scheduler, "a")) for _ in range(3)]
+            await _settle()
+            tasks.append(asyncio.create_task(call(scheduler, "b")))
+            await _settle()
+            scheduler.release("x", "model")
+            await asyncio.gather(*tasks)
+
+        asyncio.run(scenario())
+        assert order == ["a", "b", "a", "a"]
+
+    def test_busy_model_does_not_block_another_model(self, caps, monkeypatch):
+        monkeypatch.setattr(settings, "agent_max_concurrency", 2)
+        started = []
+
+        async def scenario():
+            scheduler = FairScheduler()
+            await scheduler.acquire("a", "claude")
+            waiting = asyncio.create_task(scheduler.acquire("b", "claude"))
+            await _settle()
+            await scheduler.acquire("c", "nova")
+            started.append("c")
+            assert not waiting.done()
+            scheduler.release("a", "claude")
+            await waiting
+            started.append("b")
+
+        asyncio.run(scenario())
+        assert started == ["c", "b"]
+
+    def test_full_actor_queue_is_shed(self, caps, monkeypatch):
+        monkeypatch.setattr(settings, "agent_actor_max_queued", 1)
+
+        async def scenario():
+            scheduler = FairScheduler()
+            await scheduler.acquire("a", "model")
+            queued = asyncio.create_task(scheduler.acquire("a", "model"))
+            await _settle()
+            with pytest.raises(AgentBusyError) as error:
+                await scheduler.acquire("a", "model")
+            queued.cancel()
+            return error.value.reason
+
+        assert asyncio.run(scenario()) == "actor_queue_full"
+
+    def test_queued_call_times_out(self, caps, monkeypatch):
+        monkeypatch.setattr(settings, "agent_max_queue_seconds", 0.01)
+
+        async def scenario():
+            scheduler = FairScheduler()
+            await scheduler.acquire("a", "model")
+            with pytest.raises(AgentBusyError) as error:
+                await scheduler.acquire("b", "model")
+            assert scheduler._queue == []
+            return error.value.reason
+
+        assert asyncio.run(scenario()) == "queue_timeout"
+
+    def test_deadline_too_short_to_queue_is_shed(self, caps):
+        async def scenario():
+            scheduler = FairScheduler()
+            await scheduler.acquire("a", "model")
+            with pytest.raises(AgentBusyError) as error:
+                await scheduler.acquire("b", "model", timeout=0.5)
+            return error.value.reason
+
+        assert asyncio.run(scenario()) == "deadline"
+
+    def test_cancelled_waiter_leaves_the_queue(self, caps):
+        async def scenario():
+            scheduler = FairScheduler()
+            await scheduler.acquire("a", "model")
+            waiting = asyncio.create_task(scheduler.acquire("b", "model"))
+            await _settle()
+            waiting.cancel()
+            await _settle()
+            assert scheduler._queue == []
+            scheduler.release("a", "model")
+            assert scheduler._running == 0
+
+        asyncio.run(scenario())
@@ -0,0 +1,58 @@
+import pytest
+
+from src.bettermeals.graph.approvals import Decision, parse_decision
+from src.bettermeals.graph.streaming import pending_action_from
+
+OPTIONS = ["Kale", "Methi"]
+
+
+class TestParseDecision:
+    """Test deterministic parsing of replies to a pending approval"""
+
+    @pytest.mark.parametrize("reply", ["yes", "Yes!", "ok", "go ahead", "theek hai", "👍", "  Sure. "])
+    def test_yes(self, reply):
+        assert parse_decision(reply) == Decision(approved=True)
+
+    @pytest.mark.parametrize("reply", ["no", "No.", "nope", "don't", "not now", "nahi", "❌"])
+    def test_no(self, reply):
+        assert parse_decision(reply) == Decision(approved=False)
+
+    @pytest.mark.parametrize("reply", ["methi", "METHI", "Methi please", "i'll take methi"])
+    def test_option_by_name(self, reply):
+        assert parse_decision(reply, OPTIONS) == Decision(approved=True, choice="Methi")
+
+    def test_option_by_number(self):
+        assert parse_decision("1", OPTIONS) == Decision(approved=True, choice="Kale")
+        assert parse_decision("2", OPTIONS) == Decision(approved=True, choice="Methi")
+
+    def test_out_of_range_number_is_ambiguous(self):
+        assert parse_decision("3", OPTIONS) is None
+
+    def test_no_with_an_option_is_not_a_choice(self):
+        assert parse_decision("no methi", OPTIONS) is None
+
+    def test_plain_no_declines_a_choice(self):
+        assert parse_decision("no", OPTIONS) == Decision(approved=False)
+
+    @pytest.mark.parametrize("reply", ["kale or methi", "maybe", "what's methi?", "yes but change tuesday", ""])
+    def test_ambiguous(self, reply):
+        assert parse_decision(reply, OPTIONS if "methi" in reply else None) is None
+
+    def test_question_is_not_a_decision(self):
+        assert parse_decision("yes?") is None
+
+    def test_option_must_match_a_whole_word(self):
+        assert parse_decision("methiwala", OPTIONS) is None
+
+
+class TestPendingActionFrom:
+    """Test reading the pending action from interrupt values"""
+
+    def test_dict_value(self):
+        assert pending_action_from({"pending_action": "approve_checkout"}) == "approve_checkout"
+
+    def test_first_of_a_list(self):
+        assert pending_action_from([{"pending_action": "approve_plan"}, {"pending_action": "x"}]) == "approve_plan"
+
+    def test_empty(self):
+        assert pending_action_from([]) is None
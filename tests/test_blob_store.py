@@ -0,0 +1,139 @@
+import asyncio
+import os
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from src.bettermeals.graph.blob_store import (
+    EXPIRED_CONTENT,
+    BlobCheckpointSaver,
+    BlobStore,
+    LocalBlobBackend,
+    OffloadingSerializer,
+)
+
+THRESHOLD = 1024
+PLAN = "Monday: oatmeal, salad, salmon. " * 100
+
+
+class RecordingBackend(LocalBlobBackend):
+    """Local backend that records which threads did blob I/O"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.threads = []
+
+    def write(self, digest, data):
+        self.threads.append(threading.current_thread())
+        super().write(digest, data)
+
+
+def _serializer(tmp_path, ttl_seconds=3600.0):
+    store = BlobStore(RecordingBackend(str(tmp_path)), cache_entries=16, ttl_seconds=ttl_seconds)
+    return OffloadingSerializer(store, THRESHOLD)
+
+
+def _blob_files(root):
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+class TestOffloadingSerializer:
+    """Test per-message offload of large contents in checkpoint values"""
+
+    def test_large_message_content_becomes_a_reference(self, tmp_path):
+        serde = _serializer(tmp_path)
+        messages = [HumanMessage("plan my week"), ToolMessage(PLAN, tool_call_id="call-1", name="bm_recommend_meals")]
+        type_, data = serde.dumps_typed(messages)
+        assert len(data) < len(PLAN)
+        restored = serde.loads_typed((type_, data))
+        assert [m.content for m in restored] == ["plan my week", PLAN]
+        assert restored[1].additional_kwargs == {}
+
+    def test_small_messages_stay_inline(self, tmp_path):
+        serde = _serializer(tmp_path)
+        serde.dumps_typed([HumanMessage("hi"), AIMessage("hello")])
+        assert _blob_files(tmp_path) == []
+
+    def test_growing_history_stores_each_large_message_once(self, tmp_path):
+        serde = _serializer(tmp_path)
+        messages = [ToolMessage(PLAN, tool_call_id="call-1")]
+        for turn in range(5):
+            messages = messages + [HumanMessage(f"turn {turn}"), AIMessage(PLAN + str(turn))]
+            serde.dumps_typed(messages)
+        assert len(_blob_files(tmp_path)) == 6
+
+    def test_single_message_write_is_offloaded(self, tmp_path):
+        serde = _serializer(tmp_path)
+        restored = serde.loads_typed(serde.dumps_typed(AIMessage(PLAN)))
+        assert restored.content == PLAN
+        assert len(_blob_files(tmp_path)) == 1
+
+    def test_non_message_values_are_untouched(self, tmp_path):
+        serde = _serializer(tmp_path)
+        value = {"pending_options": ["methi", "palak"], "big": PLAN}
+        assert serde.loads_typed(serde.dumps_typed(value)) == value
+        assert _blob_files(tmp_path) == []
+
+
+class TestBlobExpiry:
+    """Test that unreferenced blobs are collected and referenced ones survive"""
+
+    def _age(self, root, seconds):
+        past = time.time() - seconds
+        for directory, _, names in os.walk(root):
+            for name in names:
+                os.utime(os.path.join(directory, name), (past, past))
+
+    def test_collect_deletes_only_old_blobs(self, tmp_path):
+        serde = _serializer(tmp_path, ttl_seconds=60)
+        serde.dumps_typed(AIMessage(PLAN))
+        self._age(tmp_path, 120)
+        serde.dumps_typed(AIMessage(PLAN + "fresh"))
+        assert serde.store.collect() == 1
+        assert len(_blob_files(tmp_path)) == 1
+
+    def test_rereferencing_refreshes_the_age(self, tmp_path):
+        serde = _serializer(tmp_path, ttl_seconds=60)
+        serde.dumps_typed(AIMessage(PLAN))
+        self._age(tmp_path, 120)
+        serde.store._known.clear()  # as in another process, or after half a TTL
+        serde.dumps_typed(AIMessage(PLAN))
+        assert serde.store.collect() == 0
+
+    def test_expired_blob_restores_a_placeholder(self, tmp_path):
+        serde = _serializer(tmp_path, ttl_seconds=60)
+        data = serde.dumps_typed([HumanMessage("hi"), AIMessage(PLAN)])
+        self._age(tmp_path, 120)
+        serde.store.collect()
+        serde.store._cache.clear()
+        restored = serde.loads_typed(data)
+        assert [m.content for m in restored] == ["hi", EXPIRED_CONTENT]
+
+
+class TestBlobCheckpointSaver:
+    """Test that checkpoint serialization, and so blob I/O, runs off the event loop"""
+
+    def test_graph_run_writes_blobs_off_the_loop(self, tmp_path):
+        serde = _serializer(tmp_path)
+        saver = BlobCheckpointSaver(serde=serde)
+
+        def tool_node(state):
+            return {"messages": [AIMessage(PLAN)]}
+
+        builder = StateGraph(MessagesState)
+        builder.add_node("plan", tool_node)
+        builder.add_edge(START, "plan")
+        builder.add_edge("plan", END)
+        graph = builder.compile(checkpointer=saver)
+        config = {"configurable": {"thread_id": "t1"}}
+
+        async def scenario():
+            await graph.ainvoke({"messages": [HumanMessage("plan")]}, config)
+            return await graph.aget_state(config)
+
+        state = asyncio.run(scenario())
+        assert state.values["messages"][-1].content == PLAN
+        assert serde.store.backend.threads
+        assert threading.main_thread() not in serde.store.backend.threads
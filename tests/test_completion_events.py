@@ -0,0 +1,101 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.graph import completion_events as completion_module
+from src.bettermeals.graph.completion_events import CompletionEvents
+from src.bettermeals.utils import outbound
+from src.bettermeals.utils.outbound import send_whatsapp_message
+
+PHONES = ["919876543210", "919812345678"]
+
+
+def _change(doc_id, kind="ADDED"):
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=SimpleNamespace(id=doc_id))
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def events(monkeypatch):
+    db = MagicMock()
+    db.get_household_phone_numbers.return_value = PHONES
+    sent = []
+    onboarding = MagicMock()
+    weekly_plan = MagicMock()
+    monkeypatch.setattr(completion_module, "get_db", lambda: db)
+    monkeypatch.setattr(completion_module, "send_whatsapp_message", lambda phone, text: sent.append((phone, text)))
+    monkeypatch.setattr(completion_module, "onboarding_service", onboarding)
+    monkeypatch.setattr(completion_module, "weekly_plan_service", weekly_plan)
+    listener = CompletionEvents()
+    listener._executor = InlineExecutor()
+    return SimpleNamespace(listener=listener, sent=sent, onboarding=onboarding, weekly_plan=weekly_plan)
+
+
+class TestCompletionEvents:
+    """Test which Firestore writes advance flows and send a proactive message"""
+
+    def test_household_created_advances_each_members_onboarding(self, events):
+        events.onboarding.handle_form_submitted.side_effect = lambda phone: f"Welcome {phone}"
+        events.listener.on_household_created("h1")
+        assert events.sent == [(phone, f"Welcome {phone}") for phone in PHONES]
+
+    def test_no_message_when_the_flow_was_not_waiting(self, events):
+        events.onboarding.handle_form_submitted.return_value = None
+        events.listener.on_household_created("h1")
+        assert events.onboarding.handle_form_submitted.call_count == 2
+        assert events.sent == []
+
+    def test_current_weeks_plan_advances_the_weekly_flow(self, events):
+        events.weekly_plan.handle_plan_submitted.return_value = "Thanks for approving"
+        events.listener.on_weekly_plan_created(f"h1-{datetime.now().strftime('%Y-%W')}")
+        events.weekly_plan.handle_plan_submitted.assert_any_call(PHONES[0], "h1")
+        assert len(events.sent) == 2
+
+    def test_other_weeks_plan_is_ignored(self, events):
+        events.listener.on_weekly_plan_created("h1-2020-01")
+        events.weekly_plan.handle_plan_submitted.assert_not_called()
+
+    def test_initial_snapshot_and_non_additions_are_skipped(self, events):
+        handled = []
+        snapshot = lambda changes: events.listener._on_snapshot("household", handled.append, [], changes, None)
+        snapshot([_change("existing")])
+        snapshot([_change("h1", "MODIFIED"), _change("h2"), _change("h3", "REMOVED")])
+        assert handled == ["h2"]
+
+    def test_handler_error_does_not_escape(self, events):
+        def failing(doc_id):
+            raise RuntimeError("firestore unavailable")
+
+        events.listener._run(failing, "h1")
+
+
+class TestSendWhatsappMessage:
+    """Test the outbound sender's result for each delivery outcome"""
+
+    def test_without_url_nothing_is_sent(self, monkeypatch):
+        monkeypatch.setattr(settings, "outbound_message_url", None)
+        post = MagicMock()
+        monkeypatch.setattr(outbound.requests, "post", post)
+        assert send_whatsapp_message("919876543210", "hi") is False
+        post.assert_not_called()
+
+    def test_posts_phone_and_text(self, monkeypatch):
+        monkeypatch.setattr(settings, "outbound_message_url", "https://outbound")
+        post = MagicMock()
+        monkeypatch.setattr(outbound.requests, "post", post)
+        assert send_whatsapp_message("919876543210", "hi") is True
+        assert post.call_args.kwargs["json"] == {"phone_number": "919876543210", "text": "hi"}
+
+    def test_failed_post_returns_false(self, monkeypatch):
+        monkeypatch.setattr(settings, "outbound_message_url", "https://outbound")
+        post = MagicMock(side_effect=requests.ConnectionError("down"))
+        monkeypatch.setattr(outbound.requests, "post", post)
+        assert send_whatsapp_message("919876543210", "hi") is False
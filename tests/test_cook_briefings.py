@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# The cook_assistant package builds its service, and with it a Firestore client, on import
+with patch("src.bettermeals.database.database.get_db", MagicMock()):
+    from src.bettermeals.graph.cook_assistant.briefings import build_briefing, render_briefing, requested_day
+
+
+class TestRequestedDay:
+    """Test which cook messages are answered from the stored brief"""
+
+    @pytest.mark.parametrize("text", [
+        "What am I cooking today?",
+        "what's for lunch today",
+        "Hi, what should I make today?",
+        "Which dishes for dinner today",
+        "today's menu",
+        "Menu for today please",
+    ])
+    def test_menu_questions_about_today(self, text):
+        assert requested_day(text) == date.today()
+
+    @pytest.mark.parametrize("text", [
+        "What do I cook tomorrow?",
+        "tomorrow's menu",
+        "what is the plan for tomorrow",
+    ])
+    def test_menu_questions_about_tomorrow(self, text):
+        assert requested_day(text) == date.today() + timedelta(days=1)
+
+    @pytest.mark.parametrize("text", [
+        "I can't cook lunch today",
+        "can I make dinner early today?",
+        "I will make dinner today",
+        "No lunch today, family is out",
+        "What can't I cook today?",
+        "what time should I make lunch today",
+        "what's the recipe for dinner today",
+        "what do I need to buy to make lunch today",
+        "today's lunch was great",
+        "what am I cooking this week",
+        "what should I cook today if the guests arrive late in the evening and want something light",
+    ])
+    def test_other_messages_go_to_the_agent(self, text):
+        assert requested_day(text) is None
+
+
+class TestBriefingText:
+    """Test rendering of a day's brief from a weekly plan"""
+
+    def test_meals_are_listed_in_meal_order(self):
+        day = date(2025, 10, 14)  # Tuesday
+        plan = {"days": [{"day": "Tuesday", "meals": [
+            {"type": "dinner", "name": "Dal"},
+            {"type": "breakfast", "name": "Poha"},
+        ]}]}
+        briefing = build_briefing({"id": "cook1", "household_id": "h1"}, day, plan)
+        assert briefing["text"].splitlines() == ["Menu for Tuesday, 14 Oct:", "- Breakfast: Poha", "- Dinner: Dal"]
+
+    def test_day_missing_from_plan_has_no_briefing(self):
+        assert build_briefing({"id": "cook1"}, date(2025, 10, 14), {"days": {"monday": []}}) is None
+
+    def test_empty_day(self):
+        assert render_briefing(date(2025, 10, 14), []) == "Nothing is planned for Tuesday."
@@ -0,0 +1,174 @@
+from enum import Enum
+
+import pytest
+
+from src.bettermeals.graph import flow_engine
+from src.bettermeals.graph.flow_engine import (
+    FlowEngine,
+    StepResult,
+    StepSpec,
+    contains_any,
+    exactly_one_of,
+)
+
+
+class Step(Enum):
+    START = "start"
+    NAME = "name"
+    FORM = "form"
+    DONE = "done"
+
+
+class FakeDB:
+    """In-memory stand-in for the flow snapshot / transition calls"""
+
+    def __init__(self):
+        self.snapshots = {}
+        self.messages = {}
+        self.records = []
+        self.fail_reads = False
+
+    def get_flow_snapshot(self, collection, phone):
+        if self.fail_reads:
+            raise RuntimeError("firestore unavailable")
+        return self.snapshots.get((collection, phone))
+
+    def get_workflow_messages(self, phone, collection):
+        return self.messages.get((collection, phone), [])
+
+    def commit_flow_transition(self, collection, phone, snapshot, records):
+        self.snapshots[(collection, phone)] = snapshot
+        self.records.extend(records)
+        return True
+
+
+class DemoFlow(FlowEngine):
+    step_enum = Step
+    initial_step = Step.START
+    transaction_collection = "demo_messages"
+
+    def get_flow_type(self):
+        return "demo"
+
+    def _initialize_steps(self):
+        return {
+            Step.START: StepSpec(handler=lambda ctx: StepResult("What's your name?", next_step=Step.NAME)),
+            Step.NAME: StepSpec(
+                handler=lambda ctx: StepResult(f"Thanks {ctx.data['name']}, please fill the form", next_step=Step.FORM),
+                capture="name",
+            ),
+            Step.FORM: StepSpec(
+                handler=self._form,
+                matcher=contains_any("done", "submitted"),
+                on_event=lambda ctx: StepResult("Got your form!", next_step=Step.DONE) if ctx.data.get("form_done") else None,
+            ),
+        }
+
+    def _form(self, ctx):
+        if ctx.matched:
+            return StepResult("All set", next_step=Step.DONE)
+        raise ValueError("form handler failed")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(flow_engine, "get_db", lambda: fake)
+    return fake
+
+
+class TestKeywordMatcher:
+    """Test compiled keyword matching"""
+
+    def test_contains_is_case_insensitive(self):
+        assert contains_any("yes", "done")("I'm DONE now")
+        assert not contains_any("yes", "done")("not yet")
+
+    def test_exact_matches_whole_reply_only(self):
+        matcher = exactly_one_of("yes", "y")
+        assert matcher("  Yes ")
+        assert not matcher("yes please")
+
+
+class TestFlowEngine:
+    """Test transitions, persistence and legacy migration of table-driven flows"""
+
+    def test_transition_captures_data_and_persists_once(self, db):
+        flow = DemoFlow()
+        db.snapshots[("demo_messages", "+1")] = {"step": "name", "data": {}, "scope": None}
+
+        response = flow.process_message("Asha", "+1")
+
+        assert response == {"reply": "Thanks Asha, please fill the form"}
+        snapshot = db.snapshots[("demo_messages", "+1")]
+        assert snapshot["step"] == "form"
+        assert snapshot["data"] == {"name": "Asha"}
+        assert [r["role"] for r in db.records] == ["user", "system", "bot"]
+        assert db.records[0]["current_step"] == "name"
+        assert db.records[1]["step_update"] is True
+
+    def test_new_user_starts_at_initial_step(self, db):
+        assert DemoFlow().process_message("hi", "+1") == {"reply": "What's your name?"}
+        assert db.snapshots[("demo_messages", "+1")]["step"] == "name"
+
+    def test_handler_error_keeps_the_step(self, db):
+        db.snapshots[("demo_messages", "+1")] = {"step": "form", "data": {"name": "Asha"}, "scope": None}
+        response = DemoFlow().process_message("what form?", "+1")
+        assert response == {"reply": DemoFlow.error_reply}
+        assert db.snapshots[("demo_messages", "+1")]["step"] == "form"
+
+    def test_matcher_result_reaches_handler(self, db):
+        db.snapshots[("demo_messages", "+1")] = {"step": "form", "data": {}, "scope": None}
+        assert DemoFlow().process_message("Submitted it", "+1") == {"reply": "All set"}
+
+    def test_unreadable_state_answers_from_first_step_without_writing(self, db):
+        db.fail_reads = True
+        assert DemoFlow().process_message("hi", "+1") == {"reply": "What's your name?"}
+        assert db.records == []
+        assert db.snapshots == {}
+
+    def test_snapshot_from_another_scope_restarts(self, db):
+        class ScopedFlow(DemoFlow):
+            def snapshot_scope(self):
+                return "2025-W02"
+
+        db.snapshots[("demo_messages", "+1")] = {"step": "form", "data": {"name": "Asha"}, "scope": "2025-W01"}
+        snapshot = ScopedFlow().load_snapshot("+1")
+        assert snapshot.step == Step.START
+        assert snapshot.data == {}
+
+    def test_invalid_stored_step_falls_back_to_initial(self, db):
+        db.snapshots[("demo_messages", "+1")] = {"step": "retired_step", "data": {}, "scope": None}
+        assert DemoFlow().get_step("+1") == Step.START
+
+    def test_legacy_history_is_migrated(self, db):
+        # Newest first, as the database returns them
+        db.messages[("demo_messages", "+1")] = [
+            {"role": "bot", "content": "Thanks Asha", "current_step": "form"},
+            {"role": "system", "step_update": True, "current_step": "form"},
+            {"role": "user", "content": "Asha", "current_step": "name"},
+            {"role": "system", "step_update": True, "current_step": "name"},
+        ]
+        snapshot = DemoFlow().load_snapshot("+1")
+        assert snapshot.step == Step.FORM
+        assert snapshot.data == {"name": "Asha"}
+
+    def test_event_moves_user_and_returns_proactive_reply(self, db):
+        db.snapshots[("demo_messages", "+1")] = {"step": "form", "data": {"name": "Asha"}, "scope": None}
+        reply = DemoFlow().handle_event("+1", {"form_done": True})
+
+        assert reply == "Got your form!"
+        snapshot = db.snapshots[("demo_messages", "+1")]
+        assert snapshot["step"] == "done"
+        assert snapshot["data"] == {"name": "Asha", "form_done": True}
+        assert db.records[-1]["proactive"] is True
+
+    def test_event_without_snapshot_is_ignored(self, db):
+        assert DemoFlow().handle_event("+1", {"form_done": True}) is None
+        assert db.snapshots == {}
+
+    def test_set_data_merges(self, db):
+        flow = DemoFlow()
+        db.snapshots[("demo_messages", "+1")] = {"step": "form", "data": {"name": "Asha"}, "scope": None}
+        flow.set_data("+1", {"city": "Pune"})
+        assert flow.get_data("+1") == {"name": "Asha", "city": "Pune"}
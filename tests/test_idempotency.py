@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from src.bettermeals.tools.idempotency import COMPLETED, IN_FLIGHT, IdempotencyLedger
+
+
+class FakeCheckout:
+    """Checkout call that records the keys it was sent"""
+
+    def __init__(self, results=None, delay=0.0):
+        self.keys = []
+        self.results = list(results or [])
+        self.delay = delay
+
+    async def __call__(self, key):
+        self.keys.append(key)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        outcome = self.results.pop(0) if self.results else {"success": True, "order_id": f"order-{len(self.keys)}"}
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class TestIdempotencyLedger:
+    """Test at-most-once checkout per household cart"""
+
+    def setup_method(self):
+        self.ledger = IdempotencyLedger("checkout")
+
+    def test_keys_are_deterministic_per_household_cart(self):
+        assert self.ledger.key_for("h1", "c1") == IdempotencyLedger("checkout").key_for("h1", "c1")
+        assert self.ledger.key_for("h1", "c1") != self.ledger.key_for("h1", "c2")
+        assert self.ledger.key_for("h1", "c1") != IdempotencyLedger("refund").key_for("h1", "c1")
+
+    def test_completed_checkout_is_replayed(self):
+        call = FakeCheckout()
+
+        async def scenario():
+            first = await self.ledger.run_once("h1", "c1", call)
+            second = await self.ledger.run_once("h1", "c1", call)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert call.keys == [self.ledger.key_for("h1", "c1")]
+        assert second == {**first, "replayed": True}
+
+    def test_concurrent_duplicates_share_one_call(self):
+        call = FakeCheckout(delay=0.01)
+
+        async def scenario():
+            return await asyncio.gather(*(self.ledger.run_once("h1", "c1", call) for _ in range(3)))
+
+        results = asyncio.run(scenario())
+        assert len(call.keys) == 1
+        assert {result["order_id"] for result in results} == {"order-1"}
+        assert sum(1 for result in results if result.get("replayed")) == 2
+
+    def test_failed_attempt_retries_with_the_same_key(self):
+        call = FakeCheckout(results=[RuntimeError("backend down")])
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                await self.ledger.run_once("h1", "c1", call)
+            assert self.ledger.get(self.ledger.key_for("h1", "c1")) is None
+            return await self.ledger.run_once("h1", "c1", call)
+
+        result = asyncio.run(scenario())
+        assert result["order_id"] == "order-2"
+        assert call.keys[0] == call.keys[1]
+
+    def test_unsuccessful_result_is_not_recorded(self):
+        call = FakeCheckout(results=[{"success": False, "error": "payment declined"}])
+
+        async def scenario():
+            await self.ledger.run_once("h1", "c1", call)
+            return await self.ledger.run_once("h1", "c1", call)
+
+        result = asyncio.run(scenario())
+        assert result["success"] is True
+        assert len(call.keys) == 2
+
+    def test_sqlite_ledger_survives_restart(self, tmp_path):
+        path = str(tmp_path / "ledger.sqlite")
+        call = FakeCheckout()
+        first = asyncio.run(IdempotencyLedger("checkout", sqlite_path=path).run_once("h1", "c1", call))
+
+        restarted = IdempotencyLedger("checkout", sqlite_path=path)
+        record = restarted.get(restarted.key_for("h1", "c1"))
+        assert record == {"status": COMPLETED, "result": first}
+        assert asyncio.run(restarted.run_once("h1", "c1", call))["replayed"] is True
+        assert len(call.keys) == 1
+
+    def test_interrupted_attempt_is_resent_with_its_key(self, tmp_path):
+        path = str(tmp_path / "ledger.sqlite")
+        crashed = IdempotencyLedger("checkout", sqlite_path=path)
+        key = crashed.key_for("h1", "c1")
+        crashed._write(key, IN_FLIGHT, None)
+
+        call = FakeCheckout()
+        result = asyncio.run(IdempotencyLedger("checkout", sqlite_path=path).run_once("h1", "c1", call))
+        assert call.keys == [key]
+        assert "replayed" not in result
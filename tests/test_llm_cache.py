@@ -0,0 +1,152 @@
+import json
+import sqlite3
+import time
+from typing import Any, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.llms.cache import LLMResponseCache, ResponseStore, cache_key, llm_cache_for
+
+
+@tool
+def bm_order_status(order_id: str) -> dict:
+    """Look up an order."""
+    return {}
+
+
+@tool
+def bm_order_status_v2(order_id: str, include_items: bool = False) -> dict:
+    """Look up an order."""
+    return {}
+
+
+class CountingModel(BaseChatModel):
+    """Chat model that counts provider calls and supports bind_tools"""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "cache-test"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, messages: List[Any], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"answer {self.calls}"))])
+
+
+def _conversation(message_id: str, call_id: str) -> str:
+    return dumps([
+        HumanMessage("where is my order", id=message_id),
+        AIMessage("", id=f"ai-{message_id}", tool_calls=[{"name": "bm_order_status", "args": {"order_id": "o1"}, "id": call_id}]),
+        ToolMessage("packed", tool_call_id=call_id, id=f"tool-{message_id}"),
+    ])
+
+
+class TestCacheKey:
+    """Test what the response cache key does and doesn't depend on"""
+
+    def test_message_ids_and_tool_call_ids_do_not_change_the_key(self):
+        assert cache_key(_conversation("m1", "call_abc"), "llm", "model") == cache_key(_conversation("m2", "call_xyz"), "llm", "model")
+
+    def test_different_conversation_changes_the_key(self):
+        other = dumps([HumanMessage("where is my cart")])
+        assert cache_key(_conversation("m1", "c1"), "llm", "model") != cache_key(other, "llm", "model")
+
+    def test_llm_string_and_model_are_part_of_the_key(self):
+        prompt = _conversation("m1", "c1")
+        assert cache_key(prompt, "llm-a", "model") != cache_key(prompt, "llm-b", "model")
+        assert cache_key(prompt, "llm-a", "model-a") != cache_key(prompt, "llm-a", "model-b")
+
+
+class TestLLMCacheFor:
+    """Test per-agent opt-in and temperature gating"""
+
+    def test_only_opted_in_agents_get_a_cache(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_cache_agents", ["supervisor"])
+        assert isinstance(llm_cache_for("supervisor", "model", temperature=0), LLMResponseCache)
+        assert llm_cache_for("worker", "model", temperature=0) is None
+
+    def test_wildcard_opts_in_every_agent(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_cache_agents", ["*"])
+        assert llm_cache_for("worker", "model", temperature=0).agent == "worker"
+
+    def test_sampled_calls_are_never_cached(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_cache_agents", ["*"])
+        assert llm_cache_for("supervisor", "model", temperature=0.7) is None
+
+
+class TestLLMResponseCache:
+    """Test cache hits and misses through a chat model"""
+
+    def setup_method(self):
+        self.store = ResponseStore(max_entries=16, ttl_seconds=60)
+
+    def _model(self) -> CountingModel:
+        return CountingModel(cache=LLMResponseCache("supervisor", "cache-test", self.store))
+
+    def test_identical_call_is_served_from_the_cache(self):
+        model = self._model()
+        first = model.invoke([HumanMessage("hi")])
+        second = model.invoke([HumanMessage("hi")])
+        assert model.calls == 1
+        assert second.content == first.content
+
+    def test_changed_tool_schema_misses(self):
+        model = self._model()
+        model.bind_tools([bm_order_status]).invoke([HumanMessage("where is my order")])
+        model.bind_tools([bm_order_status]).invoke([HumanMessage("where is my order")])
+        assert model.calls == 1
+        model.bind_tools([bm_order_status_v2]).invoke([HumanMessage("where is my order")])
+        assert model.calls == 2
+
+
+class TestResponseStore:
+    """Test the in-memory LRU and the SQLite tier"""
+
+    @staticmethod
+    def _generations(text: str):
+        return [ChatGeneration(message=AIMessage(content=text))]
+
+    def test_sqlite_round_trip_survives_a_new_process(self, tmp_path):
+        path = str(tmp_path / "llm_cache.sqlite")
+        ResponseStore(max_entries=4, ttl_seconds=60, sqlite_path=path).put("k", self._generations("stored"))
+
+        fresh = ResponseStore(max_entries=4, ttl_seconds=60, sqlite_path=path)
+        value, tier = fresh.get("k")
+        assert tier == "sqlite"
+        assert value[0].message.content == "stored"
+        assert fresh.get("k")[1] == "memory"
+
+    def test_expired_entries_are_misses_in_both_tiers(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "llm_cache.sqlite")
+        store = ResponseStore(max_entries=4, ttl_seconds=60, sqlite_path=path)
+        store.put("k", self._generations("stored"))
+        now = time.time()
+        monkeypatch.setattr("src.bettermeals.llms.cache.time.time", lambda: now + 120)
+        assert store.get("k") == (None, None)
+        assert ResponseStore(max_entries=4, ttl_seconds=60, sqlite_path=path).get("k") == (None, None)
+
+    def test_undecodable_sqlite_entry_is_a_miss(self, tmp_path):
+        path = str(tmp_path / "llm_cache.sqlite")
+        ResponseStore(max_entries=4, ttl_seconds=60, sqlite_path=path)
+        with sqlite3.connect(path) as conn:
+            conn.execute("INSERT INTO llm_response_cache VALUES (?, ?, ?)", ("k", json.dumps(["not a generation"]), 1e12))
+        assert ResponseStore(max_entries=4, ttl_seconds=60, sqlite_path=path).get("k") == (None, None)
+
+    def test_lru_evicts_the_least_recently_used(self):
+        store = ResponseStore(max_entries=2, ttl_seconds=60)
+        store.put("a", self._generations("a"))
+        store.put("b", self._generations("b"))
+        store.get("a")
+        store.put("c", self._generations("c"))
+        assert store.get("b") == (None, None)
+        assert store.get("a")[1] == "memory"
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Any, List
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.llms.deadline import DeadlineBoundChat
+from src.bettermeals.utils.deadline import DeadlineExceeded, request_deadline
+
+
+class SlowModel(BaseChatModel):
+    """Chat model that answers after `delay` and records the timeout it was given"""
+
+    delay: float = 0.0
+    timeouts: List[Any] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.timeouts.append(kwargs.get("timeout"))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="done"))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.timeouts.append(kwargs.get("timeout"))
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="done"))])
+
+
+class BoundSlowModel(DeadlineBoundChat, SlowModel):
+    pass
+
+
+class TestDeadlineBoundChat:
+    """Test that chat model calls take their timeout from the request deadline"""
+
+    def test_without_deadline_uses_the_configured_timeout(self):
+        model = BoundSlowModel()
+        model.invoke([HumanMessage("hi")])
+        assert model.timeouts == [settings.llm_timeout_seconds]
+
+    def test_timeout_is_capped_by_the_time_left(self):
+        model = BoundSlowModel()
+        with request_deadline(2.0, "test"):
+            model.invoke([HumanMessage("hi")])
+        assert 0 < model.timeouts[0] <= 2.0
+
+    def test_slow_call_is_cancelled_when_the_deadline_runs_out(self):
+        model = BoundSlowModel(delay=5.0)
+
+        async def scenario():
+            with request_deadline(0.2, "test"):
+                await model.ainvoke([HumanMessage("hi")])
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(scenario())
+        assert time.monotonic() - started < 1.0
+
+    def test_no_call_starts_after_the_deadline(self):
+        model = BoundSlowModel()
+
+        async def scenario():
+            with request_deadline(0.0, "test"):
+                await model.ainvoke([HumanMessage("hi")])
+
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(scenario())
+        assert model.timeouts == []
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import uuid
+from typing import Any, List
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.llms import router
+from src.bettermeals.llms.router import HedgedChatModel, get_provider_health, register_provider
+from src.bettermeals.tools.retry import RetryBudget
+
+
+class FakeProvider(BaseChatModel):
+    """Chat model that answers `reply` after `delay` (or fails), streaming it word by word"""
+
+    reply: str = "ok"
+    delay: float = 0.0
+    error: bool = False
+    calls: int = 0
+    cancelled: int = 0
+    seen: List[Any] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-provider"
+
+    async def _wait(self, messages):
+        self.calls += 1
+        self.seen.append(messages)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise RuntimeError("provider down")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise NotImplementedError
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await self._wait(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield ChatGenerationChunk(message=AIMessageChunk(content=""))  # role-only chunk, as Groq sends
+        await self._wait(messages)
+        for word in self.reply.split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    monkeypatch.setattr(settings, "llm_router_min_samples", 2)
+    monkeypatch.setattr(settings, "llm_router_error_rate", 0.5)
+    monkeypatch.setattr(settings, "llm_router_cooldown_seconds", 60.0)
+    monkeypatch.setattr(router, "hedge_budget", RetryBudget(ratio=1.0))
+
+
+def _router(*models: FakeProvider, hedge_after: float = 0.05, **formatters) -> HedgedChatModel:
+    """Router over fresh provider names (so health does not leak between tests)"""
+    names = []
+    for index, model in enumerate(models):
+        name = f"fake_{index}_{uuid.uuid4().hex[:6]}"
+        register_provider(name, lambda agent, model=model: model, system_prompt=formatters.get(f"p{index}", lambda text: text))
+        names.append(name)
+    return HedgedChatModel(agent="test", providers=names, models=list(models), hedge_after=hedge_after, cache=False)
+
+
+def _ask(model, messages=None):
+    return asyncio.run(model.ainvoke(messages or [HumanMessage("hi")])).content
+
+
+class TestHedgedChatModel:
+    """Test hedging, failover, health and the hedge budget with fake providers"""
+
+    def test_fast_primary_answers_alone(self, routing):
+        primary, secondary = FakeProvider(reply="primary"), FakeProvider(reply="secondary")
+        assert _ask(_router(primary, secondary)) == "primary"
+        assert secondary.calls == 0
+
+    def test_slow_primary_is_hedged_and_cancelled(self, routing):
+        primary, secondary = FakeProvider(reply="primary", delay=5), FakeProvider(reply="secondary")
+        started = time.monotonic()
+        assert _ask(_router(primary, secondary)) == "secondary"
+        assert time.monotonic() - started < 1.0
+        assert primary.cancelled == 1
+
+    def test_error_fails_over_without_waiting_for_the_threshold(self, routing):
+        primary, secondary = FakeProvider(error=True), FakeProvider(reply="secondary")
+        started = time.monotonic()
+        assert _ask(_router(primary, secondary, hedge_after=5)) == "secondary"
+        assert time.monotonic() - started < 1.0
+
+    def test_unhealthy_provider_is_tried_last_during_cooldown(self, routing):
+        primary, secondary = FakeProvider(error=True), FakeProvider(reply="secondary")
+        model = _router(primary, secondary, hedge_after=5)
+        _ask(model)
+        _ask(model)
+        assert not get_provider_health(model.providers[0]).healthy()
+        primary.error = False
+        assert _ask(model) == "secondary"
+        assert primary.calls == 2
+
+    def test_exhausted_budget_waits_for_the_primary(self, routing, monkeypatch):
+        monkeypatch.setattr(router, "hedge_budget", RetryBudget(ratio=0.0, min_tokens=0.0))
+        primary, secondary = FakeProvider(reply="primary", delay=0.2), FakeProvider(reply="secondary")
+        assert _ask(_router(primary, secondary)) == "primary"
+        assert secondary.calls == 0
+
+    def test_all_providers_failing_raises_the_last_error(self, routing):
+        with pytest.raises(RuntimeError):
+            _ask(_router(FakeProvider(error=True), FakeProvider(error=True)))
+
+    def test_system_prompt_is_rendered_per_provider(self, routing):
+        cached = lambda text: SystemMessage(content=[{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}])
+        primary, secondary = FakeProvider(error=True), FakeProvider(reply="secondary")
+        _ask(_router(primary, secondary, p1=cached), [SystemMessage("rules"), HumanMessage("hi")])
+        assert primary.seen[0][0].content == "rules"
+        assert secondary.seen[0][0].content[0]["cache_control"] == {"type": "ephemeral"}
+
+
+class TestHedgedStreaming:
+    """Test that streams hedge on time to first chunk and reach the parent callbacks"""
+
+    @staticmethod
+    def _stream_events(model):
+        async def scenario():
+            tokens = []
+            async for event in model.astream_events([HumanMessage("hi")], version="v2"):
+                if event["event"] == "on_chat_model_stream":
+                    tokens.append((event["name"], event["data"]["chunk"].content))
+            return tokens
+
+        return asyncio.run(scenario())
+
+    def test_winner_chunks_are_streamed_as_the_routers_own(self, routing):
+        primary, secondary = FakeProvider(reply="slow answer", delay=5), FakeProvider(reply="fast answer")
+        started = time.monotonic()
+        tokens = self._stream_events(_router(primary, secondary))
+        assert time.monotonic() - started < 1.0
+        assert "".join(text for _, text in tokens) == "fast answer "
+        assert {name for name, _ in tokens} == {"HedgedChatModel"}  # losers never show up
+        assert primary.cancelled == 1
+
+    def test_stream_fails_over_before_the_first_chunk(self, routing):
+        primary, secondary = FakeProvider(error=True), FakeProvider(reply="from secondary")
+        tokens = self._stream_events(_router(primary, secondary, hedge_after=5))
+        assert "".join(text for _, text in tokens) == "from secondary "
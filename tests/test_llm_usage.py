@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+
+from src.bettermeals.llms.cache import LLMResponseCache, ResponseStore
+from src.bettermeals.telemetry.llm_usage import RESPONSE_CACHE_HIT, PromptUsageCallback
+from src.bettermeals.telemetry.metrics import metrics
+
+
+class UsageModel(BaseChatModel):
+    """Chat model that reports Anthropic-style usage for every call it makes"""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "usage-test"
+
+    def _generate(self, messages: List[Any], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        message = AIMessage(
+            content="ok",
+            usage_metadata={
+                "input_tokens": 100,
+                "output_tokens": 5,
+                "total_tokens": 105,
+                "input_token_details": {"cache_read": 80, "cache_creation": 20},
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _counters(agent):
+    return (
+        metrics.counter_value("llm.input_tokens", agent=agent),
+        metrics.counter_value("llm.cache_read_tokens", agent=agent),
+        metrics.counter_value("llm.cache_write_tokens", agent=agent),
+    )
+
+
+class TestPromptUsageCallback:
+    """Test which generations count as provider prompt usage"""
+
+    def test_provider_call_is_recorded(self):
+        generation = UsageModel()._generate([HumanMessage("hi")]).generations[0]
+        PromptUsageCallback("usage-direct").on_llm_end(LLMResult(generations=[[generation]]))
+        assert _counters("usage-direct") == (100, 80, 20)
+
+    def test_marked_cache_hit_is_skipped(self):
+        generation = UsageModel()._generate([HumanMessage("hi")]).generations[0]
+        generation.generation_info = {RESPONSE_CACHE_HIT: True}
+        PromptUsageCallback("usage-marked").on_llm_end(LLMResult(generations=[[generation]]))
+        assert _counters("usage-marked") == (0, 0, 0)
+
+    def test_response_cache_hit_is_not_counted_again(self):
+        store = ResponseStore(max_entries=8, ttl_seconds=60)
+        model = UsageModel(cache=LLMResponseCache("usage-cached", "usage-test", store))
+        config = {"callbacks": [PromptUsageCallback("usage-cached")]}
+
+        async def scenario():
+            await model.ainvoke([HumanMessage("hi")], config=config)
+            return await model.ainvoke([HumanMessage("hi")], config=config)
+
+        cached = asyncio.run(scenario())
+        assert model.calls == 1
+        assert cached.content == "ok"
+        assert _counters("usage-cached") == (100, 80, 20)
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.bettermeals.database import database as database_module
+from src.bettermeals.database.database import Database
+from src.bettermeals.database.phone_directory import (
+    ROLE_COOK,
+    ROLE_USER,
+    PhoneDirectory,
+    normalize_phone_number,
+)
+
+COOK = {"whatsapp_number": "+91 98765 43210", "household_id": "h1", "name": "Ramesh"}
+USER = {"phone_number": "9812345678", "householdId": "h1", "name": "Asha"}
+
+
+def _change(doc_id, data, kind="ADDED"):
+    document = SimpleNamespace(id=doc_id, to_dict=lambda: data)
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+
+def _loaded_directory() -> PhoneDirectory:
+    directory = PhoneDirectory(normalize_phone_number)
+    directory._on_snapshot(ROLE_COOK, [], [_change("cook-1", COOK)], None)
+    directory._on_snapshot(ROLE_USER, [], [_change("user-1", USER)], None)
+    return directory
+
+
+@pytest.fixture
+def db():
+    with patch.object(database_module, "initialize_firebase", MagicMock()):
+        database = Database()
+    database.phone_directory = _loaded_directory()
+    return database
+
+
+class TestPhoneDirectory:
+    """Test the in-memory phone index built from the cook/user listeners"""
+
+    def test_role_is_unknown_until_its_first_snapshot(self):
+        directory = PhoneDirectory(normalize_phone_number)
+        assert directory.lookup(ROLE_COOK, "919876543210") == (False, None)
+        directory._on_snapshot(ROLE_COOK, [], [], None)
+        assert directory.lookup(ROLE_COOK, "919876543210") == (True, None)
+        assert directory.lookup(ROLE_USER, "919876543210") == (False, None)
+
+    def test_lookup_normalizes_the_number(self):
+        directory = _loaded_directory()
+        known, entry = directory.lookup(ROLE_COOK, "+919876543210")
+        assert known and entry.doc_id == "cook-1"
+
+    def test_records_are_compact_with_the_collections_household_field(self):
+        directory = _loaded_directory()
+        assert directory.lookup(ROLE_COOK, "919876543210")[1].to_record() == {"id": "cook-1", "household_id": "h1"}
+        assert directory.lookup(ROLE_USER, "919812345678")[1].to_record() == {"id": "user-1", "householdId": "h1"}
+
+    def test_changed_number_moves_the_entry(self):
+        directory = _loaded_directory()
+        directory._on_snapshot(ROLE_USER, [], [_change("user-1", {**USER, "phone_number": "9000000000"}, "MODIFIED")], None)
+        assert directory.lookup(ROLE_USER, "919812345678") == (True, None)
+        assert directory.lookup(ROLE_USER, "919000000000")[1].doc_id == "user-1"
+        assert directory.phones_for_household("h1", ROLE_USER) == ["919000000000"]
+
+    def test_removed_document_leaves_the_directory(self):
+        directory = _loaded_directory()
+        directory._on_snapshot(ROLE_COOK, [], [_change("cook-1", COOK, "REMOVED")], None)
+        assert directory.lookup(ROLE_COOK, "919876543210") == (True, None)
+        assert directory.phones_for_household("h1") == ["919812345678"]
+
+    def test_subscribers_hear_changes_after_the_initial_load_only(self):
+        directory = PhoneDirectory(normalize_phone_number)
+        heard = []
+        directory.subscribe(lambda role, doc_id: heard.append((role, doc_id)))
+        directory._on_snapshot(ROLE_COOK, [], [_change("cook-1", COOK)], None)
+        directory._on_snapshot(ROLE_COOK, [], [_change("cook-2", {"whatsapp_number": "9111111111"})], None)
+        assert heard == [(ROLE_COOK, "cook-2")]
+
+
+class TestFindByPhone:
+    """Test that find_*_by_phone return the same compact record from the directory and from a query"""
+
+    def test_directory_answers_with_the_compact_record(self, db):
+        assert db.find_cook_by_phone("+91 98765 43210") == {"id": "cook-1", "household_id": "h1"}
+        assert db.find_user_by_phone("9812345678") == {"id": "user-1", "householdId": "h1"}
+        db.db.collection.assert_not_called()
+
+    def test_unknown_number_is_none_without_a_query(self, db):
+        assert db.find_user_by_phone("9999999999") is None
+        db.db.collection.assert_not_called()
+
+    def test_query_fallback_returns_the_same_shape(self, db):
+        db.phone_directory = PhoneDirectory(normalize_phone_number)  # not loaded yet
+        query = db.db.collection.return_value.where.return_value.limit.return_value
+        query.stream.return_value = [SimpleNamespace(id="user-1", to_dict=lambda: dict(USER))]
+        assert db.find_user_by_phone("9812345678") == {"id": "user-1", "householdId": "h1"}
+        query.stream.return_value = [SimpleNamespace(id="cook-1", to_dict=lambda: dict(COOK))]
+        assert db.find_cook_by_phone("9876543210") == {"id": "cook-1", "household_id": "h1"}
@@ -0,0 +1,233 @@
+import asyncio
+import uuid
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.tools import retry
+from src.bettermeals.tools.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    call_with_retries,
+    get_breaker,
+    parse_retry_after,
+)
+from src.bettermeals.utils.deadline import DeadlineExceeded
+
+NO_BACKOFF = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0, max_retry_after=5.0)
+
+
+def _response(status: int, headers: dict = None) -> httpx.Response:
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", "https://api.test/x"))
+
+
+def _status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    response = _response(status, headers)
+    return httpx.HTTPStatusError(f"{status}", request=response.request, response=response)
+
+
+def _url() -> str:
+    """Fresh endpoint per test so breakers do not leak between tests"""
+    return f"https://api.test/{uuid.uuid4().hex}"
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("ep", failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker("ep", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_a_single_probe(self):
+        breaker = CircuitBreaker("ep", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.before_call() is True
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_probe_success_closes(self):
+        breaker = CircuitBreaker("ep", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.before_call() is False
+
+    def test_probe_failure_reopens(self):
+        breaker = CircuitBreaker("ep", failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        breaker._opened_at -= 60
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_released_probe_lets_the_next_call_probe(self):
+        breaker = CircuitBreaker("ep", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.release_probe()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.before_call() is True
+
+
+class TestRetryBudget:
+    """Test the shared retry token bucket"""
+
+    def test_burst_allowance_then_exhausted(self):
+        budget = RetryBudget(ratio=0.1, min_tokens=2)
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+    def test_requests_refill_at_ratio(self):
+        budget = RetryBudget(ratio=0.5, min_tokens=0)
+        budget.record_request()
+        assert not budget.try_acquire()
+        budget.record_request()
+        assert budget.try_acquire()
+
+    def test_refill_is_capped(self):
+        budget = RetryBudget(ratio=1.0, min_tokens=0, max_tokens=2)
+        for _ in range(10):
+            budget.record_request()
+        assert budget.try_acquire() and budget.try_acquire()
+        assert not budget.try_acquire()
+
+
+class TestRetryAfter:
+    """Test Retry-After parsing"""
+
+    def test_delta_seconds(self):
+        assert parse_retry_after(_response(429, {"Retry-After": "3"})) == 3.0
+
+    def test_http_date(self):
+        at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        seconds = parse_retry_after(_response(503, {"Retry-After": format_datetime(at, usegmt=True)}))
+        assert 25 <= seconds <= 30
+
+    def test_date_in_the_past_is_zero(self):
+        at = datetime.now(timezone.utc) - timedelta(seconds=30)
+        assert parse_retry_after(_response(503, {"Retry-After": format_datetime(at, usegmt=True)})) == 0.0
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(_response(503)) is None
+        assert parse_retry_after(_response(503, {"Retry-After": "soon"})) is None
+
+
+class TestCallWithRetries:
+    """Test retry decisions and breaker bookkeeping around a send function"""
+
+    def setup_method(self):
+        self.sleeps = []
+        self._original_budget = retry.retry_budget
+
+    def teardown_method(self):
+        retry.retry_budget = self._original_budget
+
+    def _run(self, monkeypatch, url, outcomes, idempotent=True, policy=NO_BACKOFF):
+        """Run call_with_retries where each send raises or returns the next outcome"""
+        calls = []
+
+        async def fake_sleep(delay):
+            self.sleeps.append(delay)
+
+        async def send():
+            calls.append(1)
+            outcome = outcomes[len(calls) - 1]
+            if isinstance(outcome, BaseException):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+        try:
+            return asyncio.run(call_with_retries(url, send, idempotent=idempotent, policy=policy)), len(calls)
+        except BaseException as e:
+            return e, len(calls)
+
+    def test_idempotent_call_retries_5xx(self, monkeypatch):
+        result, calls = self._run(monkeypatch, _url(), [_status_error(503), _response(200)])
+        assert result.status_code == 200
+        assert calls == 2
+
+    def test_mutating_call_does_not_retry_5xx(self, monkeypatch):
+        result, calls = self._run(monkeypatch, _url(), [_status_error(503), _response(200)], idempotent=False)
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert calls == 1
+
+    def test_mutating_call_retries_rejected_429(self, monkeypatch):
+        result, calls = self._run(monkeypatch, _url(), [_status_error(429), _response(200)], idempotent=False)
+        assert result.status_code == 200
+        assert calls == 2
+
+    def test_client_errors_are_not_retried(self, monkeypatch):
+        result, calls = self._run(monkeypatch, _url(), [_status_error(404)])
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert calls == 1
+
+    def test_retry_after_sets_the_delay(self, monkeypatch):
+        result, _ = self._run(monkeypatch, _url(), [_status_error(429, {"Retry-After": "2"}), _response(200)])
+        assert result.status_code == 200
+        assert self.sleeps == [2.0]
+
+    def test_retry_after_beyond_cap_gives_up(self, monkeypatch):
+        result, calls = self._run(monkeypatch, _url(), [_status_error(429, {"Retry-After": "60"}), _response(200)])
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert calls == 1
+        assert self.sleeps == []
+
+    def test_exhausted_budget_stops_retries(self, monkeypatch):
+        retry.retry_budget = RetryBudget(ratio=0.0, min_tokens=0)
+        result, calls = self._run(monkeypatch, _url(), [_status_error(503), _response(200)])
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert calls == 1
+
+    def _half_open(self, monkeypatch) -> str:
+        monkeypatch.setattr(settings, "http_breaker_failure_threshold", 1)
+        monkeypatch.setattr(settings, "http_breaker_reset_seconds", 0.0)
+        url = _url()
+        get_breaker(url).record_failure()
+        return url
+
+    @pytest.mark.parametrize("error", [
+        asyncio.CancelledError(),
+        DeadlineExceeded("whatsapp_webhook", "http"),
+        ValueError("bad payload"),
+    ])
+    def test_probe_without_verdict_is_released(self, monkeypatch, error):
+        url = self._half_open(monkeypatch)
+        result, _ = self._run(monkeypatch, url, [error])
+        assert isinstance(result, type(error))
+
+        breaker = get_breaker(url)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        result, _ = self._run(monkeypatch, url, [_response(200)])
+        assert result.status_code == 200
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens_the_breaker(self, monkeypatch):
+        url = self._half_open(monkeypatch)
+        result, calls = self._run(monkeypatch, url, [_status_error(503)], policy=RetryPolicy(max_attempts=1))
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert get_breaker(url).state == CircuitBreaker.OPEN
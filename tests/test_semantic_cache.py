@@ -0,0 +1,95 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# The cook_assistant package builds its service, and with it a Firestore client, on import
+with patch("src.bettermeals.database.database.get_db", MagicMock()):
+    from src.bettermeals.graph.cook_assistant.semantic_cache import (
+        SemanticAnswerCache,
+        cosine,
+        normalize_question,
+        vectorize,
+    )
+
+HOUSEHOLD = {"household_id": "h1", "year_week": "2025-41"}
+OTHER_HOUSEHOLD = {"household_id": "h2", "year_week": "2025-41"}
+
+
+def _similarity(a: str, b: str) -> float:
+    return cosine(vectorize(normalize_question(a).split()), vectorize(normalize_question(b).split()))
+
+
+class TestSemanticAnswerCache:
+    """Test which questions are served from a cached answer"""
+
+    def setup_method(self):
+        self.cache = SemanticAnswerCache()
+
+    def test_rephrased_question_hits(self):
+        self.cache.store("How long should I soak rajma?", {}, "Soak rajma for 8 hours.")
+        assert self.cache.lookup("how long to soak rajma", {}) == "Soak rajma for 8 hours."
+
+    @pytest.mark.parametrize("stored, asked", [
+        ("can I use ghee in dal", "can I not use ghee in dal"),
+        ("can I not use ghee in dal", "can I use ghee in dal"),
+        ("should I add salt to the rice", "should I add no salt to the rice"),
+        ("can I make roti without oil", "can I make roti with oil"),
+    ])
+    def test_negation_never_matches_the_positive_form(self, stored, asked):
+        self.cache.store(stored, HOUSEHOLD, "cached answer")
+        assert self.cache.lookup(asked, HOUSEHOLD) is None
+
+    @pytest.mark.parametrize("stored, asked", [
+        ("how much water for 1 cup rice", "how much water for 3 cup rice"),
+        ("how much water for 1.5 cup rice", "how much water for 2 cup rice"),
+        ("how much water for one cup rice", "how much water for two cup rice"),
+        ("how much water for 1 cup rice", "how much water for cup rice"),
+    ])
+    def test_changed_quantity_never_matches(self, stored, asked):
+        self.cache.store(stored, HOUSEHOLD, "cached answer")
+        assert self.cache.lookup(asked, HOUSEHOLD) is None
+
+    def test_negated_pair_would_pass_the_threshold_on_similarity_alone(self):
+        assert _similarity("can I use ghee in dal", "can I not use ghee in dal") >= 0.85
+
+    def test_same_quantity_and_negation_still_match(self):
+        self.cache.store("can I not use ghee in 2 cups dal", HOUSEHOLD, "cached answer")
+        assert self.cache.lookup("can i not use ghee in 2 cups dal?", HOUSEHOLD) == "cached answer"
+
+    def test_follow_ups_are_not_cached(self):
+        self.cache.store("and what about it for 4 people", HOUSEHOLD, "cached answer")
+        assert self.cache.lookup("and what about it for 4 people", HOUSEHOLD) is None
+
+    def test_scoped_answers_stay_in_their_household(self):
+        self.cache.store("what is on my menu for dinner", HOUSEHOLD, "Dal and rice")
+        assert self.cache.lookup("what is on my menu for dinner", HOUSEHOLD) == "Dal and rice"
+        assert self.cache.lookup("what is on my menu for dinner", OTHER_HOUSEHOLD) is None
+
+    def test_scoped_question_without_keys_is_not_cached(self):
+        self.cache.store("what is on my menu for dinner", {}, "Dal and rice")
+        assert self.cache.lookup("what is on my menu for dinner", {}) is None
+
+    @pytest.mark.parametrize("question", [
+        "what can I use instead of paneer",
+        "substitute for paneer in palak paneer",
+        "is masoor dal ok for kids",
+        "how much chilli in the sabzi",
+    ])
+    def test_general_questions_are_not_shared_between_households(self, question):
+        # The agent answered with h1's allergies and household size in its context
+        self.cache.store(question, HOUSEHOLD, "h1's answer")
+        assert self.cache.lookup(question, OTHER_HOUSEHOLD) is None
+
+    def test_same_question_from_two_households_gets_each_households_answer(self):
+        self.cache.store("substitute for paneer in palak paneer", HOUSEHOLD, "Use tofu")
+        self.cache.store("substitute for paneer in palak paneer", OTHER_HOUSEHOLD, "Use potatoes (soy allergy)")
+        assert self.cache.lookup("substitute for paneer in palak paneer", HOUSEHOLD) == "Use tofu"
+        assert self.cache.lookup("substitute for paneer in palak paneer", OTHER_HOUSEHOLD) == "Use potatoes (soy allergy)"
+
+    def test_household_independent_intent_is_shared(self):
+        self.cache.store("How long should I soak rajma?", HOUSEHOLD, "Soak rajma for 8 hours.")
+        assert self.cache.lookup("how long to soak rajma", OTHER_HOUSEHOLD) == "Soak rajma for 8 hours."
+
+    def test_household_independent_intent_about_the_plan_stays_scoped(self):
+        self.cache.store("how long to soak rajma for my dinner", HOUSEHOLD, "Start now")
+        assert self.cache.lookup("how long to soak rajma for my dinner", OTHER_HOUSEHOLD) is None
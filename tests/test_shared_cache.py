@@ -0,0 +1,215 @@
+import asyncio
+import base64
+import json
+import pickle
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.bettermeals.config.settings import settings
+from src.bettermeals.utils import shared_cache
+from src.bettermeals.utils.deadline import request_deadline
+from src.bettermeals.utils.kv_server import KVServer, KVStore
+from src.bettermeals.utils.shared_cache import MISSING, LocalKVClient, TwoTierCache
+
+
+@pytest.fixture
+def kv(monkeypatch):
+    """Shared tier backed by an in-process store, signed with a test secret"""
+    client = LocalKVClient()
+    monkeypatch.setattr(settings, "shared_cache_url", "local")
+    monkeypatch.setattr(settings, "shared_cache_secret", "test-secret")
+    monkeypatch.setattr(shared_cache, "_client", client)
+    return client
+
+
+class Loader:
+    """Loader that counts its calls"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestKVStore:
+    """Test TTLs, set-if-absent, LRU eviction and prefix invalidation of the store"""
+
+    def test_entry_expires(self):
+        store = KVStore()
+        store.set("k", "v", ttl=0.05)
+        assert store.get("k") == "v"
+        time.sleep(0.06)
+        assert store.get("k") is None
+
+    def test_add_only_sets_absent_or_expired_keys(self):
+        store = KVStore()
+        assert store.add("lease", "1", ttl=0.05)
+        assert not store.add("lease", "2", ttl=0.05)
+        time.sleep(0.06)
+        assert store.add("lease", "3", ttl=0.05)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        store = KVStore(max_entries=2)
+        store.set("a", "1", ttl=60)
+        store.set("b", "2", ttl=60)
+        store.get("a")
+        store.set("c", "3", ttl=60)
+        assert store.get("b") is None
+        assert store.get("a") == "1"
+
+    def test_invalidate_drops_the_prefix_only(self):
+        store = KVStore()
+        store.set("household:1", "a", ttl=60)
+        store.set("household:2", "b", ttl=60)
+        store.set("ssm:x", "c", ttl=60)
+        assert store.invalidate("household:") == 2
+        assert store.get("ssm:x") == "c"
+
+    def test_unknown_op(self):
+        assert KVStore().handle({"op": "flush"})["ok"] is False
+
+
+class TestKVServer:
+    """Test the JSON-lines protocol over a socket"""
+
+    def test_protocol_round_trip(self):
+        async def scenario():
+            server = await asyncio.start_server(KVServer()._serve_client, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            async def call(request):
+                writer.write(json.dumps(request).encode() + b"\n")
+                await writer.drain()
+                return json.loads(await reader.readline())
+
+            responses = [
+                await call({"op": "set", "key": "k", "value": "v", "ttl": 60}),
+                await call({"op": "get", "key": "k"}),
+                await call({"op": "add", "key": "k", "value": "w", "ttl": 60}),
+                await call({"op": "invalidate", "prefix": "k"}),
+                await call({"op": "get", "key": "k"}),
+                await call({"op": "set", "key": "k"}),
+            ]
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+
+        responses = asyncio.run(scenario())
+        assert responses[1] == {"ok": True, "value": "v"}
+        assert responses[2] == {"ok": True, "added": False}
+        assert responses[3] == {"ok": True, "deleted": 1}
+        assert responses[4] == {"ok": True, "value": None}
+        assert responses[5]["ok"] is False  # missing fields are reported, not fatal
+
+
+class TestTwoTierCache:
+    """Test the local and shared tiers, negative caching and invalidation"""
+
+    def test_value_loaded_in_one_process_is_seen_by_another(self, kv):
+        loader = Loader({"name": "home", "created": datetime(2026, 1, 5, tzinfo=timezone.utc)})
+        TwoTierCache("household", ttl=60).get_or_load("h1", loader)
+        other_process = TwoTierCache("household", ttl=60)
+        assert other_process.get_or_load("h1", loader) == loader.value
+        assert loader.calls == 1
+
+    def test_none_is_cached_for_the_negative_ttl(self, kv):
+        cache = TwoTierCache("household", ttl=60, negative_ttl=0.05)
+        loader = Loader(None)
+        assert cache.get_or_load("missing", loader) is None
+        assert cache.get_or_load("missing", loader) is None
+        assert loader.calls == 1
+        time.sleep(0.06)
+        cache.get_or_load("missing", loader)
+        assert loader.calls == 2
+
+    def test_invalidate_all_drops_one_namespace_in_both_tiers(self, kv):
+        households, parameters = TwoTierCache("household", ttl=60), TwoTierCache("ssm", ttl=60)
+        households.set("h1", {"a": 1})
+        parameters.set("p1", "value")
+        households.invalidate_all()
+        assert households.get("h1") is MISSING
+        assert TwoTierCache("household", ttl=60).get("h1") is MISSING
+        assert TwoTierCache("ssm", ttl=60).get("p1") == "value"
+
+    def test_delete_reaches_other_processes(self, kv):
+        TwoTierCache("household", ttl=60).set("h1", {"a": 1})
+        TwoTierCache("household", ttl=60).delete("h1")
+        assert TwoTierCache("household", ttl=60).get("h1") is MISSING
+
+    def test_unserializable_value_stays_local(self, kv):
+        cache = TwoTierCache("household", ttl=60)
+        cache.set("h1", {1, 2})
+        assert cache.get("h1") == {1, 2}
+        assert kv.get("household:h1") is None
+
+    def test_works_without_a_shared_tier(self, monkeypatch):
+        monkeypatch.setattr(settings, "shared_cache_url", None)
+        cache = TwoTierCache("household", ttl=60)
+        loader = Loader("v")
+        cache.get_or_load("k", loader)
+        assert cache.get_or_load("k", loader) == "v"
+        assert loader.calls == 1
+
+
+class TestSharedEntryIntegrity:
+    """Test that entries from the unauthenticated tier are verified before decoding"""
+
+    def test_tampered_entry_is_a_miss(self, kv):
+        TwoTierCache("ssm", ttl=60).set("url", "https://api.example")
+        signature, _, payload = kv.get("ssm:url").partition(".")
+        kv.set("ssm:url", f"{signature}.{payload.replace('example', 'evil')}", 60)
+        assert TwoTierCache("ssm", ttl=60).get("url") is MISSING
+
+    def test_unsigned_entry_is_a_miss(self, kv):
+        kv.set("ssm:url", json.dumps(["https://evil.example"]), 60)
+        assert TwoTierCache("ssm", ttl=60).get("url") is MISSING
+
+    def test_pickle_payload_is_never_unpickled(self, kv, monkeypatch):
+        monkeypatch.setattr(settings, "shared_cache_secret", None)
+        kv.set("ssm:url", base64.b64encode(pickle.dumps(("value",))).decode(), 60)
+        assert TwoTierCache("ssm", ttl=60).get("url") is MISSING
+
+
+class TestStampedeLease:
+    """Test that only the lease holder loads, and how long the others wait"""
+
+    def test_waiter_takes_the_leaders_value(self, kv):
+        kv.add("household:h1:lease", "1", 5)
+        leader = TwoTierCache("household", ttl=60)
+        threading.Timer(0.1, leader.set, args=("h1", {"from": "leader"})).start()
+        loader = Loader({"from": "waiter"})
+        assert TwoTierCache("household", ttl=60).get_or_load("h1", loader) == {"from": "leader"}
+        assert loader.calls == 0
+
+    def test_lease_is_released_after_loading(self, kv):
+        TwoTierCache("household", ttl=60).get_or_load("h1", Loader({"a": 1}))
+        assert kv.get("household:h1:lease") is None
+
+    def test_wait_is_bounded_by_the_request_deadline(self, kv):
+        kv.add("household:h1:lease", "1", 5)
+        loader = Loader({"a": 1})
+        started = time.monotonic()
+        with request_deadline(0.2, "test"):
+            TwoTierCache("household", ttl=60).get_or_load("h1", loader)
+        assert time.monotonic() - started < 1.0
+        assert loader.calls == 1
+
+    def test_event_loop_caller_loads_instead_of_polling(self, kv):
+        kv.add("household:h1:lease", "1", 5)
+        loader = Loader({"a": 1})
+
+        async def on_loop():
+            return TwoTierCache("household", ttl=60).get_or_load("h1", loader)
+
+        started = time.monotonic()
+        assert asyncio.run(on_loop()) == {"a": 1}
+        assert time.monotonic() - started < 0.5
+        assert loader.calls == 1
@@ -0,0 +1,161 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+from fastapi.testclient import TestClient
+
+from src.bettermeals.entrypoints.sticky_front import (
+    HEALTH_FAILURES_TO_REMOVE,
+    RETRY_AFTER_SECONDS,
+    HashRing,
+    StickyFront,
+    Worker,
+    create_front,
+)
+
+KEYS = [f"+9198{i:08d}" for i in range(2000)]
+
+
+def _ring(*nodes: str) -> HashRing:
+    ring = HashRing(replicas=64)
+    for node in nodes:
+        ring.add(node)
+    return ring
+
+
+class TestHashRing:
+    """Test placement and rebalancing of phone numbers on the consistent hash ring"""
+
+    def test_empty_ring_has_no_owner(self):
+        assert HashRing(replicas=8).node_for("+919800000000") is None
+
+    def test_same_key_maps_to_the_same_node(self):
+        ring = _ring("worker-0", "worker-1", "worker-2")
+        assert all(ring.node_for(key) == ring.node_for(key) for key in KEYS[:50])
+
+    def test_keys_spread_over_all_nodes(self):
+        ring = _ring("worker-0", "worker-1", "worker-2", "worker-3")
+        counts = {}
+        for key in KEYS:
+            node = ring.node_for(key)
+            counts[node] = counts.get(node, 0) + 1
+        assert set(counts) == set(ring.nodes)
+        assert min(counts.values()) > len(KEYS) / 4 * 0.5
+
+    def test_removing_a_node_only_moves_its_keys(self):
+        ring = _ring("worker-0", "worker-1", "worker-2", "worker-3")
+        before = {key: ring.node_for(key) for key in KEYS}
+        ring.remove("worker-2")
+        assert "worker-2" not in ring.nodes
+        for key, node in before.items():
+            if node != "worker-2":
+                assert ring.node_for(key) == node
+
+    def test_adding_a_node_moves_about_one_nth_of_keys(self):
+        ring = _ring("worker-0", "worker-1", "worker-2")
+        before = {key: ring.node_for(key) for key in KEYS}
+        ring.add("worker-3")
+        moved = [key for key in KEYS if ring.node_for(key) != before[key]]
+        assert all(ring.node_for(key) == "worker-3" for key in moved)
+        assert len(moved) < len(KEYS) * 0.4
+
+    def test_readding_a_node_restores_placement(self):
+        ring = _ring("worker-0", "worker-1")
+        before = {key: ring.node_for(key) for key in KEYS}
+        ring.remove("worker-1")
+        ring.add("worker-1")
+        assert {key: ring.node_for(key) for key in KEYS} == before
+
+
+class TestStickyFront:
+    """Test routing by normalized phone number and leader selection"""
+
+    def test_phone_number_formats_route_to_the_same_worker(self):
+        front = StickyFront([Worker(i, 9000 + i) for i in range(3)])
+        for worker in front.workers.values():
+            front.ring.add(worker.name)
+        assert front.route("+91 98765 43210") is front.route("919876543210")
+
+    def test_only_worker_zero_is_leader(self):
+        with patch("src.bettermeals.entrypoints.sticky_front.subprocess.Popen", MagicMock()) as popen:
+            for i in range(3):
+                Worker(i, 9000 + i).start()
+        flags = [call.kwargs["env"]["BACKGROUND_LEADER"] for call in popen.call_args_list]
+        assert flags == ["true", "false", "false"]
+
+
+def _front(handler, count=2) -> StickyFront:
+    front = StickyFront([Worker(i, 9000 + i) for i in range(count)])
+    front.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    for worker in front.workers.values():
+        worker.process = MagicMock(poll=MagicMock(return_value=None))
+        front.ring.add(worker.name)
+    return front
+
+
+def _post(front: StickyFront):
+    client = TestClient(create_front(front))
+    return client.post("/webhooks/whatsapp", json={"phone_number": "+919876543210", "text": "hi"})
+
+
+class TestStickyFrontFailures:
+    """Test answers for failing workers and health-based ring membership"""
+
+    def test_worker_that_does_not_answer_gets_503_with_retry_after(self):
+        sent = []
+
+        def handler(request):
+            sent.append(request.url.port)
+            raise httpx.ReadTimeout("worker hung", request=request)
+
+        response = _post(_front(handler))
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == RETRY_AFTER_SECONDS
+        # Not replayed on another worker: the first may already have acted on it
+        assert len(sent) == 1
+
+    def test_dropped_connection_gets_503(self):
+        def handler(request):
+            raise httpx.RemoteProtocolError("server disconnected", request=request)
+
+        assert _post(_front(handler)).status_code == 503
+
+    def test_refused_connection_is_retried_on_another_worker(self):
+        def handler(request):
+            if request.url.port == refused:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={"reply": "ok"})
+
+        front = _front(handler)
+        refused = front.route("+919876543210").port
+        response = _post(front)
+        assert response.status_code == 200
+        assert len(front.ring.nodes) == 1
+
+    def test_failed_health_checks_take_a_live_worker_off_the_ring(self):
+        def handler(request):
+            if request.url.port == 9001:
+                raise httpx.ReadTimeout("hung", request=request)
+            return httpx.Response(200, json={"status": "ok"})
+
+        front = _front(handler)
+        asyncio.run(front.check_workers())
+        assert front.ring.nodes == ["worker-0", "worker-1"]  # one failure is tolerated
+        asyncio.run(front.check_workers())
+        assert front.ring.nodes == ["worker-0"]
+
+    def test_recovered_worker_rejoins_the_ring(self):
+        healthy = {"worker": False}
+
+        def handler(request):
+            if request.url.port == 9001 and not healthy["worker"]:
+                return httpx.Response(500)
+            return httpx.Response(200, json={"status": "ok"})
+
+        front = _front(handler)
+        for _ in range(HEALTH_FAILURES_TO_REMOVE):
+            asyncio.run(front.check_workers())
+        assert front.ring.nodes == ["worker-0"]
+        healthy["worker"] = True
+        asyncio.run(front.check_workers())
+        assert front.ring.nodes == ["worker-0", "worker-1"]
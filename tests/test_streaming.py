@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.bettermeals.graph import streaming
+from src.bettermeals.graph.streaming import OutboundRelay, stream_graph
+
+PARAGRAPH = "Here is your plan for the week: dal chawal on Monday, rajma on Tuesday, and palak paneer on Wednesday."
+TAIL = "Reply 'approve' to lock it in."
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+
+    def send(phone_number, text):
+        messages.append(text)
+        return True
+
+    monkeypatch.setattr(streaming, "send_whatsapp_message", send)
+    return messages
+
+
+def _relay(events, response, phone_number="919876543210"):
+    async def scenario():
+        relay = OutboundRelay(phone_number)
+        for event in events:
+            await relay(event)
+        return await relay.finish(response)
+
+    return asyncio.run(scenario())
+
+
+def _tokens(text, size=7):
+    return [{"type": "token", "text": text[i:i + size]} for i in range(0, len(text), size)]
+
+
+class TestOutboundRelay:
+    """Test what is sent while the graph runs and what is left for the reply"""
+
+    def test_finish_trims_the_already_streamed_prefix(self, sent):
+        answer = f"{PARAGRAPH}\n\n{TAIL}"
+        response = _relay(_tokens(answer), {"reply": answer, "pending_action": "approve_plan"})
+        assert sent == [PARAGRAPH]
+        assert response == {"reply": TAIL, "pending_action": "approve_plan", "streamed": True}
+
+    def test_discard_drops_the_handoff_preamble(self, sent):
+        preamble = "Let me check that with the meal planner."
+        answer = f"{PARAGRAPH}\n\n{TAIL}"
+        events = _tokens(preamble) + [{"type": "discard"}] + _tokens(answer)
+        response = _relay(events, {"reply": answer})
+        assert sent == [PARAGRAPH]
+        assert preamble not in " ".join(sent)
+        assert response["reply"] == TAIL
+
+    def test_short_answer_stays_in_the_reply(self, sent):
+        response = _relay(_tokens(TAIL), {"reply": TAIL})
+        assert sent == []
+        assert response == {"reply": TAIL}
+
+    def test_only_the_first_progress_note_is_sent(self, sent):
+        events = [
+            {"type": "progress", "worker": "meal_recommender", "label": "Planning your meals"},
+            {"type": "progress", "worker": "order", "label": "Working on your grocery order"},
+        ]
+        _relay(events, {"reply": TAIL})
+        assert sent == ["Planning your meals..."]
+
+    def test_failed_send_is_not_trimmed(self, monkeypatch):
+        monkeypatch.setattr(streaming, "send_whatsapp_message", lambda phone_number, text: False)
+        answer = f"{PARAGRAPH}\n\n{TAIL}"
+        assert _relay(_tokens(answer), {"reply": answer}) == {"reply": answer}
+
+
+class FakeGraph:
+    """Replays astream_events v2 events and returns a fixed final state"""
+
+    def __init__(self, events, state):
+        self.events = events
+        self.state = state
+
+    async def astream_events(self, state_in, config, version):
+        for event in self.events:
+            yield event
+
+    async def aget_state(self, config):
+        return SimpleNamespace(values=self.state)
+
+
+def _supervisor(kind, **data):
+    return {"event": kind, "name": "model", "metadata": {"langgraph_checkpoint_ns": "supervisor:1|model:2"}, "data": data}
+
+
+class TestStreamGraph:
+    """Test how graph events are turned into relay events"""
+
+    def test_events_are_translated(self):
+        events = [
+            _supervisor("on_chat_model_stream", chunk=AIMessageChunk(content="Let me ask the planner.")),
+            _supervisor("on_chat_model_end", output=AIMessage(content="", tool_calls=[{"name": "transfer", "args": {}, "id": "c1"}])),
+            {"event": "on_chain_start", "name": "meal_recommender", "metadata": {"langgraph_node": "meal_recommender"}, "data": {}},
+            {"event": "on_chain_start", "name": "meal_recommender", "metadata": {"langgraph_node": "meal_recommender"}, "data": {}},
+            # Worker model tokens are not part of the supervisor's answer
+            {"event": "on_chat_model_stream", "name": "model", "metadata": {"langgraph_checkpoint_ns": "meal_recommender:3"}, "data": {"chunk": AIMessageChunk(content="internal")}},
+            _supervisor("on_chat_model_stream", chunk=AIMessageChunk(content="Here is your plan.")),
+            {"event": "on_chain_stream", "name": "graph", "metadata": {}, "data": {"chunk": {"pending_action": "approve_plan"}}},
+        ]
+        state = {"messages": [AIMessage(content="Here is your plan.")], "pending_action": "approve_plan"}
+        received = []
+
+        response = asyncio.run(stream_graph(FakeGraph(events, state), {}, {}, on_event=received.append))
+        assert received == [
+            {"type": "token", "text": "Let me ask the planner."},
+            {"type": "discard"},
+            {"type": "progress", "worker": "meal_recommender", "label": "Planning your meals"},
+            {"type": "token", "text": "Here is your plan."},
+            {"type": "interrupt", "pending_action": "approve_plan"},
+        ]
+        assert response == {"reply": "Here is your plan.", "pending_action": "approve_plan"}
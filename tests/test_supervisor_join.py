@@ -0,0 +1,72 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.bettermeals.graph.join import trivial_join_reply
+
+
+def _fan_out(*targets):
+    return AIMessage(
+        content="",
+        name="supervisor",
+        tool_calls=[{"name": f"transfer_to_{target}", "args": {}, "id": f"call-{target}"} for target in targets],
+    )
+
+
+def _answer(worker, text):
+    return AIMessage(content=text, name=worker)
+
+
+class TestTrivialJoinReply:
+    """Test which fan-out joins are answered without the supervisor model"""
+
+    def test_plain_answers_are_joined_in_dispatch_order(self):
+        messages = [
+            HumanMessage("score my plan and check my order"),
+            _fan_out("meal_scorer", "order"),
+            _answer("order", "Order 42 is out for delivery."),
+            _answer("meal_scorer", "Your plan scores 8.5/10."),
+        ]
+        assert trivial_join_reply(messages) == "Your plan scores 8.5/10.\n\nOrder 42 is out for delivery."
+
+    def test_single_handoff_is_not_a_join(self):
+        assert trivial_join_reply([_fan_out("meal_scorer"), _answer("meal_scorer", "8.5/10")]) is None
+
+    def test_missing_branch_answer(self):
+        assert trivial_join_reply([_fan_out("meal_scorer", "order"), _answer("meal_scorer", "8.5/10")]) is None
+
+    def test_question_or_error_needs_the_model(self):
+        for text in ("Which plan do you mean?", "The scoring API failed.", "Error: timeout", "Unable to fetch the order."):
+            messages = [_fan_out("meal_scorer", "order"), _answer("meal_scorer", text), _answer("order", "Order 42 delivered.")]
+            assert trivial_join_reply(messages) is None, text
+
+    def test_markers_match_whole_words_only(self):
+        messages = [
+            _fan_out("meal_scorer", "order"),
+            _answer("meal_scorer", "Great protein variety; no terrors here."),
+            _answer("order", "Order 42 delivered without failover."),
+        ]
+        assert trivial_join_reply(messages) is not None
+
+    def test_cart_from_a_branch_needs_the_model(self):
+        messages = [
+            _fan_out("meal_scorer", "order"),
+            _answer("meal_scorer", "Your plan scores 8.5/10."),
+            _answer("order", "Cart C-7 is ready, total ₹2,340."),
+        ]
+        assert trivial_join_reply(messages) is None
+
+    def test_new_plan_from_a_branch_needs_the_model(self):
+        messages = [
+            _fan_out("meal_recommender", "onboarding"),
+            _answer("meal_recommender", "Here's your 7-day veg plan."),
+            _answer("onboarding", "Saved: vegetarian household."),
+        ]
+        assert trivial_join_reply(messages) is None
+
+    def test_approvable_tool_result_in_full_history_needs_the_model(self):
+        messages = [
+            _fan_out("meal_scorer", "order"),
+            ToolMessage('{"cart_id": "C-7"}', tool_call_id="call-1", name="bm_build_cart"),
+            _answer("meal_scorer", "Your plan scores 8.5/10."),
+            _answer("order", "All set."),
+        ]
+        assert trivial_join_reply(messages) is None
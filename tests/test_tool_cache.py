@@ -0,0 +1,62 @@
+import asyncio
+
+from src.bettermeals.tools.cache import ToolResultCache, tags_from, tool_cache
+from src.bettermeals.tools.meals import bm_recommend_meals
+from src.bettermeals.tools.onboarding import bm_onboard_household
+from src.bettermeals.tools.orders import bm_checkout, bm_order_status
+
+
+class TestToolResultCache:
+    """Test tag rendering and invalidation of cached tool results"""
+
+    def setup_method(self):
+        tool_cache.clear()
+
+    def test_tags_skip_missing_fields(self):
+        """Templates whose field is in neither args nor result are dropped"""
+        tags = tags_from("order:{order_id}", "cart:{cart_id}")
+        assert tags({"order_id": "o1"}, {"status": "packed"}) == ["order:o1"]
+        assert tags({}, {"cart_id": "c1"}) == ["cart:c1"]
+
+    def test_invalidate_tags_drops_tagged_entries(self):
+        cache = ToolResultCache()
+        cache.put("a", 1, 60, ["order:o1"])
+        cache.put("b", 2, 60, ["order:o2"])
+        assert cache.invalidate_tags(["order:o1"]) == 1
+        assert cache.get("a") == (False, None)
+        assert cache.get("b") == (True, 2)
+
+    def test_order_status_is_tagged_with_its_order(self):
+        asyncio.run(bm_order_status.ainvoke({"order_id": "o1"}))
+        assert tool_cache.invalidate_tags(["order:o1"]) == 1
+
+    def test_repeated_checkout_invalidates_cached_order_status(self):
+        """A repeated checkout returns the original order and drops its cached status"""
+        async def scenario():
+            order = await bm_checkout.ainvoke({"household_id": "h1", "cart_id": "cart-cache-test"})
+            first = await bm_order_status.ainvoke({"order_id": order["order_id"]})
+            assert await bm_order_status.ainvoke({"order_id": order["order_id"]}) == first
+
+            again = await bm_checkout.ainvoke({"household_id": "h1", "cart_id": "cart-cache-test"})
+            assert again["order_id"] == order["order_id"]
+            return await bm_order_status.ainvoke({"order_id": order["order_id"]}), first
+
+        refreshed, first = asyncio.run(scenario())
+        assert refreshed is not first
+
+    def test_household_update_invalidates_cached_recommendations(self):
+        """Changed preferences or allergies drop the household's cached recommendations"""
+        async def scenario():
+            first = await bm_recommend_meals.ainvoke({"household_id": "h-update"})
+            assert await bm_recommend_meals.ainvoke({"household_id": "h-update"}) is first
+
+            updated = await bm_onboard_household.ainvoke({
+                "phone_hash": "p1",
+                "preferences": {"allergies": ["peanut"]},
+                "household_id": "h-update",
+            })
+            assert updated["household_id"] == "h-update"
+            return await bm_recommend_meals.ainvoke({"household_id": "h-update"}), first
+
+        refreshed, first = asyncio.run(scenario())
+        assert refreshed is not first
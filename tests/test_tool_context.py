@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.bettermeals.graph.tool_context import ToolContextCache
+
+PHONE = "919876543210"
+
+
+class Builder:
+    """Counts builds; `during` runs inside a build, like a listener firing meanwhile"""
+
+    def __init__(self, context=None):
+        self.context = context or {"id": "cook-1", "household_id": "h1", "meal_ids": ["m1"]}
+        self.calls = 0
+        self.during = None
+
+    def __call__(self, phone_number):
+        self.calls += 1
+        if self.during is not None:
+            during, self.during = self.during, None
+            during()
+        return dict(self.context)
+
+
+def _change(doc_id):
+    return SimpleNamespace(document=SimpleNamespace(id=doc_id))
+
+
+class TestToolContextCache:
+    """Test caching, payload overrides and invalidation of tool contexts"""
+
+    def setup_method(self):
+        self.cache = ToolContextCache()
+        self.build = Builder()
+
+    def _get(self, payload=None):
+        return self.cache.get("cook", PHONE, payload or {}, self.build)
+
+    def test_context_is_built_once(self):
+        first = self._get()
+        assert self._get() == first
+        assert self.build.calls == 1
+        assert first == {"household_id": "h1", "meal_ids": ["m1"], "phone_number": PHONE}
+
+    def test_payload_values_override_the_cached_ones(self):
+        self._get()
+        assert self._get({"household_id": "h2", "meal_id": "m9"})["household_id"] == "h2"
+        assert self._get()["household_id"] == "h1"
+
+    def test_document_change_drops_the_context(self):
+        self._get()
+        self.cache.invalidate_doc("cook", "cook-1")
+        self._get()
+        assert self.build.calls == 2
+
+    def test_household_change_drops_the_context(self):
+        self._get()
+        self.cache.invalidate_household("h1")
+        self._get()
+        assert self.build.calls == 2
+
+    def test_other_documents_leave_the_context(self):
+        self._get()
+        self.cache.invalidate_doc("user", "cook-1")
+        self.cache.invalidate_household("h2")
+        self._get()
+        assert self.build.calls == 1
+
+    def test_new_day_drops_every_context(self):
+        self._get()
+        self.cache._day = date.today() - timedelta(days=1)
+        self._get()
+        assert self.build.calls == 2
+
+    @pytest.mark.parametrize("invalidate", [
+        lambda cache: cache.invalidate_doc("cook", "cook-1"),
+        lambda cache: cache.invalidate_household("h1"),
+    ])
+    def test_invalidation_during_a_build_is_not_lost(self, invalidate):
+        self.build.during = lambda: invalidate(self.cache)
+        assert self._get()["household_id"] == "h1"  # still answers this message
+        self._get()
+        assert self.build.calls == 2  # but the stale build was not stored
+
+    def test_unrelated_invalidation_during_a_build_keeps_it(self):
+        self.build.during = lambda: self.cache.invalidate_household("h2")
+        self._get()
+        self._get()
+        assert self.build.calls == 1
+
+    def test_failed_build_is_not_cached(self):
+        def failing(phone_number):
+            raise RuntimeError("firestore unavailable")
+
+        with pytest.raises(RuntimeError):
+            self.cache.get("cook", PHONE, {}, failing)
+        self._get()
+        self._get()
+        assert self.build.calls == 1
+
+    def test_listeners_skip_the_initial_snapshot(self):
+        heard = []
+        self.cache.subscribe(heard.append)
+        self._get()
+        self.cache._on_snapshot("household", [], [_change("h1")], None)
+        self._get()
+        assert self.build.calls == 1 and heard == []
+
+        self.cache._on_snapshot("household", [], [_change("h1")], None)
+        self._get()
+        assert self.build.calls == 2 and heard == ["h1"]
+
+    def test_weekly_plan_change_drops_its_household(self):
+        self._get()
+        self.cache._on_snapshot("weekly_meal_plan", [], [], None)
+        self.cache._on_snapshot("weekly_meal_plan", [], [_change("h1-2025-41")], None)
+        self._get()
+        assert self.build.calls == 2
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from src.bettermeals.graph import flow_engine
+from src.bettermeals.graph.weekly_plan import reminders
+from src.bettermeals.graph.weekly_plan.base import WeeklyPlanStep
+from src.bettermeals.graph.weekly_plan.reminders import ApprovalReminderBroadcast
+from src.bettermeals.graph.weekly_plan.service import weekly_plan_service
+
+
+class FakeDB:
+    """Flow snapshots plus the broadcast bookkeeping calls"""
+
+    def __init__(self):
+        self.snapshots = {}
+        self.deliveries = []
+
+    def get_flow_snapshot(self, collection, phone):
+        return self.snapshots.get((collection, phone))
+
+    def get_workflow_messages(self, phone, collection):
+        return []
+
+    def commit_flow_transition(self, collection, phone, snapshot, records):
+        self.snapshots[(collection, phone)] = snapshot
+        return True
+
+    def record_broadcast_delivery(self, broadcast_id, phone, household_id, status, error):
+        self.deliveries.append((phone, status))
+
+    def save_broadcast_progress(self, broadcast_id, progress):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(flow_engine, "get_db", lambda: fake)
+    monkeypatch.setattr(reminders, "get_db", lambda: fake)
+    return fake
+
+
+def _send(broadcast, household_id, phone):
+    async def scenario():
+        queue = asyncio.Queue()
+        await queue.put((household_id, phone))
+        worker = asyncio.create_task(broadcast._sender(queue))
+        await queue.join()
+        worker.cancel()
+
+    asyncio.run(scenario())
+
+
+class TestApprovalReminderBroadcast:
+    """Test that a delivered reminder leaves the household at the step its reply expects"""
+
+    def test_sent_reminder_moves_the_flow_to_plan_approval(self, db, monkeypatch):
+        monkeypatch.setattr(reminders, "send_whatsapp_message", lambda phone, text: True)
+        _send(ApprovalReminderBroadcast(), "hh-1", "+910000000001")
+
+        flow = weekly_plan_service.generic_weekly_plan
+        assert db.deliveries == [("+910000000001", "sent")]
+        assert flow.get_step("+910000000001") == WeeklyPlanStep.PLAN_APPROVAL
+
+    def test_failed_send_leaves_the_flow_alone(self, db, monkeypatch):
+        monkeypatch.setattr(reminders, "send_whatsapp_message", lambda phone, text: False)
+        _send(ApprovalReminderBroadcast(), "hh-1", "+910000000001")
+
+        assert db.deliveries == [("+910000000001", "failed")]
+        assert db.snapshots == {}
+
+    def test_completed_flow_is_not_moved_back(self, db, monkeypatch):
+        monkeypatch.setattr(reminders, "send_whatsapp_message", lambda phone, text: True)
+        flow = weekly_plan_service.generic_weekly_plan
+        flow.set_step("+910000000001", WeeklyPlanStep.COMPLETED)
+        _send(ApprovalReminderBroadcast(), "hh-1", "+910000000001")
+
+        assert flow.get_step("+910000000001") == WeeklyPlanStep.COMPLETED
+
+    def test_reminder_for_another_week_leaves_the_flow_alone(self, db, monkeypatch):
+        monkeypatch.setattr(reminders, "send_whatsapp_message", lambda phone, text: True)
+        _send(ApprovalReminderBroadcast("2020-01"), "hh-1", "+910000000001")
+
+        assert db.snapshots == {}